@@ -4,11 +4,16 @@ Loader mechanism for caching data, with data expiration, etc.
 .. versionadded:: 2016.11.0
 """
 
+import functools
 import logging
+import multiprocessing.util
+import os
+import threading
 import time
 
 import salt.config
 import salt.loader
+import salt.payload
 import salt.syspaths
 from salt.utils.odict import OrderedDict
 
@@ -21,7 +26,9 @@ def factory(opts, **kwargs):
     If memory caching is enabled by opts MemCache class will be instantiated.
     If not Cache class will be returned.
     """
-    if opts.get("memcache_expire_seconds", 0):
+    if opts.get("memcache_expire_seconds", 0) or opts.get(
+        "memcache_write_back_interval", 0
+    ):
         cls = MemCache
     else:
         cls = Cache
@@ -258,37 +265,201 @@ class Cache:
         fun = f"{self.driver}.contains"
         return self.modules[fun](bank, key, **self._kwargs)
 
+    def fetch_many(self, bank, keys):
+        """
+        Fetch the data of several keys of a bank. Drivers providing a
+        ``fetch_many`` function fetch them at once, the others one by one.
+
+        .. versionadded:: 3008.0
+
+        :param bank:
+            The name of the location inside the cache which holds the keys.
+
+        :param keys:
+            The names of the keys to fetch.
+
+        :return:
+            A dict mapping every key to the python object fetched from the
+            cache, or an empty dict if the key was not found.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        keys = list(keys)
+        fun = f"{self.driver}.fetch_many"
+        if fun in self.modules:
+            return self.modules[fun](bank, keys, **self._kwargs)
+        fetch = self.modules[f"{self.driver}.fetch"]
+        return {key: fetch(bank, key, **self._kwargs) for key in keys}
+
+    def store_many(self, bank, data):
+        """
+        Store the data of several keys of a bank. Drivers providing a
+        ``store_many`` function store them at once, the others one by one.
+
+        .. versionadded:: 3008.0
+
+        :param bank:
+            The name of the location inside the cache which will hold the keys
+            and their associated data.
+
+        :param data:
+            A dict mapping the names of the keys to the data to store under
+            them.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        if not data:
+            return
+        fun = f"{self.driver}.store_many"
+        if fun in self.modules:
+            return self.modules[fun](bank, data, **self._kwargs)
+        store = self.modules[f"{self.driver}.store"]
+        for key, value in data.items():
+            store(bank, key, value, **self._kwargs)
+
+    def list_with_values(self, bank, key, entries=None):
+        """
+        Lists the entries of the specified bank together with the data of
+        ``key`` in the bank of every entry, e.g. the cached grains and pillar
+        of all minions with ``list_with_values("minions", "data")``. Drivers
+        providing a ``list_with_values`` function read them at once, the
+        others one by one.
+
+        .. versionadded:: 3008.0
+
+        :param bank:
+            The name of the location inside the cache whose entries are banks
+            holding the key.
+
+        :param key:
+            The name of the key to fetch from the bank of every entry.
+
+        :param entries:
+            Only return these entries instead of all the entries of the bank.
+
+        :return:
+            A dict mapping the entries to the python object fetched from the
+            cache, or an empty dict if the key was not found. Drivers reading
+            the entries at once may leave out the entries not holding the key.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        if entries is not None:
+            entries = list(entries)
+            if not entries:
+                return {}
+        fun = f"{self.driver}.list_with_values"
+        if fun in self.modules:
+            return self.modules[fun](bank, key, entries=entries, **self._kwargs)
+        if entries is None:
+            entries = self.list(bank) or []
+        fetch = self.modules[f"{self.driver}.fetch"]
+        return {
+            entry: fetch(f"{bank}/{entry}", key, **self._kwargs) for entry in entries
+        }
+
+    def list_states(self, bank):
+        """
+        Lists the entries of the specified bank grouped by the ``state`` held
+        in their data, e.g. the minion ids of the ``keys`` bank by key state.
+        Drivers providing a ``list_states`` function read them from an index,
+        the others fetch every entry.
+
+        .. versionadded:: 3008.0
+
+        :param bank:
+            The name of the location inside the cache whose entries hold a
+            state.
+
+        :return:
+            A dict mapping every state to the list of entries in that state.
+
+        :raises SaltCacheError:
+            Raises an exception if cache driver detected an error accessing data
+            in the cache backend (auth, permissions, etc).
+        """
+        fun = f"{self.driver}.list_states"
+        if fun in self.modules:
+            return self.modules[fun](bank, **self._kwargs)
+        ret = {}
+        for entry, data in self.fetch_many(bank, self.list(bank) or []).items():
+            if isinstance(data, dict) and "state" in data:
+                ret.setdefault(data["state"], []).append(entry)
+        return ret
+
 
 class MemCache(Cache):
     """
     Short-lived in-memory cache store keeping values on time and/or size (count)
     basis.
+
+    With ``memcache_write_back_interval`` set, stored values are kept in memory
+    and written to the driver in batches at most that many seconds later, when
+    ``memcache_max_items`` values are waiting to be written, before the bank is
+    listed or checked and when the process exits. Storing the same bank and key
+    again before it was written only writes the last value.
     """
 
     # {<storage_id>: odict({<key>: [atime, data], ...}), ...}
     data = {}
+    # {<storage_id>: [<total size>, {<key>: <size>, ...}], ...}
+    sizes = {}
+    # {<storage_id>: odict({<key>: data, ...}), ...}
+    pending = {}
+    # {<storage_id>: {<key>: data, ...}, ...} being written back
+    writing = {}
+    # {<storage_id>: {<counter>: <value>, ...}, ...}
+    metrics = {}
+    # {<storage_id>: <MemCache instance writing the pending values back>, ...}
+    _writers = {}
+    # {<storage_id>: <pid of the process watching the driver's invalidations>}
+    _watching = {}
+    # {<storage_id>: <number of invalidations>}
+    _invalidations = {}
+    _lock = threading.RLock()
+    # Held while writing values back, so that they are written in order
+    _write_lock = threading.Lock()
+    _timer = None
+    _finalizer_pid = None
 
     def __init__(self, opts, **kwargs):
         super().__init__(opts, **kwargs)
         self.expire = opts.get("memcache_expire_seconds", 10)
         self.max = opts.get("memcache_max_items", 1024)
+        self.max_bytes = opts.get("memcache_max_bytes", 0)
+        self.write_back = opts.get("memcache_write_back_interval", 0)
         self.cleanup = opts.get("memcache_full_cleanup", False)
         self.debug = opts.get("memcache_debug", False)
         if self.debug:
             self.call = 0
             self.hit = 0
         self._storage = None
+        self._storage_id = None
 
     @classmethod
     def __cleanup(cls, expire):
         now = time.time()
-        for storage in cls.data.values():
+        for storage_id, storage in cls.data.items():
             for key, data in list(storage.items()):
                 if data[0] + expire < now:
-                    del storage[key]
+                    cls._discard(storage_id, key)
                 else:
                     break
 
+    @classmethod
+    def _discard(cls, storage_id, key):
+        with cls._lock:
+            cls.data.get(storage_id, {}).pop(key, None)
+            sizes = cls.sizes.get(storage_id)
+            if sizes is not None:
+                sizes[0] -= sizes[1].pop(key, 0)
+
     def _get_storage_id(self):
         fun = f"{self.driver}.storage_id"
         if fun in self.modules:
@@ -296,60 +467,374 @@ class MemCache(Cache):
         else:
             return self.driver
 
+    @property
+    def storage_id(self):
+        if self._storage_id is None:
+            self._storage_id = self._get_storage_id()
+        return self._storage_id
+
     @property
     def storage(self):
         if self._storage is None:
-            storage_id = self._get_storage_id()
-            if storage_id not in MemCache.data:
-                MemCache.data[storage_id] = OrderedDict()
-            self._storage = MemCache.data[storage_id]
+            storage_id = self.storage_id
+            with MemCache._lock:
+                self._storage = MemCache.data.setdefault(storage_id, OrderedDict())
+            self._watch_invalidations()
         return self._storage
 
+    def _watch_invalidations(self):
+        """
+        Let drivers able to tell which keys other processes changed remove
+        them from the storage, once per process and storage
+        """
+        fun = f"{self.driver}.watch_invalidations"
+        if MemCache._watching.get(self.storage_id) == os.getpid():
+            return
+        MemCache._watching[self.storage_id] = os.getpid()
+        if fun in self.modules:
+            self.modules[fun](
+                functools.partial(MemCache._invalidate, self.storage_id),
+                **self._kwargs,
+            )
+
+    @classmethod
+    def _invalidate(cls, storage_id, bank, keys):
+        """
+        Remove the keys of a bank from a storage, the whole bank and its
+        sub-banks if ``keys`` is None, or everything if ``bank`` is None
+        """
+        invalidated = 0
+        with cls._lock:
+            # Values fetched from the driver before the invalidation may be
+            # stale, see _fetched
+            cls._invalidations[storage_id] = cls._invalidations.get(storage_id, 0) + 1
+            for bank_, key_ in tuple(cls.data.get(storage_id, ())):
+                if (
+                    bank is None
+                    or (bank_ == bank and (keys is None or key_ in keys))
+                    or (keys is None and bank_.startswith(f"{bank}/"))
+                ):
+                    cls._discard(storage_id, (bank_, key_))
+                    invalidated += 1
+            if invalidated:
+                cls._add_metric(storage_id, "invalidated", invalidated)
+
+    @classmethod
+    def _add_metric(cls, storage_id, counter, value=1):
+        with cls._lock:
+            metrics = cls.metrics.setdefault(storage_id, {})
+            metrics[counter] = metrics.get(counter, 0) + value
+
+    @property
+    def pending_writes(self):
+        """
+        The values stored in this storage which were not written to the driver
+        yet
+        """
+        return MemCache.pending.setdefault(self.storage_id, OrderedDict())
+
+    def _unwritten(self):
+        """
+        The pending values of this storage and the ones being written back,
+        most recent first
+        """
+        return self.pending_writes, MemCache.writing.get(self.storage_id, {})
+
+    def _count(self, counter, value=1):
+        MemCache._add_metric(self.storage_id, counter, value)
+
+    def stats(self):
+        """
+        Return the counters of this storage: the ``hit`` and ``miss`` counts
+        of fetched values, the ``evicted`` values, the values ``invalidated``
+        by changes of other processes, the ``coalesced`` stores
+        which replaced a value not written yet, and the number of write backs
+        (``flushes``) and values written back (``flushed``).
+
+        .. versionadded:: 3008.0
+        """
+        return dict(MemCache.metrics.get(self.storage_id, {}))
+
     def fetch(self, bank, key):
         if self.debug:
             self.call += 1
+        if self.write_back:
+            with MemCache._lock:
+                for unwritten in self._unwritten():
+                    if (bank, key) in unwritten:
+                        self._count("hit")
+                        return unwritten[(bank, key)]
         now = time.time()
-        record = self.storage.pop((bank, key), None)
-        # Have a cached value for the key
-        if record is not None and record[0] + self.expire >= now:
-            if self.debug:
-                self.hit += 1
-                log.debug(
-                    "MemCache stats (call/hit/rate): %s/%s/%s",
-                    self.call,
-                    self.hit,
-                    float(self.hit) / self.call,
-                )
-            # update atime and return
-            record[0] = now
-            self.storage[(bank, key)] = record
-            return record[1]
+        with MemCache._lock:
+            record = self.storage.get((bank, key))
+            # Have a cached value for the key
+            if record is not None and record[0] + self.expire >= now:
+                # update atime and return
+                record[0] = now
+                self.storage.move_to_end((bank, key))
+                self._count("hit")
+                if self.debug:
+                    self.hit += 1
+                    log.debug(
+                        "MemCache stats (call/hit/rate): %s/%s/%s",
+                        self.call,
+                        self.hit,
+                        float(self.hit) / self.call,
+                    )
+                return record[1]
 
         # Have no value for the key or value is expired
+        self._count("miss")
+        invalidations = self._invalidation_count()
         data = super().fetch(bank, key)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [now, data]
+        self._fetched(invalidations, {(bank, key): data}, now)
         return data
 
+    def _invalidation_count(self):
+        return MemCache._invalidations.get(self.storage_id, 0)
+
+    def _fetched(self, invalidations, values, now):
+        """
+        Keep values fetched from the driver, unless the driver invalidated
+        values of the storage in the meantime: the fetch may have read the
+        value before another process changed it.
+        """
+        with MemCache._lock:
+            if self._invalidation_count() != invalidations:
+                return
+            for (bank, key), data in values.items():
+                self._remember(bank, key, data, now)
+
+    def _remember(self, bank, key, data, now):
+        size = 0
+        if self.max_bytes:
+            try:
+                size = len(salt.payload.dumps(data))
+            except Exception:  # pylint: disable=broad-except
+                pass
+        storage = self.storage
+        with MemCache._lock:
+            MemCache._discard(self.storage_id, (bank, key))
+            while storage and (
+                len(storage) >= self.max
+                or (self.max_bytes and self._size() + size > self.max_bytes)
+            ):
+                if self.cleanup:
+                    MemCache.__cleanup(self.expire)
+                if len(storage) >= self.max or (
+                    self.max_bytes and self._size() + size > self.max_bytes
+                ):
+                    MemCache._discard(self.storage_id, next(iter(storage)))
+                    self._count("evicted")
+            storage[(bank, key)] = [now, data]
+            if self.max_bytes:
+                sizes = MemCache.sizes.setdefault(self.storage_id, [0, {}])
+                sizes[0] += size
+                sizes[1][(bank, key)] = size
+
+    def _size(self):
+        return MemCache.sizes.get(self.storage_id, (0,))[0]
+
     def store(self, bank, key, data):
-        self.storage.pop((bank, key), None)
+        if self.write_back:
+            self.store_many(bank, {key: data})
+            return
+        MemCache._discard(self.storage_id, (bank, key))
         super().store(bank, key, data)
-        if len(self.storage) >= self.max:
-            if self.cleanup:
-                MemCache.__cleanup(self.expire)
-            if len(self.storage) >= self.max:
-                self.storage.popitem(last=False)
-        self.storage[(bank, key)] = [time.time(), data]
+        self._remember(bank, key, data, time.time())
 
-    def flush(self, bank, key=None):
-        if key is None:
-            for bank_, key_ in tuple(self.storage):
-                if bank == bank_:
-                    self.storage.pop((bank_, key_))
+    def fetch_many(self, bank, keys):
+        now = time.time()
+        ret = {}
+        missing = []
+        with MemCache._lock:
+            unwritten = self._unwritten() if self.write_back else ()
+            for key in keys:
+                record = self.storage.get((bank, key))
+                values = next((vals for vals in unwritten if (bank, key) in vals), None)
+                if values is not None:
+                    ret[key] = values[(bank, key)]
+                elif record is not None and record[0] + self.expire >= now:
+                    record[0] = now
+                    self.storage.move_to_end((bank, key))
+                    ret[key] = record[1]
+                else:
+                    missing.append(key)
+                    continue
+                self._count("hit")
+        if missing:
+            self._count("miss", len(missing))
+            invalidations = self._invalidation_count()
+            fetched = super().fetch_many(bank, missing)
+            self._fetched(
+                invalidations,
+                {(bank, key): data for key, data in fetched.items()},
+                now,
+            )
+            ret.update(fetched)
+        return ret
+
+    def store_many(self, bank, data):
+        if not self.write_back:
+            for key in data:
+                MemCache._discard(self.storage_id, (bank, key))
+            super().store_many(bank, data)
+            now = time.time()
+            for key, value in data.items():
+                self._remember(bank, key, value, now)
+            return
+        now = time.time()
+        with MemCache._lock:
+            pending = self.pending_writes
+            for key, value in data.items():
+                if pending.pop((bank, key), None) is not None:
+                    self._count("coalesced")
+                pending[(bank, key)] = value
+                self._remember(bank, key, value, now)
+            MemCache._writers[self.storage_id] = self
+            full = len(pending) >= self.max
+        if full:
+            self.write_back_pending()
         else:
-            self.storage.pop((bank, key), None)
+            self._schedule_write_back()
+
+    def _schedule_write_back(self):
+        with MemCache._lock:
+            if MemCache._finalizer_pid != os.getpid():
+                # Write the pending values back when the process exits. The
+                # multiprocessing finalizers also run when a child process exits.
+                multiprocessing.util.Finalize(
+                    None, MemCache.write_back_all, exitpriority=10
+                )
+                MemCache._finalizer_pid = os.getpid()
+            if MemCache._timer is None:
+                MemCache._timer = threading.Timer(
+                    self.write_back, MemCache.write_back_all
+                )
+                MemCache._timer.daemon = True
+                MemCache._timer.start()
+
+    @classmethod
+    def _after_fork(cls):
+        # The parent process writes its pending values back
+        cls._lock = threading.RLock()
+        cls._write_lock = threading.Lock()
+        cls._timer = None
+        cls._writers = {}
+        cls.pending = {}
+        cls.writing = {}
+
+    @classmethod
+    def write_back_all(cls):
+        """
+        Write the pending values of all the storages back to their drivers
+
+        .. versionadded:: 3008.0
+        """
+        with cls._lock:
+            if cls._timer is not None:
+                cls._timer.cancel()
+                cls._timer = None
+            writers = list(cls._writers.values())
+        for writer in writers:
+            writer.write_back_pending()
+
+    def write_back_pending(self):
+        """
+        Write the values stored in this storage which were not written to the
+        driver yet
+
+        .. versionadded:: 3008.0
+        """
+        if not self.write_back:
+            return
+        with MemCache._write_lock:
+            with MemCache._lock:
+                pending = self.pending_writes
+                if not pending:
+                    return
+                # The values stored from now on are pending in a new dict,
+                # the driver is written to without holding the lock
+                MemCache.pending[self.storage_id] = OrderedDict()
+                MemCache.writing[self.storage_id] = pending
+            banks = {}
+            for (bank, key), value in pending.items():
+                banks.setdefault(bank, {})[key] = value
+            written = 0
+            failed = {}
+            for bank, data in banks.items():
+                try:
+                    super().store_many(bank, data)
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.error(
+                        "Unable to write %d cached values back to %s: %s",
+                        len(data),
+                        bank,
+                        exc,
+                    )
+                    failed.update(((bank, key), value) for key, value in data.items())
+                    continue
+                written += len(data)
+            with MemCache._lock:
+                del MemCache.writing[self.storage_id]
+                # Values stored in the meantime replace the ones not written
+                pending = self.pending_writes
+                for item, value in failed.items():
+                    pending.setdefault(item, value)
+            self._count("flushes")
+            self._count("flushed", written)
+        if failed:
+            self._schedule_write_back()
+        if self.debug:
+            log.debug("MemCache stats: %s", self.stats())
+
+    def flush(self, bank, key=None):
+        with MemCache._lock:
+            if key is None:
+                for bank_, key_ in tuple(self.storage):
+                    if bank == bank_:
+                        MemCache._discard(self.storage_id, (bank_, key_))
+            else:
+                MemCache._discard(self.storage_id, (bank, key))
+        if self.write_back:
+            # Values being written back must not land after the flush
+            with MemCache._write_lock, MemCache._lock:
+                pending = self.pending_writes
+                for bank_, key_ in tuple(pending):
+                    if (key is None and bank_.startswith(f"{bank}/")) or (
+                        bank_ == bank and key in (None, key_)
+                    ):
+                        del pending[(bank_, key_)]
         super().flush(bank, key)
+
+    def list(self, bank):
+        self.write_back_pending()
+        return super().list(bank)
+
+    def list_states(self, bank):
+        self.write_back_pending()
+        return super().list_states(bank)
+
+    def contains(self, bank, key=None):
+        self.write_back_pending()
+        return super().contains(bank, key)
+
+    def updated(self, bank, key):
+        self.write_back_pending()
+        return super().updated(bank, key)
+
+    def list_with_values(self, bank, key, entries=None):
+        self.write_back_pending()
+        now = time.time()
+        invalidations = self._invalidation_count()
+        ret = super().list_with_values(bank, key, entries=entries)
+        self._fetched(
+            invalidations,
+            {(f"{bank}/{entry}", key): data for entry, data in ret.items()},
+            now,
+        )
+        return ret
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=MemCache._after_fork)
@@ -144,6 +144,47 @@ def fetch(bank, key):
         raise SaltCacheError(f"There was an error reading the key, {c_key}: {exc}")
 
 
+def _get_values(bank):
+    """
+    Read all the values below a bank with a single request.
+    Return a dict mapping the keys relative to the bank to the values.
+    """
+    try:
+        _, items = api.kv.get(bank + "/", recurse=True)
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError(f'There was an error getting the key "{bank}": {exc}')
+    return {item["Key"][len(bank) + 1 :]: item["Value"] for item in items or ()}
+
+
+def fetch_many(bank, keys):
+    """
+    Fetch several keys of a bank by reading the bank in a single request.
+    """
+    values = _get_values(bank)
+    ret = {}
+    for key in keys:
+        value = values.get(key)
+        ret[key] = {} if value is None else salt.payload.loads(value)
+    return ret
+
+
+def list_with_values(bank, key, entries=None):
+    """
+    Fetch the key of every entry of a bank by reading the bank in a single
+    request.
+    """
+    values = _get_values(bank)
+    ret = {}
+    if entries is not None:
+        ret = {entry: {} for entry in entries}
+    for path, value in values.items():
+        entry, _, entry_key = path.partition("/")
+        if entry_key != key or (entries is not None and entry not in ret):
+            continue
+        ret[entry] = {} if value is None else salt.payload.loads(value)
+    return ret
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content.
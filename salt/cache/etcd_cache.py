@@ -166,6 +166,56 @@ def fetch(bank, key):
         raise SaltCacheError(f"There was an error reading the key, {etcd_key}: {exc}")
 
 
+def _read_values(path, recursive=False):
+    """
+    Read the values below a directory with a single request.
+    Return a dict mapping the paths relative to the directory to the values.
+    """
+    try:
+        result = client.read(path, recursive=recursive)
+    except etcd.EtcdKeyNotFound:
+        return {}
+    except Exception as exc:  # pylint: disable=broad-except
+        raise SaltCacheError(f"There was an error reading the key, {path}: {exc}")
+    ret = {}
+    for leaf in result.leaves:
+        if leaf.dir or not leaf.key.startswith(path + "/"):
+            continue
+        ret[leaf.key[len(path) + 1 :]] = leaf.value
+    return ret
+
+
+def fetch_many(bank, keys):
+    """
+    Fetch several keys of a bank by reading the bank in a single request.
+    """
+    _init_client()
+    values = _read_values(f"{path_prefix}/{bank}")
+    ret = {}
+    for key in keys:
+        value = values.get(key)
+        ret[key] = {} if value is None else salt.payload.loads(base64.b64decode(value))
+    return ret
+
+
+def list_with_values(bank, key, entries=None):
+    """
+    Fetch the key of every entry of a bank by reading the bank recursively in
+    a single request.
+    """
+    _init_client()
+    values = _read_values(f"{path_prefix}/{bank}", recursive=True)
+    ret = {}
+    if entries is not None:
+        ret = {entry: {} for entry in entries}
+    for path, value in values.items():
+        entry, _, entry_key = path.partition("/")
+        if entry_key != key or (entries is not None and entry not in ret):
+            continue
+        ret[entry] = salt.payload.loads(base64.b64decode(value))
+    return ret
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content.
@@ -16,8 +16,16 @@ store and fetch handle ETL from new style, where data itself contains key
 state, to old style, where folder and/or bank contain state.
 flush/list/contains/updated are left as nearly equivalent to localfs, without
 the .p file extension to work with legacy keys via banks.
+
+The ids of the keys are also kept in an index by state, stored in the pki dir
+next to the key directories. It is updated together with the key files when
+a key is stored or flushed, and rebuilt from the key directories when their
+modification times do not match the ones recorded in it, e.g. after keys were
+moved around by hand. ``list_states`` reads the index, so that listing the
+accepted keys does not read every key file.
 """
 
+import contextlib
 import errno
 import logging
 import os
@@ -27,6 +35,7 @@ import stat
 import tempfile
 from pathlib import Path
 
+import salt.payload
 import salt.utils.atomicfile
 import salt.utils.files
 import salt.utils.stringutils
@@ -45,6 +54,19 @@ BASE_MAPPING = {
     "minions_denied": "denied",
 }
 
+# The key states of the keys bank, by directory
+KEY_BASES = {
+    base: state for base, state in BASE_MAPPING.items() if base != "minions_denied"
+}
+
+# The index of the ids of the keys by state and the lock serializing its updates
+KEY_INDEX = ".key_index.p"
+KEY_INDEX_LOCK = ".key_index.lock"
+
+# {<cachedir>: [<identity of the index file>, <index>]}, the indexes are
+# shared by the threads of a process and never changed once stored here
+_INDEXES = {}
+
 # master_keys keys that if fetched, even with cluster_id set, will still refer
 # to pki_dir instead of cluster_pki_dir
 NON_CLUSTERED_MASTER_KEYS = []
@@ -81,6 +103,149 @@ def init_kwargs(kwargs):
     return {"cachedir": pki_dir, "user": user}
 
 
+def _chown(path, user):
+    if not user:
+        return
+    try:
+        import pwd
+
+        uid = pwd.getpwnam(user).pw_uid
+        os.chown(path, uid, -1)
+    except (KeyError, ImportError, OSError):
+        # The specified user was not found, allow the backup systems to
+        # report the error
+        pass
+
+
+def _identity(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _dir_mtimes(cachedir):
+    """
+    Return the modification times of the key directories
+    """
+    mtimes = {}
+    for base in KEY_BASES:
+        try:
+            mtimes[base] = os.stat(os.path.join(cachedir, base)).st_mtime_ns
+        except OSError:
+            mtimes[base] = None
+    return mtimes
+
+
+def _scan_index(cachedir):
+    """
+    Build the key index from the key directories
+    """
+    index = {"dirs": _dir_mtimes(cachedir), "keys": {}}
+    for base, state in KEY_BASES.items():
+        index["keys"][state] = set(_list_base("keys", cachedir, base))
+    return index
+
+
+def _read_index(cachedir):
+    """
+    Return the key index stored in ``cachedir``, or None. The index is only
+    read again when the file was replaced.
+    """
+    path = os.path.join(cachedir, KEY_INDEX)
+    identity = _identity(path)
+    if identity is None:
+        return None
+    cached = _INDEXES.get(cachedir)
+    if cached is not None and cached[0] == identity:
+        return cached[1]
+    try:
+        with salt.utils.files.fopen(path, "rb") as fh_:
+            data = salt.payload.load(fh_)
+        index = {
+            "dirs": dict(data["dirs"]),
+            "keys": {state: set(data["keys"][state]) for state in KEY_BASES.values()},
+        }
+    except Exception as exc:  # pylint: disable=broad-except
+        log.debug("Unable to read key index %s: %s", path, exc)
+        return None
+    _INDEXES[cachedir] = [identity, index]
+    return index
+
+
+def _copy_index(index):
+    return {
+        "dirs": dict(index["dirs"]),
+        "keys": {state: set(ids) for state, ids in index["keys"].items()},
+    }
+
+
+def _write_index(cachedir, index, user):
+    path = os.path.join(cachedir, KEY_INDEX)
+    created = not os.path.exists(path)
+    data = {
+        "dirs": index["dirs"],
+        "keys": {state: sorted(ids) for state, ids in index["keys"].items()},
+    }
+    try:
+        with salt.utils.atomicfile.atomic_open(path, "wb") as fh_:
+            salt.payload.dump(data, fh_)
+    except OSError as exc:
+        log.debug("Unable to write key index %s: %s", path, exc)
+        _INDEXES.pop(cachedir, None)
+        return
+    if created:
+        _chown(path, user)
+    _INDEXES[cachedir] = [_identity(path), index]
+
+
+@contextlib.contextmanager
+def _locked_index(cachedir, user=None):
+    """
+    Lock the key index of ``cachedir`` and yield it up to date, so that the
+    key files and the index are changed together. The index is written back
+    when the block exits without an error.
+    """
+    lock_path = os.path.join(cachedir, KEY_INDEX_LOCK)
+    created = not os.path.exists(lock_path)
+    with contextlib.ExitStack() as stack:
+        try:
+            stack.enter_context(salt.utils.files.flopen(lock_path, "a"))
+            locked = True
+        except OSError as exc:
+            log.debug("Unable to lock key index of %s: %s", cachedir, exc)
+            locked = False
+        if not locked:
+            # Still yield the keys, but leave the index alone
+            yield _scan_index(cachedir)
+            return
+        if created:
+            _chown(lock_path, user)
+        index = _read_index(cachedir)
+        if index is None or index["dirs"] != _dir_mtimes(cachedir):
+            log.debug("Rebuilding key index of %s", cachedir)
+            index = _scan_index(cachedir)
+        else:
+            # Other threads may be reading the stored index
+            index = _copy_index(index)
+        yield index
+        index["dirs"] = _dir_mtimes(cachedir)
+        _write_index(cachedir, index, user)
+
+
+def _fresh_index(cachedir, user=None):
+    """
+    Return the key index of ``cachedir``, rebuilding it if the key directories
+    changed since it was written
+    """
+    index = _read_index(cachedir)
+    if index is not None and index["dirs"] == _dir_mtimes(cachedir):
+        return index
+    with _locked_index(cachedir, user) as index:
+        return index
+
+
 def store(bank, key, data, cachedir, user, **kwargs):
     """
     Store key state information. storing a accepted/pending/rejected state
@@ -106,6 +271,7 @@ def store(bank, key, data, cachedir, user, **kwargs):
             base = "minions"
         else:
             raise SaltCacheError("Unrecognized data/bank: {}".format(data["state"]))
+        state = data["state"]
         data = data["pub"]
     elif bank == "denied_keys":
         # denied keys is a list post migration, but is a single key in legacy
@@ -134,37 +300,40 @@ def store(bank, key, data, cachedir, user, **kwargs):
                 f"The cache directory, {base}, could not be created: {exc}"
             )
 
-    # delete current state before re-serializing new state
-    flush(bank, key, cachedir, **kwargs)
+    if bank == "keys":
+        # the key files and the index change together
+        index_lock = _locked_index(cachedir, user)
+    else:
+        index_lock = contextlib.nullcontext()
 
-    tmpfh, tmpfname = tempfile.mkstemp(dir=base)
-    os.close(tmpfh)
+    with index_lock as index:
+        # delete current state before re-serializing new state
+        _flush(bank, key, cachedir)
 
-    if user:
-        try:
-            import pwd
+        tmpfh, tmpfname = tempfile.mkstemp(dir=base)
+        os.close(tmpfh)
 
-            uid = pwd.getpwnam(user).pw_uid
-            os.chown(tmpfname, uid, -1)
-        except (KeyError, ImportError, OSError):
-            # The specified user was not found, allow the backup systems to
-            # report the error
-            pass
+        _chown(tmpfname, user)
 
-    try:
-        with salt.utils.files.set_umask(umask):
-            with salt.utils.files.fopen(tmpfname, "w+b") as fh_:
-                fh_.write(salt.utils.stringutils.to_bytes(data))
+        try:
+            with salt.utils.files.set_umask(umask):
+                with salt.utils.files.fopen(tmpfname, "w+b") as fh_:
+                    fh_.write(salt.utils.stringutils.to_bytes(data))
 
-            if bank == "master_keys":
-                os.chmod(tmpfname, 0o400)
+                if bank == "master_keys":
+                    os.chmod(tmpfname, 0o400)
 
-        # On Windows, os.rename will fail if the destination file exists.
-        salt.utils.atomicfile.atomic_rename(tmpfname, savefn)
-    except OSError as exc:
-        raise SaltCacheError(
-            f"There was an error writing the cache file, base={base}: {exc}"
-        )
+            # On Windows, os.rename will fail if the destination file exists.
+            salt.utils.atomicfile.atomic_rename(tmpfname, savefn)
+        except OSError as exc:
+            raise SaltCacheError(
+                f"There was an error writing the cache file, base={base}: {exc}"
+            )
+
+        if index is not None:
+            for ids in index["keys"].values():
+                ids.discard(key)
+            index["keys"][state].add(key)
 
 
 def fetch(bank, key, cachedir, **kwargs):
@@ -280,7 +449,20 @@ def flush(bank, key=None, cachedir=None, **kwargs):
         raise SaltCacheError("cachedir missing")
 
     if bank == "keys":
-        bases = [base for base in BASE_MAPPING if base != "minions_denied"]
+        with _locked_index(cachedir, kwargs.get("user")) as index:
+            flushed = _flush(bank, key, cachedir)
+            for ids in index["keys"].values():
+                if key is None:
+                    ids.clear()
+                else:
+                    ids.discard(key)
+        return flushed
+    return _flush(bank, key, cachedir)
+
+
+def _flush(bank, key, cachedir):
+    if bank == "keys":
+        bases = list(KEY_BASES)
     elif bank == "denied_keys":
         bases = ["minions_denied"]
     elif bank == "master_keys":
@@ -324,7 +506,7 @@ def list_(bank, cachedir, **kwargs):
     Return an iterable object containing all entries stored in the specified bank.
     """
     if bank == "keys":
-        bases = [base for base in BASE_MAPPING if base != "minions_denied"]
+        bases = list(KEY_BASES)
     elif bank == "denied_keys":
         bases = ["minions_denied"]
     elif bank == "master_keys":
@@ -334,29 +516,45 @@ def list_(bank, cachedir, **kwargs):
 
     ret = []
     for base in bases:
-        base = os.path.join(cachedir, os.path.normpath(base))
-        if not os.path.isdir(base):
+        ret.extend(_list_base(bank, cachedir, base))
+    return ret
+
+
+def _list_base(bank, cachedir, base):
+    base = os.path.join(cachedir, os.path.normpath(base))
+    if not os.path.isdir(base):
+        return []
+    try:
+        items = os.listdir(base)
+    except OSError as exc:
+        raise SaltCacheError(f'There was an error accessing directory "{base}": {exc}')
+    ret = []
+    for item in items:
+        if bank == "master_keys" and item in (KEY_INDEX, KEY_INDEX_LOCK):
             continue
-        try:
-            items = os.listdir(base)
-        except OSError as exc:
-            raise SaltCacheError(
-                f'There was an error accessing directory "{base}": {exc}'
-            )
-        for item in items:
-            # salt foolishly dumps a file here for key cache, ignore it
-            keyfile = Path(cachedir, base, item)
+        # salt foolishly dumps a file here for key cache, ignore it
+        keyfile = Path(cachedir, base, item)
 
-            if (
-                bank in ["keys", "denied_keys"] and not valid_id(__opts__, item)
-            ) or not clean_path(cachedir, str(keyfile), subdir=True):
-                log.error("saw invalid id %s, discarding", item)
+        if (
+            bank in ["keys", "denied_keys"] and not valid_id(__opts__, item)
+        ) or not clean_path(cachedir, str(keyfile), subdir=True):
+            log.error("saw invalid id %s, discarding", item)
 
-            if keyfile.is_file() and not keyfile.is_symlink():
-                ret.append(item)
+        if keyfile.is_file() and not keyfile.is_symlink():
+            ret.append(item)
     return ret
 
 
+def list_states(bank, cachedir, **kwargs):
+    """
+    Return the ids of the keys in the keys bank by state, from the key index
+    """
+    if bank != "keys":
+        raise SaltCacheError(f"Unrecognized bank: {bank}")
+    index = _fresh_index(cachedir, kwargs.get("user"))
+    return {state: list(ids) for state, ids in index["keys"].items()}
+
+
 def contains(bank, key, cachedir, **kwargs):
     """
     Checks if the specified bank contains the specified key.
@@ -89,6 +89,8 @@ except ImportError:
 _DEFAULT_DATABASE_NAME = "salt_cache"
 _DEFAULT_CACHE_TABLE_NAME = "cache"
 _RECONNECT_INTERVAL_SEC = 0.050
+# The maximum number of values passed to a single IN or multi-row query
+_MAX_QUERY_ARGS = 1000
 
 log = logging.getLogger(__name__)
 
@@ -297,6 +299,92 @@ def fetch(bank, key):
     return salt.payload.loads(r[0])
 
 
+def _chunks(items):
+    """
+    Split a list in chunks small enough to be used as the parameters of a
+    single query.
+    """
+    for idx in range(0, len(items), _MAX_QUERY_ARGS):
+        yield items[idx : idx + _MAX_QUERY_ARGS]
+
+
+def store_many(bank, data):
+    """
+    Store several keys of a bank with multi-row REPLACE queries.
+    """
+    _init_client()
+    items = list(data.items())
+    for chunk in _chunks(items):
+        query = "REPLACE INTO {} (bank, etcd_key, data) values{}".format(
+            __context__["mysql_table_name"], ",".join(["(%s,%s,%s)"] * len(chunk))
+        )
+        args = []
+        for key, value in chunk:
+            args.extend((bank, key, salt.payload.dumps(value)))
+        cur, cnt = run_query(__context__.get("mysql_client"), query, args=tuple(args))
+        cur.close()
+        if not len(chunk) <= cnt <= 2 * len(chunk):
+            raise SaltCacheError(
+                f"Error storing {len(chunk)} keys of {bank} returned {cnt}"
+            )
+
+
+def fetch_many(bank, keys):
+    """
+    Fetch several keys of a bank with ``IN`` queries.
+    """
+    _init_client()
+    keys = list(keys)
+    ret = {key: {} for key in keys}
+    for chunk in _chunks(keys):
+        query = (
+            "SELECT etcd_key, data FROM {} WHERE bank=%s AND etcd_key IN ({})".format(
+                __context__["mysql_table_name"], ",".join(["%s"] * len(chunk))
+            )
+        )
+        cur, _ = run_query(__context__.get("mysql_client"), query, args=(bank, *chunk))
+        for key, data in cur.fetchall():
+            ret[key] = salt.payload.loads(data)
+        cur.close()
+    return ret
+
+
+def list_with_values(bank, key, entries=None):
+    """
+    Fetch the key of every entry of a bank, with ``IN`` queries when the
+    entries are given and a single query otherwise.
+    """
+    _init_client()
+    if entries is None:
+        query = "SELECT bank, data FROM {} WHERE bank LIKE %s AND etcd_key=%s".format(
+            __context__["mysql_table_name"]
+        )
+        pattern = (
+            bank.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "/%"
+        )
+        queries = [(query, (pattern, key))]
+        ret = {}
+    else:
+        entries = list(entries)
+        queries = []
+        for chunk in _chunks(entries):
+            query = (
+                "SELECT bank, data FROM {} WHERE etcd_key=%s AND bank IN ({})".format(
+                    __context__["mysql_table_name"], ",".join(["%s"] * len(chunk))
+                )
+            )
+            queries.append((query, (key, *(f"{bank}/{entry}" for entry in chunk))))
+        ret = {entry: {} for entry in entries}
+    for query, args in queries:
+        cur, _ = run_query(__context__.get("mysql_client"), query, args=args)
+        for entry_bank, data in cur.fetchall():
+            entry = entry_bank[len(bank) + 1 :]
+            if "/" not in entry:
+                ret[entry] = salt.payload.loads(data)
+        cur.close()
+    return ret
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content.
@@ -118,6 +118,24 @@ unix_socket_path:
 
     Path to a UNIX socket for access. Overrides `host` / `port`.
 
+invalidation: ``False``
+
+    .. versionadded:: 3008.0
+
+    Publish a message on a Redis channel whenever keys are stored or flushed,
+    and subscribe to these messages. The in-memory caches of every master
+    process using this Redis server (see :conf_master:`memcache_expire_seconds`)
+    then drop the values changed by the other processes as soon as they are
+    changed, which makes long memcache expiration times safe. When the
+    subscription is lost, the in-memory caches are cleared once it is
+    restored.
+
+invalidation_channel: ``$INVALIDATE``
+
+    .. versionadded:: 3008.0
+
+    The name of the Redis channel the invalidation messages are published on.
+
 Configuration Example:
 
 .. code-block:: yaml
@@ -131,6 +149,7 @@ Configuration Example:
     cache.redis.key_prefix: #KEY
     cache.redis.timestamp_prefix: #TICKS
     cache.redis.separator: '@'
+    cache.redis.invalidation: true
 
 Cluster Configuration Example:
 
@@ -153,7 +172,10 @@ Cluster Configuration Example:
 
 import itertools
 import logging
+import os
+import threading
 import time
+import uuid
 
 import salt.payload
 import salt.utils.stringutils
@@ -192,8 +214,14 @@ _KEY_PREFIX = "$KEY"
 _TIMESTAMP_PREFIX = "$TSTAMP"
 _BANK_KEYS_PREFIX = "$BANKEYS"
 _SEPARATOR = "_"
+_INVALIDATION_CHANNEL = "$INVALIDATE"
+# Seconds to wait before subscribing again to the invalidation messages
+_RESUBSCRIBE_INTERVAL = 5
 
 REDIS_SERVER = None
+# Identifies the invalidation messages published by this process
+_SENDER = None
+_SENDER_PID = None
 
 # -----------------------------------------------------------------------------
 # property functions
@@ -329,6 +357,58 @@ def _get_bank_keys_redis_key(bank):
     )
 
 
+def _get_sender():
+    """
+    Return the identifier of this process in the invalidation messages.
+    """
+    global _SENDER, _SENDER_PID
+    if _SENDER_PID != os.getpid():
+        _SENDER = uuid.uuid4().hex
+        _SENDER_PID = os.getpid()
+    return _SENDER
+
+
+def _publish_invalidation(redis_pipe, bank, keys=None):
+    """
+    Publish the invalidation of the keys of a bank, or of the whole bank and
+    its sub-banks if ``keys`` is None, within the Redis pipeline.
+    """
+    if not __opts__.get("cache.redis.invalidation", False):
+        return
+    channel = __opts__.get("cache.redis.invalidation_channel", _INVALIDATION_CHANNEL)
+    redis_pipe.publish(channel, salt.payload.dumps([_get_sender(), bank, keys]))
+
+
+def _watch_invalidations(callback):
+    """
+    Subscribe to the invalidation messages and pass the ones published by the
+    other processes to ``callback``. Runs forever, subscribing again when the
+    subscription is lost.
+    """
+    channel = __opts__.get("cache.redis.invalidation_channel", _INVALIDATION_CHANNEL)
+    while True:
+        try:
+            pubsub = _get_redis_server().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(channel)
+            # Changes may have been missed while not subscribed
+            callback(None, None)
+            for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    sender, bank, keys = salt.payload.loads(message["data"])
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.debug("Ignoring invalid invalidation message: %s", exc)
+                    continue
+                if sender != _get_sender():
+                    callback(bank, keys)
+        except (RedisConnectionError, RedisResponseError) as rerr:
+            log.warning(
+                "Lost the subscription to the Redis cache invalidations: %s", rerr
+            )
+            time.sleep(_RESUBSCRIBE_INTERVAL)
+
+
 def _build_bank_hier(bank, redis_pipe):
     """
     Build the bank hierarchy from the root of the tree.
@@ -393,6 +473,7 @@ def store(bank, key, data):
             salt.payload.dumps(int(time.time())),
         )
         log.debug("Adding %s to %s", key, redis_bank_keys)
+        _publish_invalidation(redis_pipe, bank, [key])
         redis_pipe.execute()
     except (RedisConnectionError, RedisResponseError) as rerr:
         mesg = "Cannot set the Redis cache key {rkey}: {rerr}".format(
@@ -422,6 +503,73 @@ def fetch(bank, key):
     return salt.payload.loads(redis_value)
 
 
+def store_many(bank, data):
+    """
+    Store several keys of a bank in a single Redis pipeline.
+    """
+    redis_server = _get_redis_server()
+    redis_pipe = redis_server.pipeline()
+    redis_bank_keys = _get_bank_keys_redis_key(bank)
+    timestamp = salt.payload.dumps(int(time.time()))
+    try:
+        _build_bank_hier(bank, redis_pipe)
+        for key, value in data.items():
+            redis_pipe.set(_get_key_redis_key(bank, key), salt.payload.dumps(value))
+            redis_pipe.set(_get_timestamp_key(bank=bank, key=key), timestamp)
+        redis_pipe.sadd(redis_bank_keys, *data)
+        log.debug("Setting %d keys under %s", len(data), bank)
+        _publish_invalidation(redis_pipe, bank, list(data))
+        redis_pipe.execute()
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = "Cannot set the Redis cache keys of {bank}: {rerr}".format(
+            bank=bank, rerr=rerr
+        )
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+
+
+def _mget(redis_keys):
+    """
+    Fetch and deserialize several Redis keys with a single MGET.
+    """
+    if not redis_keys:
+        return []
+    redis_server = _get_redis_server()
+    try:
+        redis_values = redis_server.mget(redis_keys)
+    except (RedisConnectionError, RedisResponseError) as rerr:
+        mesg = "Cannot fetch the Redis cache keys {rkeys}: {rerr}".format(
+            rkeys=", ".join(redis_keys[:3]) + (", ..." if len(redis_keys) > 3 else ""),
+            rerr=rerr,
+        )
+        log.error(mesg)
+        raise SaltCacheError(mesg)
+    return [
+        {} if redis_value is None else salt.payload.loads(redis_value)
+        for redis_value in redis_values
+    ]
+
+
+def fetch_many(bank, keys):
+    """
+    Fetch several keys of a bank from the Redis cache with a single MGET.
+    """
+    keys = list(keys)
+    return dict(zip(keys, _mget([_get_key_redis_key(bank, key) for key in keys])))
+
+
+def list_with_values(bank, key, entries=None):
+    """
+    Fetch the key of every entry of a bank from the Redis cache with a single
+    MGET.
+    """
+    if entries is None:
+        entries = list_(bank)
+    entries = list(entries)
+    redis_keys = [_get_key_redis_key(f"{bank}/{entry}", key) for entry in entries]
+    return dict(zip(entries, _mget(redis_keys)))
+
+
 def flush(bank, key=None):
     """
     Remove the key from the cache bank with all the key content. If no key is specified, remove
@@ -515,6 +663,7 @@ def flush(bank, key=None):
             bank_keys_redis_key,
         )
         # but also its reference from $BANKEYS list
+    _publish_invalidation(redis_pipe, bank, None if key is None else [key])
     try:
         redis_pipe.execute()  # Fluuuush
     except (RedisConnectionError, RedisResponseError) as rerr:
@@ -578,3 +727,26 @@ def updated(bank, key):
     if value is not None:
         value = salt.payload.loads(value)
     return value
+
+
+def watch_invalidations(callback):
+    """
+    Call ``callback(bank, keys)`` from a background thread whenever other
+    processes store or flush keys, with ``keys`` being None when a whole bank
+    and its sub-banks were flushed. ``callback(None, None)`` means that any
+    key may have changed.
+
+    Returns False if ``cache.redis.invalidation`` is not enabled.
+
+    .. versionadded:: 3008.0
+    """
+    if not __opts__.get("cache.redis.invalidation", False):
+        return False
+    thread = threading.Thread(
+        target=_watch_invalidations,
+        args=(callback,),
+        name="RedisCacheInvalidations",
+        daemon=True,
+    )
+    thread.start()
+    return True
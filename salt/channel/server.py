@@ -65,6 +65,10 @@ class ReqServerChannel:
         (pathlib.Path(self.opts["cachedir"]) / "sessions").mkdir(exist_ok=True)
         self.sessions = {}
 
+    @property
+    def minion_keys(self):
+        return salt.crypt.get_minion_key_cache(self.opts)
+
     @property
     def aes_key(self):
         if self.opts.get("cluster_id", None):
@@ -185,9 +189,10 @@ class ReqServerChannel:
         # intercept the "_auth" commands, since the main daemon shouldn't know
         # anything about our key auth
         if payload["enc"] == "clear" and payload.get("load", {}).get("cmd") == "_auth":
-            raise tornado.gen.Return(
-                self._auth(payload["load"], sign_messages, version)
-            )
+            start = time.time()
+            ret = self._auth(payload["load"], sign_messages, version)
+            self.minion_keys.record_auth(time.time() - start)
+            raise tornado.gen.Return(ret)
 
         if payload["enc"] == "aes":
             nonce = None
@@ -281,15 +286,13 @@ class ReqServerChannel:
         try:
             key = salt.crypt.Crypticle.generate_key_string()
             pcrypt = salt.crypt.Crypticle(self.opts, key)
-            pub = self.cache.fetch("keys", target)
-            if not isinstance(pub, dict) or "pub" not in pub:
+            pub = self.minion_keys.fetch(target)
+            if pub is None:
                 log.error(
                     "No pub key found for target %s, its pub key was likely deleted mid-request.",
                     target,
                 )
                 return self.crypticle.dumps({})
-
-            pub = salt.crypt.PublicKey.from_str(pub["pub"])
         except Exception as exc:  # pylint: disable=broad-except
             log.error(
                 'Corrupt or missing public key "%s": %s',
@@ -388,18 +391,18 @@ class ReqServerChannel:
         tok = payload["load"].pop("tok", None)
         id_ = payload["load"].get("id", None)
         if tok is not None and id_ is not None:
-            if "cluster_id" in self.opts and self.opts["cluster_id"]:
-                pki_dir = self.opts["cluster_pki_dir"]
-            else:
-                pki_dir = self.opts.get("pki_dir", "")
-            try:
-                pub_path = salt.utils.verify.clean_join(pki_dir, "minions", id_)
-            except salt.exceptions.SaltValidationError:
+            if not salt.utils.verify.valid_id(self.opts, id_):
                 log.warning("Invalid minion id: %s", id_)
                 return False
             try:
-                pub = salt.crypt.PublicKey.from_file(pub_path)
-            except OSError:
+                pub = self.minion_keys.fetch(id_, state="accepted")
+            except (
+                OSError,
+                salt.exceptions.InvalidKeyError,
+                salt.exceptions.SaltCacheError,
+            ):
+                pub = None
+            if pub is None:
                 log.warning(
                     "Salt minion claiming to be %s attempted to communicate with "
                     "master, but key could not be read and verification was denied.",
@@ -747,7 +750,7 @@ class ReqServerChannel:
         # The key payload may sometimes be corrupt when using auto-accept
         # and an empty request comes in
         try:
-            pub = salt.crypt.PublicKey.from_str(key["pub"])
+            pub = self.minion_keys.from_str(load["id"], key["pub"])
         except salt.crypt.InvalidKeyError as err:
             log.error(
                 'Corrupt or missing public key "%s": %s',
@@ -1118,6 +1121,8 @@ class MasterPubServerChannel:
         self.transport = state["transport"]
 
     def close(self):
+        if getattr(self, "batcher", None) is not None:
+            self.batcher.close()
         self.transport.close()
 
     def pre_fork(self, process_manager, kwargs=None):
@@ -1144,6 +1149,16 @@ class MasterPubServerChannel:
             )
             os.nice(self.opts["event_publisher_niceness"])
         self.io_loop = tornado.ioloop.IOLoop.current()
+        self.batcher = None
+        if self.opts.get("event_batch_window", 0) > 0:
+            self.batcher = salt.utils.event.EventBatcher(
+                self._publish_local,
+                self.opts["event_batch_window"],
+                self.opts.get("event_batch_size", 1000),
+                io_loop=self.io_loop,
+            )
+        self.event_count = 0
+        self.stat_clock = time.time()
         tcp_master_pool_port = self.opts["cluster_pool_port"]
         self.pushers = []
         self.auth_errors = {}
@@ -1264,15 +1279,63 @@ class MasterPubServerChannel:
             return event_data
         raise salt.exceptions.AuthenticationError("Peer aes key not available")
 
+    async def _publish_local(self, load):
+        """
+        Publish a packed event, or a batch of them, on the local event bus
+        """
+        try:
+            await self.transport.publish_payload(load)
+        # XXX This error is transport specific and should be something else
+        except tornado.iostream.StreamClosedError:
+            log.error("Unable to forward event to local ipc bus")
+
+    async def _post_stats(self):
+        """
+        Fire an event with the throughput of the event bus
+        """
+        now = time.time()
+        if now - self.stat_clock <= self.opts["master_stats_event_iter"]:
+            return
+        duration = now - self.stat_clock
+        if self.batcher is not None:
+            batches = self.batcher.batches
+            max_batch_size = self.batcher.max_batch_size
+            self.batcher.reset_stats()
+        else:
+            batches = self.event_count
+            max_batch_size = 1 if self.event_count else 0
+        stats = {
+            "time": duration,
+            "worker": "EventPublisher",
+            "events": self.event_count,
+            "events_per_second": self.event_count / duration,
+            "batches": batches,
+            "mean_batch_size": self.event_count / batches if batches else 0,
+            "max_batch_size": max_batch_size,
+        }
+        self.event_count = 0
+        self.stat_clock = now
+        await self._publish_local(
+            salt.utils.event.SaltEvent.pack(
+                salt.utils.event.tagify("EventPublisher", "stats"), stats
+            )
+        )
+
     async def publish_payload(self, load, *args):
         tag, data = salt.utils.event.SaltEvent.unpack(load)
         tasks = []
         if not tag.startswith("cluster/peer"):
-            tasks = [
-                asyncio.create_task(
-                    self.transport.publish_payload(load), name=self.opts["id"]
-                )
-            ]
+            self.event_count += 1
+            if self.batcher is not None:
+                await self.batcher.add(load)
+            else:
+                tasks = [
+                    asyncio.create_task(
+                        self.transport.publish_payload(load), name=self.opts["id"]
+                    )
+                ]
+            if self.opts.get("master_stats", False):
+                await self._post_stats()
         for pusher in self.pushers:
             log.debug("Publish event to peer %s:%s", pusher.pull_host, pusher.pull_port)
             if tag.startswith("cluster/peer"):
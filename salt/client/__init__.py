@@ -8,6 +8,8 @@ The data structure needs to be:
               'key': '<read in the key file>'}
 """
 
+import asyncio
+import concurrent.futures
 import logging
 
 # The components here are simple, and they need to be and stay simple, we
@@ -40,6 +42,7 @@ import salt.utils.jid
 import salt.utils.minions
 import salt.utils.network
 import salt.utils.platform
+import salt.utils.statedelta
 import salt.utils.stringutils
 import salt.utils.user
 import salt.utils.verify
@@ -231,6 +234,7 @@ class LocalClient:
         self.utils = salt.loader.utils(self.opts)
         self.functions = salt.loader.minion_mods(self.opts, utils=self.utils)
         self.returners = salt.loader.returners(self.opts, self.functions)
+        self._state_delta_bases = None
 
     def __read_master_key(self):
         """
@@ -1123,11 +1127,22 @@ class LocalClient:
         tgt_type="glob",
         expect_minions=False,
         block=True,
+        latency=False,
         **kwargs,
     ):
         """
         Watch the event system and return job data as it comes in
 
+        Minions with :conf_minion:`job_heartbeat_interval` set fire a
+        heartbeat event for every job they are running. Those minions are
+        known to be running the job for as long as their heartbeats keep
+        coming in, so ``saltutil.find_job`` is only published to the minions
+        that did not send any.
+
+        :param bool latency: Add the number of seconds each minion took to
+            return, counted from the start of the wait, to its return as
+            ``latency``.
+
         :returns: all of the information for the JID
         """
         if not isinstance(minions, set):
@@ -1141,10 +1156,12 @@ class LocalClient:
         gather_job_timeout = int(
             kwargs.get("gather_job_timeout", self.opts["gather_job_timeout"])
         )
-        start = int(time.time())
+        start = time.time()
 
         # timeouts per minion, id_ -> timeout time
         minion_timeouts = {}
+        # time the next heartbeat is expected per minion, id_ -> time
+        heartbeats = {}
 
         found = set()
         missing = set()
@@ -1201,6 +1218,17 @@ class LocalClient:
                         missing.update(raw["data"]["missing"])
                     continue
 
+                if raw["tag"].startswith(f"salt/job/{jid}/beat/"):
+                    id_ = raw["data"].get("id")
+                    if id_ in minions and id_ not in found:
+                        # the minion runs the job until its next heartbeat is
+                        # due, however long the interval is compared to the
+                        # timeouts
+                        interval = raw["data"].get("interval") or 0
+                        heartbeats[id_] = time.time() + interval
+                        minion_timeouts[id_] = heartbeats[id_] + timeout
+                    continue
+
                 # Anything below this point is expected to be a job return event.
                 if not raw["tag"].startswith(f"salt/job/{jid}/ret/"):
                     log.debug("Skipping non return event: %s", raw["tag"])
@@ -1208,8 +1236,13 @@ class LocalClient:
                 if "return" not in raw["data"]:
                     log.warning("Malformed event return: %s", raw["tag"])
                     continue
+                raw["data"]["return"] = self.expand_state_delta(
+                    raw["data"]["id"], raw["data"]["return"]
+                )
                 if kwargs.get("raw", False):
                     found.add(raw["data"]["id"])
+                    if latency:
+                        raw["latency"] = time.time() - start
                     yield raw
                 else:
                     found.add(raw["data"]["id"])
@@ -1222,6 +1255,8 @@ class LocalClient:
                         ret[raw["data"]["id"]]["jid"] = raw["data"]["jid"]
                     if kwargs.get("_cmd_meta", False):
                         ret[raw["data"]["id"]].update(raw["data"])
+                    if latency:
+                        ret[raw["data"]["id"]]["latency"] = time.time() - start
                     log.debug("jid %s return from %s", jid, raw["data"]["id"])
                     yield ret
 
@@ -1261,11 +1296,20 @@ class LocalClient:
             # if the jinfo has timed out and some minions are still running the job
             # re-do the ping
             if time.time() > timeout_at and minions_running:
-                # since this is a new ping, no one has responded yet
-                jinfo = self.gather_job_info(
-                    jid, list(minions - found), "list", **kwargs
+                # minions sending heartbeats are running the job as long as
+                # their last heartbeat is recent, only ping the others
+                now = time.time()
+                minions_running = any(
+                    now - heartbeats[id_] < gather_job_timeout
+                    for id_ in minions - found
+                    if id_ in heartbeats
                 )
-                minions_running = False
+                ping = minions - found - set(heartbeats)
+                if ping:
+                    # since this is a new ping, no one has responded yet
+                    jinfo = self.gather_job_info(jid, list(ping), "list", **kwargs)
+                else:
+                    jinfo = {}
                 # if we weren't assigned any jid that means the master thinks
                 # we have nothing to send
                 if "jid" not in jinfo:
@@ -1382,6 +1426,43 @@ class LocalClient:
             for minion in missing:
                 yield {minion: {"failed": True}}
 
+    async def get_iter_returns_async(self, jid, minions, timeout=None, **kwargs):
+        """
+        Asynchronous generator over the returns of a job, as they come in.
+
+        Takes the same arguments as :py:meth:`get_iter_returns`, which is run
+        in a thread of its own so that waiting on the event bus and on
+        ``saltutil.find_job`` does not block the event loop. Every return
+        carries the number of seconds the minion took to return as
+        ``latency``.
+
+        .. code-block:: python
+
+            >>> pub_data = local.run_job('*', 'test.ping', listen=True)
+            >>> async for ret in local.get_iter_returns_async(
+            ...     pub_data['jid'], pub_data['minions']
+            ... ):
+            ...     print(ret)
+            {'jerry': {'ret': True, 'latency': 0.05}}
+        """
+        kwargs["latency"] = True
+        rets = self.get_iter_returns(jid, minions, timeout=timeout, **kwargs)
+        loop = asyncio.get_running_loop()
+        # A single thread, the event bus connection is not thread safe
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="get_iter_returns"
+        )
+        done = object()
+        try:
+            while True:
+                ret = await loop.run_in_executor(executor, next, rets, done)
+                if ret is done:
+                    break
+                yield ret
+        finally:
+            await loop.run_in_executor(executor, rets.close)
+            executor.shutdown(wait=False)
+
     def get_returns(self, jid, minions, timeout=None):
         """
         Get the returns for the command line interface via the event system
@@ -1465,7 +1546,9 @@ class LocalClient:
         for minion in data:
             m_data = {}
             if "return" in data[minion]:
-                m_data["ret"] = data[minion].get("return")
+                m_data["ret"] = self.expand_state_delta(
+                    minion, data[minion].get("return")
+                )
             else:
                 m_data["ret"] = data[minion].get("return")
             if "out" in data[minion]:
@@ -1498,6 +1581,28 @@ class LocalClient:
         # otherwise we hit the timeout, return what we have
         return ret
 
+    def expand_state_delta(self, minion_id, ret):
+        """
+        Reconstruct the full return of a state run the minion returned as a
+        delta from the job cache, see :conf_minion:`state_return_delta`
+        """
+        if not salt.utils.statedelta.is_delta(ret):
+            return ret
+        try:
+            if self._state_delta_bases is None:
+                self._state_delta_bases = salt.utils.statedelta.job_cache_getter(
+                    self.returners["{}.get_jid".format(self.opts["master_job_cache"])]
+                )
+            return salt.utils.statedelta.expand(minion_id, ret, self._state_delta_bases)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error(
+                "Unable to reconstruct the state return of %s: %s", minion_id, exc
+            )
+            ret = dict(ret)
+            delta_key = salt.utils.statedelta.DELTA_KEY
+            ret[delta_key] = dict(ret[delta_key], incomplete=True)
+            return ret
+
     def get_cache_returns(self, jid):
         """
         Execute a single pass to gather the contents of the job cache
@@ -1517,7 +1622,9 @@ class LocalClient:
         for minion in data:
             m_data = {}
             if "return" in data[minion]:
-                m_data["ret"] = data[minion].get("return")
+                m_data["ret"] = self.expand_state_delta(
+                    minion, data[minion].get("return")
+                )
             else:
                 m_data["ret"] = data[minion].get("return")
             if "out" in data[minion]:
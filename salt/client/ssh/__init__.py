@@ -2,7 +2,10 @@
 Create ssh executor system
 """
 
+import asyncio
 import base64
+import concurrent.futures
+import contextlib
 import copy
 import datetime
 import getpass
@@ -19,6 +22,7 @@ import subprocess
 import sys
 import tarfile
 import tempfile
+import threading
 import time
 import uuid
 
@@ -375,6 +379,7 @@ class SSH(MultiprocessingStateMixin):
                 exclude_saltexts=self.opts.get("thin_exclude_saltexts", False),
                 saltext_allowlist=self.opts.get("thin_saltext_allowlist"),
                 saltext_blocklist=self.opts.get("thin_saltext_blocklist"),
+                layer_cache=self.opts.get("thin_layer_cache", True),
             )
         self.mods = mod_data(self.fsclient)
 
@@ -630,6 +635,12 @@ class SSH(MultiprocessingStateMixin):
         """
         Run the routine in a "Thread", put a dict on the queue
         """
+        que.put(self.run_routine(opts, host, target, mine=mine))
+
+    def run_routine(self, opts, host, target, mine=False):
+        """
+        Run the routine of a target and return the return dict and retcode
+        """
         opts = copy.deepcopy(opts)
         single = Single(
             opts,
@@ -645,7 +656,13 @@ class SSH(MultiprocessingStateMixin):
         stdout = stderr = ""
         retcode = salt.defaults.exitcodes.EX_OK
         try:
-            stdout, stderr, retcode = single.run()
+            try:
+                stdout, stderr, retcode = single.run()
+            finally:
+                # Close the master connection shared by the ssh commands
+                shell = getattr(single, "shell", None)
+                if hasattr(shell, "close"):
+                    shell.close()
             try:
                 retcode = int(retcode)
             except (TypeError, ValueError):
@@ -680,13 +697,146 @@ class SSH(MultiprocessingStateMixin):
                 "data": None,
             }
             retcode = max(retcode, 1)
-        que.put((ret, retcode))
+        return ret, retcode
 
     def handle_ssh(self, mine=False):
         """
         Spin up the needed threads or processes and execute the subsequent
         routines
         """
+        with self._multiplex():
+            if self.opts.get("ssh_executor", "process") == "asyncio":
+                yield from self._handle_ssh_async(mine=mine)
+            else:
+                yield from self._handle_ssh_procs(mine=mine)
+
+    @contextlib.contextmanager
+    def _multiplex(self):
+        """
+        Create the directory of the control sockets of the master connections
+        to the targets, if ssh_multiplex is enabled
+        """
+        if (
+            not self.opts.get("ssh_multiplex")
+            or self.opts.get("_ssh_control_dir")
+            or salt.utils.platform.is_windows()
+        ):
+            yield
+            return
+        # The paths of the control sockets are limited to about 100
+        # characters, keep the directory in the short temporary directory
+        self.opts["_ssh_control_dir"] = tempfile.mkdtemp(prefix="salt-ssh-")
+        try:
+            yield
+        finally:
+            shutil.rmtree(self.opts.pop("_ssh_control_dir"), ignore_errors=True)
+
+    def _prepare_target(self, host):
+        """
+        Fill in the defaults of a target. Return the return of the target if
+        it cannot be run.
+        """
+        for default in self.defaults:
+            if default not in self.targets[host]:
+                self.targets[host][default] = self.defaults[default]
+        if "host" not in self.targets[host]:
+            self.targets[host]["host"] = host
+        if self.targets[host].get("winrm") and not HAS_WINSHELL:
+            log_msg = (
+                "Please contact sales@saltstack.com for access to the"
+                " enterprise saltwinshell module."
+            )
+            log.debug(log_msg)
+            return {
+                "fun_args": [],
+                "jid": None,
+                "return": log_msg,
+                "retcode": 1,
+                "fun": "",
+                "id": host,
+            }
+        return None
+
+    def _handle_ssh_async(self, mine=False):
+        """
+        Execute the routines from this process, driven by an asyncio event
+        loop. The routines run in a pool of ``ssh_max_procs`` threads, while
+        their ssh and scp commands are run as subprocesses by the event loop,
+        which runs in a thread of its own for as long as the routines do.
+        Their returns are yielded as soon as they are done.
+        """
+        if not self.targets:
+            log.error("No matching targets found in roster.")
+            return
+        max_procs = self.opts.get("ssh_max_procs", 25)
+        loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(
+            target=loop.run_forever, name="salt-ssh-loop", daemon=True
+        )
+        loop_thread.start()
+        # Commands without a terminal get their passwords from SSH_ASKPASS
+        askpass_dir = tempfile.mkdtemp(prefix="salt-ssh-")
+        self.opts["_ssh_askpass"] = os.path.join(askpass_dir, "askpass")
+        with salt.utils.files.fopen(self.opts["_ssh_askpass"], "w") as fp_:
+            fp_.write(salt.client.ssh.shell.ASKPASS_SCRIPT)
+        os.chmod(self.opts["_ssh_askpass"], 0o700)
+        pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_procs,
+            thread_name_prefix="salt-ssh",
+            initializer=salt.client.ssh.shell.SSH_LOOP.set,
+            initargs=(loop,),
+        )
+        running = {}
+        target_iter = iter(self.targets)
+        try:
+            while True:
+                while len(running) < max_procs:
+                    host = next(target_iter, None)
+                    if host is None:
+                        break
+                    no_ret = self._prepare_target(host)
+                    if no_ret is not None:
+                        yield {host: no_ret}, 1
+                        continue
+                    future = pool.submit(
+                        self.run_routine,
+                        self.opts,
+                        host,
+                        self.targets[host],
+                        mine,
+                    )
+                    running[future] = host
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(
+                    running, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    host = running.pop(future)
+                    try:
+                        ret, retcode = future.result()
+                    except Exception:  # pylint: disable=broad-except
+                        error = (
+                            "Target '{}' did not return any data, "
+                            "probably due to an error.".format(host)
+                        )
+                        log.error(error, exc_info_on_loglevel=logging.DEBUG)
+                        yield {host: error}, 1
+                        continue
+                    yield {ret["id"]: ret["ret"]}, retcode
+        finally:
+            # The routines still running need the event loop to complete
+            pool.shutdown(wait=True, cancel_futures=True)
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+            self.opts.pop("_ssh_askpass", None)
+            shutil.rmtree(askpass_dir, ignore_errors=True)
+
+    def _handle_ssh_procs(self, mine=False):
+        """
+        Execute the routines in one process per target
+        """
         que = multiprocessing.Queue()
         running = {}
         target_iter = iter(self.targets)
@@ -703,27 +853,10 @@ class SSH(MultiprocessingStateMixin):
                 except StopIteration:
                     init = True
                     continue
-                for default in self.defaults:
-                    if default not in self.targets[host]:
-                        self.targets[host][default] = self.defaults[default]
-                if "host" not in self.targets[host]:
-                    self.targets[host]["host"] = host
-                if self.targets[host].get("winrm") and not HAS_WINSHELL:
+                no_ret = self._prepare_target(host)
+                if no_ret is not None:
                     returned.add(host)
                     rets.add(host)
-                    log_msg = (
-                        "Please contact sales@saltstack.com for access to the"
-                        " enterprise saltwinshell module."
-                    )
-                    log.debug(log_msg)
-                    no_ret = {
-                        "fun_args": [],
-                        "jid": None,
-                        "return": log_msg,
-                        "retcode": 1,
-                        "fun": "",
-                        "id": host,
-                    }
                     yield {host: no_ret}, 1
                     continue
                 args = (
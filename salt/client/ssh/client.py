@@ -58,6 +58,8 @@ class SSHClient:
             ("ssh_remote_port_forwards", str),
             ("ssh_options", list),
             ("ssh_max_procs", int),
+            ("ssh_executor", str),
+            ("ssh_multiplex", bool),
             ("ssh_askpass", bool),
             ("ssh_key_deploy", bool),
             ("ssh_update_roster", bool),
@@ -2,12 +2,17 @@
 Manage transport commands via ssh
 """
 
+import asyncio
+import codecs
+import contextlib
+import contextvars
 import logging
 import os
 import re
 import shlex
 import subprocess
 import sys
+import tempfile
 import time
 
 import salt.defaults.exitcodes
@@ -34,6 +39,23 @@ SUDO_PROMPT_RE = re.compile(
 RSTR = "_edbc7885e4f9aac9b83b35999b68d015148caf467b78fa39c05f669c0ff89878"
 RSTR_RE = re.compile(r"(?:^|\r?\n)" + RSTR + r"(?:\r?\n|$)")
 
+HOST_KEY_FAILED_RE = re.compile(r"^Host key verification failed", re.M)
+
+# The event loop running the commands of the shells when the routines are run
+# by the asyncio ssh_executor, set in the threads running the routines
+SSH_LOOP = contextvars.ContextVar("salt_ssh_loop", default=None)
+
+# Answers the password and passphrase prompts of ssh commands which have no
+# terminal, the prompt is the first argument. The password and the passphrase
+# are the first and second line of the SALT_SSH_ASKPASS_FILE, so that they are
+# not in the environment of ssh and of the master connections it leaves.
+ASKPASS_SCRIPT = """#!/bin/sh
+case "$1" in
+    *assphrase*) sed -n 2p "$SALT_SSH_ASKPASS_FILE" ;;
+    *) sed -n 1p "$SALT_SSH_ASKPASS_FILE" ;;
+esac
+"""
+
 SSH_KEYGEN_PATH = salt.utils.path.which("ssh-keygen") or "ssh-keygen"
 SSH_PATH = salt.utils.path.which("ssh") or "ssh"
 SCP_PATH = salt.utils.path.which("scp") or "scp"
@@ -160,9 +182,8 @@ class Shell:
         """
         Return options to pass to ssh
         """
-        # TODO ControlMaster does not work without ControlPath
-        # user could take advantage of it if they set ControlPath in their
-        # ssh config.  Also, ControlPersist not widely available.
+        # ControlMaster does not work without ControlPath, which is set by
+        # _mux_opts when ssh_multiplex is enabled or by the user's ssh config.
         options = [
             "ControlMaster=auto",
             "StrictHostKeyChecking=no",
@@ -202,6 +223,36 @@ class Shell:
     def _ssh_opts(self):
         return " ".join([f"-o {opt}" for opt in self.ssh_options])
 
+    def _mux_opts(self):
+        """
+        Return the options sharing one master connection to the host between
+        all the ssh and scp commands of a run
+        """
+        options = [
+            "ControlMaster=auto",
+            "ControlPath={}".format(os.path.join(self.opts["_ssh_control_dir"], "%C")),
+            f"ControlPersist={int(self.timeout or 60)}s",
+        ]
+        return " ".join([f"-o {opt}" for opt in options])
+
+    def close(self):
+        """
+        Close the master connection to the host, if the commands share one
+        """
+        if not self.opts.get("_ssh_control_dir"):
+            return
+        try:
+            subprocess.run(
+                self._split_cmd(self._cmd_str("-O exit")),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=10,
+                check=False,
+            )
+        except (OSError, subprocess.SubprocessError) as exc:
+            log.debug("Unable to close the connection to %s: %s", self.host, exc)
+
     def _copy_id_str_old(self):
         """
         Return the string to execute ssh-copy-id
@@ -271,6 +322,8 @@ class Shell:
             )
         if self.ssh_options:
             command.append(self._ssh_opts())
+        if self.opts.get("_ssh_control_dir"):
+            command.append(self._mux_opts())
 
         command.append(cmd)
 
@@ -399,6 +452,14 @@ class Shell:
         if not cmd:
             return "", "No command or passphrase", 245
 
+        loop = SSH_LOOP.get()
+        if loop is not None:
+            # Forking from a thread with a preexec_fn, like VT does, is not
+            # safe, have the event loop run the command instead
+            return asyncio.run_coroutine_threadsafe(
+                self._run_cmd_async(cmd, passwd_retries=passwd_retries), loop
+            ).result()
+
         log_sanitize = None
         if self.passwd:
             log_sanitize = self.passwd
@@ -495,3 +556,125 @@ class Shell:
         ret_stdout = self._sanitize_str(ret_stdout, self.passwd)
         ret_stderr = self._sanitize_str(ret_stderr, self.passwd)
         return ret_stdout, ret_stderr, ret_status
+
+    async def _run_cmd_async(self, cmd, passwd_retries=3):
+        """
+        Execute a shell command as a subprocess of the running event loop.
+
+        The command has no terminal: ssh reads the password and the passphrase
+        of the private key from the ``_ssh_askpass`` program, and the prompts
+        of the remote command are answered on its stdin.
+        """
+        env = dict(os.environ)
+        passwd_file = None
+        if self.opts.get("_ssh_askpass") and (self.passwd or self.priv_passwd):
+            # mkstemp creates the file readable by the user only
+            fd_, passwd_file = tempfile.mkstemp(
+                dir=os.path.dirname(self.opts["_ssh_askpass"])
+            )
+            with os.fdopen(fd_, "w") as fp_:
+                fp_.write(f"{self.passwd or ''}\n{self.priv_passwd or ''}\n")
+            env.update(
+                SSH_ASKPASS=self.opts["_ssh_askpass"],
+                SSH_ASKPASS_REQUIRE="force",
+                SALT_SSH_ASKPASS_FILE=passwd_file,
+            )
+        try:
+            return await self._run_subprocess(cmd, env, passwd_retries)
+        finally:
+            if passwd_file is not None:
+                os.remove(passwd_file)
+
+    async def _run_subprocess(self, cmd, env, passwd_retries):
+        proc = await asyncio.create_subprocess_exec(
+            *self._split_cmd(cmd),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env,
+            start_new_session=True,
+        )
+        read_stderr = asyncio.ensure_future(proc.stderr.read())
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+        async def sendline(line):
+            proc.stdin.write(f"{line}\n".encode())
+            await proc.stdin.drain()
+
+        sent_passwd = 0
+        send_password = True
+        ret_stdout = ""
+        old_stdout = ""
+        try:
+            while True:
+                chunk = await proc.stdout.read(65536)
+                if not chunk:
+                    break
+                stdout = decoder.decode(chunk)
+                if stdout:
+                    ret_stdout += stdout
+                    buff = old_stdout + stdout
+                else:
+                    buff = stdout
+                if buff and RSTR_RE.search(buff):
+                    # We're getting results back, don't try to send passwords
+                    send_password = False
+                if buff and SSH_PASSWORD_PROMPT_RE.search(buff) and send_password:
+                    if not self.passwd:
+                        return (
+                            "",
+                            "Permission denied, no authentication information",
+                            254,
+                        )
+                    if sent_passwd < passwd_retries:
+                        await sendline(self.passwd)
+                        sent_passwd += 1
+                        continue
+                    else:
+                        # asking for a password, and we can't seem to send it
+                        return "", "Password authentication failed", 254
+                elif buff and SUDO_PROMPT_RE.search(buff):
+                    if not self.passwd:
+                        return "", "Sudo password is required but not provided", 254
+                    else:
+                        await sendline(self.passwd)
+                        continue
+                elif buff and buff.endswith("_||ext_mods||_"):
+                    mods_raw = (
+                        salt.utils.json.dumps(self.mods, separators=(",", ":"))
+                        + "|_E|0|"
+                    )
+                    await sendline(mods_raw)
+                if stdout:
+                    old_stdout = stdout
+            ret_stdout += decoder.decode(b"", final=True)
+            ret_status = await proc.wait()
+            ret_stderr = (await read_stderr).decode(errors="replace")
+        except (BrokenPipeError, ConnectionResetError) as exc:
+            log.debug("The command exited before reading its input: %s", exc)
+            ret_status = await proc.wait()
+            ret_stderr = (await read_stderr).decode(errors="replace")
+        finally:
+            if proc.returncode is None:
+                with contextlib.suppress(ProcessLookupError):
+                    proc.kill()
+                await proc.wait()
+            if not read_stderr.done():
+                read_stderr.cancel()
+
+        if ret_status < 0:
+            # The process died because of an unhandled signal, report
+            # a non-zero exitcode bash-style.
+            ret_status = 128 - ret_status
+        if HOST_KEY_FAILED_RE.search(ret_stderr):
+            # Without a terminal ssh fails instead of asking to accept the key
+            return (
+                "The host key needs to be accepted, to "
+                "auto accept run salt-ssh with the -i "
+                f"flag:\n{self._sanitize_str(ret_stderr, self.passwd)}",
+                "",
+                254,
+            )
+        ret_stdout = self._sanitize_str(ret_stdout, self.passwd)
+        ret_stderr = self._sanitize_str(ret_stderr, self.passwd)
+        return ret_stdout, ret_stderr, ret_status
@@ -170,6 +170,10 @@ VALID_OPTS = immutabletypes.freeze(
         # what commands the master is processing and what the rates are of the executions
         "master_stats": bool,
         "master_stats_event_iter": int,
+        # The number of seconds the master event publisher coalesces events for, 0 to disable
+        "event_batch_window": float,
+        # The maximum number of events the master event publisher coalesces in a batch
+        "event_batch_size": int,
         # The key fingerprint of the higher-level master for the syndic to verify it is talking to the
         # intended master
         "syndic_finger": str,
@@ -178,6 +182,8 @@ VALID_OPTS = immutabletypes.freeze(
         # 'maint': Runs on a schedule as a part of the maintenance process.
         # '': Disable the key cache [default]
         "key_cache": str,
+        # The number of parsed minion public keys each master worker keeps in memory, 0 to disable
+        "minion_key_cache_size": int,
         # The user under which the daemon should run
         "user": str,
         # The root directory prepended to these options: pki_dir, cachedir,
@@ -323,6 +329,21 @@ VALID_OPTS = immutabletypes.freeze(
         "ipv6": (type(None), bool),
         # The chunk size to use when streaming files with the file server
         "file_buffer_size": int,
+        # The number of chunks the minion requests in every file transfer request
+        "file_transfer_chunks": int,
+        # Compress files in transit with gzip or zstd
+        "file_transfer_compression": (type(None), str),
+        # Keep the files cached from the master in a content-addressed store
+        "file_cache_store": bool,
+        # Only return the states which changed since the previous state run
+        "state_return_delta": bool,
+        # The maximum number of consecutive delta state returns
+        "state_return_delta_chain": int,
+        # The maximum age in seconds of the full state return delta returns are
+        # based on
+        "state_return_delta_max_age": int,
+        # The maximum number of chunks the file server returns in one reply
+        "file_serve_chunks": int,
         # The TCP port on which minion events should be published if ipc_mode is TCP
         "tcp_pub_port": int,
         # The TCP port on which minion events should be pulled if ipc_mode is TCP
@@ -370,6 +391,9 @@ VALID_OPTS = immutabletypes.freeze(
         "test": bool,
         # Tell the loader to attempt to import *.pyx cython files if cython is available
         "cython_enable": bool,
+        # Keep an on-disk manifest of the modules found by the loader, reused as long as the
+        # module directories don't change
+        "loader_manifest_cache": bool,
         # Whether or not to load grains for FQDNs
         "enable_fqdns_grains": bool,
         # Whether or not to load grains for the GPU
@@ -404,6 +428,12 @@ VALID_OPTS = immutabletypes.freeze(
         "state_auto_order": bool,
         # Fire events as state chunks are processed by the state compiler
         "state_events": bool,
+        # Run the state chunks following their requisites, instead of one after the other
+        "state_graph_executor": bool,
+        # The maximum number of state chunks the state_graph_executor runs at the same time
+        "state_graph_workers": int,
+        # The state modules the state_graph_executor always runs in the minion process
+        "state_graph_serial_states": list,
         # The number of seconds a minion should wait before retry when attempting authentication
         "acceptance_wait_time": float,
         # The number of seconds a minion should wait before giving up during authentication
@@ -497,6 +527,9 @@ VALID_OPTS = immutabletypes.freeze(
         # IPC buffer size
         # Refs https://github.com/saltstack/salt/issues/34215
         "ipc_write_buffer": int,
+        # Maximum size of the data waiting to be written to a minion connected
+        # to the TCP publisher before the minion is disconnected
+        "tcp_pub_write_buffer": int,
         # various subprocess niceness levels
         "req_server_niceness": (type(None), int),
         "pub_server_niceness": (type(None), int),
@@ -510,6 +543,14 @@ VALID_OPTS = immutabletypes.freeze(
         # The number of MWorker processes for a master to startup. This number needs to scale up as
         # the number of connected minions increases.
         "worker_threads": int,
+        # The number of processes compiling pillar for the MWorker processes, 0 to compile pillar
+        # in the MWorker processes
+        "pillar_pool_workers": int,
+        # The number of seconds an MWorker waits for the pillar pool to compile a pillar
+        "pillar_pool_timeout": int,
+        # Thread pools running the requests for some commands in each MWorker, instead of
+        # the MWorker's event loop
+        "worker_pools": dict,
         # The port for the master to listen to returns on. The minion needs to connect to this port
         # to send returns.
         "ret_port": int,
@@ -623,6 +664,8 @@ VALID_OPTS = immutabletypes.freeze(
         "pillar_cache_ttl": int,
         # Pillar cache backend. Defaults to `disk` which stores caches in the master cache
         "pillar_cache_backend": str,
+        # Serve cached pillar only while the inputs and files it was compiled from are unchanged
+        "pillar_cache_fingerprint": bool,
         # Cache the GPG data to avoid having to pass through the gpg renderer
         "gpg_cache": bool,
         # GPG data cache TTL, in seconds. Has no effect unless `gpg_cache` is True
@@ -670,6 +713,12 @@ VALID_OPTS = immutabletypes.freeze(
         "fileserver_backend": list,
         "fileserver_followsymlinks": bool,
         "fileserver_ignoresymlinks": bool,
+        # Keep the fileserver caches up to date from a journal of the changes
+        # to the file roots, instead of walking them on every update
+        "fileserver_journal": bool,
+        # Answer file find and hash requests from an index of every backend's
+        # files written by the fileserver update process
+        "fileserver_hash_index": bool,
         "fileserver_verify_config": bool,
         # Optionally apply '*' permissions to any user. By default '*' is a fallback case that is
         # applied only if the user didn't matched by other matchers.
@@ -712,6 +761,12 @@ VALID_OPTS = immutabletypes.freeze(
         # cachedir under the name of the minion and used to predetermine what minions are expected to
         # reply from executions.
         "minion_data_cache": bool,
+        # Resolve grain, pillar and ipcidr targets through an in-memory index of the
+        # minion data cache instead of fetching the cached data of every minion.
+        "minion_data_cache_index": bool,
+        # The minimum number of seconds between two validations of the minion data
+        # cache index against the cache. 0 validates it for every target.
+        "minion_data_cache_index_interval": int,
         # The number of seconds between AES key rotations on the master
         "publish_session": int,
         # Defines a salt reactor. See https://docs.saltproject.io/en/latest/topics/reactor/
@@ -722,6 +777,8 @@ VALID_OPTS = immutabletypes.freeze(
         "reactor_worker_threads": int,
         # The queue size for workers in the reactor
         "reactor_worker_hwm": int,
+        # The number of compiled reaction templates the reactor keeps
+        "reactor_template_cache_size": int,
         # Defines engines. See https://docs.saltproject.io/en/latest/topics/engines/
         "engines": list,
         # Whether or not to store runner returns in the job cache
@@ -840,12 +897,21 @@ VALID_OPTS = immutabletypes.freeze(
         "ssh_config_file": str,
         "ssh_merge_pillar": bool,
         "ssh_run_pre_flight": bool,
+        # How salt-ssh runs the targets, "process" for one process per target
+        # or "asyncio" for one event loop driving them from a single process
+        "ssh_executor": str,
+        # Share one master connection to each target between the ssh and scp
+        # commands of a salt-ssh run
+        "ssh_multiplex": bool,
         "cluster_mode": bool,
         "sqlite_queue_dir": str,
         "queue_dirs": list,
         # Instructs the minion to ping its master(s) every n number of minutes. Used
         # primarily as a mitigation technique against minion disconnects.
         "ping_interval": int,
+        # The number of seconds between the heartbeat events the minion fires for the jobs it is
+        # running, 0 to disable
+        "job_heartbeat_interval": int,
         # Instructs the salt CLI to print a summary of a minion responses before returning
         "cli_summary": bool,
         # The maximum number of minion connections allowed by the master. Can have performance
@@ -907,12 +973,19 @@ VALID_OPTS = immutabletypes.freeze(
         "memcache_full_cleanup": bool,
         # Enable collecting the memcache stats and log it on `debug` log level.
         "memcache_debug": bool,
+        # Set a memcache limit in bytes of serialized data per cache storage.
+        "memcache_max_bytes": int,
+        # Write stored values back to the cache driver in batches every N seconds.
+        "memcache_write_back_interval": int,
         # Thin and minimal Salt extra modules
         "thin_extra_mods": str,
         "min_extra_mods": str,
         "thin_exclude_saltexts": bool,
         "thin_saltext_allowlist": (type(None), list),
         "thin_saltext_blocklist": list,
+        # Cache the compressed files of every package of the Salt Thin, so it is
+        # generated again by only compressing the packages which changed
+        "thin_layer_cache": bool,
         # Default returners minion should use. List or comma-delimited string
         "return": (str, list),
         # TLS/SSL connection options. This could be set to a dictionary containing arguments
@@ -1081,6 +1154,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "pillar_cache": False,
         "pillar_cache_ttl": 3600,
         "pillar_cache_backend": "disk",
+        "pillar_cache_fingerprint": False,
         "request_channel_timeout": 60,
         "request_channel_tries": 3,
         "gpg_cache": False,
@@ -1193,6 +1267,12 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "ipc_write_buffer": _DFLT_IPC_WBUFFER,
         "ipv6": None,
         "file_buffer_size": 262144,
+        "file_transfer_chunks": 8,
+        "file_transfer_compression": None,
+        "file_cache_store": False,
+        "state_return_delta": False,
+        "state_return_delta_chain": 12,
+        "state_return_delta_max_age": 43200,
         "tcp_pub_port": 4510,
         "tcp_pull_port": 4511,
         "tcp_authentication_retries": 5,
@@ -1213,6 +1293,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "test": False,
         "ext_job_cache": "",
         "cython_enable": False,
+        "loader_manifest_cache": False,
         "enable_fqdns_grains": _DFLT_FQDNS_GRAINS,
         "enable_gpu_grains": True,
         "enable_zip_modules": False,
@@ -1223,6 +1304,9 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_graph_executor": False,
+        "state_graph_workers": 4,
+        "state_graph_serial_states": ["pkg", "pkgrepo"],
         "state_queue": False,
         "snapper_states": False,
         "snapper_states_config": "root",
@@ -1271,6 +1355,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "reactor_refresh_interval": 60,
         "reactor_worker_threads": 10,
         "reactor_worker_hwm": 10000,
+        "reactor_template_cache_size": 256,
         "engines": [],
         "tcp_keepalive": True,
         "tcp_keepalive_idle": 300,
@@ -1292,6 +1377,7 @@ DEFAULT_MINION_OPTS = immutabletypes.freeze(
         "cluster_mode": False,
         "restart_on_error": False,
         "ping_interval": 0,
+        "job_heartbeat_interval": 0,
         "username": None,
         "password": None,
         "zmq_filtering": False,
@@ -1342,6 +1428,9 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "auth_mode": 1,
         "user": _MASTER_USER,
         "worker_threads": 5,
+        "pillar_pool_workers": 0,
+        "pillar_pool_timeout": 300,
+        "worker_pools": {},
         "sock_dir": os.path.join(salt.syspaths.SOCK_DIR, "master"),
         "sock_pool_size": 1,
         "ret_port": 4506,
@@ -1352,6 +1441,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "root_dir": salt.syspaths.ROOT_DIR,
         "pki_dir": os.path.join(salt.syspaths.LIB_STATE_DIR, "pki", "master"),
         "key_cache": "",
+        "minion_key_cache_size": 10000,
         "cachedir": os.path.join(salt.syspaths.CACHE_DIR, "master"),
         "file_roots": {
             "base": [salt.syspaths.BASE_FILE_ROOTS_DIR, salt.syspaths.SPM_FORMULA_PATH]
@@ -1442,6 +1532,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "max_event_size": 1048576,
         "master_stats": False,
         "master_stats_event_iter": 60,
+        "event_batch_window": 0.0,
+        "event_batch_size": 1000,
         "minionfs_env": "base",
         "minionfs_mountpoint": "",
         "minionfs_whitelist": [],
@@ -1456,6 +1548,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "pillar_cache": False,
         "pillar_cache_ttl": 3600,
         "pillar_cache_backend": "disk",
+        "pillar_cache_fingerprint": False,
         "gpg_cache": False,
         "gpg_cache_ttl": 86400,
         "gpg_cache_backend": "disk",
@@ -1486,11 +1579,14 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "file_recv": False,
         "file_recv_max_size": 100,
         "file_buffer_size": 1048576,
+        "file_serve_chunks": 8,
         "file_ignore_regex": [],
         "file_ignore_glob": [],
         "fileserver_backend": ["roots"],
         "fileserver_followsymlinks": True,
         "fileserver_ignoresymlinks": False,
+        "fileserver_journal": False,
+        "fileserver_hash_index": False,
         "fileserver_verify_config": True,
         "max_open_files": 100000,
         "hash_type": DEFAULT_HASH_TYPE,
@@ -1512,9 +1608,12 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "master_job_cache": "local_cache",
         "job_cache_store_endtime": False,
         "minion_data_cache": True,
+        "minion_data_cache_index": False,
+        "minion_data_cache_index_interval": 10,
         "enforce_mine_cache": False,
         "ipc_mode": _DFLT_IPC_MODE,
         "ipc_write_buffer": _DFLT_IPC_WBUFFER,
+        "tcp_pub_write_buffer": 0,
         # various subprocess niceness levels
         "req_server_niceness": None,
         "pub_server_niceness": None,
@@ -1548,6 +1647,7 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "reactor_refresh_interval": 60,
         "reactor_worker_threads": 10,
         "reactor_worker_hwm": 10000,
+        "reactor_template_cache_size": 256,
         "engines": [],
         "event_return": "",
         "event_return_queue": 0,
@@ -1564,12 +1664,16 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "state_auto_order": True,
         "state_events": False,
         "state_aggregate": False,
+        "state_graph_executor": False,
+        "state_graph_workers": 4,
+        "state_graph_serial_states": ["pkg", "pkgrepo"],
         "search": "",
         "loop_interval": 60,
         "nodegroups": {},
         "ssh_list_nodegroups": {},
         "ssh_use_home_key": False,
         "cython_enable": False,
+        "loader_manifest_cache": False,
         "enable_gpu_grains": False,
         # XXX: Remove 'key_logfile' support in 2014.1.0
         "key_logfile": os.path.join(salt.syspaths.LOGS_DIR, "key"),
@@ -1624,6 +1728,8 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "ssh_identities_only": False,
         "ssh_log_file": os.path.join(salt.syspaths.LOGS_DIR, "ssh"),
         "ssh_config_file": os.path.join(salt.syspaths.HOME_DIR, ".ssh", "config"),
+        "ssh_executor": "process",
+        "ssh_multiplex": False,
         "cluster_mode": False,
         "sqlite_queue_dir": os.path.join(salt.syspaths.CACHE_DIR, "master", "queues"),
         "queue_dirs": [],
@@ -1647,11 +1753,14 @@ DEFAULT_MASTER_OPTS = immutabletypes.freeze(
         "memcache_max_items": 1024,
         "memcache_full_cleanup": False,
         "memcache_debug": False,
+        "memcache_max_bytes": 0,
+        "memcache_write_back_interval": 0,
         "thin_extra_mods": "",
         "min_extra_mods": "",
         "thin_exclude_saltexts": False,
         "thin_saltext_allowlist": None,
         "thin_saltext_blocklist": [],
+        "thin_layer_cache": True,
         "ssl": None,
         "extmod_whitelist": {},
         "extmod_blacklist": {},
@@ -6,6 +6,7 @@ authenticating peers
 
 import base64
 import binascii
+import collections
 import copy
 import hashlib
 import hmac
@@ -16,6 +17,7 @@ import random
 import stat
 import sys
 import tempfile
+import threading
 import time
 import traceback
 import uuid
@@ -331,6 +333,189 @@ class PublicKey(BaseKey):
         return verifier.verify(data)
 
 
+# Process-wide minion public key caches, keyed by keys.cache_driver and pki dir
+_MINION_KEY_CACHES = {}
+_MINION_KEY_CACHES_LOCK = threading.Lock()
+
+
+def get_minion_key_cache(opts):
+    """
+    Return the process-wide :class:`MinionKeyCache` for the key store
+    configured in ``opts``
+    """
+    if opts.get("cluster_id"):
+        pki_dir = opts.get("cluster_pki_dir")
+    else:
+        pki_dir = opts.get("pki_dir", "")
+    key = (opts.get("keys.cache_driver", "localfs_key"), pki_dir)
+    with _MINION_KEY_CACHES_LOCK:
+        if key not in _MINION_KEY_CACHES:
+            _MINION_KEY_CACHES[key] = MinionKeyCache(opts)
+        return _MINION_KEY_CACHES[key]
+
+
+class MinionKeyCache:
+    """
+    LRU cache of parsed minion :class:`PublicKey` objects, shared by the
+    request channels and master functions of a master worker.
+
+    With the ``localfs_key`` driver entries are validated against the stat of
+    the minion's key file, so a cache hit costs a ``stat`` instead of reading
+    and parsing the key. Keys stored by ``salt-key`` or by another worker
+    replace the file, which changes its inode and invalidates the entry. With
+    other drivers the key is fetched from the cache and only the parsing is
+    skipped when the key did not change.
+    """
+
+    # The order localfs_key looks for a minion's key in
+    STATE_DIRS = (
+        ("rejected", "minions_rejected"),
+        ("pending", "minions_pre"),
+        ("accepted", "minions"),
+    )
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.size = opts.get("minion_key_cache_size", 10000)
+        if opts.get("cluster_id"):
+            self.pki_dir = opts["cluster_pki_dir"]
+        else:
+            self.pki_dir = opts.get("pki_dir", "")
+        self.stat_keys = opts.get("keys.cache_driver", "localfs_key") == "localfs_key"
+        self.cache = salt.cache.Cache(opts, driver=opts["keys.cache_driver"])
+        # {<minion id>: (<stamp>, <state>, <pub str>, <PublicKey>)}
+        self.keys = collections.OrderedDict()
+        # Master functions may run in the threads of the worker's request pools
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """
+        Reset the hit, miss and auth timing counters
+        """
+        self.hits = 0
+        self.misses = 0
+        self.auth_runs = 0
+        self.auth_time = 0.0
+
+    def stats(self):
+        """
+        Return the counters of the cache and the mean time taken to handle
+        ``_auth`` requests
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.keys),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "auth_runs": self.auth_runs,
+                "auth_mean": (
+                    self.auth_time / self.auth_runs if self.auth_runs else 0.0
+                ),
+            }
+
+    def record_auth(self, duration):
+        """
+        Account for the time taken to handle an ``_auth`` request
+        """
+        with self._lock:
+            self.auth_runs += 1
+            self.auth_time += duration
+
+    def invalidate(self, id_=None):
+        """
+        Drop the cached key of a minion, or of all minions if no id is passed
+        """
+        with self._lock:
+            if id_ is None:
+                self.keys.clear()
+            else:
+                self.keys.pop(id_, None)
+
+    def _stamp(self, id_):
+        """
+        Return the state and stat of a minion's key file, or None if it has no
+        key
+        """
+        for state, base in self.STATE_DIRS:
+            try:
+                st = os.lstat(os.path.join(self.pki_dir, base, id_))
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                return (state, st.st_ino, st.st_mtime_ns, st.st_size)
+        return None
+
+    def _lookup(self, id_, stamp, pub_str):
+        with self._lock:
+            entry = self.keys.get(id_)
+            if entry is not None and (
+                (stamp is not None and entry[0] == stamp)
+                or (pub_str is not None and entry[2] == pub_str)
+            ):
+                self.keys.move_to_end(id_)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def _add(self, id_, stamp, state, pub_str):
+        pub = PublicKey.from_str(pub_str)
+        if self.size > 0:
+            with self._lock:
+                self.keys[id_] = (stamp, state, pub_str, pub)
+                self.keys.move_to_end(id_)
+                while len(self.keys) > self.size:
+                    self.keys.popitem(last=False)
+        return pub
+
+    def fetch(self, id_, state=None):
+        """
+        Return the parsed public key of a minion, or None if the minion has no
+        key, or if ``state`` is passed and the key is in another state.
+
+        Raises :py:exc:`InvalidKeyError` if the stored key can't be parsed.
+        """
+        if not salt.utils.verify.valid_id(self.opts, id_):
+            return None
+        stamp = None
+        if self.stat_keys:
+            stamp = self._stamp(id_)
+            if stamp is None:
+                self.invalidate(id_)
+                return None
+            entry = self._lookup(id_, stamp, None)
+            if entry is not None:
+                return entry[3] if state is None or entry[1] == state else None
+        key = self.cache.fetch("keys", id_)
+        if not isinstance(key, dict) or "pub" not in key:
+            self.invalidate(id_)
+            return None
+        if not self.stat_keys:
+            entry = self._lookup(id_, None, key["pub"])
+            if entry is not None:
+                entry = (None, key["state"], entry[2], entry[3])
+                with self._lock:
+                    self.keys[id_] = entry
+                return entry[3] if state is None or key["state"] == state else None
+        pub = self._add(id_, stamp, key["state"], key["pub"])
+        return pub if state is None or key["state"] == state else None
+
+    def from_str(self, id_, pub_str):
+        """
+        Return the parsed form of a key that was already fetched for a minion,
+        reusing the cached key if it is the same
+        """
+        entry = self._lookup(id_, None, pub_str)
+        if entry is not None:
+            return entry[3]
+        # The key file may have changed since the key was read, so the entry is
+        # only stamped once fetch() reads the file itself
+        return self._add(id_, None, None, pub_str)
+
+
 @salt.utils.decorators.memoize
 def get_rsa_key(path, passphrase):
     """
@@ -623,8 +623,9 @@ class RemoteFuncs:
         _res = checker.check_minions(load["tgt"], match_type, greedy=False)
         minions = _res["minions"]
         minion_side_acl = {}  # Cache minion-side ACL
+        cached_mine = self.cache.list_with_values("minions", "mine", entries=minions)
         for minion in minions:
-            mine_data = self.cache.fetch(f"minions/{minion}", "mine")
+            mine_data = cached_mine.get(minion)
             if not isinstance(mine_data, dict):
                 continue
             for function in functions_allowed:
@@ -794,6 +795,10 @@ class RemoteFuncs:
                 "data",
                 {"grains": load["grains"], "pillar": data},
             )
+            if self.opts.get("minion_data_cache_index", False):
+                salt.utils.minions.get_minion_data_index(self.opts).update(
+                    load["id"], {"grains": load["grains"], "pillar": data}
+                )
             if self.opts.get("minion_data_cache_events") is True:
                 self.event.fire_event(
                     {"comment": "Minion data cache refresh"},
@@ -25,6 +25,7 @@ import salt.payload
 import salt.utils.atomicfile
 import salt.utils.data
 import salt.utils.files
+import salt.utils.filestore
 import salt.utils.gzip_util
 import salt.utils.hashutils
 import salt.utils.http
@@ -1131,6 +1132,11 @@ class RemoteClient(Client):
             self.auth = self.channel.auth
         else:
             self.auth = ""
+        self.file_store = None
+        if self.opts.get("file_cache_store"):
+            self.file_store = salt.utils.filestore.FileStore(
+                os.path.join(self.opts["cachedir"], "file_store")
+            )
 
     def _refresh_channel(self):
         """
@@ -1166,6 +1172,8 @@ class RemoteClient(Client):
             pass
         if channel is not None:
             channel.close()
+        if getattr(self, "file_store", None) is not None:
+            self.file_store.save()
 
     def get_file(
         self, path, dest="", makedirs=False, saltenv="base", gzip=None, cachedir=None
@@ -1220,11 +1228,27 @@ class RemoteClient(Client):
             path,
         )
 
+        # Files cached from the master are kept in the file store, if enabled
+        store = None
+        if not dest and isinstance(hash_server, dict) and "hsum" in hash_server:
+            store = self.file_store
         if dest2check and os.path.isfile(dest2check):
-            hash_local = self.hash_file(dest2check, saltenv)
+            if store is not None:
+                hash_local = store.hash(dest2check, hash_server["hash_type"])
+                if hash_local == hash_server["hsum"]:
+                    store.save(force=False)
+                    return dest2check
+            else:
+                hash_local = self.hash_file(dest2check, saltenv)
+
+                if hash_local == hash_server:
+                    return dest2check
 
-            if hash_local == hash_server:
-                return dest2check
+        if store is not None and store.fetch(
+            hash_server["hash_type"], hash_server["hsum"], dest2check
+        ):
+            store.save(force=False)
+            return dest2check
 
         log.debug(
             "Fetching file from saltenv '%s', ** attempting ** '%s'", saltenv, path
@@ -1236,6 +1260,19 @@ class RemoteClient(Client):
         if gzip:
             gzip = int(gzip)
             load["gzip"] = gzip
+        # Masters which don't know about these return a single chunk per
+        # request, uncompressed unless gzip was set
+        if self.opts.get("file_transfer_chunks", 1) > 1:
+            load["chunks"] = self.opts["file_transfer_chunks"]
+        compression = self.opts.get("file_transfer_compression")
+        if compression:
+            if compression not in salt.fileserver.COMPRESSION_METHODS:
+                log.warning(
+                    "Unsupported file_transfer_compression '%s', using gzip",
+                    compression,
+                )
+                compression = "gzip"
+            load["compress"] = compression
 
         fn_ = None
         if dest:
@@ -1310,7 +1347,11 @@ class RemoteClient(Client):
                         if os.path.isdir(dest):
                             salt.utils.files.rm_rf(dest)
                         fn_ = salt.utils.atomicfile.atomic_open(dest, "wb+")
-                if data.get("gzip", None):
+                if data.get("compress", None):
+                    data = salt.fileserver.uncompress_chunk(
+                        data["data"], salt.utils.stringutils.to_str(data["compress"])
+                    )
+                elif data.get("gzip", None):
                     data = salt.utils.gzip_util.uncompress(data["data"])
                 else:
                     data = data["data"]
@@ -1346,6 +1387,9 @@ class RemoteClient(Client):
         if fn_:
             fn_.close()
             log.info("Fetching file from saltenv '%s', ** done ** '%s'", saltenv, path)
+            if store is not None:
+                store.add(dest, hash_server["hash_type"], hash_server["hsum"])
+                store.save(force=False)
         else:
             log.debug(
                 "In saltenv '%s', we are ** missing ** the file '%s'", saltenv, path
@@ -1500,6 +1544,8 @@ class FSClient(RemoteClient):
         self._closing = False
         self.channel = salt.fileserver.FSChan(opts)
         self.auth = DumbAuth()
+        # The files are read from the local file server
+        self.file_store = None
 
 
 # Provide backward compatibility for anyone directly using LocalClient (but no
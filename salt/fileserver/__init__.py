@@ -10,16 +10,31 @@ import re
 import time
 from collections.abc import Sequence
 
+import salt.exceptions
 import salt.loader
 import salt.utils.files
+import salt.utils.gzip_util
+import salt.utils.mmapindex
 import salt.utils.path
+import salt.utils.stringutils
 import salt.utils.url
 import salt.utils.versions
 from salt.utils.args import get_function_argspec as _argspec
 from salt.utils.decorators import ensure_unicode_args
 
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
 log = logging.getLogger(__name__)
 
+# Compression methods for the file chunks served to the minions, in order of
+# preference
+COMPRESSION_METHODS = ("zstd", "gzip") if HAS_ZSTD else ("gzip",)
+
 
 def _unlock_cache(w_lock):
     """
@@ -94,12 +109,17 @@ def wait_lock(lk_fn, dest, wait_timeout=0):
     return False
 
 
-def check_file_list_cache(opts, form, list_cache, w_lock):
+def check_file_list_cache(opts, form, list_cache, w_lock, cache_time=None):
     """
     Checks the cache file to see if there is a new enough file list cache, and
     returns the match (if found, along with booleans used by the fileserver
     backend to determine if the cache needs to be refreshed/written).
+
+    ``cache_time`` overrides :conf_master:`fileserver_list_cache_time`, for
+    backends whose file list cache is kept up to date by their update function.
     """
+    if cache_time is None:
+        cache_time = opts.get("fileserver_list_cache_time", 20)
     refresh_cache = False
     save_cache = True
     wait_lock(w_lock, list_cache, 5 * 60)
@@ -133,17 +153,17 @@ def check_file_list_cache(opts, form, list_cache, w_lock):
                         age = current_time - file_mtime
                 else:
                     # if filelist does not exists yet, mark it as expired
-                    age = opts.get("fileserver_list_cache_time", 20) + 1
+                    age = cache_time + 1
                 if age < 0:
                     # Cache is from the future! Warn and mark cache invalid.
                     log.warning("The file list_cache was created in the future!")
-                if 0 <= age < opts.get("fileserver_list_cache_time", 20):
+                if 0 <= age < cache_time:
                     # Young enough! Load this sucker up!
                     with salt.utils.files.fopen(list_cache, "rb") as fp_:
                         log.debug(
                             "Returning file list from cache: age=%s cache_time=%s %s",
                             age,
-                            opts.get("fileserver_list_cache_time", 20),
+                            cache_time,
                             list_cache,
                         )
                         return salt.payload.load(fp_).get(form, []), False, False
@@ -290,6 +310,56 @@ def is_file_ignored(opts, fname):
     return False
 
 
+def compress_chunk(data, method, level=None):
+    """
+    Compress a chunk of a file with one of the :data:`COMPRESSION_METHODS`
+    """
+    if method == "zstd":
+        return zstandard.ZstdCompressor(level=level or 3).compress(data)
+    return salt.utils.gzip_util.compress(data, level or 6)
+
+
+def uncompress_chunk(data, method):
+    """
+    Uncompress a chunk of a file compressed by :func:`compress_chunk`
+    """
+    if method == "zstd":
+        if not HAS_ZSTD:
+            raise salt.exceptions.MinionError(
+                "The zstandard library is required to uncompress this file"
+            )
+        return zstandard.ZstdDecompressor().decompress(data)
+    return salt.utils.gzip_util.uncompress(data)
+
+
+def hash_index_path(opts):
+    """
+    Return the path of the file hash index shared by the master workers
+    """
+    return os.path.join(opts["cachedir"], "fileserver_hash_index")
+
+
+def _mtime_ns(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _hash_entry_current(entry):
+    """
+    Whether the file of an entry of the hash index is unchanged and no file
+    taking precedence over it appeared since it was indexed
+    """
+    try:
+        stat = os.stat(entry["fnd"]["path"])
+    except OSError:
+        return False
+    if [stat.st_mtime_ns, stat.st_size] != entry["stat"]:
+        return False
+    return all(_mtime_ns(dirpath) == mtime for dirpath, mtime in entry["guards"])
+
+
 def clear_lock(clear_func, role, remote=None, lock_type="update"):
     """
     Function to allow non-fileserver functions to clear update locks
@@ -330,6 +400,9 @@ class Fileserver:
     def __init__(self, opts):
         self.opts = opts
         self.servers = salt.loader.fileserver(opts, opts["fileserver_backend"])
+        self.hash_index = None
+        if opts.get("fileserver_hash_index"):
+            self.hash_index = salt.utils.mmapindex.MmapIndex(hash_index_path(opts))
 
     def backends(self, back=None):
         """
@@ -529,6 +602,120 @@ class Fileserver:
             if fstr in self.servers:
                 self.servers[fstr]()
 
+    def _indexed_file(self, path, saltenv, back):
+        """
+        Return the entry of the hash index for a file, from the first of the
+        backends having it, or None. Entries which are not current anymore
+        are ignored, the file is then looked up in the backends.
+        """
+        if self.hash_index is None:
+            return None
+        for fsb in back:
+            entry = self.hash_index.get((fsb, saltenv, path))
+            if entry is not None:
+                if _hash_entry_current(entry):
+                    return entry
+                return None
+        return None
+
+    def _roots_dirs(self, saltenv):
+        """
+        Return the file_roots directories of an environment
+        """
+        file_roots = self.opts.get("file_roots") or {}
+        if saltenv in file_roots:
+            return file_roots[saltenv]
+        return [
+            root.replace("__env__", saltenv) for root in file_roots.get("__env__", [])
+        ]
+
+    def _hash_index_guards(self, fsb, saltenv, path, fnd):
+        """
+        Return the directories of the file roots where a new file would take
+        precedence over the indexed one, with their modification time
+        """
+        backends = self.backends()
+        if "roots" not in backends or backends.index("roots") > backends.index(fsb):
+            return []
+        guards = []
+        for root in self._roots_dirs(saltenv):
+            full = os.path.join(root, path)
+            if fsb == "roots" and full == fnd["path"]:
+                break
+            dirpath = os.path.dirname(full)
+            guards.append([dirpath, _mtime_ns(dirpath)])
+        return guards
+
+    def _hash_entry(self, fsb, saltenv, path):
+        """
+        Return the entry of the hash index of a file, or None
+        """
+        fnd = self.servers[f"{fsb}.find_file"](path, saltenv)
+        if not fnd.get("path"):
+            return None
+        fnd["back"] = fsb
+        try:
+            stat = os.stat(fnd["path"])
+        except OSError:
+            return None
+        hsum = self.servers[f"{fsb}.file_hash"]({"path": path, "saltenv": saltenv}, fnd)
+        if not hsum:
+            return None
+        return {
+            "fnd": fnd,
+            "hash": hsum,
+            "stat": [stat.st_mtime_ns, stat.st_size],
+            "guards": self._hash_index_guards(fsb, saltenv, path, fnd),
+        }
+
+    def build_hash_index(self, back=None):
+        """
+        Write the index of the files of every backend and their hashes,
+        shared by the master workers to answer ``_file_find`` and
+        ``_file_hash`` requests without hashing the files.
+
+        Only the files of the backends in ``back``, all of them by default,
+        are indexed again. Their entries which are still current are kept.
+        """
+        start = time.time()
+        back = self.backends(back)
+        previous = {}
+        for key, entry in salt.utils.mmapindex.MmapIndex(
+            hash_index_path(self.opts), check_interval=0
+        ).items():
+            previous[key] = entry
+        items = [(key, entry) for key, entry in previous.items() if key[0] not in back]
+        hashed = 0
+        for fsb in back:
+            if f"{fsb}.file_hash" not in self.servers:
+                continue
+            for saltenv in self.envs(back=[fsb]):
+                for path in self.file_list({"saltenv": saltenv, "fsbackend": [fsb]}):
+                    key = (fsb, saltenv, path)
+                    entry = previous.get(key)
+                    if entry is None or not _hash_entry_current(entry):
+                        try:
+                            entry = self._hash_entry(fsb, saltenv, path)
+                        except Exception as exc:  # pylint: disable=broad-except
+                            log.debug(
+                                "Unable to hash %s in %s:%s: %s",
+                                path,
+                                fsb,
+                                saltenv,
+                                exc,
+                            )
+                            continue
+                        hashed += 1
+                    if entry is not None:
+                        items.append((key, entry))
+        salt.utils.mmapindex.write_index(hash_index_path(self.opts), items)
+        log.debug(
+            "Indexed the hashes of %d files, %d hashed again, in %.2f seconds",
+            len(items),
+            hashed,
+            time.time() - start,
+        )
+
     def _find_file(self, load):
         """
         Convenience function for calls made using the RemoteClient
@@ -586,6 +773,11 @@ class Fileserver:
         if not isinstance(saltenv, str):
             saltenv = str(saltenv)
 
+        if not kwargs:
+            entry = self._indexed_file(path, saltenv, back)
+            if entry is not None:
+                return dict(entry["fnd"])
+
         for fsb in back:
             fstr = f"{fsb}.find_file"
             if fstr in self.servers:
@@ -597,7 +789,8 @@ class Fileserver:
 
     def serve_file(self, load):
         """
-        Serve up a chunk of a file
+        Serve up a chunk of a file, or up to ``chunks`` consecutive chunks if
+        the load asks for them
         """
         ret = {"data": "", "dest": ""}
 
@@ -610,12 +803,60 @@ class Fileserver:
         if not isinstance(load["saltenv"], str):
             load["saltenv"] = str(load["saltenv"])
 
+        try:
+            chunks = min(
+                int(load.get("chunks", 1)), self.opts.get("file_serve_chunks", 1)
+            )
+        except (TypeError, ValueError):
+            chunks = 1
+        compress = load.get("compress")
+        if compress is not None:
+            compress = salt.utils.stringutils.to_str(compress)
+
         fnd = self.find_file(load["path"], load["saltenv"])
         if not fnd.get("back"):
             return ret
         fstr = "{}.serve_file".format(fnd["back"])
-        if fstr in self.servers:
+        if fstr not in self.servers:
+            return ret
+        if chunks <= 1 and compress is None:
             return self.servers[fstr](load, fnd)
+        return self._serve_chunks(self.servers[fstr], load, fnd, chunks, compress)
+
+    def _serve_chunks(self, serve, load, fnd, chunks, compress):
+        """
+        Serve up to ``chunks`` consecutive chunks of a file in one reply,
+        optionally compressed as a whole
+        """
+        level = load.get("gzip")
+        # Chunks are compressed together rather than one by one
+        load = {key: val for key, val in load.items() if key != "gzip"}
+        if compress not in COMPRESSION_METHODS:
+            compress = "gzip" if level else None
+        loc = load["loc"]
+        ret = None
+        data = []
+        for _ in range(max(chunks, 1)):
+            chunk = serve(dict(load, loc=loc), fnd)
+            if ret is None:
+                ret = chunk
+            if not isinstance(chunk, dict) or not chunk.get("data"):
+                break
+            if isinstance(chunk["data"], str):
+                chunk["data"] = chunk["data"].encode()
+            data.append(chunk["data"])
+            loc += len(chunk["data"])
+            if len(chunk["data"]) < self.opts["file_buffer_size"]:
+                # Reached the end of the file
+                break
+        if not data:
+            return ret
+        ret["data"] = b"".join(data)
+        if compress is not None:
+            ret["data"] = compress_chunk(
+                ret["data"], compress, level if compress == "gzip" else None
+            )
+            ret["compress"] = compress
         return ret
 
     def __file_hash_and_stat(self, load):
@@ -631,9 +872,13 @@ class Fileserver:
         if not isinstance(load["saltenv"], str):
             load["saltenv"] = str(load["saltenv"])
 
-        fnd = self.find_file(
-            salt.utils.stringutils.to_unicode(load["path"]), load["saltenv"]
-        )
+        path = salt.utils.stringutils.to_unicode(load["path"])
+        if "?" not in path and not salt.utils.url.is_escaped(path):
+            entry = self._indexed_file(path, load["saltenv"], self.backends())
+            if entry is not None:
+                return entry["hash"], entry["fnd"].get("stat")
+
+        fnd = self.find_file(path, load["saltenv"])
         if not fnd.get("back"):
             return "", None
         stat_result = fnd.get("stat", None)
@@ -15,13 +15,18 @@ Fileserver environments are defined using the :conf_master:`file_roots`
 configuration option.
 """
 
+import collections
 import errno
 import logging
 import os
+import threading
 
 import salt.fileserver
+import salt.payload
+import salt.utils.atomicfile
 import salt.utils.event
 import salt.utils.files
+import salt.utils.fsjournal
 import salt.utils.gzip_util
 import salt.utils.hashutils
 import salt.utils.path
@@ -32,6 +37,15 @@ import salt.utils.versions
 
 log = logging.getLogger(__name__)
 
+# {<file root>: (<TreeJournal>, {<path>: <file list entry>})}
+_JOURNALS = {}
+# {<file path>: <mtime>}, as written to the mtime_map file
+_MTIME_MAP = None
+# {<file path>: (<file handle>, <stat identity>)}, the files served last
+_OPEN_FILES = collections.OrderedDict()
+_OPEN_FILES_LOCK = threading.Lock()
+_OPEN_FILES_MAX = 32
+
 
 def find_file(path, saltenv="base", **kwargs):
     """
@@ -158,20 +172,55 @@ def serve_file(load, fnd):
     if not file_in_root:
         return ret
 
-    with salt.utils.files.fopen(fpath, "rb") as fp_:
-        fp_.seek(load["loc"])
-        data = fp_.read(__opts__["file_buffer_size"])
-        if gzip and data:
-            data = salt.utils.gzip_util.compress(data, gzip)
-            ret["gzip"] = gzip
-        ret["data"] = data
+    data = _read_chunk(fpath, load["loc"], __opts__["file_buffer_size"])
+    if gzip and data:
+        data = salt.utils.gzip_util.compress(data, gzip)
+        ret["gzip"] = gzip
+    ret["data"] = data
     return ret
 
 
+def _read_chunk(fpath, loc, size):
+    """
+    Read a chunk of a file, reusing the handle opened for its previous chunks
+    as long as the file was not replaced or modified in the meantime
+    """
+    if salt.utils.platform.is_windows():
+        # Open handles would prevent the files from being replaced or removed
+        with salt.utils.files.fopen(fpath, "rb") as fp_:
+            fp_.seek(loc)
+            return fp_.read(size)
+    with _OPEN_FILES_LOCK:
+        cached = _OPEN_FILES.pop(fpath, None)
+        try:
+            stat = os.stat(fpath)
+        except OSError:
+            if cached is not None:
+                cached[0].close()
+            raise
+        identity = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if cached is not None and cached[1] != identity:
+            cached[0].close()
+            cached = None
+        if cached is None:
+            # The handle is kept open for the next chunks
+            # pylint: disable=resource-leakage
+            cached = (salt.utils.files.fopen(fpath, "rb"), identity)
+            # pylint: enable=resource-leakage
+        _OPEN_FILES[fpath] = cached
+        while len(_OPEN_FILES) > _OPEN_FILES_MAX:
+            _OPEN_FILES.popitem(last=False)[1][0].close()
+        fp_ = cached[0]
+        fp_.seek(loc)
+        return fp_.read(size)
+
+
 def update():
     """
     When we are asked to update (regular interval) lets reap the cache
     """
+    if __opts__.get("fileserver_journal", False):
+        return _journal_update()
     try:
         salt.fileserver.reap_fileserver_cache_dir(
             os.path.join(__opts__["cachedir"], "roots", "hash"), find_file
@@ -187,17 +236,40 @@ def update():
     # generate the new map
     new_mtime_map = salt.fileserver.generate_mtime_map(__opts__, __opts__["file_roots"])
 
-    old_mtime_map = {}
     # if you have an old map, load that
+    old_mtime_map = _read_mtime_map(mtime_map_path)
+    for file_path, mtime in old_mtime_map.items():
+        if mtime != new_mtime_map.get(file_path, mtime):
+            data["files"]["changed"].append(file_path)
+
+    # compare the maps, set changed to the return value
+    data["changed"] = salt.fileserver.diff_mtime_map(old_mtime_map, new_mtime_map)
+
+    # compute files that were removed and added
+    old_files = set(old_mtime_map)
+    new_files = set(new_mtime_map)
+    data["files"]["removed"] = list(old_files - new_files)
+    data["files"]["added"] = list(new_files - old_files)
+
+    # write out the new map
+    _write_mtime_map(mtime_map_path, new_mtime_map)
+    _fire_update_event(data)
+    # return data is used for tests
+    # but can also be used to get file changes with out needing fileserver events
+    return data
+
+
+def _read_mtime_map(mtime_map_path):
+    """
+    Read the mtime map written by the last update
+    """
+    mtime_map = {}
     try:
         with salt.utils.files.fopen(mtime_map_path, encoding="utf-8") as fp_:
             for line in fp_:
                 try:
                     file_path, mtime = line.strip().rsplit(":", 1)
-                    mtime = float(mtime)
-                    old_mtime_map[file_path] = mtime
-                    if mtime != new_mtime_map.get(file_path, mtime):
-                        data["files"]["changed"].append(file_path)
+                    mtime_map[file_path] = float(mtime)
                 except ValueError:
                     # Document the invalid entry in the log
                     log.warning(
@@ -207,24 +279,25 @@ def update():
                     )
     except (OSError, UnicodeDecodeError):
         pass
+    return mtime_map
 
-    # compare the maps, set changed to the return value
-    data["changed"] = salt.fileserver.diff_mtime_map(old_mtime_map, new_mtime_map)
 
-    # compute files that were removed and added
-    old_files = set(old_mtime_map)
-    new_files = set(new_mtime_map)
-    data["files"]["removed"] = list(old_files - new_files)
-    data["files"]["added"] = list(new_files - old_files)
-
-    # write out the new map
+def _write_mtime_map(mtime_map_path, mtime_map):
+    """
+    Write out the mtime map
+    """
     mtime_map_path_dir = os.path.dirname(mtime_map_path)
     if not os.path.exists(mtime_map_path_dir):
         os.makedirs(mtime_map_path_dir)
     with salt.utils.files.fopen(mtime_map_path, "wb") as fp_:
-        for file_path, mtime in new_mtime_map.items():
+        for file_path, mtime in mtime_map.items():
             fp_.write(salt.utils.stringutils.to_bytes(f"{file_path}:{mtime}\n"))
 
+
+def _fire_update_event(data):
+    """
+    Fire the fileserver update event, if enabled
+    """
     if __opts__.get("fileserver_events", False):
         # if there is a change, fire an event
         with salt.utils.event.get_event(
@@ -236,8 +309,161 @@ def update():
             event.fire_event(
                 data, salt.utils.event.tagify(["roots", "update"], prefix="fileserver")
             )
-    # return data is used for tests
-    # but can also be used to get file changes with out needing fileserver events
+
+
+def _list_cache_path(saltenv):
+    """
+    Return the path of the file list cache of an environment
+    """
+    return os.path.join(
+        __opts__["cachedir"],
+        "file_lists",
+        "roots",
+        f"{salt.utils.files.safe_filename_leaf(saltenv)}.p",
+    )
+
+
+def _journal_root(root):
+    """
+    Update the journal of a file root and the file list entries of the paths
+    that changed. Returns the changes.
+    """
+    try:
+        journal, entries = _JOURNALS[root]
+    except KeyError:
+        journal = salt.utils.fsjournal.TreeJournal(
+            root, followlinks=__opts__["fileserver_followsymlinks"]
+        )
+        entries = {}
+        _JOURNALS[root] = (journal, entries)
+    changes = journal.update()
+    for path in changes["removed"]:
+        entries.pop(path, None)
+    for path in changes["added"] | changes["modified"]:
+        if path in journal.entries:
+            entries[path] = _file_list_entry(root, path)
+    return changes
+
+
+def _journal_file_lists(saltenv):
+    """
+    Build the file lists of an environment from the journals of its roots
+    """
+    ret = {"files": set(), "dirs": set(), "empty_dirs": set(), "links": {}}
+    for root in __opts__["file_roots"][saltenv]:
+        journal, entries = _JOURNALS[root]
+        for path, entry in entries.items():
+            if entry is None:
+                continue
+            rel_path, empty, link_dest = entry
+            ret["dirs" if journal.entries[path] else "files"].add(rel_path)
+            if empty:
+                ret["empty_dirs"].add(rel_path)
+            if link_dest is not None:
+                ret["links"][rel_path] = link_dest
+    ret["files"] = sorted(ret["files"])
+    ret["dirs"] = sorted(ret["dirs"])
+    ret["empty_dirs"] = sorted(ret["empty_dirs"])
+    return ret
+
+
+def _journal_update():
+    """
+    Update the mtime map, file lists and hash cache from the changes found by
+    the journals of the file roots, instead of walking every file root
+    """
+    global _MTIME_MAP
+
+    mtime_map_path = os.path.join(__opts__["cachedir"], "roots", "mtime_map")
+    data = {
+        "changed": False,
+        "files": {"changed": [], "removed": [], "added": []},
+        "backend": "roots",
+    }
+    first_run = _MTIME_MAP is None
+    if first_run:
+        _MTIME_MAP = _read_mtime_map(mtime_map_path)
+
+    changes = {}
+    for saltenv, roots in __opts__["file_roots"].items():
+        if saltenv == "__env__":
+            # The roots depend on the requested environment, these are listed
+            # when requested
+            continue
+        for root in roots:
+            if root not in changes:
+                changes[root] = _journal_root(root)
+
+    seen = set()
+    for root, root_changes in changes.items():
+        files = _JOURNALS[root][0].files
+        for path in root_changes["removed"]:
+            if _MTIME_MAP.pop(path, None) is not None:
+                data["files"]["removed"].append(path)
+        for path in root_changes["added"] | root_changes["modified"]:
+            stat = files.get(path)
+            if stat is None or salt.fileserver.is_file_ignored(__opts__, path):
+                continue
+            mtime = stat[0]
+            seen.add(path)
+            old_mtime = _MTIME_MAP.get(path)
+            if old_mtime is None:
+                data["files"]["added"].append(path)
+            elif old_mtime != mtime or path in root_changes["modified"]:
+                # The journal also finds files replaced with the same mtime
+                data["files"]["changed"].append(path)
+            _MTIME_MAP[path] = mtime
+    if first_run:
+        # Files removed while no journal was running
+        for path in set(_MTIME_MAP) - seen:
+            del _MTIME_MAP[path]
+            data["files"]["removed"].append(path)
+    data["changed"] = any(data["files"].values())
+
+    hash_cachedir = os.path.join(__opts__["cachedir"], "roots", "hash")
+    for saltenv, roots in __opts__["file_roots"].items():
+        if saltenv == "__env__":
+            continue
+        list_cache = _list_cache_path(saltenv)
+        env_changes = [changes[root] for root in roots]
+        if not first_run and not any(
+            paths for root_changes in env_changes for paths in root_changes.values()
+        ):
+            try:
+                # Let the workers know the cached file lists are still current
+                os.utime(list_cache)
+                continue
+            except OSError:
+                pass
+        os.makedirs(os.path.dirname(list_cache), exist_ok=True)
+        with salt.utils.atomicfile.atomic_open(list_cache, "wb") as fp_:
+            fp_.write(salt.payload.dumps(_journal_file_lists(saltenv)))
+        # Added files may hide a file with the same path in a later root
+        for root, root_changes in zip(roots, env_changes):
+            for path in root_changes["added"] | root_changes["removed"]:
+                if path in _JOURNALS[root][0].dirs:
+                    continue
+                rel_path = _translate_sep(os.path.relpath(path, root))
+                try:
+                    os.unlink(
+                        os.path.join(
+                            hash_cachedir,
+                            saltenv,
+                            "{}.hash.{}".format(rel_path, __opts__["hash_type"]),
+                        )
+                    )
+                except OSError:
+                    pass
+
+    if "__env__" in __opts__["file_roots"]:
+        try:
+            salt.fileserver.reap_fileserver_cache_dir(hash_cachedir, find_file)
+        except OSError:
+            pass
+
+    if data["changed"] or not os.path.exists(mtime_map_path):
+        _write_mtime_map(mtime_map_path, _MTIME_MAP)
+    _fire_update_event(data)
     return data
 
 
@@ -323,6 +549,75 @@ def file_hash(load, fnd):
     return ret
 
 
+def _translate_sep(path):
+    """
+    Translate path separators for Windows masterless minions
+    """
+    return path.replace("\\", "/") if os.path.sep == "\\" else path
+
+
+def _file_list_entry(fs_root, abs_path):
+    """
+    Return the relative path of an item below a file root, whether it is an
+    empty directory and its symlink destination (or None if it is not a listed
+    symlink). Returns None if the item is not listed.
+    """
+    log.trace("roots: Processing %s", abs_path)
+    is_link = salt.utils.path.islink(abs_path)
+    log.trace("roots: %s is %sa link", abs_path, "not " if not is_link else "")
+    if is_link and __opts__["fileserver_ignoresymlinks"]:
+        return None
+    rel_path = _translate_sep(os.path.relpath(abs_path, fs_root))
+    log.trace("roots: %s relative path is %s", abs_path, rel_path)
+    if salt.fileserver.is_file_ignored(__opts__, rel_path):
+        return None
+    empty = False
+    if os.path.isdir(abs_path):
+        try:
+            empty = not os.listdir(abs_path)
+        except OSError:
+            log.debug("Unable to list dir: %s", abs_path)
+    link_dest = None
+    if is_link:
+        link_dest = salt.utils.path.readlink(abs_path)
+        log.trace("roots: %s symlink destination is %s", abs_path, link_dest)
+        if salt.utils.platform.is_windows() and link_dest.startswith("\\\\"):
+            # Symlink points to a network path. Since you can't
+            # join UNC and non-UNC paths, just assume the original
+            # path.
+            log.trace(
+                "roots: %s is a UNC path, using %s instead",
+                link_dest,
+                abs_path,
+            )
+            link_dest = abs_path
+        # Not sure what the purpose of this is since symlinks that point outside
+        # the file roots are allowed (when following symlinks). Either way, this does not do what
+        # it's intended to do since a symlink that starts with ../ is not resolved
+        # relative to its full path, but to the containing directory as well.
+        # This allows symlinks to point to the parent and sibling directories of the file root
+        # and still be listed here.
+        if link_dest.startswith(".."):
+            joined = os.path.join(abs_path, link_dest)
+        else:
+            joined = os.path.join(os.path.dirname(abs_path), link_dest)
+        rel_dest = _translate_sep(
+            os.path.relpath(
+                os.path.realpath(os.path.normpath(joined)),
+                os.path.realpath(fs_root),
+            )
+        )
+        log.trace("roots: %s relative path is %s", abs_path, rel_dest)
+        if not rel_dest.startswith("..") or not __opts__["fileserver_followsymlinks"]:
+            # Only count the link if it does not point
+            # outside of the root dir of the fileserver
+            # (i.e. the "path" variable)
+            link_dest = _translate_sep(link_dest)
+        else:
+            link_dest = None
+    return rel_path, empty, link_dest
+
+
 def _file_lists(load, form):
     """
     Return a dict containing the file lists for files, dirs, empty dirs and symlinks
@@ -357,8 +652,15 @@ def _file_lists(load, form):
         list_cachedir,
         f".{salt.utils.files.safe_filename_leaf(actual_saltenv)}.w",
     )
+    cache_time = None
+    if __opts__.get("fileserver_journal", False) and saltenv != "__env__":
+        # The file lists are kept up to date by the fileserver update process
+        cache_time = max(
+            __opts__.get("fileserver_list_cache_time", 20),
+            2 * __opts__.get("roots_update_interval", 60),
+        )
     cache_match, refresh_cache, save_cache = salt.fileserver.check_file_list_cache(
-        __opts__, form, list_cache, w_lock
+        __opts__, form, list_cache, w_lock, cache_time=cache_time
     )
     if cache_match is not None:
         return cache_match
@@ -369,75 +671,16 @@ def _file_lists(load, form):
             """
             Add the files to the target set
             """
-
-            def _translate_sep(path):
-                """
-                Translate path separators for Windows masterless minions
-                """
-                return path.replace("\\", "/") if os.path.sep == "\\" else path
-
             for item in items:
-                abs_path = os.path.join(parent_dir, item)
-                log.trace("roots: Processing %s", abs_path)
-                is_link = salt.utils.path.islink(abs_path)
-                log.trace(
-                    "roots: %s is %sa link", abs_path, "not " if not is_link else ""
-                )
-                if is_link and __opts__["fileserver_ignoresymlinks"]:
-                    continue
-                rel_path = _translate_sep(os.path.relpath(abs_path, fs_root))
-                log.trace("roots: %s relative path is %s", abs_path, rel_path)
-                if salt.fileserver.is_file_ignored(__opts__, rel_path):
+                entry = _file_list_entry(fs_root, os.path.join(parent_dir, item))
+                if entry is None:
                     continue
+                rel_path, empty, link_dest = entry
                 tgt.add(rel_path)
-                if os.path.isdir(abs_path):
-                    try:
-                        if not os.listdir(abs_path):
-                            ret["empty_dirs"].add(rel_path)
-                    except OSError:
-                        log.debug("Unable to list dir: %s", abs_path)
-                if is_link:
-                    link_dest = salt.utils.path.readlink(abs_path)
-                    log.trace(
-                        "roots: %s symlink destination is %s", abs_path, link_dest
-                    )
-                    if salt.utils.platform.is_windows() and link_dest.startswith(
-                        "\\\\"
-                    ):
-                        # Symlink points to a network path. Since you can't
-                        # join UNC and non-UNC paths, just assume the original
-                        # path.
-                        log.trace(
-                            "roots: %s is a UNC path, using %s instead",
-                            link_dest,
-                            abs_path,
-                        )
-                        link_dest = abs_path
-                    # Not sure what the purpose of this is since symlinks that point outside
-                    # the file roots are allowed (when following symlinks). Either way, this does not do what
-                    # it's intended to do since a symlink that starts with ../ is not resolved
-                    # relative to its full path, but to the containing directory as well.
-                    # This allows symlinks to point to the parent and sibling directories of the file root
-                    # and still be listed here.
-                    if link_dest.startswith(".."):
-                        joined = os.path.join(abs_path, link_dest)
-                    else:
-                        joined = os.path.join(os.path.dirname(abs_path), link_dest)
-                    rel_dest = _translate_sep(
-                        os.path.relpath(
-                            os.path.realpath(os.path.normpath(joined)),
-                            os.path.realpath(fs_root),
-                        )
-                    )
-                    log.trace("roots: %s relative path is %s", abs_path, rel_dest)
-                    if not rel_dest.startswith(".."):
-                        # Only count the link if it does not point
-                        # outside of the root dir of the fileserver
-                        # (i.e. the "path" variable)
-                        ret["links"][rel_path] = _translate_sep(link_dest)
-                    else:
-                        if not __opts__["fileserver_followsymlinks"]:
-                            ret["links"][rel_path] = _translate_sep(link_dest)
+                if empty:
+                    ret["empty_dirs"].add(rel_path)
+                if link_dest is not None:
+                    ret["links"][rel_path] = link_dest
 
         for path in __opts__["file_roots"][saltenv]:
             if saltenv == "__env__":
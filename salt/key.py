@@ -582,15 +582,11 @@ class Key:
             "minions": [],
             "minions_denied": [],
         }
-        for id_ in salt.utils.data.sorted_ignorecase(self.cache.list("keys")):
-            key = self.cache.fetch("keys", id_)
-
-            if key["state"] == "accepted":
-                ret["minions"].append(id_)
-            elif key["state"] == "pending":
-                ret["minions_pre"].append(id_)
-            elif key["state"] == "rejected":
-                ret["minions_rejected"].append(id_)
+        states = self.cache.list_states("keys")
+        for state in ("accepted", "pending", "rejected"):
+            ret[self.STATE_MAP[state]] = salt.utils.data.sorted_ignorecase(
+                states.get(state, [])
+            )
 
         for id_ in salt.utils.data.sorted_ignorecase(self.cache.list("denied_keys")):
             ret["minions_denied"].append(id_)
@@ -1,5 +1,6 @@
 import copy
 import functools
+import hashlib
 import importlib
 import importlib.machinery
 import importlib.util
@@ -21,6 +22,7 @@ import salt.config
 import salt.defaults.events
 import salt.defaults.exitcodes
 import salt.loader.context
+import salt.loader.manifest
 import salt.syspaths
 import salt.utils.args
 import salt.utils.context
@@ -361,6 +363,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
 
         self._lock = self._get_lock()
 
+        self._manifest = None
         with self._lock:
             self._refresh_file_mapping()
 
@@ -483,6 +486,14 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         # The files are added in order of priority, so order *must* be retained.
         self.file_mapping = salt.utils.odict.OrderedDict()
 
+        if self._manifest is None:
+            self._manifest = self._get_manifest()
+        if self._manifest is not None and self._manifest.load():
+            self.file_mapping.update(self._manifest.file_mapping)
+            return
+        # modification times of the scanned directories, for the manifest
+        scanned_dirs = {}
+
         opt_match = []
 
         def _replace_pre_ext(obj):
@@ -496,16 +507,19 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             return ""
 
         for mod_dir in self.module_dirs:
+            scanned_dirs[mod_dir] = salt.loader.manifest.dir_mtime(mod_dir)
             try:
                 # Make sure we have a sorted listdir in order to have
                 # expectable override results
                 files = sorted(x for x in os.listdir(mod_dir) if x != "__pycache__")
             except OSError:
                 continue  # Next mod_dir
+            pycache_dir = os.path.join(mod_dir, "__pycache__")
+            scanned_dirs[pycache_dir] = salt.loader.manifest.dir_mtime(pycache_dir)
             try:
                 pycache_files = [
                     os.path.join("__pycache__", x)
-                    for x in sorted(os.listdir(os.path.join(mod_dir, "__pycache__")))
+                    for x in sorted(os.listdir(pycache_dir))
                 ]
             except OSError:
                 pass
@@ -553,6 +567,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # if its a directory, lets allow us to load that
                     if ext == "":
                         # is there something __init__?
+                        scanned_dirs[fpath] = salt.loader.manifest.dir_mtime(fpath)
                         subfiles = os.listdir(fpath)
                         for suffix in self.suffix_order:
                             if "" == suffix:
@@ -604,6 +619,52 @@ class LazyLoader(salt.utils.lazy.LazyDict):
             f_noext = smod.split(".")[-1]
             self.file_mapping[f_noext] = (smod, ".o", 0)
 
+        if self._manifest is not None:
+            self._manifest.update_mapping(self.file_mapping, scanned_dirs)
+            self._manifest.save()
+
+    def _get_manifest(self):
+        """
+        Return the persistent module manifest of this loader, if enabled
+        """
+        cachedir = self.opts.get("cachedir")
+        if not self.opts.get("loader_manifest_cache", False) or not cachedir:
+            return None
+        # Everything that determines the file mapping goes into the file name
+        key = salt.utils.stringutils.to_bytes(
+            repr(
+                (
+                    sys.implementation.cache_tag,
+                    self.tag,
+                    list(self.module_dirs),
+                    self.suffix_order,
+                    sorted(self.disabled),
+                    self.opts.get("optimization_order"),
+                    self.static_modules,
+                )
+            )
+        )
+        path = os.path.join(
+            cachedir,
+            "loader",
+            "{}-{}.p".format(self.tag, hashlib.sha256(key).hexdigest()[:16]),
+        )
+        virtual_fingerprint = None
+        if self.virtual_enable:
+            virtual_fingerprint = salt.loader.manifest.fingerprint(
+                [
+                    self.pack.get("__grains__"),
+                    self.opts.get("id"),
+                    self.opts.get("proxy"),
+                    self.virtual_funcs,
+                ]
+            )
+        return salt.loader.manifest.ModuleManifest(path, virtual_fingerprint)
+
+    def _save_manifest(self):
+        if self._manifest is not None and self._manifest.dirty:
+            self._manifest.save()
+
     def clear(self):
         """
         Clear the dict
@@ -647,6 +708,24 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         return mod_opts
 
     def _iter_files(self, mod_name):
+        """
+        Iterate over all file_mapping files in order of closeness to mod_name.
+
+        If the manifest knows which modules provide ``mod_name`` they are
+        tried first, and the modules known to not load are tried last.
+        """
+        if self._manifest is None or not self._manifest.virtual:
+            yield from self._iter_files_by_name(mod_name)
+            return
+        virtual = self._manifest.virtual
+        names = list(dict.fromkeys(self._iter_files_by_name(mod_name)))
+        provided = [x for x in names if mod_name in (virtual.get(x) or ())]
+        failed = [x for x in names if x in virtual and virtual[x] is None]
+        yield from provided
+        yield from (x for x in names if x not in provided and x not in failed)
+        yield from failed
+
+    def _iter_files_by_name(self, mod_name):
         """
         Iterate over all file_mapping files in order of closeness to mod_name
         """
@@ -975,6 +1054,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     # If a module has information about why it could not be loaded, record it
                     self.missing_modules[module_name] = virtual_err
                     self.missing_modules[name] = virtual_err
+                    if self._manifest is not None:
+                        self._manifest.record_virtual(name, None)
                     return False
         else:
             virtual_aliases = ()
@@ -1021,6 +1102,8 @@ class LazyLoader(salt.utils.lazy.LazyDict):
         # If we had another module by the same virtual name, we should put any
         # new functions under the existing dictionary.
         mod_names = [module_name] + list(virtual_aliases)
+        if self._manifest is not None:
+            self._manifest.record_virtual(name, mod_names)
 
         for attr in funcs_to_load:
             if attr.startswith("_"):
@@ -1128,6 +1211,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                         self._refresh_file_mapping()
                         reloaded = True
                     continue
+            self._save_manifest()
 
         return ret
 
@@ -1146,6 +1230,7 @@ class LazyLoader(salt.utils.lazy.LazyDict):
                     self.missing_modules[name] = f"Module file not found {name}"
 
             self.loaded = True
+            self._save_manifest()
 
     def reload_modules(self):
         with self._lock:
@@ -0,0 +1,144 @@
+"""
+Persistent manifest of the modules found by a :class:`LazyLoader
+<salt.loader.lazy.LazyLoader>`.
+
+The manifest stores the file mapping a loader built from its module
+directories, together with the modification times of those directories. As
+long as none of the directories changed, the file mapping is reused without
+listing the directories again.
+
+It also remembers which names every module was made available under once its
+``__virtual__`` function ran, for a given fingerprint of the grains. The
+loader uses this to try the module providing a function first, instead of
+loading and evaluating ``__virtual__`` for every module until it is found.
+"""
+
+import logging
+import os
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.hashutils
+import salt.version
+
+log = logging.getLogger(__name__)
+
+# Bump whenever the layout of the manifest changes
+MANIFEST_VERSION = 1
+
+
+def dir_mtime(path):
+    """
+    Return the modification time of a directory in nanoseconds, or None if it
+    does not exist
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def fingerprint(data):
+    """
+    Return a fingerprint of the data ``__virtual__`` functions depend on, or
+    None if it can't be serialized
+    """
+    try:
+        return salt.utils.hashutils.sha256_digest(salt.payload.dumps(data))
+    except Exception:  # pylint: disable=broad-except
+        return None
+
+
+class ModuleManifest:
+    """
+    On-disk manifest of a loader's file mapping and virtual names
+    """
+
+    def __init__(self, path, virtual_fingerprint=None):
+        self.path = path
+        self.virtual_fingerprint = virtual_fingerprint
+        # {<directory>: <mtime_ns>}
+        self.dirs = {}
+        # [(<name>, (<fpath>, <ext>, <opt_index>)), ...]
+        self.file_mapping = None
+        # {<name>: [<virtual name>, <alias>, ...] or None}
+        self.virtual = {}
+        self.dirty = False
+
+    def load(self):
+        """
+        Load the manifest from disk. Returns True if the stored file mapping is
+        still valid for the module directories.
+        """
+        try:
+            with salt.utils.files.fopen(self.path, "rb") as fh_:
+                data = salt.payload.load(fh_)
+        except FileNotFoundError:
+            return False
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug("Unable to read loader manifest %s: %s", self.path, exc)
+            return False
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != MANIFEST_VERSION
+            or data.get("salt") != salt.version.__version__
+        ):
+            return False
+        if (
+            self.virtual_fingerprint is not None
+            and data.get("fingerprint") == self.virtual_fingerprint
+        ):
+            self.virtual = data.get("virtual") or {}
+        self.dirs = data.get("dirs") or {}
+        for path, mtime in self.dirs.items():
+            if dir_mtime(path) != mtime:
+                log.trace("Loader manifest %s is stale, %s changed", self.path, path)
+                return False
+        self.file_mapping = [
+            (name, tuple(entry)) for name, entry in data.get("file_mapping") or ()
+        ]
+        return True
+
+    def update_mapping(self, file_mapping, dirs):
+        """
+        Record a freshly scanned file mapping
+        """
+        self.file_mapping = list(file_mapping.items())
+        self.dirs = dirs
+        self.dirty = True
+
+    def record_virtual(self, name, names):
+        """
+        Record the names a module is available under, or None if its
+        ``__virtual__`` function prevented it from loading
+        """
+        if self.virtual_fingerprint is None:
+            return
+        names = list(names) if names is not None else None
+        if self.virtual.get(name, False) != names:
+            self.virtual[name] = names
+            self.dirty = True
+
+    def save(self):
+        """
+        Write the manifest to disk if it changed
+        """
+        if not self.dirty or self.file_mapping is None:
+            return
+        data = {
+            "version": MANIFEST_VERSION,
+            "salt": salt.version.__version__,
+            "dirs": self.dirs,
+            "file_mapping": self.file_mapping,
+            "fingerprint": self.virtual_fingerprint,
+            "virtual": self.virtual,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with salt.utils.atomicfile.atomic_open(self.path, "wb") as fh_:
+                salt.payload.dump(data, fh_)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.debug("Unable to write loader manifest %s: %s", self.path, exc)
+            return
+        self.dirty = False
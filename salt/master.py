@@ -5,11 +5,16 @@ involves preparing the three listeners and the workers needed by the master.
 
 import asyncio
 import collections
+import concurrent.futures
+import contextvars
 import copy
 import ctypes
+import datetime
+import functools
 import logging
 import multiprocessing
 import os
+import queue
 import re
 import signal
 import stat
@@ -43,6 +48,7 @@ import salt.utils.event
 import salt.utils.files
 import salt.utils.gitfs
 import salt.utils.gzip_util
+import salt.utils.hashutils
 import salt.utils.jid
 import salt.utils.job
 import salt.utils.master
@@ -249,6 +255,10 @@ class Maintenance(salt.utils.process.SignalHandlingProcess):
         self.opts = opts
         # How often do we perform the maintenance tasks
         self.loop_interval = int(self.opts["loop_interval"])
+        # When the next scheduled job is due, and how often the scheduler needs
+        # to evaluate the jobs which are not left out until they are due
+        self.next_due = None
+        self.schedule_interval = None
         # A serializer for general maint operations
         self.restart_interval = int(self.opts["maintenance_interval"])
         # Initializes pki_dir with the correct option for clustered environments
@@ -345,7 +355,21 @@ class Maintenance(salt.utils.process.SignalHandlingProcess):
             salt.utils.verify.check_max_open_files(self.opts)
             last = now
             now = int(time.time())
-            time.sleep(self.loop_interval)
+            time.sleep(self.sleep_interval())
+
+    def sleep_interval(self):
+        """
+        Return the number of seconds to sleep before the next iteration. It is
+        shortened to wake up when the next scheduled job is due, or when the
+        scheduler needs to evaluate its jobs again.
+        """
+        interval = self.loop_interval
+        if self.schedule_interval is not None:
+            interval = min(interval, self.schedule_interval)
+        if self.next_due is not None:
+            until_due = (self.next_due - datetime.datetime.now()).total_seconds()
+            interval = min(interval, max(until_due, 1))
+        return interval
 
     def handle_key_cache(self):
         """
@@ -444,10 +468,13 @@ class Maintenance(salt.utils.process.SignalHandlingProcess):
         """
         try:
             self.schedule.eval()
-            # Check if scheduler requires lower loop interval than
-            # the loop_interval setting
-            if self.schedule.loop_interval < self.loop_interval:
-                self.loop_interval = self.schedule.loop_interval
+            # The jobs left in the evaluation need it every
+            # schedule.loop_interval, the others when they are due
+            if self.schedule.evaluating:
+                self.schedule_interval = self.schedule.loop_interval
+            else:
+                self.schedule_interval = None
+            self.next_due = self.schedule.next_due
         except Exception as exc:  # pylint: disable=broad-except
             log.error("Exception %s occurred in scheduled job", exc)
         self.schedule.cleanup_subprocesses()
@@ -485,6 +512,7 @@ class FileserverUpdate(salt.utils.process.SignalHandlingProcess):
         import salt.fileserver
 
         self.fileserver = salt.fileserver.Fileserver(self.opts)
+        self.hash_index_lock = threading.Lock()
         self.fill_buckets()
 
     def fill_buckets(self):
@@ -566,8 +594,21 @@ class FileserverUpdate(salt.utils.process.SignalHandlingProcess):
                     backend_name,
                 )
 
+    def update_hash_index(self, backends):
+        """
+        Update the entries of the updated backends in the file hash index
+        shared by the master workers, see :conf_master:`fileserver_hash_index`
+        """
+        with self.hash_index_lock:
+            try:
+                self.fileserver.build_hash_index(
+                    back=[backend_name for backend_name, _ in backends]
+                )
+            except Exception:  # pylint: disable=broad-except
+                log.exception("Uncaught exception while indexing file hashes")
+
     @classmethod
-    def update(cls, interval, backends, timeout):
+    def update(cls, interval, backends, timeout, on_update=None):
         """
         Threading target which handles all updates for a given wait interval
         """
@@ -579,6 +620,8 @@ class FileserverUpdate(salt.utils.process.SignalHandlingProcess):
                 interval,
             )
             cls._do_update(backends)
+            if on_update is not None:
+                on_update(backends)
             log.debug(
                 "Completed fileserver updates for items with an update "
                 "interval of %d, waiting %d seconds",
@@ -612,6 +655,11 @@ class FileserverUpdate(salt.utils.process.SignalHandlingProcess):
                     interval,
                     self.buckets[interval],
                     self.opts["fileserver_interval"],
+                    (
+                        self.update_hash_index
+                        if self.opts["fileserver_hash_index"]
+                        else None
+                    ),
                 ),
             )
             self.update_threads[interval].start()
@@ -1017,6 +1065,413 @@ class EventMonitor(salt.utils.process.SignalHandlingProcess):
             io_loop.start()
 
 
+# The options of the processes compiling pillar in the pillar pool
+_PILLAR_POOL_OPTS = None
+
+# The items of a pillar request that the compiled pillar depends on
+PILLAR_REQUEST_KEYS = (
+    "grains",
+    "saltenv",
+    "env",
+    "ext",
+    "pillar_override",
+    "pillarenv",
+    "extra_minion_data",
+    "clean_cache",
+)
+
+
+def _init_pillar_pool_process(opts):
+    global _PILLAR_POOL_OPTS
+    # The PillarPool process stops its pool, don't inherit its signal handlers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _PILLAR_POOL_OPTS = opts
+
+
+def _compile_pillar(load):
+    """
+    Compile the pillar of a minion in a process of the pillar pool. Returns
+    the pillar data and the time it took to compile it.
+    """
+    start = time.time()
+    pillar = salt.pillar.get_pillar(
+        _PILLAR_POOL_OPTS,
+        load["grains"],
+        load["id"],
+        load.get("saltenv", load.get("env")),
+        ext=load.get("ext"),
+        pillar_override=load.get("pillar_override", {}),
+        pillarenv=load.get("pillarenv"),
+        extra_minion_data=load.get("extra_minion_data"),
+        clean_cache=load.get("clean_cache"),
+    )
+    return pillar.compile_pillar(), time.time() - start
+
+
+class PillarPool(salt.utils.process.SignalHandlingProcess):
+    """
+    Compile pillar data for the master workers in a dedicated pool of
+    processes.
+
+    The workers put their pillar requests on a shared queue and wait for the
+    reply on their own queue, so at most :conf_master:`pillar_pool_workers`
+    pillars are compiled at the same time however many minions refresh their
+    pillar. Identical requests for a minion that arrive while its pillar is
+    being compiled are answered with the result of that compilation.
+    """
+
+    def __init__(self, opts, requests, replies, **kwargs):
+        super().__init__(**kwargs)
+        self.opts = opts
+        self.requests = requests
+        self.replies = replies
+        # {(<minion id>, <request digest>): [(<worker index>, <request id>), ...]}
+        self.inflight = {}
+        self.lock = threading.Lock()
+        self.executor = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stat_clock = time.time()
+        self.renders = 0
+        self.deduplicated = 0
+        self.render_time = 0.0
+        # {<minion id>: <seconds taken to compile its last pillar>}
+        self.minion_times = {}
+
+    def _handle_signals(self, signum, sigframe):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        super()._handle_signals(signum, sigframe)
+
+    def _start_executor(self):
+        self.executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.opts["pillar_pool_workers"],
+            initializer=_init_pillar_pool_process,
+            initargs=(self.opts,),
+        )
+
+    @staticmethod
+    def request_key(load):
+        """
+        Return the key identical pillar requests of a minion share
+        """
+        digest = salt.utils.hashutils.sha256_digest(
+            salt.payload.dumps({key: load.get(key) for key in PILLAR_REQUEST_KEYS})
+        )
+        return load["id"], digest
+
+    def handle_request(self, worker, request_id, load):
+        """
+        Queue the compilation of a minion's pillar, unless the same pillar is
+        already being compiled
+        """
+        key = self.request_key(load)
+        with self.lock:
+            if key in self.inflight:
+                self.inflight[key].append((worker, request_id))
+                self.deduplicated += 1
+                return
+            self.inflight[key] = [(worker, request_id)]
+        try:
+            future = self.executor.submit(_compile_pillar, load)
+        except concurrent.futures.process.BrokenProcessPool:
+            log.error("The pillar pool broke, restarting it")
+            self._start_executor()
+            future = self.executor.submit(_compile_pillar, load)
+        future.add_done_callback(lambda fut: self.handle_result(key, fut))
+
+    def handle_result(self, key, future):
+        """
+        Send the compiled pillar to every worker waiting for it
+        """
+        try:
+            data, duration = future.result()
+            error = None
+        except Exception as exc:  # pylint: disable=broad-except
+            data, duration, error = None, 0.0, str(exc)
+            log.error("Failed to compile the pillar of %s: %s", key[0], exc)
+        with self.lock:
+            waiters = self.inflight.pop(key, [])
+            if error is None:
+                self.renders += 1
+                self.render_time += duration
+                self.minion_times[key[0]] = duration
+        log.debug("Compiled the pillar of %s in %.3f seconds", key[0], duration)
+        for worker, request_id in waiters:
+            self.replies[worker].put((request_id, data, error))
+
+    def _post_stats(self, event):
+        """
+        Fire an event with the pillar pool stats
+        """
+        now = time.time()
+        if now - self.stat_clock < self.opts["master_stats_event_iter"]:
+            return
+        with self.lock:
+            stats = {
+                "time": now - self.stat_clock,
+                "renders": self.renders,
+                "deduplicated": self.deduplicated,
+                "inflight": len(self.inflight),
+                "mean": self.render_time / self.renders if self.renders else 0.0,
+                "minions": self.minion_times,
+            }
+            self.reset_stats()
+        event.fire_event(stats, tagify("PillarPool", "stats"))
+
+    def run(self):
+        """
+        Compile the pillars requested by the workers until the master stops
+        """
+        salt.utils.process.appendproctitle(self.__class__.__name__)
+        self._start_executor()
+        with salt.utils.event.get_master_event(
+            self.opts, self.opts["sock_dir"], listen=False
+        ) as event:
+            while True:
+                try:
+                    worker, request_id, load = self.requests.get(timeout=1)
+                except queue.Empty:
+                    pass
+                else:
+                    self.handle_request(worker, request_id, load)
+                if self.opts["master_stats"]:
+                    self._post_stats(event)
+
+
+class PillarPoolClient:
+    """
+    Send the pillar requests of a master worker to the :class:`PillarPool`
+    and wait for the replies without blocking the worker's event loop
+    """
+
+    def __init__(self, opts, requests, replies, index):
+        self.opts = opts
+        self.requests = requests
+        self.replies = replies
+        self.index = index
+        self.counter = 0
+        self.pending = {}
+        self.loop = None
+
+    def start(self):
+        """
+        Start reading the replies of the pool, must be called from the
+        worker's event loop
+        """
+        self.loop = asyncio.get_running_loop()
+        thread = threading.Thread(target=self._read_replies, daemon=True)
+        thread.start()
+
+    def _read_replies(self):
+        while True:
+            try:
+                request_id, data, error = self.replies.get()
+            except (EOFError, OSError):
+                return
+            self.loop.call_soon_threadsafe(self._resolve, request_id, data, error)
+
+    def _resolve(self, request_id, data, error):
+        future = self.pending.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(salt.exceptions.SaltException(error))
+        else:
+            future.set_result(data)
+
+    async def compile_pillar(self, load):
+        """
+        Return the pillar compiled by the pool for a pillar request
+        """
+        if self.loop is None:
+            self.start()
+        self.counter += 1
+        request_id = self.counter
+        future = self.loop.create_future()
+        self.pending[request_id] = future
+        self.requests.put(
+            (
+                self.index,
+                request_id,
+                {key: load[key] for key in ("id", *PILLAR_REQUEST_KEYS) if key in load},
+            )
+        )
+        try:
+            return await asyncio.wait_for(future, self.opts["pillar_pool_timeout"])
+        finally:
+            self.pending.pop(request_id, None)
+
+
+class RequestPool:
+    """
+    Threads running the requests for some of the AES commands of a master
+    worker, with a bounded queue
+    """
+
+    def __init__(self, name, commands, threads=1, queue_size=0):
+        self.name = name
+        self.commands = tuple(commands)
+        self.threads = threads
+        self.queue_size = queue_size
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=threads, thread_name_prefix=f"RequestPool-{name}"
+        )
+        # Requests submitted to the pool which did not complete yet
+        self.pending = 0
+        self.reset_stats()
+
+    @property
+    def full(self):
+        """
+        Whether the pool can't queue another request
+        """
+        return self.pending >= self.threads + self.queue_size
+
+    def reset_stats(self):
+        self.runs = 0
+        self.queue_time = 0.0
+        self.queue_time_max = 0.0
+        self.queue_depth_max = 0
+
+    def stats(self):
+        """
+        Return the number of requests run by the pool and how long they
+        waited for a thread
+        """
+        return {
+            "runs": self.runs,
+            "queue_mean": self.queue_time / self.runs if self.runs else 0.0,
+            "queue_max": self.queue_time_max,
+            "queue_depth_max": self.queue_depth_max,
+        }
+
+    def _record(self, queued):
+        self.runs += 1
+        self.queue_time += queued
+        self.queue_time_max = max(self.queue_time_max, queued)
+
+    def submit(self, func, *args):
+        """
+        Queue a function to run in the pool, :meth:`finish` must be called
+        once the returned future completed
+        """
+        self.pending += 1
+        self.queue_depth_max = max(self.queue_depth_max, self.pending - self.threads)
+        submitted = time.monotonic()
+        context = contextvars.copy_context()
+
+        def target():
+            self._record(time.monotonic() - submitted)
+            return context.run(func, *args)
+
+        return asyncio.wrap_future(self.executor.submit(target))
+
+    def finish(self):
+        self.pending -= 1
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class RequestPools:
+    """
+    The :class:`RequestPool` instances of a master worker, configured with
+    :conf_master:`worker_pools`
+
+    Requests for commands not assigned to a pool keep being run on the
+    worker's event loop. The transport can wait on :meth:`ready` before
+    reading another request, so that a worker stops taking requests while one
+    of its pools is full instead of queueing them without bounds.
+    """
+
+    def __init__(self, opts):
+        self.pools = []
+        self.routes = {}
+        for name, conf in opts["worker_pools"].items():
+            pool = RequestPool(
+                name,
+                conf.get("commands", ()),
+                threads=max(int(conf.get("threads", 1)), 1),
+                queue_size=max(int(conf.get("queue", 0)), 0),
+            )
+            self.pools.append(pool)
+            for cmd in pool.commands:
+                if cmd in self.routes:
+                    log.warning(
+                        "Command %s is assigned to worker pools %s and %s, using %s",
+                        cmd,
+                        self.routes[cmd].name,
+                        name,
+                        self.routes[cmd].name,
+                    )
+                    continue
+                self.routes[cmd] = pool
+        self._ready = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def thread_state(self, factory):
+        """
+        Return the object of the calling pool thread, created with ``factory``
+        the first time the thread asks for it
+
+        The loaders, file server and connections of the master functions are
+        not thread safe, so every pool thread uses its own.
+        """
+        state = getattr(self._local, "state", None)
+        if state is None:
+            with self._lock:
+                state = self._local.state = factory()
+        return state
+
+    def get(self, cmd):
+        """
+        Return the pool running a command, or None
+        """
+        return self.routes.get(cmd)
+
+    def _update_ready(self):
+        if self._ready is None:
+            self._ready = asyncio.Event()
+        if any(pool.full for pool in self.pools):
+            self._ready.clear()
+        else:
+            self._ready.set()
+
+    async def ready(self):
+        """
+        Wait until none of the pools is full
+        """
+        self._update_ready()
+        await self._ready.wait()
+
+    async def run(self, pool, func, *args):
+        """
+        Run a function in a pool
+        """
+        future = pool.submit(func, *args)
+        self._update_ready()
+        try:
+            return await future
+        finally:
+            pool.finish()
+            self._update_ready()
+
+    def stats(self):
+        return {pool.name: pool.stats() for pool in self.pools}
+
+    def reset_stats(self):
+        for pool in self.pools:
+            pool.reset_stats()
+
+    def close(self):
+        for pool in self.pools:
+            pool.close()
+
+
 class ReqServer(salt.utils.process.SignalHandlingProcess):
     """
     Starts up the master request server, minions send results to this
@@ -1080,15 +1535,33 @@ class ReqServer(salt.utils.process.SignalHandlingProcess):
             )
             os.nice(self.opts["req_server_niceness"])
 
+        pillar_requests = None
+        pillar_replies = []
+        if self.opts["pillar_pool_workers"] > 0:
+            pillar_requests = multiprocessing.Queue()
+            pillar_replies = [
+                multiprocessing.Queue() for _ in range(int(self.opts["worker_threads"]))
+            ]
+
         # Reset signals to default ones before adding processes to the process
         # manager. We don't want the processes being started to inherit those
         # signal handlers
         with salt.utils.process.default_signals(signal.SIGINT, signal.SIGTERM):
+            if pillar_requests is not None:
+                self.process_manager.add_process(
+                    PillarPool,
+                    args=(self.opts, pillar_requests, pillar_replies),
+                    name="PillarPool",
+                )
             for ind in range(int(self.opts["worker_threads"])):
                 name = f"MWorker-{ind}"
+                pillar_queues = None
+                if pillar_requests is not None:
+                    pillar_queues = (pillar_requests, pillar_replies[ind], ind)
                 self.process_manager.add_process(
                     MWorker,
                     args=(self.opts, self.master_key, self.key, req_channels),
+                    kwargs={"pillar_queues": pillar_queues},
                     name=name,
                 )
         self.process_manager.run()
@@ -1118,13 +1591,16 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
     salt master.
     """
 
-    def __init__(self, opts, mkey, key, req_channels, **kwargs):
+    def __init__(self, opts, mkey, key, req_channels, pillar_queues=None, **kwargs):
         """
         Create a salt master worker process
 
         :param dict opts: The salt options
         :param dict mkey: The user running the salt master and the RSA key
         :param dict key: The user running the salt master and the AES key
+        :param tuple pillar_queues: The request queue of the pillar pool, the
+            reply queue of this worker and its index, if pillar is compiled
+            by the pillar pool
 
         :rtype: MWorker
         :return: Master worker
@@ -1132,6 +1608,9 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         super().__init__(**kwargs)
         self.opts = opts
         self.req_channels = req_channels
+        self.pillar_queues = pillar_queues
+        self.pillar_pool = None
+        self.request_pools = None
 
         self.mkey = mkey
         self.key = key
@@ -1177,6 +1656,9 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         """
         self.io_loop = tornado.ioloop.IOLoop()
         for req_channel in self.req_channels:
+            if self.request_pools is not None:
+                # Let the transport read requests while others are running
+                req_channel.transport.request_gate = self.request_pools.ready
             req_channel.post_fork(
                 self._handle_payload, io_loop=self.io_loop
             )  # TODO: cleaner? Maybe lazily?
@@ -1211,6 +1693,10 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         load = payload["load"]
         if key == "clear":
             ret = await self._handle_clear(load)
+        elif self.pillar_pool is not None and load.get("cmd") == "_pillar":
+            ret = await self._handle_pillar(load)
+        elif self.request_pools is not None and self.request_pools.get(load.get("cmd")):
+            ret = await self._handle_pooled(load)
         else:
             ret = self._handle_aes(load)
         return ret
@@ -1231,10 +1717,19 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
                     "time": end - self.stat_clock,
                     "worker": self.name,
                     "stats": self.stats,
+                    "key_cache": self.aes_funcs.minion_keys.stats(),
+                    "pools": (
+                        self.request_pools.stats()
+                        if self.request_pools is not None
+                        else {}
+                    ),
                 },
                 tagify(self.name, "stats"),
             )
             self.stats = collections.defaultdict(lambda: {"mean": 0, "runs": 0})
+            self.aes_funcs.minion_keys.reset_stats()
+            if self.request_pools is not None:
+                self.request_pools.reset_stats()
             self.stat_clock = end
 
     async def _handle_clear(self, load):
@@ -1289,6 +1784,51 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
             self._post_stats(start, cmd)
         return ret
 
+    async def _handle_pooled(self, data):
+        """
+        Process a command sent via an AES key in the request pool it is
+        assigned to, leaving the event loop free to handle other requests
+
+        :param dict data: The decrypted payload
+        :return: The result of the AESFuncs function and how to send it
+        """
+        cmd = data["cmd"]
+        pool = self.request_pools.get(cmd)
+        if self.opts["master_stats"]:
+            start = time.time()
+            self.stats[cmd]["runs"] += 1
+
+        def run_func():
+            aes_funcs = self.request_pools.thread_state(
+                functools.partial(AESFuncs, self.opts)
+            )
+            with salt.utils.ctx.request_context({"data": data, "opts": self.opts}):
+                return aes_funcs.run_func(cmd, data)
+
+        ret = await self.request_pools.run(pool, run_func)
+
+        if self.opts["master_stats"]:
+            self._post_stats(start, cmd)
+        return ret
+
+    async def _handle_pillar(self, data):
+        """
+        Process a pillar request by having the pillar pool compile the pillar
+
+        :param dict data: The pillar request
+        :return: The pillar data for the minion and how to send it
+        """
+        if self.opts["master_stats"]:
+            start = time.time()
+            self.stats["_pillar"]["runs"] += 1
+
+        with salt.utils.ctx.request_context({"data": data, "opts": self.opts}):
+            ret = await self.aes_funcs.pillar_from_pool(data, self.pillar_pool)
+
+        if self.opts["master_stats"]:
+            self._post_stats(start, "_pillar")
+        return ret
+
     def run(self):
         """
         Start a Master Worker
@@ -1324,6 +1864,10 @@ class MWorker(salt.utils.process.SignalHandlingProcess):
         )
         self.clear_funcs.connect()
         self.aes_funcs = AESFuncs(self.opts)
+        if self.pillar_queues is not None:
+            self.pillar_pool = PillarPoolClient(self.opts, *self.pillar_queues)
+        if self.opts["worker_pools"]:
+            self.request_pools = RequestPools(self.opts)
         self.__bind()
 
 
@@ -1413,6 +1957,7 @@ class AESFuncs(TransportMethods):
         self.key_cache = salt.cache.Cache(
             self.opts, driver=self.opts["keys.cache_driver"]
         )
+        self.minion_keys = salt.crypt.get_minion_key_cache(self.opts)
 
     def __setup_fileserver(self):
         """
@@ -1446,14 +1991,8 @@ class AESFuncs(TransportMethods):
         if not salt.utils.verify.valid_id(self.opts, id_):
             return False
 
-        key = self.key_cache.fetch("keys", id_)
-
-        if not key:
-            log.error("Unexpectedly got no pub key for %s", id_)
-            return False
-
         try:
-            pub = salt.crypt.PublicKey.from_str(key["pub"])
+            pub = self.minion_keys.fetch(id_)
         except (OSError, KeyError):
             log.warning(
                 "Salt minion claiming to be %s attempted to communicate with "
@@ -1462,8 +2001,19 @@ class AESFuncs(TransportMethods):
                 exc_info=True,
             )
             return False
-        except (ValueError, IndexError, TypeError) as err:
+        except (
+            ValueError,
+            IndexError,
+            TypeError,
+            salt.exceptions.InvalidKeyError,
+        ) as err:
             log.error('Unable to load public key "%s": %s', id_, err)
+            return False
+
+        if pub is None:
+            log.error("Unexpectedly got no pub key for %s", id_)
+            return False
+
         try:
             if pub.decrypt(token) == b"salt":
                 return True
@@ -1757,6 +2307,38 @@ class AESFuncs(TransportMethods):
             clean_cache=load.get("clean_cache"),
         )
         data = pillar.compile_pillar()
+        return self._store_pillar(load, data)
+
+    async def pillar_from_pool(self, load, pool):
+        """
+        Return the pillar data for the minion, compiled by the pillar pool
+
+        :param dict load: Minion payload
+        :param PillarPoolClient pool: The client of the pillar pool
+
+        :return: The pillar data for the minion and how to send it
+        """
+        if any(key not in load for key in ("id", "grains")):
+            return False, {"fun": "send"}
+        if not salt.utils.verify.valid_id(self.opts, load["id"]):
+            return False, {"fun": "send"}
+        load["grains"]["id"] = load["id"]
+        try:
+            data = await pool.compile_pillar(load)
+        except asyncio.TimeoutError:
+            log.error("Timed out waiting for the pillar of %s", load["id"])
+            data = False
+        except salt.exceptions.SaltException as exc:
+            log.error("Error compiling the pillar of %s: %s", load["id"], exc)
+            data = False
+        else:
+            data = self._store_pillar(load, data)
+        return data, self._pillar_reply_opts(load)
+
+    def _store_pillar(self, load, data):
+        """
+        Update the minion data cache with freshly compiled pillar data
+        """
         self.fs_.update_opts()
         if self.opts.get("minion_data_cache", False):
             self.masterapi.cache.store(
@@ -1764,6 +2346,10 @@ class AESFuncs(TransportMethods):
                 "data",
                 {"grains": load["grains"], "pillar": data},
             )
+            if self.opts.get("minion_data_cache_index", False):
+                salt.utils.minions.get_minion_data_index(self.opts).update(
+                    load["id"], {"grains": load["grains"], "pillar": data}
+                )
             if self.opts.get("minion_data_cache_events") is True:
                 self.event.fire_event(
                     {"Minion data cache refresh": load["id"]},
@@ -1834,7 +2420,10 @@ class AESFuncs(TransportMethods):
         if "sig" in load:
             log.trace("Verifying signed event publish from minion")
             sig = load.pop("sig")
-            this_minion_pubkey = self.key_cache.fetch("keys", load["id"])
+            try:
+                this_minion_pubkey = self.minion_keys.fetch(load["id"])
+            except salt.exceptions.InvalidKeyError:
+                this_minion_pubkey = None
             serialized_load = salt.serializers.msgpack.serialize(load)
             if not this_minion_pubkey or not this_minion_pubkey.verify(
                 serialized_load, sig
@@ -2086,13 +2675,19 @@ class AESFuncs(TransportMethods):
         if func == "_return":
             return ret, {"fun": "send"}
         if func == "_pillar" and "id" in load:
-            if load.get("ver") != "2" and self.opts["pillar_version"] == 1:
-                # Authorized to return old pillar proto
-                return ret, {"fun": "send"}
-            return ret, {"fun": "send_private", "key": "pillar", "tgt": load["id"]}
+            return ret, self._pillar_reply_opts(load)
         # Encrypt the return
         return ret, {"fun": "send"}
 
+    def _pillar_reply_opts(self, load):
+        """
+        Return how the reply to a pillar request is to be sent
+        """
+        if load.get("ver") != "2" and self.opts["pillar_version"] == 1:
+            # Authorized to return old pillar proto
+            return {"fun": "send"}
+        return {"fun": "send_private", "key": "pillar", "tgt": load["id"]}
+
     def destroy(self):
         self.masterapi.destroy()
         if self.local is not None:
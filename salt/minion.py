@@ -57,6 +57,7 @@ import salt.utils.platform
 import salt.utils.process
 import salt.utils.schedule
 import salt.utils.ssdp
+import salt.utils.statedelta
 import salt.utils.user
 import salt.utils.zeromq
 from salt._compat import ipaddress
@@ -2344,6 +2345,8 @@ class Minion(MinionBase):
             load = {"cmd": ret_cmd, "id": self.opts["id"]}
             for key, value in ret.items():
                 load[key] = value
+            if self.opts["state_return_delta"]:
+                load = salt.utils.statedelta.delta_load(self.opts, load)
 
         if "out" in ret:
             if isinstance(ret["out"], str):
@@ -2387,6 +2390,9 @@ class Minion(MinionBase):
         except SaltReqTimeoutError:
             timeout_handler()
             ret_val = ""
+        else:
+            if self.opts["state_return_delta"]:
+                salt.utils.statedelta.confirm(self.opts, load)
         log.trace("ret_val = %s", ret_val)  # pylint: disable=no-member
         raise tornado.gen.Return(ret_val)
 
@@ -2414,6 +2420,8 @@ class Minion(MinionBase):
         except SaltReqTimeoutError:
             timeout_handler()
             return ""
+        if self.opts["state_return_delta"]:
+            salt.utils.statedelta.confirm(self.opts, load)
         log.trace("ret_val = %s", ret_val)  # pylint: disable=no-member
         return ret_val
 
@@ -3139,6 +3147,31 @@ class Minion(MinionBase):
             self.grains_cache = self.opts["grains"]
             self.ready = True
 
+    def _fire_job_heartbeats(self):
+        """
+        Fire a heartbeat event on the master for every job this minion is
+        running, so that clients waiting for the returns know the job is still
+        running without publishing ``saltutil.find_job``
+        """
+        events = []
+        for job in salt.utils.minion.running(self.opts):
+            if not job.get("jid") or job.get("schedule"):
+                continue
+            events.append(
+                {
+                    "tag": tagify([job["jid"], "beat", self.opts["id"]], "job"),
+                    "data": {
+                        "id": self.opts["id"],
+                        "jid": job["jid"],
+                        "fun": job.get("fun"),
+                        "pid": job.get("pid"),
+                        "interval": self.opts["job_heartbeat_interval"],
+                    },
+                }
+            )
+        if events:
+            self.io_loop.add_callback(self._fire_master_main, events=events)
+
     def setup_beacons(self, before_connect=False):
         """
         Set up the beacons.
@@ -3316,6 +3349,13 @@ class Minion(MinionBase):
             self.remove_periodic_callback("ping")
             self.add_periodic_callback("ping", ping_master, ping_interval)
 
+        heartbeat_interval = self.opts.get("job_heartbeat_interval", 0)
+        if heartbeat_interval > 0 and self.connected:
+            self.remove_periodic_callback("job_heartbeat")
+            self.add_periodic_callback(
+                "job_heartbeat", self._fire_job_heartbeats, heartbeat_interval
+            )
+
         # add handler to subscriber
         if hasattr(self, "pub_channel") and self.pub_channel is not None:
             self.pub_channel.on_recv(self._handle_payload)
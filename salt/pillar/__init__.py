@@ -22,9 +22,11 @@ import salt.utils.cache
 import salt.utils.crypt
 import salt.utils.data
 import salt.utils.dictupdate
+import salt.utils.hashutils
+import salt.utils.json
 import salt.utils.url
 from salt.exceptions import SaltClientError
-from salt.template import compile_template
+from salt.template import TEMPLATE_DEPENDENCIES, compile_template
 
 # Even though dictupdate is imported, invoking salt.utils.dictupdate.merge here
 # causes an UnboundLocalError. This should be investigated and fixed, but until
@@ -393,6 +395,40 @@ class RemotePillar(RemotePillarMixin):
     # pylint: enable=W1701
 
 
+# The options the pillar cached by PillarCache depends on, including the ones
+# the top files and pillar templates are commonly rendered against
+PILLAR_CACHE_OPTS = (
+    "allow_undefined",
+    "decrypt_pillar",
+    "decrypt_pillar_default",
+    "decrypt_pillar_delimiter",
+    "decrypt_pillar_renderers",
+    "exclude_ext_pillar",
+    "ext_pillar",
+    "ext_pillar_first",
+    "jinja_env",
+    "jinja_lstrip_blocks",
+    "jinja_sls_env",
+    "jinja_trim_blocks",
+    "nodegroups",
+    "on_demand_ext_pillar",
+    "pass_to_ext_pillars",
+    "pillar_includes_override_sls",
+    "pillar_merge_lists",
+    "pillar_opts",
+    "pillar_roots",
+    "pillar_safe_render_error",
+    "pillar_source_merging_strategy",
+    "pillarenv_from_saltenv",
+    "renderer",
+    "renderer_blacklist",
+    "renderer_whitelist",
+    "saltversion",
+    "state_top",
+    "top_file_merging_strategy",
+)
+
+
 class PillarCache:
     """
     Return a cached pillar if it exists, otherwise cache it.
@@ -483,9 +519,150 @@ class PillarCache:
 
         return True
 
+    def fingerprint(self):
+        """
+        Return a fingerprint of the inputs the pillar of the minion is compiled
+        from, other than the pillar files
+        """
+        inputs = {
+            "grains": self.grains,
+            "saltenv": self.saltenv,
+            "pillarenv": self.pillarenv,
+            "ext": self.ext,
+            "extra_minion_data": self.extra_minion_data,
+            "opts": {key: self.opts.get(key) for key in PILLAR_CACHE_OPTS},
+        }
+        if self.opts.get("pillar_opts"):
+            # The master options are part of the pillar
+            inputs["opts"] = {
+                key: value for key, value in self.opts.items() if key != "grains"
+            }
+        return salt.utils.hashutils.sha256_digest(
+            salt.utils.json.dumps(inputs, sort_keys=True, default=repr)
+        )
+
+    def _shadowing_dirs(self, path):
+        """
+        Return the directories where a new SLS file would take precedence over
+        the pillar file ``path``: the same file in the pillar roots before the
+        one it was found in and, for an ``init.sls``, the ``<name>.sls`` file
+        in any of them.
+        """
+        dirs = []
+        for saltenv, roots in self.opts.get("pillar_roots", {}).items():
+            if saltenv == "__env__":
+                env = self.pillarenv or self.saltenv
+                if not env:
+                    continue
+                roots = [root.replace("__env__", env) for root in roots]
+            roots = [os.path.abspath(root) for root in roots]
+            for idx, root in enumerate(roots):
+                if not path.startswith(os.path.join(root, "")):
+                    continue
+                rel = os.path.relpath(path, root)
+                for prev in roots[:idx]:
+                    dirs.append(os.path.dirname(os.path.join(prev, rel)))
+                if os.path.basename(rel) == "init.sls":
+                    sls_rel = os.path.dirname(rel) + ".sls"
+                    for other in roots:
+                        dirs.append(os.path.dirname(os.path.join(other, sls_rel)))
+                break
+        return dirs
+
+    def _stat_dependencies(self, paths):
+        """
+        Return the modification time and size of the pillar files, and the
+        modification time of the directories they are in and of the
+        directories where a new file would shadow them
+        """
+        stats = {}
+
+        def _stat(fn_, with_size):
+            if fn_ in stats:
+                return
+            try:
+                st = os.stat(fn_)
+            except OSError:
+                stats[fn_] = None
+            else:
+                stats[fn_] = [st.st_mtime_ns, st.st_size if with_size else None]
+
+        for path in paths:
+            _stat(path, True)
+            _stat(os.path.dirname(path), False)
+            for dirpath in self._shadowing_dirs(path):
+                _stat(dirpath, False)
+        return stats
+
+    @staticmethod
+    def _dependencies_changed(stats):
+        for fn_, stat in stats.items():
+            try:
+                st = os.stat(fn_)
+            except OSError:
+                if stat is not None:
+                    return True
+                continue
+            if stat is None or st.st_mtime_ns != stat[0]:
+                return True
+            if stat[1] is not None and st.st_size != stat[1]:
+                return True
+        return False
+
+    def compile_fingerprinted_pillar(self):
+        """
+        Return the cached pillar if neither the inputs nor any of the files it
+        was compiled from changed, otherwise compile and cache it
+        """
+        inputs_key = f"{self.minion_id}/inputs"
+        fingerprint = self.fingerprint()
+        minion_cache = (
+            self.cache[self.minion_id] if self.minion_id in self.cache else {}
+        )
+        minion_inputs = self.cache[inputs_key] if inputs_key in self.cache else {}
+        inputs = minion_inputs.get(self.pillarenv)
+        if (
+            self.pillarenv in minion_cache
+            and inputs
+            and inputs["fingerprint"] == fingerprint
+            and not self._dependencies_changed(inputs["dependencies"])
+        ):
+            log.debug(
+                "Pillar cache hit for minion %s and pillarenv %s",
+                self.minion_id,
+                self.pillarenv,
+            )
+            return minion_cache[self.pillarenv]
+
+        dependencies = set()
+        token = TEMPLATE_DEPENDENCIES.set(dependencies)
+        try:
+            fresh_pillar = self.fetch_pillar()
+        finally:
+            TEMPLATE_DEPENDENCIES.reset(token)
+        log.debug(
+            "Pillar cache miss for minion %s and pillarenv %s, compiled from %s",
+            self.minion_id,
+            self.pillarenv,
+            sorted(dependencies),
+        )
+        if fresh_pillar.get("_errors"):
+            # Don't cache a broken pillar, it would be served until a file changes
+            return fresh_pillar
+        minion_cache[self.pillarenv] = fresh_pillar
+        minion_inputs[self.pillarenv] = {
+            "fingerprint": fingerprint,
+            "dependencies": self._stat_dependencies(dependencies),
+        }
+        self.cache[self.minion_id] = minion_cache
+        self.cache[inputs_key] = minion_inputs
+        return fresh_pillar
+
     def compile_pillar(self, *args, **kwargs):  # Will likely just be pillar_dirs
         if self.clean_cache:
             self.clear_pillar()
+        if self.opts.get("pillar_cache_fingerprint", False):
+            return self.compile_fingerprinted_pillar()
         log.debug(
             "Scanning pillar cache for information about minion %s and pillarenv %s",
             self.minion_id,
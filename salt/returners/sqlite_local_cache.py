@@ -0,0 +1,587 @@
+"""
+Use an SQLite index for the master job cache. This helps the job cache to cope
+with a large number of jobs.
+
+.. versionadded:: 3008.0
+
+The :mod:`local_cache <salt.returners.local_cache>` returner stores every job
+in its own directory and has to walk and deserialize every ``.load.p`` file
+when listing or expiring jobs. This returner keeps the minion returns in the
+same on-disk layout, but records the job loads, the targeted minions and the
+job end times in an SQLite database under the master cachedir, indexed by jid
+and by creation time. Listing the last ``N`` jobs, listing the jobs started
+in a time range and expiring old jobs are then answered from the index
+without touching the job directories.
+
+To enable this returner, set the following value in the master config:
+
+.. code-block:: yaml
+
+    master_job_cache: sqlite_local_cache
+
+The location of the database defaults to ``<cachedir>/jobs.db`` and can be
+changed with:
+
+.. code-block:: yaml
+
+    master_job_cache.sqlite.database: /var/cache/salt/master/jobs.db
+
+Jobs already present in the ``local_cache`` job cache can be imported into the
+index with the :py:func:`jobs.import_local_cache
+<salt.runners.jobs.import_local_cache>` runner:
+
+.. code-block:: bash
+
+    salt-run jobs.import_local_cache
+"""
+
+import datetime
+import errno
+import logging
+import os
+import shutil
+import threading
+import time
+
+import salt.exceptions
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.jid
+import salt.utils.job
+import salt.utils.minions
+import salt.utils.stringutils
+
+try:
+    import sqlite3
+
+    HAS_SQLITE3 = True
+except ImportError:
+    HAS_SQLITE3 = False
+
+log = logging.getLogger(__name__)
+
+__virtualname__ = "sqlite_local_cache"
+
+# Bump when the schema changes, older databases are upgraded in _init_db
+SCHEMA_VERSION = 1
+
+# return is the "return" from the minion data
+RETURN_P = "return.p"
+# out is the "out" from the minion data
+OUT_P = "out.p"
+# load is the published job, as stored by local_cache
+LOAD_P = ".load.p"
+# the list of minions that the job is targeted to, as stored by local_cache
+MINIONS_P = ".minions.p"
+SYNDIC_MINIONS_P = ".minions.{0}.p"
+# endtime is the end time for a job, as stored by local_cache
+ENDTIME = "endtime"
+
+# Connections are not shared with forked processes or other threads
+_CONNECTIONS = {}
+
+
+def __virtual__():
+    if not HAS_SQLITE3:
+        return (False, "Could not import sqlite3; sqlite_local_cache disabled")
+    return __virtualname__
+
+
+def _job_dir():
+    """
+    Return root of the jobs cache directory
+    """
+    return os.path.join(__opts__["cachedir"], "jobs")
+
+
+def _db_path():
+    """
+    Return the path of the job index database
+    """
+    return __opts__.get("master_job_cache.sqlite.database") or os.path.join(
+        __opts__["cachedir"], "jobs.db"
+    )
+
+
+def _init_db(conn):
+    """
+    Create the job index tables
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+    with conn:
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                 jid TEXT PRIMARY KEY,
+                 created REAL NOT NULL,
+                 fun TEXT,
+                 nocache INTEGER NOT NULL DEFAULT 0,
+                 load BLOB,
+                 endtime TEXT
+               )"""
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created)")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS minions (
+                 jid TEXT NOT NULL,
+                 syndic_id TEXT NOT NULL DEFAULT '',
+                 minions BLOB NOT NULL,
+                 PRIMARY KEY (jid, syndic_id)
+               )"""
+        )
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+def _get_conn():
+    """
+    Return the job index database connection of this process and thread
+    """
+    path = _db_path()
+    # sqlite connections may only be used by the thread that opened them
+    key = (os.getpid(), threading.get_ident(), path)
+    conn = _CONNECTIONS.get(key)
+    if conn is None:
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname, exist_ok=True)
+        try:
+            conn = sqlite3.connect(path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            _init_db(conn)
+        except sqlite3.Error as exc:
+            raise salt.exceptions.SaltCacheError(
+                f"Unable to open the job index database {path}: {exc}"
+            )
+        _CONNECTIONS[key] = conn
+    return conn
+
+
+def _dumps(data):
+    return sqlite3.Binary(salt.payload.dumps(data))
+
+
+def _loads(data):
+    if data is None:
+        return None
+    return salt.payload.loads(bytes(data))
+
+
+def _fun(load):
+    """
+    Return the indexed function name of a job load
+    """
+    fun = load.get("fun")
+    if isinstance(fun, str):
+        return fun
+    return None
+
+
+def _dt_to_jid(when):
+    """
+    Return the lowest jid a job started at the given datetime can have
+    """
+    return f"{when:%Y%m%d%H%M%S%f}"
+
+
+def prep_jid(nocache=False, passed_jid=None, recurse_count=0):
+    """
+    Return a job id and record it in the job index.
+
+    This is the function responsible for making sure jids don't collide (unless
+    it is passed a jid).
+    """
+    if recurse_count >= 5:
+        err = f"prep_jid could not store a jid after {recurse_count} tries."
+        log.error(err)
+        raise salt.exceptions.SaltCacheError(err)
+    if passed_jid is None:  # this can be a None or an empty string.
+        jid = salt.utils.jid.gen_jid(__opts__)
+    else:
+        jid = passed_jid
+
+    conn = _get_conn()
+    try:
+        with conn:
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO jobs (jid, created, nocache) VALUES (?, ?, ?)",
+                (jid, time.time(), int(bool(nocache))),
+            )
+    except sqlite3.Error as exc:
+        log.warning("Could not record jid %s in the job index: %s", jid, exc)
+        time.sleep(0.1)
+        return prep_jid(
+            nocache=nocache, passed_jid=passed_jid, recurse_count=recurse_count + 1
+        )
+    if not cur.rowcount and passed_jid is None:
+        # Someone else is using this jid, we need a new one
+        time.sleep(0.1)
+        return prep_jid(nocache=nocache, recurse_count=recurse_count + 1)
+    return jid
+
+
+def returner(load):
+    """
+    Return data to the local job cache
+    """
+    # if a minion is returning a standalone job, get a jobid
+    if load["jid"] == "req":
+        load["jid"] = prep_jid(nocache=load.get("nocache", False))
+
+    conn = _get_conn()
+    row = conn.execute(
+        "SELECT nocache FROM jobs WHERE jid = ?", (load["jid"],)
+    ).fetchone()
+    if row is None:
+        # Make sure returns of jobs published elsewhere (syndics, etc.) expire
+        with conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO jobs (jid, created) VALUES (?, ?)",
+                (load["jid"], time.time()),
+            )
+    elif row[0]:
+        return
+
+    jid_dir = salt.utils.jid.jid_dir(load["jid"], _job_dir(), __opts__["hash_type"])
+    hn_dir = os.path.join(jid_dir, load["id"])
+
+    try:
+        os.makedirs(hn_dir)
+    except OSError as err:
+        if err.errno == errno.EEXIST:
+            # Minion has already returned this jid and it should be dropped
+            log.error(
+                "An extra return was detected from minion %s, please verify "
+                "the minion, this could be a replay attack",
+                load["id"],
+            )
+            return False
+        raise
+
+    salt.payload.dump(
+        {key: load[key] for key in ["return", "retcode", "success"] if key in load},
+        # Use atomic open here to avoid the file being read before it's
+        # completely written to. Refs #1935
+        salt.utils.atomicfile.atomic_open(os.path.join(hn_dir, RETURN_P), "w+b"),
+    )
+
+    if "out" in load:
+        salt.payload.dump(
+            load["out"],
+            salt.utils.atomicfile.atomic_open(os.path.join(hn_dir, OUT_P), "w+b"),
+        )
+
+
+def save_load(jid, clear_load, minions=None):
+    """
+    Save the load to the specified jid
+
+    minions argument is to provide a pre-computed list of matched minions for
+    the job, for cases when this function can't compute that list itself (such
+    as for salt-ssh)
+    """
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO jobs (jid, created) VALUES (?, ?)",
+            (jid, time.time()),
+        )
+        conn.execute(
+            "UPDATE jobs SET fun = ?, load = ? WHERE jid = ?",
+            (_fun(clear_load), _dumps(clear_load), jid),
+        )
+
+    # if you have a tgt, save that for the UI etc
+    if "tgt" in clear_load and clear_load["tgt"] != "":
+        if minions is None:
+            ckminions = salt.utils.minions.CkMinions(__opts__)
+            # Retrieve the minions list
+            _res = ckminions.check_minions(
+                clear_load["tgt"], clear_load.get("tgt_type", "glob")
+            )
+            minions = _res["minions"]
+        # save the minions to a cache so we can see in the UI
+        save_minions(jid, minions)
+
+
+def save_minions(jid, minions, syndic_id=None):
+    """
+    Save/update the list of minions for a given job
+    """
+    minions = list(minions)
+    log.debug(
+        "Adding minions for job %s%s: %s",
+        jid,
+        f" from syndic master '{syndic_id}'" if syndic_id else "",
+        minions,
+    )
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO minions (jid, syndic_id, minions) VALUES (?, ?, ?)",
+            (jid, syndic_id or "", _dumps(minions)),
+        )
+
+
+def get_load(jid):
+    """
+    Return the load data that marks a specified jid
+    """
+    conn = _get_conn()
+    row = conn.execute("SELECT load FROM jobs WHERE jid = ?", (jid,)).fetchone()
+    if row is None or row[0] is None:
+        return {}
+    ret = _loads(row[0]) or {}
+    all_minions = set()
+    for (minions,) in conn.execute("SELECT minions FROM minions WHERE jid = ?", (jid,)):
+        all_minions.update(_loads(minions))
+    if all_minions:
+        ret["Minions"] = sorted(all_minions)
+    return ret
+
+
+def get_jid(jid):
+    """
+    Return the information returned when the specified job id was executed
+    """
+    jid_dir = salt.utils.jid.jid_dir(jid, _job_dir(), __opts__["hash_type"])
+
+    ret = {}
+    # Check to see if the jid is real, if not return the empty dict
+    if not os.path.isdir(jid_dir):
+        return ret
+    for fn_ in os.listdir(jid_dir):
+        if fn_.startswith("."):
+            continue
+        retp = os.path.join(jid_dir, fn_, RETURN_P)
+        outp = os.path.join(jid_dir, fn_, OUT_P)
+        if not os.path.isfile(retp):
+            continue
+        try:
+            with salt.utils.files.fopen(retp, "rb") as rfh:
+                ret_data = salt.payload.load(rfh)
+            if not isinstance(ret_data, dict) or "return" not in ret_data:
+                ret_data = {"return": ret_data}
+            ret[fn_] = ret_data
+            if os.path.isfile(outp):
+                with salt.utils.files.fopen(outp, "rb") as rfh:
+                    ret[fn_]["out"] = salt.payload.load(rfh)
+        except Exception as exc:  # pylint: disable=broad-except
+            if "Permission denied:" in str(exc):
+                raise
+            log.error("Failed to read the return of %s for job %s: %s", fn_, jid, exc)
+    return ret
+
+
+def _format_jids(rows):
+    ret = {}
+    for jid, load, endtime in rows:
+        job = _loads(load)
+        if not job:
+            continue
+        ret[jid] = salt.utils.jid.format_jid_instance(jid, job)
+        if endtime and __opts__.get("job_cache_store_endtime"):
+            ret[jid]["EndTime"] = endtime
+    return ret
+
+
+def get_jids():
+    """
+    Return a dict mapping all job ids to job information
+    """
+    rows = _get_conn().execute(
+        "SELECT jid, load, endtime FROM jobs WHERE load IS NOT NULL"
+    )
+    return _format_jids(rows)
+
+
+def get_jids_range(start=None, end=None):
+    """
+    Return a dict mapping the job ids of the jobs started between ``start``
+    and ``end`` (inclusive) to job information
+
+    :param datetime start: return jobs started at or after this UTC time
+    :param datetime end: return jobs started at or before this UTC time
+    """
+    sql = "SELECT jid, load, endtime FROM jobs WHERE load IS NOT NULL"
+    args = []
+    if start is not None:
+        sql += " AND jid >= ?"
+        args.append(_dt_to_jid(start))
+    if end is not None:
+        # jids may carry a "_<pid>" suffix, compare against the next microsecond
+        sql += " AND jid < ?"
+        args.append(_dt_to_jid(end + datetime.timedelta(microseconds=1)))
+    return _format_jids(_get_conn().execute(sql, args))
+
+
+def get_jids_filter(count, filter_find_job=True):
+    """
+    Return a list of all jobs information filtered by the given criteria.
+    :param int count: show not more than the count of most recent jobs
+    :param bool filter_find_jobs: filter out 'saltutil.find_job' jobs
+    """
+    sql = "SELECT jid, load FROM jobs WHERE load IS NOT NULL"
+    args = []
+    if filter_find_job:
+        sql += " AND (fun IS NULL OR fun != ?)"
+        args.append("saltutil.find_job")
+    sql += " ORDER BY jid DESC LIMIT ?"
+    args.append(count)
+    ret = []
+    for jid, load in _get_conn().execute(sql, args):
+        job = _loads(load)
+        if job:
+            ret.append(salt.utils.jid.format_jid_instance_ext(jid, job))
+    ret.reverse()
+    return ret
+
+
+def _remove_job_dir(job_path):
+    """
+    Try to remove job dir. In rare cases NotADirectoryError can raise because node corruption.
+    :param job_path: Path to job
+    """
+    try:
+        shutil.rmtree(job_path)
+    except FileNotFoundError:
+        pass
+    except (NotADirectoryError, OSError) as err:
+        log.error("Unable to remove %s: %s", job_path, err)
+        return False
+    return True
+
+
+def clean_old_jobs():
+    """
+    Clean out the old jobs from the job cache
+    """
+    keep_jobs_seconds = salt.utils.job.get_keep_jobs_seconds(__opts__)
+    if keep_jobs_seconds == 0:
+        return
+    conn = _get_conn()
+    cutoff = time.time() - keep_jobs_seconds
+    jids = [
+        row[0]
+        for row in conn.execute("SELECT jid FROM jobs WHERE created < ?", (cutoff,))
+    ]
+    job_dir = _job_dir()
+    for jid in jids:
+        jid_dir = salt.utils.jid.jid_dir(jid, job_dir, __opts__["hash_type"])
+        _remove_job_dir(jid_dir)
+        parent = os.path.dirname(jid_dir)
+        try:
+            os.rmdir(parent)
+        except OSError:
+            # Other jobs share this directory
+            pass
+    with conn:
+        conn.executemany("DELETE FROM jobs WHERE jid = ?", ((jid,) for jid in jids))
+        conn.executemany("DELETE FROM minions WHERE jid = ?", ((jid,) for jid in jids))
+
+
+def update_endtime(jid, time):  # pylint: disable=redefined-outer-name
+    """
+    Update (or store) the end time for a given job
+    """
+    conn = _get_conn()
+    with conn:
+        conn.execute(
+            "UPDATE jobs SET endtime = ? WHERE jid = ?",
+            (salt.utils.stringutils.to_str(time), jid),
+        )
+
+
+def get_endtime(jid):
+    """
+    Retrieve the stored endtime for a given job
+
+    Returns False if no endtime is present
+    """
+    row = (
+        _get_conn().execute("SELECT endtime FROM jobs WHERE jid = ?", (jid,)).fetchone()
+    )
+    if row is None or not row[0]:
+        return False
+    return row[0]
+
+
+def _read_payload(path):
+    try:
+        with salt.utils.files.fopen(path, "rb") as rfh:
+            return salt.payload.load(rfh)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.error("Failed to deserialize %s: %s", path, exc)
+        return None
+
+
+def import_local_cache():
+    """
+    Index the jobs stored by the :mod:`local_cache <salt.returners.local_cache>`
+    returner in the job cache directory. The minion returns are left in
+    place, the job directories are only read once.
+
+    Returns the number of jobs imported.
+    """
+    job_dir = _job_dir()
+    if not os.path.isdir(job_dir):
+        return 0
+    conn = _get_conn()
+    count = 0
+    for top in os.listdir(job_dir):
+        t_path = os.path.join(job_dir, top)
+        if not os.path.isdir(t_path):
+            continue
+        for final in os.listdir(t_path):
+            f_path = os.path.join(t_path, final)
+            jid_file = os.path.join(f_path, "jid")
+            if not os.path.isfile(jid_file):
+                continue
+            with salt.utils.files.fopen(jid_file, "rb") as rfh:
+                jid = salt.utils.stringutils.to_unicode(rfh.read()).strip()
+            created = os.stat(jid_file).st_ctime
+            nocache = os.path.exists(os.path.join(f_path, "nocache"))
+            load = None
+            if os.path.isfile(os.path.join(f_path, LOAD_P)):
+                load = _read_payload(os.path.join(f_path, LOAD_P))
+            endtime = None
+            if os.path.isfile(os.path.join(f_path, ENDTIME)):
+                with salt.utils.files.fopen(os.path.join(f_path, ENDTIME), "r") as efh:
+                    endtime = efh.read().strip("\n")
+            minions = {}
+            for name in os.listdir(f_path):
+                if name == MINIONS_P:
+                    syndic_id = ""
+                elif name.startswith(".minions.") and name.endswith(".p"):
+                    syndic_id = name[len(".minions.") : -len(".p")]
+                else:
+                    continue
+                data = _read_payload(os.path.join(f_path, name))
+                if data is not None:
+                    minions[syndic_id] = list(data)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO jobs "
+                    "(jid, created, fun, nocache, load, endtime) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        jid,
+                        created,
+                        _fun(load) if load else None,
+                        int(nocache),
+                        _dumps(load) if load else None,
+                        endtime,
+                    ),
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO minions (jid, syndic_id, minions) "
+                    "VALUES (?, ?, ?)",
+                    (
+                        (jid, syndic_id, _dumps(data))
+                        for syndic_id, data in minions.items()
+                    ),
+                )
+            count += 1
+    return count
@@ -14,6 +14,7 @@ import salt.utils.args
 import salt.utils.files
 import salt.utils.jid
 import salt.utils.master
+import salt.utils.statedelta
 from salt.exceptions import SaltClientError
 
 try:
@@ -204,7 +205,9 @@ def list_job(jid, ext_source=None, display_progress=False):
 
     job = mminion.returners[f"{returner}.get_load"](jid)
     ret.update(_format_jid_instance(jid, job))
-    ret["Result"] = mminion.returners[f"{returner}.get_jid"](jid)
+    ret["Result"] = _expand_state_deltas(
+        mminion, returner, mminion.returners[f"{returner}.get_jid"](jid)
+    )
 
     fstr = "{}.get_endtime".format(__opts__["master_job_cache"])
     if __opts__.get("job_cache_store_endtime") and fstr in mminion.returners:
@@ -310,7 +313,15 @@ def list_jobs(
         )
     mminion = salt.minion.MasterMinion(__opts__)
 
-    ret = mminion.returners[f"{returner}.get_jids"]()
+    range_fun = f"{returner}.get_jids_range"
+    if DATEUTIL_SUPPORT and (start_time or end_time) and range_fun in mminion.returners:
+        # Let the returner narrow the jobs down to the requested time range
+        ret = mminion.returners[range_fun](
+            start=dateutil_parser.parse(start_time) if start_time else None,
+            end=dateutil_parser.parse(end_time) if end_time else None,
+        )
+    else:
+        ret = mminion.returners[f"{returner}.get_jids"]()
 
     mret = {}
     for item in ret:
@@ -416,6 +427,38 @@ def list_jobs_filter(
         return ret
 
 
+def import_local_cache(ext_source=None):
+    """
+    .. versionadded:: 3008.0
+
+    Import the jobs stored in the :mod:`local_cache
+    <salt.returners.local_cache>` job cache directory into the job index of
+    the configured job cache returner, for instance when switching the
+    :conf_master:`master_job_cache` to :mod:`sqlite_local_cache
+    <salt.returners.sqlite_local_cache>`.
+
+    Returns the number of jobs imported.
+
+    ext_source
+        The external job cache to use. Default: `None`.
+
+    CLI Example:
+
+    .. code-block:: bash
+
+        salt-run jobs.import_local_cache
+    """
+    returner = _get_returner(
+        (__opts__["ext_job_cache"], ext_source, __opts__["master_job_cache"])
+    )
+    mminion = salt.minion.MasterMinion(__opts__)
+
+    fun = f"{returner}.import_local_cache"
+    if fun not in mminion.returners:
+        raise NotImplementedError(f"'{fun}' returner function not implemented yet.")
+    return mminion.returners[fun]()
+
+
 def print_job(jid, ext_source=None):
     """
     Print a specific job's detail given by its jid, including the return data.
@@ -442,7 +485,9 @@ def print_job(jid, ext_source=None):
             "retrieved. Check master log for details.".format(returner)
         )
         return ret
-    ret[jid]["Result"] = mminion.returners[f"{returner}.get_jid"](jid)
+    ret[jid]["Result"] = _expand_state_deltas(
+        mminion, returner, mminion.returners[f"{returner}.get_jid"](jid)
+    )
 
     fstr = "{}.get_endtime".format(__opts__["master_job_cache"])
     if __opts__.get("job_cache_store_endtime") and fstr in mminion.returners:
@@ -539,6 +584,28 @@ def _get_returner(returner_types):
             return returner
 
 
+def _expand_state_deltas(mminion, returner, result):
+    """
+    Reconstruct the state runs the minions returned as deltas, see
+    :conf_minion:`state_return_delta`
+    """
+    if not isinstance(result, dict):
+        return result
+    get_return = None
+    for minion, data in result.items():
+        if isinstance(data, dict) and salt.utils.statedelta.is_delta(
+            data.get("return")
+        ):
+            if get_return is None:
+                get_return = salt.utils.statedelta.job_cache_getter(
+                    mminion.returners[f"{returner}.get_jid"]
+                )
+            data["return"] = salt.utils.statedelta.expand(
+                minion, data["return"], get_return
+            )
+    return result
+
+
 def _format_job_instance(job):
     """
     Helper to format a job instance
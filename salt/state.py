@@ -2548,6 +2548,11 @@ class State:
                 self._check_disabled(chunk, disabled)
         else:
             disabled = disabled_states
+        if self.opts.get("state_graph_executor", False) and self.dependency_dag.dag:
+            running, failhard = self.call_chunks_graph(chunks)
+            if failhard:
+                return running
+            return {**disabled, **running}
         running = {}
         pending_chunks = {}
         for low in chunks:
@@ -2580,6 +2585,161 @@ class State:
         ret = {**disabled, **running}
         return ret
 
+    def call_chunks_graph(
+        self, chunks: Sequence[LowChunk]
+    ) -> tuple[dict[str, dict], bool]:
+        """
+        Call the chunks following the dependency graph built by order_chunks.
+
+        Every chunk is called as soon as the states it depends on finished.
+        The chunks which can run in a separate process (see
+        ``_graph_concurrent``) run concurrently, on at most
+        ``state_graph_workers`` processes at a time, the others run in this
+        process. Chunks without requisites between them can run in any order.
+
+        Returns the running dict and whether the run stopped because of a
+        failhard.
+        """
+        workers = max(1, self.opts.get("state_graph_workers", 4))
+        running = {}
+        # The chunks started in a separate process by this executor
+        dispatched = {}
+        remaining = list(chunks)
+        failhard = killed = False
+        while remaining or dispatched:
+            if dispatched:
+                self.reconcile_procs({tag: running[tag] for tag in dispatched})
+                for tag in [tag for tag in dispatched if "proc" not in running[tag]]:
+                    low = dispatched.pop(tag)
+                    self._graph_chunk_done(low, tag, running, chunks)
+                    if self.check_failhard(low, running):
+                        failhard = True
+            if failhard or killed:
+                break
+            still_remaining = []
+            progress = False
+            for low in remaining:
+                tag = _gen_tag(low)
+                if tag in running:
+                    # Already called as the requisite of another chunk
+                    continue
+                if not self._graph_ready(low, running):
+                    still_remaining.append(low)
+                    continue
+                concurrent = self._graph_concurrent(low)
+                if concurrent and len(dispatched) >= workers:
+                    still_remaining.append(low)
+                    continue
+                if self.check_pause(low) == "kill":
+                    killed = True
+                    break
+                progress = True
+                if concurrent:
+                    self._mod_init(low)
+                    status, _ = self._check_requisites(low, running)
+                    concurrent = status == "met"
+                if concurrent:
+                    # Call a copy, the chunk itself is shared with the graph
+                    running[tag] = self.call(dict(low, parallel=True), chunks, running)
+                    if "proc" in running[tag]:
+                        dispatched[tag] = low
+                        continue
+                    self._graph_chunk_done(low, tag, running, chunks)
+                else:
+                    running, pending = self.call_chunk(low, running, chunks)
+                    if pending:
+                        still_remaining.append(low)
+                    if running.pop("__FAILHARD__", False):
+                        failhard = True
+                if failhard or self.check_failhard(low, running):
+                    failhard = True
+                    break
+            if killed or failhard:
+                remaining = []
+                continue
+            remaining = still_remaining
+            if progress:
+                continue
+            if dispatched or not self.reconcile_procs(running):
+                time.sleep(0.01)
+            elif remaining:
+                # Nothing is running and nothing is ready, let call_chunk
+                # sort out the requisites of the next chunk in order
+                low = remaining.pop(0)
+                running, pending = self.call_chunk(low, running, chunks)
+                if pending:
+                    remaining.insert(0, low)
+                if running.pop("__FAILHARD__", False) or self.check_failhard(
+                    low, running
+                ):
+                    failhard = True
+                    remaining = []
+        while True:
+            if self.reconcile_procs(running):
+                break
+            time.sleep(0.01)
+        for tag, low in dispatched.items():
+            self._graph_chunk_done(low, tag, running, chunks)
+        return running, failhard
+
+    def _graph_ready(self, low: LowChunk, running: dict[str, dict]) -> bool:
+        """
+        Check if all the states the low chunk depends on have finished
+        """
+        for req_type, chunk in self.dependency_dag.get_dependencies(low):
+            run_dict = self.pre if req_type == RequisiteType.PREREQ else running
+            ret = run_dict.get(_gen_tag(chunk))
+            if ret is None or "proc" in ret:
+                return False
+        return True
+
+    def _graph_concurrent(self, low: LowChunk) -> bool:
+        """
+        Check if the low chunk can be called in a separate process by the
+        dependency graph executor.
+
+        Chunks taking part in a prereq or an aggregation, chunks setting
+        ``parallel`` themselves, chunks reloading modules, grains or pillar
+        and the states listed in ``state_graph_serial_states`` always run in
+        this process.
+        """
+        tag = _gen_tag(low)
+        if (
+            "parallel" in low
+            or low.get("__prereq__")
+            or low.get("__prerequiring__")
+            or low.get("__agg__")
+            or tag in self.pre
+            or tag not in self.dependency_dag.dag
+        ):
+            return False
+        if low["state"] in (self.opts.get("state_graph_serial_states") or ()):
+            return False
+        for key in (
+            "reload_modules",
+            "reload_grains",
+            "reload_pillar",
+            "force_reload_modules",
+        ):
+            if low.get(key):
+                return False
+        return not self.dependency_dag.get_aggregate_chunks(low)
+
+    def _graph_chunk_done(
+        self,
+        low: LowChunk,
+        tag: str,
+        running: dict[str, dict],
+        chunks: Sequence[LowChunk],
+    ) -> None:
+        """
+        Finish a chunk the dependency graph executor called in a separate
+        process, the same way call and call_chunk finish the other chunks
+        """
+        running[tag].pop("__parallel__", None)
+        self.check_refresh(low, running[tag])
+        self._record_chunk_ret(low, tag, running, chunks)
+
     def check_failhard(self, low: LowChunk, running: dict[str, dict]):
         """
         Check if the low data chunk should send a failhard signal
@@ -2986,29 +3146,40 @@ class State:
             else:
                 running[tag] = self.call(low, chunks, running)
         if tag in running:
-            self.event(
-                running[tag], len(chunks), fire_event=low.get("fire_event", False)
-            )
-
-            for sub_state_data in running[tag].pop("sub_state_run", ()):
-                start_time, duration = _calculate_fake_duration()
-                self.__run_num += 1
-                sub_tag = _gen_tag(sub_state_data["low"])
-                running[sub_tag] = {
-                    "name": sub_state_data["low"]["name"],
-                    "changes": sub_state_data["changes"],
-                    "result": sub_state_data["result"],
-                    "duration": sub_state_data.get("duration", duration),
-                    "start_time": sub_state_data.get("start_time", start_time),
-                    "comment": sub_state_data.get("comment", ""),
-                    "__state_ran__": True,
-                    "__run_num__": self.__run_num,
-                }
-                for key in ("__sls__", "__id__", "name"):
-                    running[sub_tag][key] = low.get(key)
+            self._record_chunk_ret(low, tag, running, chunks)
 
         return running, False
 
+    def _record_chunk_ret(
+        self,
+        low: LowChunk,
+        tag: str,
+        running: dict[str, dict],
+        chunks: Sequence[LowChunk],
+    ) -> None:
+        """
+        Fire the event for a finished chunk and add the returns of the sub
+        states it ran
+        """
+        self.event(running[tag], len(chunks), fire_event=low.get("fire_event", False))
+
+        for sub_state_data in running[tag].pop("sub_state_run", ()):
+            start_time, duration = _calculate_fake_duration()
+            self.__run_num += 1
+            sub_tag = _gen_tag(sub_state_data["low"])
+            running[sub_tag] = {
+                "name": sub_state_data["low"]["name"],
+                "changes": sub_state_data["changes"],
+                "result": sub_state_data["result"],
+                "duration": sub_state_data.get("duration", duration),
+                "start_time": sub_state_data.get("start_time", start_time),
+                "comment": sub_state_data.get("comment", ""),
+                "__state_ran__": True,
+                "__run_num__": self.__run_num,
+            }
+            for key in ("__sls__", "__id__", "name"):
+                running[sub_tag][key] = low.get(key)
+
     def _assign_not_run_result_dict(
         self,
         low: LowChunk,
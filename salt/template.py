@@ -3,6 +3,7 @@ Manage basic template commands
 """
 
 import codecs
+import contextvars
 import io
 import logging
 import os
@@ -23,6 +24,20 @@ log = logging.getLogger(__name__)
 SLS_ENCODING = "utf-8"  # this one has no BOM.
 SLS_ENCODER = codecs.getencoder(SLS_ENCODING)
 
+# While set to a set, the paths of the template files rendered and loaded by
+# the renderers are added to it
+TEMPLATE_DEPENDENCIES = contextvars.ContextVar("template_dependencies", default=None)
+
+
+def record_template_dependency(path):
+    """
+    Record that a template file was read, if the dependencies of the current
+    render are being recorded
+    """
+    dependencies = TEMPLATE_DEPENDENCIES.get()
+    if dependencies is not None:
+        dependencies.add(path)
+
 
 def compile_template(
     template,
@@ -66,6 +81,7 @@ def compile_template(
         if not os.path.isfile(template):
             log.error("Template does not exist: %s", template)
             return ret
+        record_template_dependency(template)
         # Template is an empty file
         if salt.utils.files.is_empty(template):
             log.debug("Template is an empty file: %s", template)
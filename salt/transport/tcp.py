@@ -8,6 +8,7 @@ Wire protocol: "len(payload) msgpack({'head': SOMEHEADER, 'body': SOMEBODY})"
 import asyncio
 import asyncio.exceptions
 import errno
+import functools
 import logging
 import multiprocessing
 import queue
@@ -1075,6 +1076,42 @@ class PubServer(tornado.tcpserver.TCPServer):
             self.remove_presence_callback = lambda subscriber: subscriber
         self.ssl = ssl
 
+    @property
+    def clients(self):
+        """
+        The connected subscribers
+        """
+        return self._clients
+
+    @clients.setter
+    def clients(self, clients):
+        self._clients = set(clients)
+        # {<minion id>: {<subscriber>, ...}}
+        self._subscribers = {}
+        for client in self._clients:
+            self._index_client(client)
+
+    def _index_client(self, client):
+        """
+        Make a subscriber a target of the publishes for its minion id, once the
+        minion id is known
+        """
+        if client.id_ is not None:
+            self._subscribers.setdefault(client.id_, set()).add(client)
+
+    def remove_client(self, client):
+        """
+        Close the connection to a subscriber and stop publishing to it
+        """
+        client.close()
+        self.remove_presence_callback(client)
+        self._clients.discard(client)
+        subscribers = self._subscribers.get(client.id_)
+        if subscribers is not None:
+            subscribers.discard(client)
+            if not subscribers:
+                del self._subscribers[client.id_]
+
     def close(self):
         if self._closing:
             return
@@ -1102,11 +1139,10 @@ class PubServer(tornado.tcpserver.TCPServer):
                     body = framed_msg["body"]
                     if self.presence_callback:
                         self.presence_callback(client, body)
+                        self._index_client(client)
             except _StreamClosedError as e:
                 log.debug("tcp stream to %s closed, unable to recv", client.address)
-                client.close()
-                self.remove_presence_callback(client)
-                self.clients.discard(client)
+                self.remove_client(client)
                 break
             except Exception as e:  # pylint: disable=broad-except
                 log.error(
@@ -1124,45 +1160,63 @@ class PubServer(tornado.tcpserver.TCPServer):
                 name = salt.transport.base.common_name(cert)
                 log.error("Request client cert %r", name)
         log.debug("Subscriber at %s connected", address)
+        if self.opts.get("tcp_pub_write_buffer", 0) > 0:
+            stream.max_write_buffer_size = self.opts["tcp_pub_write_buffer"]
         client = Subscriber(stream, address)
         self.clients.add(client)
         self.io_loop.spawn_callback(self._stream_read, client)
 
+    def _send(self, client, payload):
+        """
+        Queue a payload on the stream of a subscriber without waiting for it
+        to be written, so that slow subscribers don't hold up the others.
+        Subscribers whose write buffer is full are disconnected.
+        """
+        try:
+            future = client.stream.write(payload)
+        except tornado.iostream.StreamBufferFullError:
+            log.warning(
+                "Subscriber at %s is not keeping up with the publisher, "
+                "disconnecting it",
+                client.address,
+            )
+            self.remove_client(client)
+            return False
+        except tornado.iostream.StreamClosedError:
+            log.debug(
+                "Subscriber at %s has disconnected from publisher", client.address
+            )
+            self.remove_client(client)
+            return False
+        future.add_done_callback(functools.partial(self._sent, client))
+        return True
+
+    def _sent(self, client, future):
+        if not future.cancelled() and isinstance(
+            future.exception(), tornado.iostream.StreamClosedError
+        ):
+            log.debug(
+                "Subscriber at %s has disconnected from publisher", client.address
+            )
+            self.remove_client(client)
+
     # TODO: ACK the publish through IPC
     async def publish_payload(self, package, topic_list=None):
         log.trace(
             "TCP PubServer sending payload: topic_list=%r %r", topic_list, package
         )
         payload = salt.transport.frame.frame_msg(package)
-        to_remove = []
         if topic_list:
             for topic in topic_list:
                 sent = False
-                for client in list(self.clients):
-                    if topic == client.id_:
-                        try:
-                            # Write the packed str
-                            await client.stream.write(payload)
-                            sent = True
-                            # self.io_loop.add_future(f, lambda f: True)
-                        except tornado.iostream.StreamClosedError:
-                            to_remove.append(client)
+                for client in list(self._subscribers.get(topic, ())):
+                    if self._send(client, payload):
+                        sent = True
                 if not sent:
-                    log.debug("Publish target %s not connected %r", topic, self.clients)
+                    log.debug("Publish target %s not connected", topic)
         else:
             for client in list(self.clients):
-                try:
-                    # Write the packed str
-                    await client.stream.write(payload)
-                except tornado.iostream.StreamClosedError:
-                    to_remove.append(client)
-        for client in to_remove:
-            log.debug(
-                "Subscriber at %s has disconnected from publisher", client.address
-            )
-            client.close()
-            self.remove_presence_callback(client)
-            self.clients.discard(client)
+                self._send(client, payload)
         log.trace("TCP PubServer finished publishing payload")
 
 
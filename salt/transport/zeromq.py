@@ -414,6 +414,9 @@ class RequestServer(salt.transport.base.DaemonizedRequestServer):
         self._w_monitor = None
         self.tasks = set()
         self._event = asyncio.Event()
+        # Coroutine function the worker waits on before reading another
+        # request. When set, requests are handled concurrently.
+        self.request_gate = None
 
     def zmq_device(self):
         """
@@ -534,7 +537,12 @@ class RequestServer(salt.transport.base.DaemonizedRequestServer):
         """
         # context = zmq.Context(1)
         self.context = zmq.asyncio.Context(1)
-        self._socket = self.context.socket(zmq.REP)
+        if self.request_gate is not None:
+            # A DEALER socket can receive requests before replying to the
+            # previous ones, the envelope of each request is kept to reply
+            self._socket = self.context.socket(zmq.DEALER)
+        else:
+            self._socket = self.context.socket(zmq.REP)
         # Linger -1 means we'll never discard messages.
         self._socket.setsockopt(zmq.LINGER, -1)
         self._start_zmq_monitor()
@@ -556,7 +564,11 @@ class RequestServer(salt.transport.base.DaemonizedRequestServer):
         self.message_handler = message_handler
 
         async def callback():
-            task = asyncio.create_task(self.request_handler())
+            if self.request_gate is not None:
+                handler = self.concurrent_request_handler()
+            else:
+                handler = self.request_handler()
+            task = asyncio.create_task(handler)
             task.add_done_callback(self.tasks.discard)
             self.tasks.add(task)
 
@@ -579,6 +591,47 @@ class RequestServer(salt.transport.base.DaemonizedRequestServer):
                 )
                 continue
 
+    async def concurrent_request_handler(self):
+        """
+        Read requests without waiting for the replies to the previous ones,
+        as long as the request gate lets the worker take more requests
+        """
+        while not self._event.is_set():
+            try:
+                await self.request_gate()
+                frames = await asyncio.wait_for(self._socket.recv_multipart(), 0.3)
+            except zmq.error.Again:
+                continue
+            except asyncio.exceptions.TimeoutError:
+                continue
+            except Exception as exc:  # pylint: disable=broad-except
+                log.error(
+                    "Exception in request handler",
+                    exc_info_on_loglevel=logging.DEBUG,
+                )
+                continue
+            task = asyncio.create_task(self._handle_frames(frames))
+            task.add_done_callback(self.tasks.discard)
+            self.tasks.add(task)
+            # Let the request reach its pool before checking the gate again
+            await asyncio.sleep(0)
+
+    async def _handle_frames(self, frames):
+        try:
+            delimiter = frames.index(b"")
+        except ValueError:
+            log.error("Received a request without an envelope")
+            return
+        envelope, request = frames[: delimiter + 1], frames[-1]
+        try:
+            reply = await self.handle_message(None, request)
+            await self._socket.send_multipart(envelope + [self.encode_payload(reply)])
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error(
+                "Exception in request handler",
+                exc_info_on_loglevel=logging.DEBUG,
+            )
+
     async def handle_message(self, stream, payload):
         try:
             payload = self.decode_payload(payload)
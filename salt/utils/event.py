@@ -56,9 +56,11 @@ import datetime
 import errno
 import fnmatch
 import hashlib
+import inspect
 import logging
 import os
 import time
+from collections import deque
 from collections.abc import Iterable, MutableMapping
 
 import tornado.ioloop
@@ -86,6 +88,7 @@ log = logging.getLogger(__name__)
 SUB_EVENT = ("state.highstate", "state.sls")
 
 TAGEND = "\n\n"  # long tag delimiter
+BATCHTAG = "__batch__"  # tag of the envelopes holding a batch of packed events
 TAGPARTER = "/"  # name spaced tag delimiter
 SALT = "salt"  # base prefix for all salt/ events
 # dict map of namespaced base tag prefixes for salt events
@@ -263,6 +266,8 @@ class SaltEvent:
             self.opts["ipc_mode"] = "tcp"
         self.pending_tags = []
         self.pending_events = []
+        # Packed events received in a batch and not processed yet
+        self.unbatched_events = deque()
         self.__load_cache_regex()
         if listen and not self.cpub:
             # Only connect to the publisher at initialization time if
@@ -371,6 +376,7 @@ class SaltEvent:
         self.subscriber.close()
         self.subscriber = None
         self.pending_events = []
+        self.unbatched_events.clear()
         self.cpub = False
 
     def connect_pull(self, timeout=1):
@@ -436,6 +442,47 @@ class SaltEvent:
             raise
         return mtag, data
 
+    @classmethod
+    def pack_batch(cls, events):
+        """
+        Pack a list of packed events into a single batch envelope
+        """
+        return b"".join(
+            [
+                salt.utils.stringutils.to_bytes(BATCHTAG),
+                salt.utils.stringutils.to_bytes(TAGEND),
+                salt.payload.dumps(list(events), use_bin_type=True),
+            ]
+        )
+
+    @classmethod
+    def unbatch(cls, raw):
+        """
+        Return the list of packed events in raw, which is either a single
+        packed event or a batch envelope
+        """
+        prefix = salt.utils.stringutils.to_bytes(BATCHTAG + TAGEND)
+        if not raw.startswith(prefix):
+            return [raw]
+        try:
+            return salt.payload.loads(raw[len(prefix) :])
+        except SaltDeserializationError:
+            log.warning("SaltDeserializationError on unpacking a batch of events")
+            raise
+
+    def _recv(self, timeout):
+        """
+        Receive a single packed event, unbatching envelopes
+        """
+        if self.unbatched_events:
+            return self.unbatched_events.popleft()
+        raw = self.subscriber.recv(timeout=timeout)
+        if raw is None:
+            return None
+        events = self.unbatch(raw)
+        self.unbatched_events.extend(events[1:])
+        return events[0] if events else None
+
     @classmethod
     def pack(cls, tag, data, max_size=None):
         tagend = TAGEND
@@ -565,7 +612,7 @@ class SaltEvent:
                 if not self._run_io_loop_sync:
                     log.error("Trying to get event with async subscriber")
                     raise SaltInvocationError("get_event needs synchronous subscriber")
-                raw = self.subscriber.recv(timeout=wait)
+                raw = self._recv(timeout=wait)
                 if raw is None:
                     break
                 mtag, data = self.unpack(raw)
@@ -690,7 +737,7 @@ class SaltEvent:
         if not self.cpub:
             if not self.connect_pub():
                 return None
-        raw = self.subscriber.recv(timeout=0)
+        raw = self._recv(timeout=0)
         if raw is None:
             return None
         mtag, data = self.unpack(raw)
@@ -706,7 +753,7 @@ class SaltEvent:
         if not self.cpub:
             if not self.connect_pub():
                 return None
-        raw = self.subscriber.recv(timeout=None)
+        raw = self._recv(timeout=None)
         if raw is None:
             return None
         mtag, data = self.unpack(raw)
@@ -915,8 +962,21 @@ class SaltEvent:
         assert not self._run_io_loop_sync
         if not self.cpub:
             self.connect_pub()
+
+        async def _handle_batch(events):
+            for raw in events:
+                ret = event_handler(raw)
+                if inspect.isawaitable(ret):
+                    await ret
+
+        def _unbatching_handler(raw):
+            events = self.unbatch(raw)
+            if len(events) == 1:
+                return event_handler(events[0])
+            return _handle_batch(events)
+
         # This will handle reconnects
-        self.io_loop.spawn_callback(self.subscriber.on_recv, event_handler)
+        self.io_loop.spawn_callback(self.subscriber.on_recv, _unbatching_handler)
 
     # pylint: disable=W1701
     def __del__(self):
@@ -1015,6 +1075,76 @@ class MinionEvent(SaltEvent):
         )
 
 
+class EventBatcher:
+    """
+    Coalesce the packed events published on an event bus into batch envelopes.
+
+    Events are held for up to ``window`` seconds, or until ``size`` events are
+    queued, and then passed to ``publish`` together as a single message.
+    SaltEvent subscribers unbatch the envelopes transparently.
+    """
+
+    def __init__(self, publish, window, size, io_loop=None):
+        self.publish = publish
+        self.window = window
+        self.size = max(1, size)
+        self.io_loop = io_loop or tornado.ioloop.IOLoop.current()
+        self.pending = []
+        self._flush_timeout = None
+        self.batches = 0
+        self.max_batch_size = 0
+
+    async def add(self, raw):
+        """
+        Queue a packed event
+        """
+        self.pending.append(raw)
+        if len(self.pending) >= self.size:
+            await self.flush()
+        elif self._flush_timeout is None:
+            self._flush_timeout = self.io_loop.call_later(
+                self.window, self.io_loop.spawn_callback, self.flush
+            )
+
+    async def flush(self):
+        """
+        Publish the queued events
+        """
+        if self._flush_timeout is not None:
+            self.io_loop.remove_timeout(self._flush_timeout)
+            self._flush_timeout = None
+        if not self.pending:
+            return
+        events, self.pending = self.pending, []
+        self.batches += 1
+        self.max_batch_size = max(self.max_batch_size, len(events))
+        if len(events) == 1:
+            await self.publish(events[0])
+        else:
+            await self.publish(SaltEvent.pack_batch(events))
+
+    def reset_stats(self):
+        self.batches = 0
+        self.max_batch_size = 0
+
+    def close(self):
+        """
+        Publish the queued events and stop waiting for more
+        """
+        if self._flush_timeout is not None:
+            self.io_loop.remove_timeout(self._flush_timeout)
+            self._flush_timeout = None
+        if not self.pending:
+            return
+        if self.io_loop.asyncio_loop.is_running():
+            self.io_loop.spawn_callback(self.flush)
+            return
+        try:
+            self.io_loop.run_sync(self.flush, timeout=5)
+        except Exception as exc:  # pylint: disable=broad-except
+            log.error("Unable to publish %d batched events: %s", len(self.pending), exc)
+
+
 class AsyncEventPublisher:
     """
     An event publisher class intended to run in an ioloop (within a single process)
@@ -0,0 +1,218 @@
+"""
+Content-addressed store for the files a minion caches from the master.
+
+Every file is stored once under its hash, and the cached copies of the file
+in the minion's file cache are hard links to it. Identical files served from
+several environments or gitfs branches are therefore only downloaded and
+stored once.
+
+A persistent index keeps the hash of the stored and cached files, together
+with their size, modification time and inode. Files which did not change
+since they were indexed are validated by a ``stat`` call instead of being
+hashed again.
+
+.. versionadded:: 3008.0
+"""
+
+import logging
+import os
+import shutil
+import time
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+import salt.utils.hashutils
+
+log = logging.getLogger(__name__)
+
+# The minimum number of seconds between two writes of the index
+SAVE_INTERVAL = 1
+
+
+def _stat(path):
+    """
+    Return the size, modification time and inode of a file
+    """
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class FileStore:
+    """
+    Store of files keyed by their hash, below ``root``
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.p")
+        # {<path>: [<hash_type>, <hsum>, <size>, <mtime_ns>, <inode>]}
+        self._index = None
+        self._dirty = False
+        self._saved = 0
+
+    @property
+    def index(self):
+        if self._index is None:
+            try:
+                with salt.utils.files.fopen(self.index_path, "rb") as fh_:
+                    self._index = salt.payload.load(fh_)
+            except FileNotFoundError:
+                self._index = {}
+            except Exception as exc:  # pylint: disable=broad-except
+                log.debug(
+                    "Unable to read file store index %s: %s", self.index_path, exc
+                )
+                self._index = {}
+            if not isinstance(self._index, dict):
+                self._index = {}
+        return self._index
+
+    def save(self, force=True):
+        """
+        Write the index to disk if it changed. Unless ``force`` is set, the
+        index is written at most every :data:`SAVE_INTERVAL` seconds.
+        """
+        if not self._dirty:
+            return
+        if not force and time.monotonic() - self._saved < SAVE_INTERVAL:
+            return
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with salt.utils.atomicfile.atomic_open(self.index_path, "wb") as fh_:
+                salt.payload.dump(self.index, fh_)
+        except OSError as exc:
+            log.debug("Unable to write file store index %s: %s", self.index_path, exc)
+            return
+        self._dirty = False
+        self._saved = time.monotonic()
+
+    def object_path(self, hash_type, hsum):
+        """
+        Return the path of the stored file with the given hash
+        """
+        return os.path.join(self.root, hash_type, hsum[:2], hsum)
+
+    def lookup(self, path, hash_type):
+        """
+        Return the indexed hash of a file if it did not change since it was
+        indexed, or None
+        """
+        entry = self.index.get(path)
+        if not entry or entry[0] != hash_type:
+            return None
+        try:
+            if _stat(path) == entry[2:]:
+                return entry[1]
+        except OSError:
+            self._forget(path)
+        return None
+
+    def hash(self, path, hash_type):
+        """
+        Return the hash of a file, only hashing it again if it changed since
+        it was indexed
+        """
+        hsum = self.lookup(path, hash_type)
+        if hsum is None:
+            try:
+                hsum = salt.utils.hashutils.get_hash(path, form=hash_type)
+            except OSError:
+                return None
+            self._record(path, hash_type, hsum)
+        return hsum
+
+    def fetch(self, hash_type, hsum, dest):
+        """
+        Link the stored file with the given hash to ``dest``. Returns False if
+        the file is not in the store.
+        """
+        obj = self.object_path(hash_type, hsum)
+        if self.lookup(obj, hash_type) != hsum:
+            if os.path.exists(obj):
+                # Modified through one of its links, it can't be trusted
+                _remove(obj)
+                self._forget(obj)
+            return False
+        if not self._link(obj, dest, copy=True):
+            return False
+        self._record(dest, hash_type, hsum)
+        log.debug("Cached %s from the file store", dest)
+        return True
+
+    def add(self, path, hash_type, hsum):
+        """
+        Add a downloaded file to the store, if its contents match the hash the
+        master reported for it
+        """
+        if self.hash(path, hash_type) != hsum:
+            log.debug("Not storing %s, it does not match hash %s", path, hsum)
+            return
+        obj = self.object_path(hash_type, hsum)
+        if self.lookup(obj, hash_type) == hsum:
+            # Already stored, share the stored copy
+            if self._link(obj, path):
+                self._record(path, hash_type, hsum)
+            return
+        os.makedirs(os.path.dirname(obj), exist_ok=True)
+        if self._link(path, obj):
+            self._record(obj, hash_type, hsum)
+
+    def _link(self, src, dest, copy=False):
+        """
+        Atomically replace ``dest`` with a hard link to ``src``, or a copy of
+        it if ``copy`` is set and hard links are not supported
+        """
+        tmp = f"{dest}.{os.getpid()}.store"
+        try:
+            _remove(tmp)
+            try:
+                os.link(src, tmp)
+            except OSError:
+                if not copy:
+                    return False
+                shutil.copyfile(src, tmp)
+            os.replace(tmp, dest)
+        except OSError as exc:
+            log.debug("Unable to link %s to %s: %s", src, dest, exc)
+            _remove(tmp)
+            return False
+        return True
+
+    def _record(self, path, hash_type, hsum):
+        previous = self.index.get(path)
+        try:
+            self.index[path] = [hash_type, hsum] + _stat(path)
+        except OSError:
+            self.index.pop(path, None)
+        self._dirty = True
+        if previous and previous[1] != hsum:
+            self._release(previous[0], previous[1])
+
+    def _forget(self, path):
+        entry = self.index.pop(path, None)
+        if entry is None:
+            return
+        self._dirty = True
+        if path != self.object_path(entry[0], entry[1]):
+            self._release(entry[0], entry[1])
+
+    def _release(self, hash_type, hsum):
+        """
+        Remove a stored file which is no longer linked from the file cache
+        """
+        obj = self.object_path(hash_type, hsum)
+        try:
+            if os.stat(obj).st_nlink > 1:
+                return
+        except OSError:
+            pass
+        _remove(obj)
+        self._forget(obj)
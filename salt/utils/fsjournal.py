@@ -0,0 +1,245 @@
+"""
+Journal of the changes made below a directory.
+
+Fileserver backends use it to update their caches from the files and
+directories that changed since their last update, instead of walking the whole
+tree every time. When pyinotify is available, the directories to look at are
+taken from inotify events. Otherwise the modification times of the known
+directories and files are polled, which still avoids listing every directory
+and rebuilding everything derived from the tree.
+
+.. versionadded:: 3008.0
+"""
+
+import logging
+import os
+
+try:
+    import pyinotify
+
+    HAS_PYINOTIFY = True
+    WATCH_MASK = (
+        pyinotify.IN_CREATE
+        | pyinotify.IN_DELETE
+        | pyinotify.IN_MOVED_FROM
+        | pyinotify.IN_MOVED_TO
+        | pyinotify.IN_CLOSE_WRITE
+        | pyinotify.IN_ATTRIB
+        | pyinotify.IN_DELETE_SELF
+        | pyinotify.IN_MOVE_SELF
+    )
+except ImportError:
+    HAS_PYINOTIFY = False
+
+log = logging.getLogger(__name__)
+
+
+def _stat(path):
+    """
+    Return the modification time and the size of a file, following symlinks,
+    or None if they can't be determined (e.g. a dangling symlink)
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime, st.st_size
+
+
+class TreeJournal:
+    """
+    Keep track of the files and directories below ``root`` and report what
+    changed on every call to :meth:`update`.
+
+    Items are classified the way ``os.walk`` does: symlinks to directories are
+    directories, and they are only descended into when ``followlinks`` is set.
+    """
+
+    def __init__(self, root, followlinks=False, use_inotify=True):
+        self.root = root
+        self.followlinks = followlinks
+        # {<path>: <is a directory>}
+        self.entries = {}
+        # {<directory>: [<mtime_ns>, {<name>, ...}]}
+        self.dirs = {}
+        # {<file>: (<mtime>, <size>)}
+        self.files = {}
+        self.scanned = False
+        self._dirty = set()
+        self._touched = set()
+        self._overflow = False
+        self._wm = self._notifier = None
+        if use_inotify and HAS_PYINOTIFY:
+            self._wm = pyinotify.WatchManager()
+            self._notifier = pyinotify.Notifier(self._wm, self._handle_event)
+
+    @property
+    def inotify(self):
+        """
+        Whether changes are read from inotify rather than polled
+        """
+        return self._notifier is not None
+
+    def close(self):
+        """
+        Release the inotify watches
+        """
+        if self._notifier is not None:
+            self._notifier.stop()
+            self._wm = self._notifier = None
+
+    def _handle_event(self, event):
+        if event.mask & pyinotify.IN_Q_OVERFLOW:
+            self._overflow = True
+        elif event.mask & (pyinotify.IN_CLOSE_WRITE | pyinotify.IN_ATTRIB):
+            if event.dir:
+                self._dirty.add(event.path)
+            else:
+                self._touched.add(event.pathname)
+        else:
+            self._dirty.add(event.path)
+            if event.mask & (pyinotify.IN_DELETE_SELF | pyinotify.IN_MOVE_SELF):
+                self._dirty.add(os.path.dirname(event.path))
+            elif event.mask & (pyinotify.IN_CREATE | pyinotify.IN_MOVED_TO):
+                # The file may replace a known one, e.g. an editor or a git
+                # checkout renaming a temporary file over it
+                self._touched.add(event.pathname)
+
+    def _watch(self, path):
+        if self._wm is None:
+            return
+        wdd = self._wm.add_watch(path, WATCH_MASK, quiet=True)
+        if wdd.get(path, -1) < 0:
+            # Most likely fs.inotify.max_user_watches was reached
+            log.warning(
+                "Unable to watch %s with inotify, polling %s for changes instead",
+                path,
+                self.root,
+            )
+            self.close()
+
+    def _unwatch(self, path):
+        if self._wm is None:
+            return
+        wd = self._wm.get_wd(path)
+        if wd is not None:
+            self._wm.rm_watch(wd, quiet=True)
+
+    def _add(self, path, changes):
+        is_dir = os.path.isdir(path)
+        self.entries[path] = is_dir
+        changes["added"].add(path)
+        if not is_dir:
+            self.files[path] = _stat(path)
+        elif self.followlinks or not os.path.islink(path):
+            self._scan_dir(path, changes)
+
+    def _remove(self, path, changes):
+        if self.entries.pop(path, None) is None:
+            return
+        changes["removed"].add(path)
+        self.files.pop(path, None)
+        if path in self.dirs:
+            self._unwatch(path)
+        _, names = self.dirs.pop(path, (None, ()))
+        for name in names:
+            self._remove(os.path.join(path, name), changes)
+
+    def _scan_dir(self, path, changes):
+        """
+        Compare the contents of a directory with the known ones
+        """
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            names = set(os.listdir(path))
+        except OSError:
+            if path == self.root:
+                for name in self.dirs.pop(path, (None, ()))[1]:
+                    self._remove(os.path.join(path, name), changes)
+            else:
+                self._remove(path, changes)
+            return
+        known = self.dirs.get(path)
+        if known is None:
+            self._watch(path)
+            old_names = set()
+        else:
+            old_names = known[1]
+        self.dirs[path] = [mtime_ns, names]
+        for name in old_names - names:
+            self._remove(os.path.join(path, name), changes)
+        for name in names - old_names:
+            self._add(os.path.join(path, name), changes)
+        for name in names & old_names:
+            self._check(os.path.join(path, name), changes)
+        if known is not None and names != old_names:
+            changes["modified"].add(path)
+
+    def _check(self, path, changes):
+        """
+        Compare an item still in its directory with the known one, it may have
+        been replaced by another one
+        """
+        if os.path.isdir(path) != self.entries.get(path):
+            self._remove(path, changes)
+            self._add(path, changes)
+        elif path in self.files and path not in changes["added"]:
+            stat = _stat(path)
+            if stat != self.files[path]:
+                self.files[path] = stat
+                changes["modified"].add(path)
+
+    def _poll(self):
+        """
+        Find the directories and files whose modification time changed
+        """
+        for path, (mtime_ns, _) in self.dirs.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    self._dirty.add(path)
+            except OSError:
+                self._dirty.add(path if path == self.root else os.path.dirname(path))
+        for path, stat in self.files.items():
+            if _stat(path) != stat:
+                self._touched.add(path)
+
+    def update(self):
+        """
+        Bring the journal up to date and return the paths that were added,
+        removed or modified since the last update. On the first update, every
+        path below the root is reported as added.
+
+        Directories are reported as modified when items were added to or
+        removed from them.
+        """
+        changes = {"added": set(), "removed": set(), "modified": set()}
+        if not self.scanned:
+            self._scan_dir(self.root, changes)
+            self.scanned = True
+            return changes
+        if self._notifier is not None:
+            while self._notifier.check_events(0):
+                self._notifier.read_events()
+                self._notifier.process_events()
+            if self._overflow:
+                log.debug("inotify queue overflowed, polling %s", self.root)
+                self._overflow = False
+                self._poll()
+        else:
+            self._poll()
+        if self.root not in self.dirs:
+            # The root did not exist on the last update
+            self._dirty.add(self.root)
+        dirty, self._dirty = self._dirty, set()
+        touched, self._touched = self._touched, set()
+        # Parents first, so that removed subtrees are not scanned
+        for path in sorted(dirty, key=len):
+            if path in self.dirs or path == self.root:
+                self._scan_dir(path, changes)
+        for path in touched:
+            if path in self.files and path not in changes["added"]:
+                stat = _stat(path)
+                if stat != self.files[path]:
+                    self.files[path] = stat
+                    changes["modified"].add(path)
+        return changes
@@ -3002,6 +3002,11 @@ class GitBase:
                 listen=False,
             ) as event:
                 event.fire_event(data, tagify(["gitfs", "update"], prefix="fileserver"))
+        if self.opts.get("fileserver_journal", False):
+            if not data["changed"]:
+                # The file lists and hashes only change with the fetched refs
+                return
+            self.clear_file_list_cache()
         try:
             salt.fileserver.reap_fileserver_cache_dir(
                 self.hash_cachedir, self.find_file
@@ -3010,6 +3015,28 @@ class GitBase:
             # Hash file won't exist if no files have yet been served up
             pass
 
+    def clear_file_list_cache(self):
+        """
+        Remove the cached file lists, so that they are rebuilt from the
+        fetched refs when next requested
+        """
+        try:
+            names = os.listdir(self.file_list_cachedir)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".p"):
+                self._remove_file_list_cache(
+                    salt.utils.path.join(self.file_list_cachedir, name)
+                )
+
+    @staticmethod
+    def _remove_file_list_cache(list_cache):
+        try:
+            os.unlink(list_cache)
+        except OSError:
+            pass
+
     def update_intervals(self):
         """
         Returns a dictionary mapping remote IDs to their intervals, designed to
@@ -3485,6 +3512,16 @@ class GitFS(GitBase):
             fp_.write(ret["hsum"])
         return ret
 
+    def _env_cache_mtime(self):
+        """
+        Return the modification time of the env cache, which is rewritten
+        whenever fetching changed a ref
+        """
+        try:
+            return os.stat(self.env_cache).st_mtime_ns
+        except OSError:
+            return None
+
     def _file_lists(self, load, form):
         """
         Return a dict containing the file lists for files and dirs
@@ -3508,8 +3545,19 @@ class GitFS(GitBase):
             self.file_list_cachedir,
             f".{lc_path_adj}.w",
         )
+        cache_time = env_cache_mtime = None
+        if self.opts.get("fileserver_journal", False):
+            # The update function removes the cached file lists when fetching
+            # changed a ref, until then they can be reused.
+            cache_time = float("inf")
+            env_cache_mtime = self._env_cache_mtime()
+            try:
+                if os.stat(list_cache).st_mtime_ns < (env_cache_mtime or 0):
+                    self._remove_file_list_cache(list_cache)
+            except OSError:
+                pass
         cache_match, refresh_cache, save_cache = salt.fileserver.check_file_list_cache(
-            self.opts, form, list_cache, w_lock
+            self.opts, form, list_cache, w_lock, cache_time=cache_time
         )
         if cache_match is not None:
             return cache_match
@@ -3539,6 +3587,12 @@ class GitFS(GitBase):
                 salt.fileserver.write_file_list_cache(
                     self.opts, ret, list_cache, w_lock
                 )
+                if (
+                    cache_time is not None
+                    and env_cache_mtime != self._env_cache_mtime()
+                ):
+                    # The refs were updated while the lists were being built
+                    self._remove_file_list_cache(list_cache)
             # NOTE: symlinks are organized in a dict instead of a list, however
             # the 'symlinks' key will be defined above so it will never get to
             # the default value in the call to ret.get() below.
@@ -22,6 +22,7 @@ from jinja2.environment import TemplateModule
 from jinja2.exceptions import TemplateRuntimeError
 from jinja2.ext import Extension
 
+import salt.template
 import salt.utils.data
 import salt.utils.files
 import salt.utils.json
@@ -182,6 +183,7 @@ class SaltCacheLoader(BaseLoader):
                     with salt.utils.files.fopen(filepath, "rb") as ifile:
                         contents = ifile.read().decode(self.encoding)
                         mtime = os.path.getmtime(filepath)
+                        salt.template.record_template_dependency(filepath)
 
                         def uptodate():
                             try:
@@ -238,12 +238,17 @@ class MasterPillarUtil:
                 "and enfore_mine_cache are both disabled."
             )
             return mine_data
-        if not minion_ids:
-            minion_ids = self.cache.list("minions")
-        for minion_id in minion_ids:
+        entries = [
+            minion_id
+            for minion_id in minion_ids
+            if salt.utils.verify.valid_id(self.opts, minion_id)
+        ]
+        cached_mine = self.cache.list_with_values(
+            "minions", "mine", entries=entries if minion_ids else None
+        )
+        for minion_id, mdata in cached_mine.items():
             if not salt.utils.verify.valid_id(self.opts, minion_id):
                 continue
-            mdata = self.cache.fetch(f"minions/{minion_id}", "mine")
             if isinstance(mdata, dict):
                 mine_data[minion_id] = mdata
         return mine_data
@@ -256,12 +261,17 @@ class MasterPillarUtil:
         if not self.opts.get("minion_data_cache", False):
             log.debug("Skipping cached data because minion_data_cache is not enabled.")
             return grains, pillars
-        if not minion_ids:
-            minion_ids = self.cache.list("minions")
-        for minion_id in minion_ids:
+        entries = [
+            minion_id
+            for minion_id in minion_ids
+            if salt.utils.verify.valid_id(self.opts, minion_id)
+        ]
+        cached_data = self.cache.list_with_values(
+            "minions", "data", entries=entries if minion_ids else None
+        )
+        for minion_id, mdata in cached_data.items():
             if not salt.utils.verify.valid_id(self.opts, minion_id):
                 continue
-            mdata = self.cache.fetch(f"minions/{minion_id}", "data")
             if not isinstance(mdata, dict):
                 log.warning(
                     "cache.fetch should always return a dict. ReturnedType: %s,"
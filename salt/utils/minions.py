@@ -3,9 +3,12 @@ This module contains routines used to verify the matcher against the minions
 expected to return
 """
 
+import bisect
 import fnmatch
 import logging
 import re
+import threading
+import time
 
 import salt.cache
 import salt.key
@@ -20,6 +23,7 @@ import salt.utils.versions
 from salt._compat import ipaddress
 from salt.defaults import DEFAULT_TARGET_DELIM
 from salt.exceptions import CommandExecutionError, SaltCacheError
+from salt.utils.odict import OrderedDict
 
 HAS_RANGE = False
 try:
@@ -196,6 +200,483 @@ def nodegroup_comp(nodegroup, nodegroups, skip=None, first_call=True):
         return ret
 
 
+# The relative cost of evaluating a target of a compound expression, by
+# engine. Globs have no engine. The targets matched against the minion data
+# cache are the most expensive ones.
+COMPOUND_COSTS = {
+    "L": 0,
+    None: 1,
+    "E": 1,
+    "R": 1,
+    "G": 2,
+    "I": 2,
+    "P": 3,
+    "J": 3,
+    "S": 3,
+}
+# The engines whose targets can be evaluated over a set of candidates only
+_COMPOUND_CACHE_ENGINES = ("G", "P", "I", "J", "S")
+# The maximum number of compiled compound expressions kept
+_COMPOUND_PLANS_MAX = 256
+# {<expression>: (<nodegroups>, <plan>)}
+_COMPOUND_PLANS = OrderedDict()
+_COMPOUND_PLANS_LOCK = threading.Lock()
+
+
+class _CompoundError(Exception):
+    """
+    Raised on an invalid compound expression
+    """
+
+
+def compound_cost(node):
+    """
+    Return the cost of evaluating a node of a compound plan, the cost of its
+    most expensive target
+    """
+    if node[0] == "target":
+        return COMPOUND_COSTS[node[1]]
+    if node[0] == "not":
+        return compound_cost(node[1])
+    return max(compound_cost(child) for child in node[1])
+
+
+class _CompoundParser:
+    """
+    Recursive descent parser of compound expressions, ``and`` binding tighter
+    than ``or``
+    """
+
+    def __init__(self, words, nodegroups):
+        self.words = list(words)
+        self.nodegroups = nodegroups
+
+    def peek(self):
+        """
+        Return the next word, with the nodegroups expanded in place
+        """
+        while self.words:
+            word = self.words[0]
+            if not isinstance(word, str):
+                word = self.words[0] = str(word)
+            if word.startswith("N@") and len(word) > 2:
+                self.words[0:1] = list(nodegroup_comp(word[2:], self.nodegroups))
+                continue
+            return word
+        return None
+
+    def parse(self):
+        node = self.parse_or()
+        word = self.peek()
+        if word == ")":
+            raise _CompoundError("unexpected right parenthesis")
+        if word is not None:
+            raise _CompoundError(f'missing operator before "{word}"')
+        return node
+
+    def parse_or(self):
+        nodes = [self.parse_and()]
+        while self.peek() == "or":
+            self.words.pop(0)
+            nodes.append(self.parse_and())
+        if len(nodes) == 1:
+            return nodes[0]
+        return ("or", nodes)
+
+    def parse_and(self):
+        nodes = []
+        while True:
+            node = self.parse_not()
+            if node[0] == "and":
+                nodes.extend(node[1])
+            else:
+                nodes.append(node)
+            word = self.peek()
+            if word == "and":
+                self.words.pop(0)
+            elif word != "not":
+                break
+        if len(nodes) == 1:
+            return nodes[0]
+        # The cheapest targets first, so that the expensive ones only need to
+        # be evaluated for the minions left
+        return ("and", sorted(nodes, key=compound_cost))
+
+    def parse_not(self):
+        if self.peek() == "not":
+            self.words.pop(0)
+            # Whether a list is negated right away, its missing minions are
+            # ignored then
+            direct = self.peek() != "("
+            return ("not", self.parse_not(), direct)
+        word = self.peek()
+        if word is None:
+            raise _CompoundError("unexpected end of expression")
+        if word in ("and", "or"):
+            raise _CompoundError(f'unexpected operator "{word}"')
+        if word == ")":
+            raise _CompoundError("unexpected right parenthesis")
+        self.words.pop(0)
+        if word == "(":
+            node = self.parse_or()
+            word = self.peek()
+            if word == ")":
+                self.words.pop(0)
+            elif word is not None:
+                raise _CompoundError(f'missing operator before "{word}"')
+            # A missing right parenthesis at the end is tolerated
+            return node
+        target_info = parse_target(word)
+        if target_info and target_info["engine"]:
+            if target_info["engine"] not in COMPOUND_COSTS:
+                raise _CompoundError(
+                    'unrecognized target engine "{}" for target expression "{}"'.format(
+                        target_info["engine"], word
+                    )
+                )
+            return (
+                "target",
+                target_info["engine"],
+                target_info["pattern"],
+                target_info["delimiter"],
+            )
+        return ("target", None, word, None)
+
+
+def compile_compound(expr, nodegroups=None):
+    """
+    Compile a compound target expression into an evaluation plan, or return
+    None if the expression is invalid.
+
+    The plan is a tree of ``("or", [<node>, ...])``, ``("and", [<node>,
+    ...])``, ``("not", <node>, <not parenthesized>)`` and ``("target",
+    <engine>, <pattern>, <delimiter>)`` nodes, with the nodegroups expanded. The nodes of an
+    ``and`` are ordered by their :func:`compound_cost`.
+
+    Compiled plans are kept for the most recently compiled expressions, as
+    long as the nodegroups are the same.
+    """
+    key = expr if isinstance(expr, str) else tuple(expr)
+    with _COMPOUND_PLANS_LOCK:
+        cached = _COMPOUND_PLANS.get(key)
+        if cached is not None and cached[0] is nodegroups:
+            _COMPOUND_PLANS.move_to_end(key)
+            return cached[1]
+    words = expr.split() if isinstance(expr, str) else expr
+    try:
+        plan = _CompoundParser(words, nodegroups or {}).parse()
+    except _CompoundError as exc:
+        log.error("Invalid compound target %s: %s", expr, exc)
+        plan = None
+    with _COMPOUND_PLANS_LOCK:
+        _COMPOUND_PLANS[key] = (nodegroups, plan)
+        while len(_COMPOUND_PLANS) > _COMPOUND_PLANS_MAX:
+            _COMPOUND_PLANS.popitem(last=False)
+    return plan
+
+
+# Process-wide minion data indexes, keyed by cache driver and cachedir
+_MINION_DATA_INDEXES = {}
+_MINION_DATA_INDEXES_LOCK = threading.Lock()
+
+
+def get_minion_data_index(opts):
+    """
+    Return the process-wide :class:`MinionDataIndex` for the minion data cache
+    configured in ``opts``
+    """
+    key = (opts.get("cache", "localfs"), opts.get("cachedir"))
+    with _MINION_DATA_INDEXES_LOCK:
+        if key not in _MINION_DATA_INDEXES:
+            _MINION_DATA_INDEXES[key] = MinionDataIndex(opts)
+        return _MINION_DATA_INDEXES[key]
+
+
+class MinionDataIndex:
+    """
+    In-memory inverted index of the grains and pillar data held in the minion
+    data cache, used to resolve grain, pillar and ipcidr targets without
+    fetching and matching the cached data of every minion.
+
+    Scalar values (and scalar list members) are indexed by their key path as
+    ``{search_type: {path: {value: {minion_id, ...}}}}``, using the lowercased
+    string form that :py:func:`salt.utils.data.subdict_match` compares
+    against. Minions whose data holds a dict (or a list with nested data) at a
+    looked up path cannot be answered from the value index alone; for those
+    the cached data is fetched and matched with ``subdict_match`` as before.
+
+    IP addresses from the ``ipv4`` and ``ipv6`` grains are kept both by their
+    string form, for address targets, and as a sorted list of integer
+    addresses, so that a CIDR target is resolved with a range bisection over
+    the network's first and last address.
+
+    The index is refreshed against the cache by comparing the ``updated``
+    timestamp of each minion's ``data`` key, and updated incrementally by the
+    master when it stores minion data itself. The index is shared by all the
+    threads of a process, every access to it is done holding its lock and the
+    lookups return sets of their own.
+    """
+
+    SEARCH_TYPES = ("grains", "pillar")
+
+    def __init__(self, opts):
+        self.opts = opts
+        self.cache = salt.cache.factory(opts)
+        self.interval = opts.get("minion_data_cache_index_interval", 10)
+        self.last_refresh = 0
+        self._lock = threading.RLock()
+        # {<minion_id>: (<updated>, <loaded_at>)}
+        self._entries = {}
+        # {<minion_id>: [(<mapping>, <key>), ...]}
+        self._postings = {}
+        self._values = {search_type: {} for search_type in self.SEARCH_TYPES}
+        self._complex = {search_type: {} for search_type in self.SEARCH_TYPES}
+        self._opaque = {search_type: {} for search_type in self.SEARCH_TYPES}
+        self._addrs = {"ipv4": {}, "ipv6": {}}
+        self._ranges = {"ipv4": [], "ipv6": []}
+
+    def minions(self):
+        """
+        Return the set of minion ids present in the minion data cache
+        """
+        with self._lock:
+            return set(self._entries)
+
+    def refresh(self, force=False):
+        """
+        Bring the index in line with the minion data cache, re-indexing only
+        the minions whose cached data changed since they were last indexed.
+        Returns the set of minion ids present in the cache.
+        """
+        with self._lock:
+            now = time.time()
+            if not force and self.interval and now - self.last_refresh < self.interval:
+                return self.minions()
+            listed = set(self.cache.list("minions") or [])
+            loaded_at = int(now)
+            for id_ in listed:
+                bank = f"minions/{id_}"
+                try:
+                    if self.cache.contains(bank, "data"):
+                        updated = self.cache.updated(bank, "data")
+                    else:
+                        updated = None
+                except SaltCacheError:
+                    updated = None
+                entry = self._entries.get(id_)
+                # Cache timestamps have a one second resolution, data written
+                # during the second it was loaded in has to be loaded again
+                if (
+                    entry is not None
+                    and entry[0] == updated
+                    and (updated is None or updated < entry[1])
+                ):
+                    continue
+                data = None
+                if updated is not None:
+                    try:
+                        data = self.cache.fetch(bank, "data")
+                    except SaltCacheError:
+                        pass
+                self._index(id_, data, updated, loaded_at)
+            for id_ in set(self._entries) - listed:
+                self.remove(id_)
+            self.last_refresh = now
+            return listed
+
+    def update(self, minion_id, data):
+        """
+        Re-index a minion after its data was stored in the minion data cache
+        """
+        bank = f"minions/{minion_id}"
+        loaded_at = int(time.time())
+        try:
+            updated = self.cache.updated(bank, "data")
+        except SaltCacheError:
+            updated = None
+        with self._lock:
+            self._index(minion_id, data, updated, loaded_at)
+
+    def remove(self, minion_id):
+        """
+        Drop a minion from the index
+        """
+        with self._lock:
+            self._entries.pop(minion_id, None)
+            for mapping, key in self._postings.pop(minion_id, ()):
+                if isinstance(mapping, list):
+                    idx = bisect.bisect_left(mapping, key)
+                    if idx < len(mapping) and mapping[idx] == key:
+                        del mapping[idx]
+                    continue
+                ids = mapping.get(key)
+                if ids is not None:
+                    ids.discard(minion_id)
+                    if not ids:
+                        del mapping[key]
+
+    def _post(self, minion_id, mapping, key):
+        mapping.setdefault(key, set()).add(minion_id)
+        self._postings[minion_id].append((mapping, key))
+
+    def _index(self, minion_id, data, updated, loaded_at):
+        self.remove(minion_id)
+        self._entries[minion_id] = (updated, loaded_at)
+        self._postings[minion_id] = []
+        if not isinstance(data, dict):
+            return
+        for search_type in self.SEARCH_TYPES:
+            search_data = data.get(search_type)
+            if search_data is None:
+                continue
+            if not isinstance(search_data, dict):
+                self._post(minion_id, self._opaque[search_type], ())
+                continue
+            self._walk(minion_id, search_type, (), search_data)
+        grains = data.get("grains")
+        if isinstance(grains, dict):
+            for proto in ("ipv4", "ipv6"):
+                addrs = grains.get(proto)
+                if not isinstance(addrs, (list, tuple, set)):
+                    continue
+                for addr in addrs:
+                    self._post(minion_id, self._addrs[proto], str(addr))
+                    try:
+                        num = int(ipaddress.ip_address(addr))
+                    except ValueError:
+                        continue
+                    item = (num, minion_id)
+                    bisect.insort(self._ranges[proto], item)
+                    self._postings[minion_id].append((self._ranges[proto], item))
+
+    def _walk(self, minion_id, search_type, path, node):
+        if isinstance(node, dict):
+            if path:
+                self._post(minion_id, self._complex[search_type], path)
+            for key, value in node.items():
+                # Non-string keys can't be reached with a target expression
+                if isinstance(key, str):
+                    self._walk(minion_id, search_type, path + (key,), value)
+        elif isinstance(node, (list, tuple)):
+            if not node:
+                return
+            # Lists can be traversed further by index or into embedded dicts
+            self._post(minion_id, self._opaque[search_type], path)
+            values = self._values[search_type].setdefault(path, {})
+            for member in node:
+                if isinstance(member, (dict, list, tuple)):
+                    self._post(minion_id, self._complex[search_type], path)
+                else:
+                    self._post(minion_id, values, self._value_key(member))
+        elif path:
+            values = self._values[search_type].setdefault(path, {})
+            self._post(minion_id, values, self._value_key(node))
+
+    @staticmethod
+    def _value_key(value):
+        try:
+            return str(value).lower()
+        except UnicodeDecodeError:
+            return salt.utils.stringutils.to_unicode(value).lower()
+
+    def match(
+        self,
+        search_type,
+        expr,
+        delimiter=DEFAULT_TARGET_DELIM,
+        regex_match=False,
+        exact_match=False,
+    ):
+        """
+        Return the set of minion ids whose ``search_type`` data matches
+        ``expr``, following the semantics of
+        :py:func:`salt.utils.data.subdict_match`.
+        """
+        splits = expr.split(delimiter)
+        num_splits = len(splits)
+        if num_splits == 1:
+            return set()
+
+        matched = set()
+        fallback = set()
+        with self._lock:
+            values_index = self._values[search_type]
+            complex_index = self._complex[search_type]
+            opaque_index = self._opaque[search_type]
+            for idx in range(num_splits - 1, 0, -1):
+                path = tuple(splits[:idx])
+                if delimiter.join(path) == "*":
+                    fallback.update(self._entries)
+                    continue
+                for plen in range(idx):
+                    fallback.update(opaque_index.get(path[:plen], ()))
+                fallback.update(complex_index.get(path, ()))
+                values = values_index.get(path)
+                if not values:
+                    continue
+                pattern = self._value_key(delimiter.join(splits[idx:]))
+                if exact_match or not (regex_match or _has_magic(pattern)):
+                    matched.update(values.get(pattern, ()))
+                elif regex_match:
+                    try:
+                        regex = re.compile(pattern)
+                    except re.error:
+                        log.error("Invalid regex '%s' in match", pattern)
+                        continue
+                    for value, ids in values.items():
+                        if regex.match(value):
+                            matched.update(ids)
+                else:
+                    for value, ids in values.items():
+                        if fnmatch.fnmatch(value, pattern):
+                            matched.update(ids)
+
+        # The cached data is fetched and matched without holding the lock
+        for id_ in fallback - matched:
+            try:
+                mdata = self.cache.fetch(f"minions/{id_}", "data")
+            except SaltCacheError:
+                continue
+            if not mdata:
+                continue
+            if salt.utils.data.subdict_match(
+                mdata.get(search_type),
+                expr,
+                delimiter=delimiter,
+                regex_match=regex_match,
+                exact_match=exact_match,
+            ):
+                matched.add(id_)
+        return matched
+
+    def match_ipcidr(self, tgt):
+        """
+        Return the set of minion ids with an address matching ``tgt``, an
+        ``ipaddress`` address or network object
+        """
+        proto = f"ipv{tgt.version}"
+        with self._lock:
+            if isinstance(tgt, (ipaddress.IPv4Address, ipaddress.IPv6Address)):
+                return set(self._addrs[proto].get(str(tgt), ()))
+            ranges = self._ranges[proto]
+            first = int(tgt.network_address)
+            last = int(tgt.broadcast_address)
+            start = bisect.bisect_left(ranges, (first,))
+            matched = set()
+            for num, id_ in ranges[start:]:
+                if num > last:
+                    break
+                matched.add(id_)
+            return matched
+
+
+def _has_magic(pattern):
+    """
+    Return whether a glob pattern contains any fnmatch special characters
+    """
+    return any(char in pattern for char in "*?[")
+
+
 class CkMinions:
     """
     Used to check what minions should respond from a target
@@ -210,12 +691,34 @@ class CkMinions:
         self.opts = opts
         self.cache = salt.cache.factory(opts)
         self.key = salt.key.get_key(opts)
+        # The minions of the minion data index refreshed for the target being
+        # checked
+        self._index_minions = None
         # TODO: this is actually an *auth* check
         if self.opts.get("transport", "zeromq") in salt.transport.TRANSPORTS:
             self.acc = "minions"
         else:
             self.acc = "accepted"
 
+    def _minion_data_index(self):
+        """
+        Return the minion data index if it is enabled, otherwise None
+        """
+        if self.opts.get("minion_data_cache", False) and self.opts.get(
+            "minion_data_cache_index", False
+        ):
+            return get_minion_data_index(self.opts)
+        return None
+
+    def _refresh_minion_data_index(self, index):
+        """
+        Refresh the minion data index once per target, however many of its
+        terms look up the minion data
+        """
+        if self._index_minions is None:
+            self._index_minions = index.refresh()
+        return self._index_minions
+
     def _check_nodegroup_minions(self, expr, greedy):  # pylint: disable=unused-argument
         """
         Return minions found by looking at nodegroups
@@ -318,8 +821,11 @@ class CkMinions:
         data and matched by the condition.
         """
         cache_enabled = self.opts.get("minion_data_cache", False)
+        index = self._minion_data_index()
 
         def list_cached_minions():
+            if index is not None:
+                return self._refresh_minion_data_index(index)
             return self.cache.list("minions")
 
         if greedy:
@@ -330,7 +836,27 @@ class CkMinions:
         else:
             return {"minions": [], "missing": []}
 
-        if cache_enabled:
+        if index is not None:
+            if greedy:
+                cminions = list_cached_minions()
+            else:
+                cminions = minions
+            if not cminions:
+                return {"minions": minions, "missing": []}
+            matched = index.match(
+                search_type,
+                expr,
+                delimiter=delimiter,
+                regex_match=regex_match,
+                exact_match=exact_match,
+            )
+            if greedy:
+                minions = [
+                    id_ for id_ in minions if id_ not in cminions or id_ in matched
+                ]
+            else:
+                minions = list(matched)
+        elif cache_enabled:
             if greedy:
                 cminions = list_cached_minions()
             else:
@@ -338,10 +864,11 @@ class CkMinions:
             if not cminions:
                 return {"minions": minions, "missing": []}
             minions = set(minions)
+            if greedy:
+                cminions = [id_ for id_ in cminions if id_ in minions]
+            cdata = self.cache.list_with_values("minions", "data", entries=cminions)
             for id_ in cminions:
-                if greedy and id_ not in minions:
-                    continue
-                mdata = self.cache.fetch(f"minions/{id_}", "data")
+                mdata = cdata.get(id_)
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -403,18 +930,24 @@ class CkMinions:
         Return the minions found by looking via ipcidr
         """
         cache_enabled = self.opts.get("minion_data_cache", False)
+        index = self._minion_data_index()
+
+        def list_cached_minions():
+            if index is not None:
+                return self._refresh_minion_data_index(index)
+            return self.cache.list("minions")
 
         if greedy:
             if not minions:
                 minions = self._pki_minions()
         elif cache_enabled:
-            minions = self.cache.list("minions")
+            minions = list_cached_minions()
         else:
             return {"minions": [], "missing": []}
 
         if cache_enabled:
             if greedy:
-                cminions = self.cache.list("minions")
+                cminions = list_cached_minions()
             else:
                 cminions = minions
             if cminions is None:
@@ -431,11 +964,25 @@ class CkMinions:
                 except Exception:  # pylint: disable=broad-except
                     log.error("Invalid IP/CIDR target: %s", tgt)
                     return {"minions": [], "missing": []}
+
+            if index is not None:
+                matched = index.match_ipcidr(tgt)
+                if greedy:
+                    minions = [
+                        id_ for id_ in minions if id_ not in cminions or id_ in matched
+                    ]
+                else:
+                    minions = matched
+                return {"minions": list(minions), "missing": []}
+
             proto = f"ipv{tgt.version}"
 
             minions = set(minions)
+            if greedy:
+                cminions = [id_ for id_ in cminions if id_ in minions]
+            cdata = self.cache.list_with_values("minions", "data", entries=cminions)
             for id_ in cminions:
-                mdata = self.cache.fetch(f"minions/{id_}", "data")
+                mdata = cdata.get(id_)
                 if mdata is None:
                     if not greedy:
                         minions.remove(id_)
@@ -503,8 +1050,7 @@ class CkMinions:
             log.error("Compound target that is neither string, list nor tuple")
             return {"minions": [], "missing": []}
 
-        # we wrap this in a dict so we can assign to it from within the eval at
-        # the end of this method
+        # the pki minions are only listed if they are needed
         _deferred_minions_scope = {"minions": minions}
 
         def _deferred_minions():
@@ -515,154 +1061,98 @@ class CkMinions:
 
         log.debug("expr: %s, delimiter: %s, minions: %s", expr, delimiter, minions)
 
-        nodegroups = self.opts.get("nodegroups", {})
-
         if self.opts.get("minion_data_cache", False):
+            plan = compile_compound(expr, self.opts.get("nodegroups"))
+            if plan is None:
+                return {"minions": [], "missing": []}
+            log.debug("Evaluating compound plan: %s", plan)
+            context = {
+                "greedy": greedy,
+                "pillar_exact": pillar_exact,
+                "minions": minions,
+                "all_minions": _deferred_minions,
+                "missing": [],
+            }
+            matched = self._eval_compound(plan, None, context)
+            return {"minions": list(matched), "missing": context["missing"]}
+
+        return {"minions": list(minions), "missing": []}
+
+    def _eval_compound(self, node, candidates, context, negated=False):
+        """
+        Return the set of minions matched by a node of a compound plan. If
+        ``candidates`` is a set, only the minions in it are returned, and the
+        targets matched against the minion data cache only look at them.
+        """
+        kind = node[0]
+        if kind == "or":
+            matched = set()
+            for child in node[1]:
+                matched |= self._eval_compound(child, candidates, context)
+            return matched
+        if kind == "and":
+            for child in node[1]:
+                candidates = self._eval_compound(child, candidates, context)
+            return candidates
+        if kind == "not":
+            base = set(context["all_minions"]())
+            if candidates is not None:
+                base &= candidates
+            return base - self._eval_compound(node[1], base, context, negated=node[2])
+
+        _, engine, pattern, delimiter = node
+        greedy = context["greedy"]
+        if engine is None:
+            _results = self._check_glob_minions(
+                pattern, True, minions=context["minions"]
+            )
+        else:
             ref = {
                 "G": self._check_grain_minions,
                 "P": self._check_grain_pcre_minions,
                 "I": self._check_pillar_minions,
                 "J": self._check_pillar_pcre_minions,
                 "L": self._check_list_minions,
-                "N": None,  # nodegroups should already be expanded
                 "S": self._check_ipcidr_minions,
                 "E": self._check_pcre_minions,
                 "R": self._all_minions,
             }
-            if pillar_exact:
+            if context["pillar_exact"]:
                 ref["I"] = self._check_pillar_exact_minions
                 ref["J"] = self._check_pillar_exact_minions
-
-            results = []
-            unmatched = []
-            opers = ["and", "or", "not", "(", ")"]
-            missing = []
-
-            if isinstance(expr, str):
-                words = expr.split()
-            else:
-                # we make a shallow copy in order to not affect the passed in arg
-                words = expr[:]
-
-            while words:
-                word = words.pop(0)
-                target_info = parse_target(word)
-
-                # Easy check first
-                if word in opers:
-                    if results:
-                        if results[-1] == "(" and word in ("and", "or"):
-                            log.error('Invalid beginning operator after "(": %s', word)
-                            return {"minions": [], "missing": []}
-                        if word == "not":
-                            if not results[-1] in ("&", "|", "("):
-                                results.append("&")
-                            results.append("(")
-                            results.append("set(all_minions())")
-                            results.append("-")
-                            unmatched.append("-")
-                        elif word == "and":
-                            results.append("&")
-                        elif word == "or":
-                            results.append("|")
-                        elif word == "(":
-                            results.append(word)
-                            unmatched.append(word)
-                        elif word == ")":
-                            if not unmatched or unmatched[-1] != "(":
-                                log.error(
-                                    "Invalid compound expr (unexpected "
-                                    "right parenthesis): %s",
-                                    expr,
-                                )
-                                return {"minions": [], "missing": []}
-                            results.append(word)
-                            unmatched.pop()
-                            if unmatched and unmatched[-1] == "-":
-                                results.append(")")
-                                unmatched.pop()
-                        else:  # Won't get here, unless oper is added
-                            log.error("Unhandled oper in compound expr: %s", expr)
-                            return {"minions": [], "missing": []}
-                    else:
-                        # seq start with oper, fail
-                        if word == "not":
-                            results.append("(")
-                            results.append("set(all_minions())")
-                            results.append("-")
-                            unmatched.append("-")
-                        elif word == "(":
-                            results.append(word)
-                            unmatched.append(word)
-                        else:
-                            log.error(
-                                "Expression may begin with binary operator: %s", word
-                            )
-                            return {"minions": [], "missing": []}
-
-                elif target_info and target_info["engine"]:
-                    if "N" == target_info["engine"]:
-                        # if we encounter a node group, just evaluate it in-place
-                        decomposed = nodegroup_comp(target_info["pattern"], nodegroups)
-                        if decomposed:
-                            words = decomposed + words
-                        continue
-
-                    engine = ref.get(target_info["engine"])
-                    if not engine:
-                        # If an unknown engine is called at any time, fail out
-                        log.error(
-                            'Unrecognized target engine "%s" for'
-                            ' target expression "%s"',
-                            target_info["engine"],
-                            word,
-                        )
-                        return {"minions": [], "missing": []}
-
-                    engine_args = [target_info["pattern"]]
-                    if target_info["engine"] in ("G", "P", "I", "J"):
-                        engine_args.append(target_info["delimiter"] or ":")
-                    engine_args.append(greedy)
-
-                    # ignore missing minions for lists if we exclude them with
-                    # a 'not'
-                    if "L" == target_info["engine"]:
-                        engine_args.append(results and results[-1] == "-")
-                    _results = engine(*engine_args, minions=minions)
-                    results.append(str(set(_results["minions"])))
-                    missing.extend(_results["missing"])
-                    if unmatched and unmatched[-1] == "-":
-                        results.append(")")
-                        unmatched.pop()
-
-                else:
-                    _results = self._check_glob_minions(word, True, minions=minions)
-                    results.append(str(set(_results["minions"])))
-                    if unmatched and unmatched[-1] == "-":
-                        results.append(")")
-                        unmatched.pop()
-
-            # Add a closing ')' for each item left in unmatched
-            results.extend([")" for item in unmatched])
-
-            results = " ".join(results)
-            log.debug("Evaluating final compound matching expr: %s", results)
-            try:
-                minions = list(
-                    eval(  # pylint: disable=eval-used
-                        results,
-                        {
-                            "all_minions": _deferred_minions,
-                            "_deferred_minions_scope": _deferred_minions_scope,
-                        },
-                    )
-                )  # pylint: disable=W0123
-                return {"minions": minions, "missing": missing}
-            except Exception:  # pylint: disable=broad-except
-                log.error("Invalid compound target: %s", expr)
-                return {"minions": [], "missing": []}
-
-        return {"minions": list(minions), "missing": []}
+            engine_args = [pattern]
+            if engine in ("G", "P", "I", "J"):
+                engine_args.append(delimiter or ":")
+            if engine in _COMPOUND_CACHE_ENGINES and candidates is not None:
+                if not candidates:
+                    return set()
+                # Only look at the candidates in the minion data cache. The
+                # greedy match keeps the candidates missing from the cache,
+                # which are dropped afterwards for a non greedy match.
+                _results = ref[engine](*engine_args, True, minions=list(candidates))
+                matched = set(_results["minions"]) & candidates
+                if not greedy:
+                    matched &= set(self._cached_minions() or ())
+                return matched
+            engine_args.append(greedy)
+            # ignore missing minions for lists if we exclude them with a 'not'
+            if engine == "L":
+                engine_args.append(negated)
+            _results = ref[engine](*engine_args, minions=context["minions"])
+            context["missing"].extend(_results["missing"])
+        matched = set(_results["minions"])
+        if candidates is not None:
+            matched &= candidates
+        return matched
+
+    def _cached_minions(self):
+        """
+        Return the minions in the minion data cache
+        """
+        index = self._minion_data_index()
+        if index is not None:
+            return self._refresh_minion_data_index(index)
+        return self.cache.list("minions")
 
     def connected_ids(self, subset=None, show_ip=False):
         """
@@ -766,6 +1256,8 @@ class CkMinions:
                 "Failed matching available minions with %s pattern: %s", tgt_type, expr
             )
             _res = {"minions": [], "missing": []}
+        finally:
+            self._index_minions = None
         return _res
 
     def validate_tgt(self, valid, expr, tgt_type, minions=None, expr_form=None):
@@ -0,0 +1,172 @@
+"""
+Read-only hash table stored in a file, shared by processes through ``mmap``.
+
+One process writes the table with :func:`write_index`, replacing the previous
+file atomically. Readers map the file with :class:`MmapIndex` and look keys up
+without loading the whole table, so the table's pages are shared between all
+the readers through the page cache.
+
+The file starts with a header holding a magic string and the number of slots,
+followed by the slots and then the records. Every slot holds the 64 bit hash
+of a key and the offset of its record, 0 meaning the slot is empty. Every
+record is the serialized ``[key, value]`` pair prefixed with its length.
+Collisions are resolved by linear probing.
+
+.. versionadded:: 3008.0
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"SALTIDX1"
+HEADER = struct.Struct("<8sQ")
+SLOT = struct.Struct("<QQ")
+LENGTH = struct.Struct("<I")
+
+
+def _key_hash(key):
+    """
+    Return the 64 bit hash of a key, a tuple of strings. 0 is reserved for
+    empty slots.
+    """
+    data = "\0".join(key).encode("utf-8", "surrogateescape")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little") or 1
+
+
+def write_index(path, items):
+    """
+    Write the ``(key, value)`` pairs to a new table at ``path``. Keys are
+    tuples of strings and values anything :mod:`salt.payload` can serialize.
+    """
+    items = list(items)
+    nslots = 8
+    while nslots < 2 * len(items):
+        nslots *= 2
+    slots = [(0, 0)] * nslots
+    records = []
+    offset = HEADER.size + nslots * SLOT.size
+    for key, value in items:
+        key = tuple(key)
+        record = salt.payload.dumps([list(key), value])
+        khash = _key_hash(key)
+        slot = khash & (nslots - 1)
+        while slots[slot][1]:
+            slot = (slot + 1) & (nslots - 1)
+        slots[slot] = (khash, offset)
+        records.append(LENGTH.pack(len(record)))
+        records.append(record)
+        offset += LENGTH.size + len(record)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with salt.utils.atomicfile.atomic_open(path, "wb") as fh_:
+        fh_.write(HEADER.pack(MAGIC, nslots))
+        fh_.write(b"".join(SLOT.pack(*slot) for slot in slots))
+        fh_.write(b"".join(records))
+
+
+class MmapIndex:
+    """
+    Reader of a table written by :func:`write_index`
+
+    The file is checked for replacement at most every ``check_interval``
+    seconds, and mapped again when it was replaced.
+    """
+
+    def __init__(self, path, check_interval=1):
+        self.path = path
+        self.check_interval = check_interval
+        self._mmap = None
+        self._nslots = 0
+        self._identity = None
+        self._checked = None
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = None
+        self._identity = None
+
+    def refresh(self):
+        """
+        Map the table again if the file was replaced
+        """
+        now = time.monotonic()
+        if self._checked is not None and now - self._checked < self.check_interval:
+            return
+        self._checked = now
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self.close()
+            return
+        identity = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self._identity:
+            return
+        self.close()
+        try:
+            with salt.utils.files.fopen(self.path, "rb") as fh_:
+                mapped = mmap.mmap(fh_.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as exc:
+            log.debug("Unable to map index %s: %s", self.path, exc)
+            return
+        magic, nslots = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC:
+            log.debug("%s is not an index", self.path)
+            mapped.close()
+            return
+        self._mmap = mapped
+        self._nslots = nslots
+        self._identity = identity
+
+    def get(self, key, default=None):
+        """
+        Return the value of a key, or ``default`` if it's not in the table or
+        no table is mapped
+        """
+        self.refresh()
+        if self._mmap is None:
+            return default
+        key = list(key)
+        khash = _key_hash(key)
+        slot = khash & (self._nslots - 1)
+        for _ in range(self._nslots):
+            slot_hash, offset = SLOT.unpack_from(
+                self._mmap, HEADER.size + slot * SLOT.size
+            )
+            if not offset:
+                break
+            if slot_hash == khash:
+                (length,) = LENGTH.unpack_from(self._mmap, offset)
+                start = offset + LENGTH.size
+                record_key, value = salt.payload.loads(
+                    self._mmap[start : start + length]
+                )
+                if record_key == key:
+                    return value
+            slot = (slot + 1) & (self._nslots - 1)
+        return default
+
+    def items(self):
+        """
+        Yield the ``(key, value)`` pairs of the table, in no particular order
+        """
+        self.refresh()
+        if self._mmap is None:
+            return
+        for slot in range(self._nslots):
+            _, offset = SLOT.unpack_from(self._mmap, HEADER.size + slot * SLOT.size)
+            if not offset:
+                continue
+            (length,) = LENGTH.unpack_from(self._mmap, offset)
+            start = offset + LENGTH.size
+            key, value = salt.payload.loads(self._mmap[start : start + length])
+            yield tuple(key), value
@@ -463,6 +463,12 @@ class ThreadPool:
         except queue.Full:
             return False
 
+    def qsize(self):
+        """
+        Return the number of queued jobs no worker picked up yet
+        """
+        return self._job_queue.qsize()
+
     def _thread_target(self):
         while True:
             # 1s timeout so that if the parent dies this thread will die within 1s
@@ -6,6 +6,8 @@ import fnmatch
 import glob
 import logging
 import os
+import re
+import time
 
 import salt.client
 import salt.defaults.exitcodes
@@ -27,6 +29,71 @@ REACTOR_INTERNAL_KEYWORDS = frozenset(
     ["__id__", "__sls__", "name", "order", "fun", "key", "state"]
 )
 
+# The characters starting a wildcard in a reactor tag pattern
+_WILDCARDS = re.compile(r"[*?[]")
+
+
+class ReactorMap:
+    """
+    Reactor map compiled to look up the reactors of event tags.
+
+    Tag patterns without wildcards are looked up by tag. The others are
+    indexed by the literal prefix before their first wildcard, and only the
+    patterns whose prefix starts the tag are matched, against a regular
+    expression compiled once. The reactors are returned in the order of the
+    map, like matching every pattern with ``fnmatch`` does.
+
+    .. versionadded:: 3008.0
+    """
+
+    def __init__(self, react_map):
+        # {<tag>: [(<position>, <reactors>), ...]}
+        self.exact = {}
+        # {<prefix length>: {<prefix>: [(<position>, <match>, <reactors>), ...]}}
+        self.prefixes = {}
+        for position, ropt in enumerate(react_map or ()):
+            if not isinstance(ropt, dict) or len(ropt) != 1:
+                continue
+            pattern, reactors = next(iter(ropt.items()))
+            if not isinstance(pattern, str):
+                continue
+            if isinstance(reactors, str):
+                reactors = [reactors]
+            elif not isinstance(reactors, list):
+                continue
+            pattern = os.path.normcase(pattern)
+            wildcard = _WILDCARDS.search(pattern)
+            if wildcard is None:
+                self.exact.setdefault(pattern, []).append((position, reactors))
+                continue
+            prefix = pattern[: wildcard.start()]
+            match = re.compile(fnmatch.translate(pattern)).match
+            self.prefixes.setdefault(len(prefix), {}).setdefault(prefix, []).append(
+                (position, match, reactors)
+            )
+        self.lengths = sorted(self.prefixes)
+
+    def match(self, tag):
+        """
+        Return the reactors of the patterns matching ``tag``
+        """
+        tag = os.path.normcase(tag)
+        matched = list(self.exact.get(tag, ()))
+        for length in self.lengths:
+            if length > len(tag):
+                break
+            for position, match, reactors in self.prefixes[length].get(
+                tag[:length], ()
+            ):
+                if match(tag):
+                    matched.append((position, reactors))
+        if len(matched) > 1:
+            matched.sort(key=lambda item: item[0])
+        ret = []
+        for _, reactors in matched:
+            ret.extend(reactors)
+        return ret
+
 
 class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
     """
@@ -44,9 +111,23 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         super().__init__(**kwargs)
         local_minion_opts = opts.copy()
         local_minion_opts["file_client"] = "local"
+        # Only the per event data pass of the reaction templates is rendered
+        local_minion_opts["jinja_compile_cache_size"] = opts.get(
+            "reactor_template_cache_size", 0
+        )
         self.minion = salt.minion.MasterMinion(local_minion_opts)
         salt.state.Compiler.__init__(self, opts, self.minion.rend)
         self.is_leader = True
+        # (<identity of the reactor map>, <ReactorMap>)
+        self._react_map = None
+        self.stat_clock = time.time()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.events = 0
+        self.matched = 0
+        self.renders = 0
+        self.render_time = 0.0
 
     def render_reaction(self, glob_ref, tag, data):
         """
@@ -78,38 +159,48 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 log.exception('Failed to render "%s": ', fn_)
         return react
 
-    def list_reactors(self, tag):
+    def compiled_map(self):
         """
-        Take in the tag from an event and return a list of the reactors to
-        process
+        Return the reactor map compiled into a :class:`ReactorMap`. A reactor
+        map file is only read again when it changed.
         """
-        log.debug("Gathering reactors for tag %s", tag)
-        reactors = []
-        if isinstance(self.opts["reactor"], str):
+        reactor = self.opts["reactor"]
+        if isinstance(reactor, str):
             try:
-                with salt.utils.files.fopen(self.opts["reactor"]) as fp_:
+                stat = os.stat(reactor)
+                identity = (reactor, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                identity = (reactor, None)
+        else:
+            identity = id(reactor)
+        if self._react_map is not None and self._react_map[0] == identity:
+            return self._react_map[1]
+
+        react_map = []
+        if isinstance(reactor, str):
+            log.debug("Compiling reactor map %s", reactor)
+            try:
+                with salt.utils.files.fopen(reactor) as fp_:
                     react_map = salt.utils.yaml.safe_load(fp_)
             except OSError:
-                log.error('Failed to read reactor map: "%s"', self.opts["reactor"])
+                log.error('Failed to read reactor map: "%s"', reactor)
             except Exception:  # pylint: disable=broad-except
-                log.error(
-                    'Failed to parse YAML in reactor map: "%s"', self.opts["reactor"]
-                )
+                log.error('Failed to parse YAML in reactor map: "%s"', reactor)
+            if not isinstance(react_map, list):
+                react_map = []
         else:
-            react_map = self.opts["reactor"]
-        for ropt in react_map:
-            if not isinstance(ropt, dict):
-                continue
-            if len(ropt) != 1:
-                continue
-            key = next(iter(ropt.keys()))
-            val = ropt[key]
-            if fnmatch.fnmatch(tag, key):
-                if isinstance(val, str):
-                    reactors.append(val)
-                elif isinstance(val, list):
-                    reactors.extend(val)
-        return reactors
+            react_map = reactor
+        compiled = ReactorMap(react_map)
+        self._react_map = (identity, compiled)
+        return compiled
+
+    def list_reactors(self, tag):
+        """
+        Take in the tag from an event and return a list of the reactors to
+        process
+        """
+        log.debug("Gathering reactors for tag %s", tag)
+        return self.compiled_map().match(tag)
 
     def list_all(self):
         """
@@ -142,6 +233,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                 return {"status": False, "comment": "Reactor already exists."}
 
         self.minion.opts["reactor"].append({tag: reaction})
+        self._react_map = None
         return {"status": True, "comment": "Reactor added."}
 
     def delete_reactor(self, tag):
@@ -153,6 +245,7 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
             _tag = next(iter(reactor.keys()))
             if _tag == tag:
                 self.minion.opts["reactor"].remove(reactor)
+                self._react_map = None
                 return {"status": True, "comment": "Reactor deleted."}
 
         return {"status": False, "comment": "Reactor does not exists."}
@@ -175,8 +268,11 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         high = {}
         chunks = []
         try:
+            start = time.monotonic()
             for fn_ in reactors:
                 high.update(self.render_reaction(fn_, tag, data))
+            self.renders += 1
+            self.render_time += time.monotonic() - start
             if high:
                 errors = self.verify_high(high)
                 if errors:
@@ -204,6 +300,25 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
         self.resolve_aliases(chunks)
         return chunks
 
+    def _post_stats(self, event):
+        """
+        Fire an event with the reactor stats
+        """
+        now = time.time()
+        if now - self.stat_clock < self.opts["master_stats_event_iter"]:
+            return
+        stats = {
+            "time": now - self.stat_clock,
+            "events": self.events,
+            "matched": self.matched,
+            "renders": self.renders,
+            "mean": self.render_time / self.renders if self.renders else 0.0,
+            "queue": self.wrap.pool.qsize(),
+        }
+        self.reset_stats()
+        self.stat_clock = now
+        event.fire_event(stats, salt.utils.event.tagify("Reactor", "stats"))
+
     def call_reactions(self, chunks):
         """
         Execute the reaction state
@@ -278,15 +393,18 @@ class Reactor(salt.utils.process.SignalHandlingProcess, salt.state.Compiler):
                     if not self.is_leader:
                         continue
                     else:
+                        self.events += 1
                         reactors = self.list_reactors(data["tag"])
-                        if not reactors:
-                            continue
-                        chunks = self.reactions(data["tag"], data["data"], reactors)
-                        if chunks:
-                            try:
-                                self.call_reactions(chunks)
-                            except SystemExit:
-                                log.warning("Exit ignored by reactor")
+                        if reactors:
+                            self.matched += 1
+                            chunks = self.reactions(data["tag"], data["data"], reactors)
+                            if chunks:
+                                try:
+                                    self.call_reactions(chunks)
+                                except SystemExit:
+                                    log.warning("Exit ignored by reactor")
+                if self.opts.get("master_stats"):
+                    self._post_stats(event)
 
 
 class ReactWrap:
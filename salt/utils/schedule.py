@@ -14,6 +14,7 @@ Requires that python-dateutil is installed on the minion.
 import copy
 import datetime
 import errno
+import heapq
 import itertools
 import logging
 import os
@@ -185,10 +186,95 @@ class Schedule:
             self._subprocess_list = salt.utils.process.SubprocessList()
         else:
             self._subprocess_list = _subprocess_list
+        # Heap of the (<due time>, <job name>) of the jobs left out of the
+        # evaluation until they are due, see _set_idle
+        self._due = []
+        # {<job name>: (<due time>, <job data>)}
+        self._idle = {}
+        self._due_key = None
+        self._due_now = None
+        # Whether the last call to eval left jobs in the evaluation
+        self.evaluating = False
 
     def __getnewargs__(self):
         return self.opts, self.functions, self.returners, self.intervals, None
 
+    @property
+    def next_due(self):
+        """
+        Return the earliest time a job left out of the evaluation is due, or
+        None. Jobs which are not left out are evaluated on every call to eval.
+        """
+        while self._due:
+            due, name = self._due[0]
+            if self._idle.get(name, (None,))[0] == due:
+                return due
+            heapq.heappop(self._due)
+        return None
+
+    def _wake_job(self, name):
+        """
+        Evaluate a job again on the next call to eval, after it was modified
+        """
+        self._idle.pop(name, None)
+
+    def _set_idle(self, name, data, now):
+        """
+        Leave a job out of the evaluation until it is due, if nothing but the
+        passing of time can change its state before
+        """
+        next_fire_time = data.get("_next_fire_time")
+        if (
+            not self.enabled
+            or not data.get("enabled", True)
+            or data.get("_continue")
+            or data.get("_error")
+            or data.get("_run_on_start")
+            or data.get("splay")
+            or data.get("_splay")
+            or "run_explicit" in data
+            or not isinstance(next_fire_time, datetime.datetime)
+            or next_fire_time <= now
+        ):
+            return
+        if "_seconds" in data or "cron" in data:
+            # These run once their next fire time without microseconds passed
+            due = next_fire_time - datetime.timedelta(
+                microseconds=next_fire_time.microsecond
+            )
+        elif "when" in data and data.get("_run"):
+            due = next_fire_time
+        else:
+            return
+        self._idle[name] = (due, data)
+        heapq.heappush(self._due, (due, name))
+
+    def _pop_due(self, now):
+        """
+        Put the jobs which are due back into the evaluation. All the jobs are
+        evaluated again when the schedule, the pillar or the grains were
+        replaced, the global settings of the schedule changed or the time went
+        backwards.
+        """
+        key = (
+            id(self.opts.get("schedule")),
+            id(self.opts.get("pillar")),
+            id(self.opts.get("grains")),
+            self.enabled,
+            self.splay,
+            self.skip_function,
+            self.skip_during_range,
+        )
+        if key != self._due_key or self._due_now is None or now < self._due_now:
+            self._due_key = key
+            self._due = []
+            self._idle = {}
+        self._due_now = now
+        while self._due and self._due[0][0] <= now:
+            due, name = heapq.heappop(self._due)
+            if self._idle.get(name, (None,))[0] == due:
+                del self._idle[name]
+
     def option(self, opt):
         """
         Return options merged from config and pillar
@@ -338,6 +424,7 @@ class Schedule:
         # remove from self.intervals
         if name in self.intervals:
             del self.intervals[name]
+        self._wake_job(name)
 
         if persist:
             self.persist()
@@ -403,6 +490,7 @@ class Schedule:
                 data[job]["enabled"] = True
 
         new_job = next(iter(data.keys()))
+        self._wake_job(new_job)
 
         if new_job in self._get_schedule(include_opts=False):
             log.warning("Cannot update job %s, it's in the pillar!", new_job)
@@ -435,6 +523,7 @@ class Schedule:
         # ensure job exists, then enable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = True
+            self._wake_job(name)
             log.info("Enabling job %s in scheduler", name)
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -459,6 +548,7 @@ class Schedule:
         # ensure job exists, then disable it
         if name in self.opts["schedule"]:
             self.opts["schedule"][name]["enabled"] = False
+            self._wake_job(name)
             log.info("Disabling job %s in scheduler", name)
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -488,6 +578,7 @@ class Schedule:
             return
 
         self.opts["schedule"][name] = schedule
+        self._wake_job(name)
 
         if persist:
             self.persist()
@@ -570,6 +661,7 @@ class Schedule:
         """
         # Remove all jobs from self.intervals
         self.intervals = {}
+        self._idle = {}
 
         if "schedule" in schedule:
             schedule = schedule["schedule"]
@@ -633,6 +725,7 @@ class Schedule:
             self.opts["schedule"][name]["run_explicit"].append(
                 {"time": new_time, "time_fmt": time_fmt}
             )
+            self._wake_job(name)
 
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -662,6 +755,7 @@ class Schedule:
             self.opts["schedule"][name]["skip_explicit"].append(
                 {"time": time, "time_fmt": time_fmt}
             )
+            self._wake_job(name)
 
         elif name in self._get_schedule(include_opts=False):
             log.warning("Cannot modify job %s, it's in the pillar!", name)
@@ -1483,6 +1577,10 @@ class Schedule:
         if "splay" in schedule:
             self.splay = schedule["splay"]
 
+        if not now:
+            now = datetime.datetime.now()
+        self._pop_due(now)
+
         _hidden = ["enabled", "skip_function", "skip_during_range", "splay"]
         for job, data in schedule.items():
 
@@ -1490,6 +1588,11 @@ class Schedule:
             if job in _hidden:
                 continue
 
+            # Skip the jobs which are not due yet, see _set_idle
+            idle = self._idle.get(job)
+            if idle is not None and idle[1] is data:
+                continue
+
             # Clear these out between runs
             for item in [
                 "_continue",
@@ -1534,9 +1637,6 @@ class Schedule:
             if "_splay" not in data:
                 data["_splay"] = None
 
-            if not now:
-                now = datetime.datetime.now()
-
             # Used for quick lookups when detecting invalid option
             # combinations.
             schedule_keys = set(data.keys())
@@ -1809,6 +1909,10 @@ class Schedule:
                         data["_next_fire_time"] = now + datetime.timedelta(
                             seconds=data["_seconds"]
                         )
+            self._set_idle(job, data, now)
+        self.evaluating = any(
+            job not in _hidden and job not in self._idle for job in schedule
+        )
         return jids
 
     def _run_job(self, func, data, jid=None):
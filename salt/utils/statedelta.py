@@ -0,0 +1,247 @@
+"""
+Delta-compressed returns of state runs.
+
+With :conf_minion:`state_return_delta` enabled, the minion only returns the
+states whose result or changes differ from its previous run of the same state
+function with the same arguments. The return then holds a ``__state_delta__``
+entry naming the job it is based on, the states which were not part of the run
+anymore and a digest of the results of the full run.
+
+The master stores and fires the delta return as is. The full return is
+reconstructed by :func:`expand` when it is read, from the returns of the
+previous jobs in the job cache.
+
+A run only becomes the base of the next delta return once the master received
+its return, see :func:`confirm`. A full return is sent again after
+``state_return_delta_chain`` delta returns, or once the last full return is
+older than ``state_return_delta_max_age`` seconds, so the returns a delta
+return is based on are still in the job cache.
+
+.. versionadded:: 3008.0
+"""
+
+import hashlib
+import logging
+import os
+import time
+
+import salt.payload
+import salt.utils.atomicfile
+import salt.utils.files
+
+log = logging.getLogger(__name__)
+
+DELTA_KEY = "__state_delta__"
+
+STATE_FUNCTIONS = frozenset(
+    ("state.apply", "state.highstate", "state.sls", "state.top", "state.sls_id")
+)
+
+# The maximum number of delta returns followed to reconstruct a return
+MAX_CHAIN = 1000
+
+
+def _state_digest(entry):
+    return hashlib.sha256(
+        salt.payload.dumps([entry.get("result"), entry.get("changes")])
+    ).hexdigest()[:32]
+
+
+def _digest(state_digests):
+    return hashlib.sha256(
+        "\n".join(sorted(f"{key} {val}" for key, val in state_digests.items())).encode()
+    ).hexdigest()
+
+
+def _state_digests(ret):
+    """
+    Return the digests of the results and changes of a state return, or None
+    if ``ret`` is not a state return
+    """
+    if not isinstance(ret, dict) or not ret or DELTA_KEY in ret:
+        return None
+    digests = {}
+    for key, entry in ret.items():
+        if not isinstance(entry, dict) or "result" not in entry:
+            return None
+        digests[key] = _state_digest(entry)
+    return digests
+
+
+def _baseline_path(opts, load):
+    key = hashlib.sha256(
+        salt.payload.dumps([load.get("fun"), load.get("fun_args")])
+    ).hexdigest()
+    return os.path.join(opts["cachedir"], "state_delta", f"{key}.p")
+
+
+def _pending_path(path):
+    return f"{path[:-2]}.pending.p"
+
+
+def delta_load(opts, load):
+    """
+    Replace the return of a state run in a return load with the states which
+    changed since the previous run, if the previous run was returned
+    """
+    if load.get("fun") not in STATE_FUNCTIONS or load.get("jid") in (None, "req"):
+        return load
+    digests = _state_digests(load.get("return"))
+    if digests is None:
+        return load
+
+    path = _baseline_path(opts, load)
+    try:
+        with salt.utils.files.fopen(path, "rb") as fh_:
+            previous = salt.payload.load(fh_)
+    except FileNotFoundError:
+        previous = None
+    except Exception as exc:  # pylint: disable=broad-except
+        log.debug("Unable to read the previous state return %s: %s", path, exc)
+        previous = None
+
+    now = time.time()
+    baseline = {"jid": load["jid"], "digests": digests, "chain": 0, "start": now}
+    if (
+        previous
+        and previous["chain"] < opts["state_return_delta_chain"]
+        and now - previous.get("start", 0) < opts["state_return_delta_max_age"]
+    ):
+        ret = {
+            key: entry
+            for key, entry in load["return"].items()
+            if previous["digests"].get(key) != digests[key]
+        }
+        ret[DELTA_KEY] = {
+            "base": previous["jid"],
+            "removed": [key for key in previous["digests"] if key not in digests],
+            "digest": _digest(digests),
+        }
+        log.debug(
+            "Returning %d of %d states for job %s, based on job %s",
+            len(ret) - 1,
+            len(digests),
+            load["jid"],
+            previous["jid"],
+        )
+        load = dict(load, **{"return": ret})
+        baseline["chain"] = previous["chain"] + 1
+        baseline["start"] = previous["start"]
+
+    # The run becomes the base of the next delta return once the master
+    # received the return
+    pending = _pending_path(path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with salt.utils.atomicfile.atomic_open(pending, "wb") as fh_:
+            salt.payload.dump(baseline, fh_)
+    except OSError as exc:
+        log.debug("Unable to write the state return baseline %s: %s", pending, exc)
+    return load
+
+
+def confirm(opts, load):
+    """
+    Make the run of a return load the base of the next delta return, once
+    the master received the return
+    """
+    if load.get("fun") not in STATE_FUNCTIONS or load.get("jid") in (None, "req"):
+        return
+    path = _baseline_path(opts, load)
+    pending = _pending_path(path)
+    try:
+        with salt.utils.files.fopen(pending, "rb") as fh_:
+            baseline = salt.payload.load(fh_)
+        if baseline["jid"] == load["jid"]:
+            os.replace(pending, path)
+    except FileNotFoundError:
+        pass
+    except Exception as exc:  # pylint: disable=broad-except
+        log.debug("Unable to confirm the state return baseline %s: %s", path, exc)
+
+
+def is_delta(ret):
+    """
+    Whether a return is a delta return
+    """
+    return isinstance(ret, dict) and DELTA_KEY in ret
+
+
+def expand(minion_id, ret, get_return):
+    """
+    Reconstruct the full return of a state run from a delta return.
+
+    ``get_return`` is called with a job id and the minion id and must return
+    the minion's return for that job from the job cache, or None. Returns that
+    aren't delta returns are returned unchanged.
+
+    The states which did not change keep the comment, duration and start time
+    of the run they were last returned for.
+
+    When a return the delta is based on is not in the job cache anymore, the
+    states which are known are returned with the ``__state_delta__`` entry,
+    marked as ``incomplete`` and naming the ``missing`` job.
+    """
+    if not is_delta(ret) or ret[DELTA_KEY].get("incomplete"):
+        return ret
+    chain = [ret]
+    missing = None
+    while is_delta(chain[-1]):
+        base_jid = chain[-1][DELTA_KEY]["base"]
+        base = get_return(base_jid, minion_id) if len(chain) <= MAX_CHAIN else None
+        if not isinstance(base, dict):
+            log.warning(
+                "Unable to reconstruct the return of %s, the return for job %s "
+                "is not in the job cache",
+                minion_id,
+                base_jid,
+            )
+            missing = base_jid
+            base = {}
+            break
+        chain.append(base)
+    else:
+        base = chain.pop()
+
+    full = dict(base)
+    for delta in reversed(chain):
+        for key in delta[DELTA_KEY]["removed"]:
+            full.pop(key, None)
+        full.update(delta)
+        del full[DELTA_KEY]
+
+    if missing is not None:
+        full[DELTA_KEY] = dict(ret[DELTA_KEY], incomplete=True, missing=missing)
+        return full
+
+    if base:
+        digests = _state_digests(full)
+        if digests is None or _digest(digests) != ret[DELTA_KEY]["digest"]:
+            log.warning(
+                "The reconstructed state return of %s does not match the digest "
+                "it was returned with",
+                minion_id,
+            )
+    return full
+
+
+def job_cache_getter(get_jid, max_jobs=8):
+    """
+    Return a ``get_return`` function for :func:`expand` reading the returns
+    from the ``get_jid`` function of a job cache. The returns of the last
+    ``max_jobs`` jobs read are kept, as the returns of many minions are
+    usually based on the same job. A job is read again when the return of a
+    minion is not in the returns kept for it, as it may have been stored
+    since.
+    """
+    jobs = {}
+
+    def get_return(jid, minion_id):
+        if minion_id not in jobs.get(jid, {}):
+            jobs.pop(jid, None)
+            if len(jobs) >= max_jobs:
+                jobs.pop(next(iter(jobs)))
+            jobs[jid] = get_jid(jid) or {}
+        return jobs[jid].get(minion_id, {}).get("return")
+
+    return get_return
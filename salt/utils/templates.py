@@ -10,6 +10,7 @@ import os
 import pathlib
 import sys
 import tempfile
+import threading
 import traceback
 
 import jinja2
@@ -43,6 +44,11 @@ TEMPLATE_DIRNAME = os.path.join(saltpath[0], "templates")
 SLS_ENCODING = "utf-8"  # this one has no BOM.
 SLS_ENCODER = codecs.getencoder(SLS_ENCODING)
 
+# The code of the Jinja templates compiled by render_jinja_tmpl when the
+# jinja_compile_cache_size option is set, by source and environment settings
+_COMPILED_TEMPLATES = OrderedDict()
+_COMPILED_TEMPLATES_LOCK = threading.Lock()
+
 
 class AliasedLoader:
     """
@@ -326,6 +332,30 @@ def _get_jinja_error(trace, context=None):
     return line, out
 
 
+def _compiled_template(jinja_env, tmplstr, settings, cache_size):
+    """
+    Return the Jinja template for ``tmplstr``, reusing the code compiled for
+    the same source and environment settings
+    """
+    key = (tmplstr, settings)
+    with _COMPILED_TEMPLATES_LOCK:
+        code = _COMPILED_TEMPLATES.get(key)
+        if code is not None:
+            _COMPILED_TEMPLATES.move_to_end(key)
+    if code is None:
+        # Constant folding may call filters at compile time, their results
+        # must not be reused by later renders
+        jinja_env.optimized = False
+        code = jinja_env.compile(tmplstr)
+        with _COMPILED_TEMPLATES_LOCK:
+            _COMPILED_TEMPLATES[key] = code
+            while len(_COMPILED_TEMPLATES) > cache_size:
+                _COMPILED_TEMPLATES.popitem(last=False)
+    return jinja_env.template_class.from_code(
+        jinja_env, code, jinja_env.make_globals(None), None
+    )
+
+
 def render_jinja_tmpl(tmplstr, context, tmplpath=None):
     """
     Render a Jinja template.
@@ -465,7 +495,14 @@ def render_jinja_tmpl(tmplstr, context, tmplpath=None):
 
         jinja_env.globals.update(decoded_context)
         try:
-            template = jinja_env.from_string(tmplstr)
+            cache_size = opts.get("jinja_compile_cache_size", 0)
+            if cache_size:
+                settings = repr(
+                    sorted(item for item in env_args.items() if item[0] != "loader")
+                )
+                template = _compiled_template(jinja_env, tmplstr, settings, cache_size)
+            else:
+                template = jinja_env.from_string(tmplstr)
             output = template.render(**decoded_context)
         except jinja2.exceptions.UndefinedError as exc:
             trace = traceback.extract_tb(sys.exc_info()[2])
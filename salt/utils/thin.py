@@ -5,6 +5,8 @@ Generate the salt thin tarball from the installed python files
 import contextlib
 import contextvars as py_contextvars
 import copy
+import gzip
+import hashlib
 import importlib.util
 import inspect
 import io
@@ -33,6 +35,7 @@ import yaml
 
 import salt
 import salt.exceptions
+import salt.utils.atomicfile
 import salt.utils.entrypoints
 import salt.utils.files
 import salt.utils.hashutils
@@ -99,6 +102,9 @@ concurrent = None
 
 log = logging.getLogger(__name__)
 
+# Bump when the way layers are built changes, to invalidate the cached layers
+LAYER_VERSION = b"thin-layer-1"
+
 
 def import_module(name, path):
     """
@@ -533,6 +539,144 @@ def _get_thintar_prefix(tarname):
     return tmp_tarname
 
 
+def _layer_digest(entries):
+    """
+    Return the digest of the content of a layer, made of the files of the
+    ``(name, arcname)`` pairs in ``entries``
+    """
+    hasher = hashlib.sha256(LAYER_VERSION)
+    for name, arcname in entries:
+        hasher.update(salt.utils.stringutils.to_bytes(arcname) + b"\0")
+        hasher.update(b"%o\0" % os.stat(name).st_mode)
+        with salt.utils.files.fopen(name, "rb") as fh_:
+            for chunk in iter(lambda: fh_.read(0x10000), b""):
+                hasher.update(chunk)
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+class _LayeredTarFile:
+    """
+    Gzipped tarball written from layers of files, usually one per top.
+
+    Every layer is compressed on its own to a gzip member and cached in
+    ``layerdir`` under the digest of its content. A gzip stream can hold many
+    members, so the tarball is the concatenation of the layers followed by a
+    member with the files added outside of a layer and the end of the tar
+    archive. Building the tarball again only compresses the layers which
+    changed.
+    """
+
+    def __init__(self, name, layerdir):
+        self.name = name
+        self.layerdir = layerdir
+        self.layers = []
+        self._entries = None
+        self._tail = None
+        os.makedirs(layerdir, exist_ok=True)
+        self._fh = salt.utils.files.fopen(name, "wb")
+
+    @contextlib.contextmanager
+    def layer(self):
+        """
+        Add the files added within the context to a new layer
+        """
+        self._entries = []
+        try:
+            yield self
+            entries = self._entries
+        finally:
+            self._entries = None
+        if entries:
+            self._add_layer(entries)
+
+    def _tail_tar(self):
+        if self._tail is None:
+            self._tail = tarfile.open(fileobj=self._fh, mode="w:gz", dereference=True)
+        return self._tail
+
+    def add(self, name, arcname=None):
+        if self._entries is None:
+            self._tail_tar().add(name, arcname=arcname)
+        else:
+            # The working directory changes between the tops
+            self._entries.append((os.path.abspath(name), arcname or name))
+
+    def addfile(self, tarinfo, fileobj=None):
+        self._tail_tar().addfile(tarinfo, fileobj=fileobj)
+
+    def _compress_layer(self, entries):
+        buf = io.BytesIO()
+        tfp = tarfile.open(fileobj=buf, mode="w", dereference=True)
+        for name, arcname in entries:
+            tfp.add(name, arcname=arcname)
+        # Leave the end of the archive out, the layer is followed by others
+        return gzip.compress(buf.getvalue()[: tfp.offset], mtime=0)
+
+    def _add_layer(self, entries):
+        if self._tail is not None:
+            # The layer would end up within the tail member
+            for name, arcname in entries:
+                self._tail.add(name, arcname=arcname)
+            return
+        digest = _layer_digest(entries)
+        path = os.path.join(self.layerdir, f"{digest}.gz")
+        try:
+            with salt.utils.files.fopen(path, "rb") as fh_:
+                data = fh_.read()
+            log.debug("Using the cached layer %s", digest)
+        except FileNotFoundError:
+            log.debug("Compressing the layer %s", digest)
+            data = self._compress_layer(entries)
+            try:
+                with salt.utils.atomicfile.atomic_open(path, "wb") as fh_:
+                    fh_.write(data)
+            except OSError as exc:
+                log.warning("Unable to cache the layer %s: %s", digest, exc)
+        self._fh.write(data)
+        self.layers.append(digest)
+
+    def close(self):
+        """
+        Finish the tarball and remove the cached layers it does not use
+        """
+        self._tail_tar().close()
+        self._fh.close()
+        for fname in os.listdir(self.layerdir):
+            if fname.endswith(".gz") and fname[:-3] not in self.layers:
+                try:
+                    os.remove(os.path.join(self.layerdir, fname))
+                except OSError:
+                    pass
+
+
+def _cached_hash(path, form):
+    """
+    Return the hash of a tarball, which is cached next to it until the
+    tarball is replaced
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return salt.utils.hashutils.get_hash(path, form)
+    identity = [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+    hash_path = f"{path}.{form}"
+    try:
+        with salt.utils.files.fopen(hash_path, "r") as fh_:
+            cached = salt.utils.json.load(fh_)
+        if cached["identity"] == identity:
+            return cached["hash"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    ret = salt.utils.hashutils.get_hash(path, form)
+    try:
+        with salt.utils.atomicfile.atomic_open(hash_path, "w") as fh_:
+            salt.utils.json.dump({"identity": identity, "hash": ret}, fh_)
+    except OSError as exc:
+        log.debug("Unable to cache the hash of %s: %s", path, exc)
+    return ret
+
+
 def _pack_alternative(extended_cfg, digest_collector, tfp):
     # Pack alternative data
     config = copy.deepcopy(extended_cfg)
@@ -744,12 +888,17 @@ def gen_thin(
     exclude_saltexts=False,
     saltext_allowlist=None,
     saltext_blocklist=None,
+    layer_cache=False,
 ):
     """
     Generate the salt-thin tarball and print the location of the tarball
     Optional additional mods to include (e.g. mako) can be supplied as a comma
     delimited string.  Permits forcing an overwrite of the output file as well.
 
+    With ``layer_cache``, the files of every top are compressed to a layer
+    which is cached, so the tarball is generated again by only compressing
+    the tops which changed. Only applies to the gzip compression.
+
     CLI Example:
 
     .. code-block:: bash
@@ -838,7 +987,9 @@ def gen_thin(
         )
 
     tmp_thintar = _get_thintar_prefix(thintar)
-    if compress == "gzip":
+    if compress == "gzip" and layer_cache:
+        tfp = _LayeredTarFile(tmp_thintar, os.path.join(thindir, "layers"))
+    elif compress == "gzip":
         tfp = tarfile.open(tmp_thintar, "w:gz", dereference=True)
     elif compress == "zip":
         tfp = zipfile.ZipFile(
@@ -852,6 +1003,10 @@ def gen_thin(
     except OSError:
         start_dir = None
     tempdir = None
+    if isinstance(tfp, _LayeredTarFile):
+        layer = tfp.layer
+    else:
+        layer = contextlib.nullcontext
 
     # Pack default data
     log.debug("Packing default libraries based on current Salt version")
@@ -877,26 +1032,31 @@ def gen_thin(
             if not os.path.isdir(top):
                 # top is a single file module
                 if os.path.exists(os.path.join(top_dirname, base)):
-                    tfp.add(base, arcname=os.path.join(site_pkg_dir, base))
+                    with layer():
+                        tfp.add(base, arcname=os.path.join(site_pkg_dir, base))
                 continue
-            for root, dirs, files in salt.utils.path.os_walk(base, followlinks=True):
-                for name in files:
-                    if not name.endswith((".pyc", ".pyo")):
-                        digest_collector.add(os.path.join(root, name))
-                        arcname = os.path.join(
-                            site_pkg_dir, *(namespace or ()), root, name
-                        )
-                        if hasattr(tfp, "getinfo"):
-                            try:
-                                # This is a little slow but there's no clear way to detect duplicates
-                                tfp.getinfo(os.path.join(site_pkg_dir, root, name))
-                                arcname = None
-                            except KeyError:
-                                log.debug(
-                                    'ZIP: Unable to add "%s" with "getinfo"', arcname
-                                )
-                        if arcname:
-                            tfp.add(os.path.join(root, name), arcname=arcname)
+            with layer():
+                for root, dirs, files in salt.utils.path.os_walk(
+                    base, followlinks=True
+                ):
+                    for name in files:
+                        if not name.endswith((".pyc", ".pyo")):
+                            digest_collector.add(os.path.join(root, name))
+                            arcname = os.path.join(
+                                site_pkg_dir, *(namespace or ()), root, name
+                            )
+                            if hasattr(tfp, "getinfo"):
+                                try:
+                                    # This is a little slow but there's no clear way to detect duplicates
+                                    tfp.getinfo(os.path.join(site_pkg_dir, root, name))
+                                    arcname = None
+                                except KeyError:
+                                    log.debug(
+                                        'ZIP: Unable to add "%s" with "getinfo"',
+                                        arcname,
+                                    )
+                            if arcname:
+                                tfp.add(os.path.join(root, name), arcname=arcname)
 
             if tempdir is not None:
                 shutil.rmtree(tempdir)
@@ -948,7 +1108,7 @@ def thin_sum(cachedir, form="sha1"):
     else:
         code_checksum = "'0'"
 
-    return code_checksum, salt.utils.hashutils.get_hash(thintar, form)
+    return code_checksum, _cached_hash(thintar, form)
 
 
 def gen_min(
@@ -1189,4 +1349,4 @@ def min_sum(cachedir, form="sha1"):
     Return the checksum of the current thin tarball
     """
     mintar = gen_min(cachedir)
-    return salt.utils.hashutils.get_hash(mintar, form)
+    return _cached_hash(mintar, form)
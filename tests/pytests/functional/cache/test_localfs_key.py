@@ -222,3 +222,35 @@ def test_list(cache):
     #
     # assert contains works as expected
     assert cache.list("denied_keys") == ["minion_a"]
+
+
+def test_list_states(cache):
+    pki_dir = cache.opts["pki_dir"]
+    cache.store("keys", "minion_x", {"state": "pending", "pub": "RSAKEY_minion_x"})
+    cache.store("keys", "minion_y", {"state": "accepted", "pub": "RSAKEY_minion_y"})
+    cache.store("keys", "minion_z", {"state": "pending", "pub": "RSAKEY_minion_z"})
+
+    states = cache.list_states("keys")
+    assert sorted(states["pending"]) == ["minion_x", "minion_z"]
+    assert states["accepted"] == ["minion_y"]
+    assert states["rejected"] == []
+    assert os.path.exists(os.path.join(pki_dir, ".key_index.p"))
+
+    # the index is updated with the keys
+    cache.store("keys", "minion_x", {"state": "accepted", "pub": "RSAKEY_minion_x"})
+    cache.flush("keys", "minion_z")
+    states = cache.list_states("keys")
+    assert states["pending"] == []
+    assert sorted(states["accepted"]) == ["minion_x", "minion_y"]
+
+    # keys moved by hand are picked up
+    os.rename(
+        os.path.join(pki_dir, "minions", "minion_y"),
+        os.path.join(pki_dir, "minions_rejected", "minion_y"),
+    )
+    states = cache.list_states("keys")
+    assert states["accepted"] == ["minion_x"]
+    assert states["rejected"] == ["minion_y"]
+
+    # the index files are not keys
+    assert ".key_index.p" not in cache.list("master_keys")
@@ -0,0 +1,94 @@
+"""
+Integration tests for the salt-ssh asyncio executor and the multiplexing of
+the ssh connections
+"""
+
+import asyncio
+import re
+import threading
+
+import pytest
+
+import salt.client.ssh.shell
+from tests.support.runtests import RUNTIME_VARS
+
+pytestmark = [
+    pytest.mark.slow_test,
+    pytest.mark.skip_on_windows(reason="salt-ssh not available on Windows"),
+]
+
+
+@pytest.fixture
+def event_loop_thread():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield loop
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+
+@pytest.fixture
+def ssh_shell(sshd_server, sshd_config_dir, known_hosts_file, tmp_path):
+    opts = {
+        "_ssh_control_dir": str(tmp_path),
+        "known_hosts_file": known_hosts_file,
+    }
+    shell = salt.client.ssh.shell.Shell(
+        opts,
+        "127.0.0.1",
+        user=RUNTIME_VARS.RUNNING_TESTS_USER,
+        port=sshd_server.listen_port,
+        priv=str(sshd_config_dir / "client_key"),
+        timeout=30,
+    )
+    try:
+        yield shell
+    finally:
+        shell.close()
+
+
+def _master_pid(shell):
+    _, stderr, retcode = shell._run_cmd(shell._cmd_str("-O check"))
+    assert retcode == 0, stderr
+    return re.search(r"Master running \(pid=(\d+)\)", stderr).group(1)
+
+
+def test_shell_reuses_master_connection(ssh_shell, tmp_path, event_loop_thread):
+    stdout, stderr, retcode = ssh_shell.exec_cmd("echo first")
+    assert retcode == 0, stderr
+    assert stdout.strip() == "first"
+    # The first command left a master connection the next ones go through
+    assert len(list(tmp_path.iterdir())) == 1
+    master = _master_pid(ssh_shell)
+
+    # The commands run by the event loop of the asyncio executor share it too
+    def run():
+        salt.client.ssh.shell.SSH_LOOP.set(event_loop_thread)
+        return ssh_shell.exec_cmd("echo second"), _master_pid(ssh_shell)
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(run()))
+    thread.start()
+    thread.join()
+    (stdout, stderr, retcode), async_master = result[0]
+    assert retcode == 0, stderr
+    assert stdout.strip() == "second"
+    assert async_master == master
+
+    ssh_shell.close()
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("executor", ["process", "asyncio"])
+def test_multiplexed_run(salt_master, salt_ssh_cli, executor):
+    config = f"ssh_executor: {executor}\nssh_multiplex: True\n"
+    with pytest.helpers.temp_file(
+        "master.d/ssh-executor.conf", config, salt_master.config_dir
+    ):
+        ret = salt_ssh_cli.run("test.echo", "itworked")
+    assert ret.returncode == 0
+    assert ret.data == "itworked"
@@ -6,7 +6,7 @@ import pytest
 
 import salt.cache
 import salt.payload
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 
 
 @pytest.fixture
@@ -29,3 +29,45 @@ def test_factory_memcache(opts):
     with patch.dict(opts, {"memcache_expire_seconds": 10}):
         ret = salt.cache.factory(opts)
         assert isinstance(ret, salt.cache.MemCache)
+
+
+def test_bulk_fallback(master_opts):
+    cache = salt.cache.Cache(master_opts)
+    cache.store_many("bank", {"key1": "data1", "key2": "data2"})
+    assert cache.fetch("bank", "key1") == "data1"
+    assert cache.fetch_many("bank", ["key1", "key2", "key3"]) == {
+        "key1": "data1",
+        "key2": "data2",
+        "key3": {},
+    }
+
+    cache.store("minions/minion1", "data", {"grains": {"id": "minion1"}})
+    cache.store("minions/minion2", "data", {"grains": {"id": "minion2"}})
+    cache.store("minions/minion2", "mine", {"test.ping": True})
+    assert cache.list_with_values("minions", "data") == {
+        "minion1": {"grains": {"id": "minion1"}},
+        "minion2": {"grains": {"id": "minion2"}},
+    }
+    assert cache.list_with_values("minions", "mine", entries=["minion2"]) == {
+        "minion2": {"test.ping": True}
+    }
+    assert cache.list_with_values("minions", "mine", entries=[]) == {}
+
+
+def test_bulk_driver_functions(opts):
+    modules = {
+        "fake_driver.fetch_many": MagicMock(return_value={"key": "data"}),
+        "fake_driver.store_many": MagicMock(),
+        "fake_driver.list_with_values": MagicMock(return_value={"minion": "data"}),
+    }
+    with patch.dict(opts, {"cache": "fake_driver"}):
+        cache = salt.cache.factory(opts)
+        with patch("salt.loader.cache", return_value=modules):
+            assert cache.fetch_many("bank", ["key"]) == {"key": "data"}
+            cache.store_many("bank", {"key": "data"})
+            assert cache.list_with_values("minions", "data") == {"minion": "data"}
+    modules["fake_driver.fetch_many"].assert_called_once_with("bank", ["key"])
+    modules["fake_driver.store_many"].assert_called_once_with("bank", {"key": "data"})
+    modules["fake_driver.list_with_values"].assert_called_once_with(
+        "minions", "data", entries=None
+    )
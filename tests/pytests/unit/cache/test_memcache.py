@@ -2,11 +2,13 @@
 Validate Cache class methods
 """
 
+import threading
+
 import pytest
 
 import salt.cache
 import salt.payload
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, call, patch
 
 
 @pytest.fixture
@@ -190,3 +192,219 @@ def test_fetch_debug(cache, opts):
             # Check debug data
             assert cache.call == 6
             assert cache.hit == 3
+
+
+def test_fetch_many(cache):
+    with patch(
+        "salt.cache.Cache.fetch_many", return_value={"key2": "fake_data2"}
+    ) as cache_fetch_many_mock, patch("salt.cache.Cache.store"):
+        with patch("salt.loader.cache", return_value={}):
+            with patch("time.time", return_value=0):
+                cache.store("bank", "key1", "fake_data1")
+            with patch("time.time", return_value=1):
+                ret = cache.fetch_many("bank", ["key1", "key2"])
+            assert ret == {"key1": "fake_data1", "key2": "fake_data2"}
+            # Only the keys missing from memory are fetched from the driver
+            cache_fetch_many_mock.assert_called_once_with("bank", ["key2"])
+            assert salt.cache.MemCache.data == {
+                "fake_driver": {
+                    ("bank", "key1"): [1, "fake_data1"],
+                    ("bank", "key2"): [1, "fake_data2"],
+                }
+            }
+
+
+def test_max_bytes(opts):
+    salt.cache.MemCache.data = {}
+    salt.cache.MemCache.sizes = {}
+    salt.cache.MemCache.metrics = {}
+    opts["memcache_max_items"] = 10
+    opts["memcache_max_bytes"] = 2 * len(salt.payload.dumps("fake_data1"))
+    cache = salt.cache.factory(opts)
+    with patch("salt.cache.Cache.store"):
+        with patch("salt.loader.cache", return_value={}):
+            with patch("time.time", return_value=0):
+                cache.store("bank", "key1", "fake_data1")
+                cache.store("bank", "key2", "fake_data2")
+                cache.store("bank", "key3", "fake_data3")
+    # The least recently used value was removed to stay below the limit
+    assert salt.cache.MemCache.data == {
+        "fake_driver": {
+            ("bank", "key2"): [0, "fake_data2"],
+            ("bank", "key3"): [0, "fake_data3"],
+        }
+    }
+    assert cache.stats() == {"evicted": 1}
+
+
+def test_write_back(opts):
+    salt.cache.MemCache.data = {}
+    salt.cache.MemCache.pending = {}
+    salt.cache.MemCache.metrics = {}
+    opts["memcache_max_items"] = 10
+    opts["memcache_write_back_interval"] = 3600
+    cache = salt.cache.factory(opts)
+    with patch("salt.cache.Cache.store_many") as cache_store_many_mock, patch(
+        "salt.cache.Cache.fetch", return_value="driver_data"
+    ) as cache_fetch_mock, patch("salt.cache.Cache.flush"), patch(
+        "salt.cache.Cache.list", return_value=["key1"]
+    ):
+        with patch("salt.loader.cache", return_value={}):
+            cache.store("bank1", "key1", "fake_data1")
+            cache.store("bank1", "key1", "fake_data11")
+            cache.store("bank2", "key1", "fake_data21")
+            cache.store("bank2", "key2", "fake_data22")
+            cache.flush("bank2", "key2")
+            # Nothing was written yet, the pending values are served
+            cache_store_many_mock.assert_not_called()
+            assert cache.fetch("bank1", "key1") == "fake_data11"
+            cache_fetch_mock.assert_not_called()
+
+            # Listing a bank writes the pending values back first
+            assert cache.list("bank1") == ["key1"]
+            cache_store_many_mock.assert_has_calls(
+                [
+                    call("bank1", {"key1": "fake_data11"}),
+                    call("bank2", {"key1": "fake_data21"}),
+                ]
+            )
+            assert cache_store_many_mock.call_count == 2
+            assert salt.cache.MemCache.pending == {"fake_driver": {}}
+            assert cache.stats() == {
+                "hit": 1,
+                "coalesced": 1,
+                "flushes": 1,
+                "flushed": 2,
+            }
+    salt.cache.MemCache.write_back_all()
+
+
+def test_invalidation(cache):
+    watch_invalidations = MagicMock(return_value=True)
+    modules = {"fake_driver.watch_invalidations": watch_invalidations}
+    with patch("salt.cache.Cache.store"), patch("salt.cache.Cache.fetch"):
+        with patch("salt.loader.cache", return_value=modules):
+            salt.cache.MemCache._watching = {}
+            with patch("time.time", return_value=0):
+                cache.store("minions/minion1", "data", "fake_data1")
+                cache.store("minions/minion1", "mine", "fake_data2")
+                cache.store("minions/minion2", "data", "fake_data3")
+            watch_invalidations.assert_called_once()
+            callback = watch_invalidations.call_args[0][0]
+
+            callback("minions/minion1", ["data"])
+            assert list(salt.cache.MemCache.data["fake_driver"]) == [
+                ("minions/minion1", "mine"),
+                ("minions/minion2", "data"),
+            ]
+            callback("minions", None)
+            assert salt.cache.MemCache.data["fake_driver"] == {}
+            assert cache.stats()["invalidated"] == 3
+
+            # The driver is only asked once per process
+            salt.cache.factory(cache.opts).fetch("minions/minion1", "data")
+            watch_invalidations.assert_called_once()
+
+
+def test_concurrent_access(opts):
+    salt.cache.MemCache.data = {}
+    salt.cache.MemCache.sizes = {}
+    salt.cache.MemCache.metrics = {}
+    opts["memcache_max_items"] = 16
+    opts["memcache_max_bytes"] = 8 * len(salt.payload.dumps("fake_data00"))
+    cache = salt.cache.factory(opts)
+
+    def run(num):
+        for idx in range(500):
+            key = f"key{(num + idx) % 32:02d}"
+            if idx % 3 == 0:
+                cache.store("bank", key, f"fake_{key}")
+            elif idx % 7 == 0:
+                salt.cache.MemCache._invalidate("fake_driver", "bank", [key])
+            else:
+                cache.fetch("bank", key)
+
+    with patch("salt.cache.Cache.store"), patch(
+        "salt.cache.Cache.fetch", return_value="fake_data00"
+    ):
+        with patch("salt.loader.cache", return_value={}):
+            threads = [threading.Thread(target=run, args=(num,)) for num in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+    # The sizes still account for exactly the values kept
+    total, sizes = salt.cache.MemCache.sizes["fake_driver"]
+    assert set(sizes) == set(salt.cache.MemCache.data["fake_driver"])
+    assert total == sum(sizes.values())
+    assert total <= opts["memcache_max_bytes"]
+
+
+def test_invalidation_during_fetch(cache):
+    """
+    A value invalidated while it was fetched from the driver is not kept
+    """
+    watch_invalidations = MagicMock(return_value=True)
+    modules = {"fake_driver.watch_invalidations": watch_invalidations}
+    salt.cache.MemCache._watching = {}
+
+    def fetch(bank, key):
+        # Another process changes the value after the driver read it
+        watch_invalidations.call_args[0][0](bank, [key])
+        return "stale_data"
+
+    with patch("salt.cache.Cache.fetch", side_effect=fetch) as cache_fetch_mock:
+        with patch("salt.loader.cache", return_value=modules):
+            assert cache.fetch("minions/minion1", "data") == "stale_data"
+            assert salt.cache.MemCache.data["fake_driver"] == {}
+            cache_fetch_mock.side_effect = None
+            cache_fetch_mock.return_value = "fake_data"
+            assert cache.fetch("minions/minion1", "data") == "fake_data"
+            assert cache_fetch_mock.call_count == 2
+            assert list(salt.cache.MemCache.data["fake_driver"]) == [
+                ("minions/minion1", "data")
+            ]
+
+
+def test_write_back_without_lock(opts):
+    """
+    Values are stored and fetched while the pending values are written back
+    """
+    salt.cache.MemCache.data = {}
+    salt.cache.MemCache.pending = {}
+    salt.cache.MemCache.metrics = {}
+    opts["memcache_max_items"] = 10
+    opts["memcache_write_back_interval"] = 3600
+    cache = salt.cache.factory(opts)
+    during_write = {}
+
+    def store_many(bank, data):
+        def other_thread():
+            cache.store("bank1", "key2", "fake_data2")
+            during_write["fetched"] = cache.fetch("bank1", "key1")
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        thread.join(5)
+        during_write["blocked"] = thread.is_alive()
+
+    with patch("salt.cache.Cache.store_many", side_effect=store_many) as store_mock:
+        with patch("salt.loader.cache", return_value={}):
+            cache.store("bank1", "key1", "fake_data1")
+            # Another process may drop the value from the memory storage
+            salt.cache.MemCache.data["fake_driver"].clear()
+            cache.write_back_pending()
+            assert during_write == {"blocked": False, "fetched": "fake_data1"}
+            store_mock.assert_called_once_with("bank1", {"key1": "fake_data1"})
+            assert salt.cache.MemCache.pending["fake_driver"] == {
+                ("bank1", "key2"): "fake_data2"
+            }
+            assert salt.cache.MemCache.writing == {}
+
+            # The entries are listed after writing the pending values back
+            store_mock.side_effect = None
+            with patch("salt.cache.Cache.list_states", return_value={}):
+                cache.list_states("bank1")
+            assert salt.cache.MemCache.pending["fake_driver"] == {}
+    salt.cache.MemCache.write_back_all()
@@ -147,6 +147,56 @@ def test_flush():
                 mock_run_query.assert_has_calls(expected_calls, True)
 
 
+def test_fetch_many():
+    """
+    Tests that fetch_many reads all the keys with a single query.
+    """
+    mock_connect_client = MagicMock()
+    with patch.object(mysql_cache, "_init_client"):
+        with patch.dict(
+            mysql_cache.__context__,
+            {"mysql_client": mock_connect_client, "mysql_table_name": "salt"},
+        ):
+            with patch.object(mysql_cache, "run_query") as mock_run_query:
+                cursor = MagicMock()
+                cursor.fetchall.return_value = [("key1", b"\xa5hello")]
+                mock_run_query.return_value = (cursor, 1)
+                ret = mysql_cache.fetch_many(bank="bank", keys=["key1", "key2"])
+                assert ret == {"key1": "hello", "key2": {}}
+                mock_run_query.assert_called_once_with(
+                    mock_connect_client,
+                    "SELECT etcd_key, data FROM salt WHERE bank=%s AND etcd_key IN (%s,%s)",
+                    args=("bank", "key1", "key2"),
+                )
+
+
+def test_list_with_values():
+    """
+    Tests that list_with_values reads the key of all the entries with a single
+    query.
+    """
+    mock_connect_client = MagicMock()
+    with patch.object(mysql_cache, "_init_client"):
+        with patch.dict(
+            mysql_cache.__context__,
+            {"mysql_client": mock_connect_client, "mysql_table_name": "salt"},
+        ):
+            with patch.object(mysql_cache, "run_query") as mock_run_query:
+                cursor = MagicMock()
+                cursor.fetchall.return_value = [
+                    ("minions/minion1", b"\xa5hello"),
+                    ("minions/minion1/sub", b"\xa5world"),
+                ]
+                mock_run_query.return_value = (cursor, 2)
+                ret = mysql_cache.list_with_values(bank="minions", key="data")
+                assert ret == {"minion1": "hello"}
+                mock_run_query.assert_called_once_with(
+                    mock_connect_client,
+                    "SELECT bank, data FROM salt WHERE bank LIKE %s AND etcd_key=%s",
+                    args=("minions/%", "data"),
+                )
+
+
 def test_init_client():
     """
     Tests that the _init_client places the correct information in __context__
@@ -0,0 +1,68 @@
+"""
+Unit tests for the redis_cache cache
+"""
+
+import pytest
+
+import salt.cache.redis_cache as redis_cache
+import salt.payload
+from tests.support.mock import MagicMock, patch
+
+pytestmark = [
+    pytest.mark.skipif(
+        not redis_cache.HAS_REDIS, reason="The python-redis package is missing."
+    )
+]
+
+
+@pytest.fixture
+def configure_loader_modules():
+    return {redis_cache: {"__opts__": {"cache.redis.invalidation": True}}}
+
+
+def test_store_publishes_invalidation():
+    redis_server = MagicMock()
+    redis_pipe = redis_server.pipeline.return_value
+    with patch.object(redis_cache, "_get_redis_server", return_value=redis_server):
+        redis_cache.store("minions/minion", "data", {"grains": {}})
+        redis_cache.flush("minions/minion", "data")
+    sender = redis_cache._get_sender()
+    assert [
+        salt.payload.loads(call.args[1]) for call in redis_pipe.publish.call_args_list
+    ] == [
+        [sender, "minions/minion", ["data"]],
+        [sender, "minions/minion", ["data"]],
+    ]
+
+
+def test_watch_invalidations():
+    messages = [
+        {
+            "type": "message",
+            "data": salt.payload.dumps(["other", "minions/minion", ["data"]]),
+        },
+        {
+            "type": "message",
+            "data": salt.payload.dumps([redis_cache._get_sender(), "mine", None]),
+        },
+    ]
+    redis_server = MagicMock()
+    pubsub = redis_server.pubsub.return_value
+    pubsub.listen.side_effect = [
+        iter(messages),
+        redis_cache.RedisConnectionError("connection lost"),
+    ]
+    callback = MagicMock()
+    with patch.object(
+        redis_cache, "_get_redis_server", return_value=redis_server
+    ), patch("time.sleep", side_effect=KeyboardInterrupt):
+        with pytest.raises(KeyboardInterrupt):
+            redis_cache._watch_invalidations(callback)
+    pubsub.subscribe.assert_called_with("$INVALIDATE")
+    # The messages of this process are skipped and every new subscription
+    # invalidates everything
+    assert [call.args for call in callback.call_args_list] == [
+        (None, None),
+        ("minions/minion", ["data"]),
+        (None, None),
+    ]
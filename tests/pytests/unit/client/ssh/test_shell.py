@@ -1,6 +1,9 @@
+import asyncio
 import importlib
 import logging
+import os
 import subprocess
+import threading
 import types
 
 import pytest
@@ -273,3 +276,120 @@ def test_scp_command_execution_uses_custom_path():
         args, _ = mock_run_cmd.call_args
         assert "/custom/scp" in args[0]
         assert "source_file.txt example.com:/path/dest_file.txt" in args[0]
+
+
+def test_ssh_shell_multiplex(tmp_path):
+    """
+    Ensure the ssh and scp commands share the master connection to the host
+    and the connection is closed with the shell
+    """
+    opts = {"_ssh_version": (8, 0), "_ssh_control_dir": str(tmp_path)}
+    _shell = shell.Shell(opts=opts, host="example.com", port="2222", timeout=30)
+    control_path = "ControlPath={}".format(tmp_path / "%C")
+    for cmd_str in (
+        _shell._cmd_str("ls -la"),
+        _shell._cmd_str("a example.com:b", ssh=shell.SCP_PATH),
+    ):
+        assert "-o ControlMaster=auto" in cmd_str
+        assert f"-o {control_path}" in cmd_str
+        assert "-o ControlPersist=30s" in cmd_str
+
+    with patch("subprocess.run") as mock_run:
+        _shell.close()
+    cmd = mock_run.call_args[0][0]
+    assert cmd[0] == shell.SSH_PATH
+    assert "example.com" in cmd
+    assert cmd[-2:] == ["-O", "exit"]
+    assert control_path in cmd
+
+    del opts["_ssh_control_dir"]
+    assert "ControlPath" not in _shell._cmd_str("ls -la")
+    with patch("subprocess.run") as mock_run:
+        _shell.close()
+    mock_run.assert_not_called()
+
+
+def _run_in_event_loop(func):
+    """
+    Call a function in a thread whose shell commands are run by an event loop,
+    like the routines of the asyncio ssh_executor
+    """
+    loop = asyncio.new_event_loop()
+    loop_thread = threading.Thread(target=loop.run_forever)
+    loop_thread.start()
+    result = []
+
+    def target():
+        shell.SSH_LOOP.set(loop)
+        result.append(func())
+
+    try:
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join(30)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        loop_thread.join()
+        loop.close()
+    return result[0]
+
+
+@pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh")
+def test_run_cmd_in_event_loop(tmp_path):
+    """
+    Ensure commands run by the event loop get their password from the askpass
+    program and have the prompts of the remote command answered
+    """
+    askpass_dir = tmp_path / "askpass_dir"
+    askpass_dir.mkdir()
+    askpass = askpass_dir / "askpass"
+    askpass.write_text(shell.ASKPASS_SCRIPT)
+    askpass.chmod(0o700)
+    asked = tmp_path / "asked"
+    fake_ssh = tmp_path / "ssh"
+    fake_ssh.write_text(
+        "#!/bin/sh\n"
+        'env > "$1.env"\n'
+        '"$SSH_ASKPASS" "user@host\'s password:" > "$1"\n'
+        '"$SSH_ASKPASS" "Enter passphrase for key:" >> "$1"\n'
+        f"printf '%s' '{shell.SUDO_PROMPT}'\n"
+        "read passwd\n"
+        'echo "sudo got $passwd"\n'
+        "echo warning >&2\n"
+        "exit 3\n"
+    )
+    fake_ssh.chmod(0o700)
+    _shell = shell.Shell(
+        {"_ssh_askpass": str(askpass)},
+        host="example.com",
+        passwd="s3cr3t",
+        priv_passwd="phr4se",
+    )
+
+    stdout, stderr, retcode = _run_in_event_loop(
+        lambda: _shell._run_cmd(f"{fake_ssh} {asked}")
+    )
+    assert asked.read_text() == "s3cr3t\nphr4se\n"
+    # The passwords are neither in the environment of ssh nor left on disk
+    env = (tmp_path / "asked.env").read_text()
+    assert "s3cr3t" not in env
+    assert "phr4se" not in env
+    assert os.listdir(askpass_dir) == ["askpass"]
+    assert stdout.endswith("sudo got ******\n")
+    assert stderr == "warning\n"
+    assert retcode == 3
+
+
+@pytest.mark.skip_on_windows(reason="Windows does not support salt-ssh")
+def test_run_cmd_in_event_loop_host_key_not_accepted(tmp_path):
+    fake_ssh = tmp_path / "ssh"
+    fake_ssh.write_text(
+        "#!/bin/sh\necho 'Host key verification failed.' >&2\nexit 255\n"
+    )
+    fake_ssh.chmod(0o700)
+    _shell = shell.Shell({}, host="example.com")
+
+    stdout, stderr, retcode = _run_in_event_loop(lambda: _shell._run_cmd(str(fake_ssh)))
+    assert stdout.startswith("The host key needs to be accepted")
+    assert stderr == ""
+    assert retcode == 254
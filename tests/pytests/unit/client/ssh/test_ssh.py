@@ -1,6 +1,11 @@
+import asyncio
+import os
+import threading
+
 import pytest
 
 import salt.client.ssh.client
+import salt.client.ssh.shell
 import salt.utils.msgpack
 from salt.client import ssh
 from tests.support.mock import MagicMock, Mock, patch
@@ -72,6 +77,8 @@ def roster():
         ("ssh_remote_port_forwards", "test", True),
         ("ssh_options", ["test1", "test2"], True),
         ("ssh_max_procs", 2, True),
+        ("ssh_executor", "asyncio", False),
+        ("ssh_multiplex", True, False),
         ("ssh_askpass", True, True),
         ("ssh_key_deploy", True, True),
         ("ssh_update_roster", True, True),
@@ -517,3 +524,78 @@ def test_handle_routine_single_run_invalid_retcode(opts, target, caplog):
         )
     )
     assert "Got an invalid retcode for host 'localhost': 'None'" in caplog.text
+
+
+@pytest.mark.parametrize("executor", ["process", "asyncio"])
+def test_handle_ssh_multiplex(opts, target, executor):
+    """
+    Ensure the routines of a run get the directory of the control sockets,
+    which is removed after the run
+    """
+    opts["tgt"] = "localhost"
+    opts["ssh_executor"] = executor
+    opts["ssh_multiplex"] = True
+
+    def run_routine(opts, host, target, mine=False):
+        assert os.path.isdir(opts["_ssh_control_dir"])
+        return {"id": host, "ret": opts["_ssh_control_dir"]}, 0
+
+    with patch("salt.roster.get_roster_file", MagicMock(return_value="")):
+        client = ssh.SSH(opts)
+    client.targets = {"localhost": target}
+    with patch.object(client, "run_routine", side_effect=run_routine):
+        ret = list(client.handle_ssh())
+    assert len(ret) == 1
+    control_dir = ret[0][0]["localhost"]
+    assert ret[0][1] == 0
+    assert not os.path.exists(control_dir)
+    assert "_ssh_control_dir" not in client.opts
+
+
+def test_handle_ssh_async(opts, target):
+    """
+    Ensure the asyncio executor yields the returns in the order the routines
+    finish and turns the errors of a routine into the return of its target
+    """
+    opts["tgt"] = "*"
+    opts["ssh_executor"] = "asyncio"
+    opts["ssh_max_procs"] = 2
+    release = threading.Event()
+    consumed = threading.Event()
+    ran_command = threading.Event()
+
+    def run_routine(opts, host, target, mine=False):
+        if host == "slow":
+            assert consumed.wait(30)
+            # Like the shell commands, run something on the event loop
+            loop = salt.client.ssh.shell.SSH_LOOP.get()
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0), loop).result(30)
+            ran_command.set()
+            assert release.wait(30)
+        elif host == "broken":
+            raise Exception("broken")
+        return {"id": host, "ret": host}, 0
+
+    with patch("salt.roster.get_roster_file", MagicMock(return_value="")):
+        client = ssh.SSH(opts)
+    client.targets = {
+        "slow": dict(target),
+        "fast": dict(target),
+        "broken": dict(target),
+    }
+    with patch.object(client, "run_routine", side_effect=run_routine):
+        rets = client.handle_ssh()
+        assert next(rets) == ({"fast": "fast"}, 0)
+        # The event loop keeps running while the returns are not consumed
+        consumed.set()
+        assert ran_command.wait(10)
+        assert next(rets) == (
+            {
+                "broken": "Target 'broken' did not return any data, "
+                "probably due to an error."
+            },
+            1,
+        )
+        release.set()
+        assert list(rets) == [({"slow": "slow"}, 0)]
+    assert client.targets["fast"]["host"] == "login1"
@@ -1,7 +1,11 @@
+import asyncio
+import time
+
 import pytest
 
 import salt.client
 from salt.exceptions import SaltInvocationError
+from tests.support.mock import MagicMock, patch
 
 
 @pytest.fixture
@@ -273,3 +277,155 @@ def test_prep_pub_ext_job_cache_existing(master_opts):
         "user": local_client.salt_user,
     }
     assert result == expected
+
+
+def _job_events(jid, events):
+    yield from events
+    while True:
+        yield None
+
+
+def test_get_iter_returns_heartbeats(master_opts):
+    """
+    Minions sending heartbeats are not pinged with saltutil.find_job
+    """
+    jid = "20240102030405060708"
+    events = [
+        {"tag": f"salt/job/{jid}/beat/minion1", "data": {"id": "minion1"}},
+        None,
+        {
+            "tag": f"salt/job/{jid}/ret/minion1",
+            "data": {"id": "minion1", "return": True, "retcode": 0},
+        },
+        {
+            "tag": f"salt/job/{jid}/ret/minion2",
+            "data": {"id": "minion2", "return": True, "retcode": 0},
+        },
+    ]
+    local_client = salt.client.get_local_client(mopts=master_opts)
+    gather_job_info = MagicMock(return_value={})
+    with patch.object(local_client, "returns_for_job", return_value=True), patch.object(
+        local_client, "get_returns_no_block", return_value=_job_events(jid, events)
+    ), patch.object(local_client, "gather_job_info", gather_job_info):
+        rets = list(
+            local_client.get_iter_returns(
+                jid,
+                ["minion1", "minion2"],
+                timeout=0,
+                gather_job_timeout=5,
+                latency=True,
+            )
+        )
+    gather_job_info.assert_called_once_with(
+        jid, ["minion2"], "list", gather_job_timeout=5
+    )
+    assert [list(ret) for ret in rets] == [["minion1"], ["minion2"]]
+    assert all(ret[id_]["latency"] >= 0 for ret in rets for id_ in ret)
+
+
+def test_get_iter_returns_heartbeat_interval(master_opts):
+    """
+    Minions sending heartbeats less often than the timeouts are waited for
+    until their next heartbeat is due
+    """
+    jid = "20240102030405060708"
+    start = time.time()
+
+    def events():
+        yield {
+            "tag": f"salt/job/{jid}/beat/minion1",
+            "data": {"id": "minion1", "interval": 5},
+        }
+        while time.time() - start < 2.5:
+            yield None
+        yield {
+            "tag": f"salt/job/{jid}/ret/minion1",
+            "data": {"id": "minion1", "return": True, "retcode": 0},
+        }
+        while True:
+            yield None
+
+    local_client = salt.client.get_local_client(mopts=master_opts)
+    gather_job_info = MagicMock(return_value={})
+    with patch.object(local_client, "returns_for_job", return_value=True), patch.object(
+        local_client, "get_returns_no_block", return_value=events()
+    ), patch.object(local_client, "gather_job_info", gather_job_info):
+        rets = list(
+            local_client.get_iter_returns(
+                jid, ["minion1"], timeout=0, gather_job_timeout=1
+            )
+        )
+    gather_job_info.assert_not_called()
+    assert rets == [{"minion1": {"ret": True, "retcode": 0}}]
+
+
+def test_get_iter_returns_async(master_opts):
+    """
+    The event loop keeps running while the returns are waited for
+    """
+    jid = "20240102030405060708"
+    events = iter(
+        [
+            {"tag": f"salt/job/{jid}/beat/minion1", "data": {"id": "minion1"}},
+            {
+                "tag": f"salt/job/{jid}/ret/minion1",
+                "data": {"id": "minion1", "return": True, "retcode": 0},
+            },
+        ]
+    )
+
+    def get_event(**kwargs):
+        # Wait on the event bus like the real connection does
+        time.sleep(0.2)
+        return next(events, None)
+
+    local_client = salt.client.get_local_client(mopts=master_opts)
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def collect():
+        ticker = asyncio.ensure_future(tick())
+        try:
+            return [
+                ret
+                async for ret in local_client.get_iter_returns_async(
+                    jid, ["minion1"], timeout=5
+                )
+            ]
+        finally:
+            ticker.cancel()
+
+    with patch.object(local_client, "returns_for_job", return_value=True), patch.object(
+        local_client.event, "get_event", side_effect=get_event
+    ):
+        rets = asyncio.run(collect())
+    assert len(rets) == 1
+    assert rets[0]["minion1"]["ret"] is True
+    assert rets[0]["minion1"]["latency"] >= 0.4
+    # The loop ran while the event bus was waited on
+    assert len(ticks) > 20
+
+
+def test_expand_state_delta_job_cache_error(master_opts, caplog):
+    """
+    A job cache failing to return the base of a delta return does not abort
+    gathering the returns
+    """
+    delta = {
+        "b": {"result": True, "changes": {}, "comment": "ok", "duration": 1.0},
+        "__state_delta__": {"base": "1", "removed": [], "digest": ""},
+    }
+    local_client = salt.client.get_local_client(mopts=master_opts)
+    get_jid = MagicMock(side_effect=OSError("job cache unavailable"))
+    with patch.dict(
+        local_client.returners, {f"{master_opts['master_job_cache']}.get_jid": get_jid}
+    ):
+        ret = local_client.expand_state_delta("minion1", delta)
+    assert ret["b"] == delta["b"]
+    assert ret["__state_delta__"]["incomplete"] is True
+    assert "incomplete" not in delta["__state_delta__"]
+    assert "job cache unavailable" in caplog.text
@@ -234,3 +234,48 @@ def test_pwdata_decrypt():
         b"\x07\xa5\xa1\x058\xc7\xce\xbeb\x92\xbf\x0bL\xec\xdf\xc3M\x83\xfb$\xec\xd5\xf9"
     )
     assert salt.crypt.pwdata_decrypt(key_string, pwdata) == "1234"
+
+
+def test_minion_key_cache(tmp_path, master_opts):
+    master_opts["pki_dir"] = str(tmp_path)
+    cache = salt.cache.Cache(master_opts, driver=master_opts["keys.cache_driver"])
+    cache.store("keys", "minion", {"state": "pending", "pub": PUB_KEY})
+    keys = salt.crypt.MinionKeyCache(master_opts)
+
+    pub = keys.fetch("minion")
+    assert isinstance(pub, salt.crypt.PublicKey)
+    assert keys.fetch("minion") is pub
+    assert keys.fetch("minion", state="accepted") is None
+    assert keys.stats()["hits"] == 2
+    assert keys.stats()["misses"] == 1
+
+    # Accepting the key replaces the key file, which invalidates the entry
+    cache.store("keys", "minion", {"state": "accepted", "pub": PUB_KEY2})
+    accepted = keys.fetch("minion", state="accepted")
+    assert accepted is not None and accepted is not pub
+    assert keys.fetch("minion") is accepted
+    assert keys.from_str("minion", PUB_KEY2) is accepted
+
+    cache.flush("keys", "minion")
+    assert keys.fetch("minion") is None
+    assert keys.fetch("../minion") is None
+    assert keys.stats()["size"] == 0
+
+
+def test_minion_key_cache_lru(tmp_path, master_opts):
+    master_opts["pki_dir"] = str(tmp_path)
+    master_opts["minion_key_cache_size"] = 2
+    cache = salt.cache.Cache(master_opts, driver=master_opts["keys.cache_driver"])
+    for id_ in ("minion1", "minion2", "minion3"):
+        cache.store("keys", id_, {"state": "accepted", "pub": PUB_KEY})
+    keys = salt.crypt.MinionKeyCache(master_opts)
+
+    first = keys.fetch("minion1")
+    keys.fetch("minion2")
+    assert keys.fetch("minion1") is first
+    keys.fetch("minion3")
+    assert list(keys.keys) == ["minion1", "minion3"]
+    keys.invalidate("minion1")
+    assert list(keys.keys) == ["minion3"]
+    keys.invalidate()
+    assert not keys.keys
@@ -8,6 +8,7 @@ import os
 
 import pytest
 
+import salt.fileserver
 import salt.utils.files
 from salt import fileclient
 from tests.support.mock import AsyncMock, MagicMock, Mock, patch
@@ -67,6 +68,25 @@ class MockReqChannel:
         return self
 
 
+class FileserverChannel:
+    """
+    Request channel answering file server requests with a local file server
+    """
+
+    def __init__(self, opts, loads):
+        self.fs = salt.fileserver.Fileserver(opts)
+        self.loads = loads
+
+    def send(self, load, raw=False):
+        self.loads.append(dict(load))
+        if load["cmd"] == "_file_hash":
+            return self.fs.file_hash(load)
+        return self.fs.serve_file(load)
+
+    def close(self):
+        pass
+
+
 def test_fileclient_context_manager_closes(minion_opts, master_opts):
     """
     ensure fileclient channel closes
@@ -251,3 +271,67 @@ def test_get_url_with_hash(client_opts):
                 result = client.get_url(url, dest)
 
                 assert result == "/path/to/file#with#hash"
+
+
+def test_remote_client_get_file_chunks(tmp_path, minion_opts, master_opts):
+    """
+    Ensure files are downloaded correctly when the master returns several
+    compressed chunks per request
+    """
+    fileroot = tmp_path / "srv"
+    fileroot.mkdir()
+    content = os.urandom(5000)
+    (fileroot / "blob").write_bytes(content)
+    master_opts.update(
+        {
+            "file_roots": {"base": [str(fileroot)]},
+            "file_buffer_size": 1024,
+            "file_serve_chunks": 2,
+        }
+    )
+    minion_opts.update({"file_transfer_chunks": 4, "file_transfer_compression": "gzip"})
+    loads = []
+    channel = FileserverChannel(master_opts, loads)
+
+    with patch("salt.channel.client.ReqChannel.factory", return_value=channel):
+        client = fileclient.RemoteClient(minion_opts)
+        dest = client.get_file("salt://blob", str(tmp_path / "blob"))
+
+    with salt.utils.files.fopen(dest, "rb") as fp_:
+        assert fp_.read() == content
+    serve_loads = [load for load in loads if load["cmd"] == "_serve_file"]
+    # 2 chunks of 1024 bytes per request, and a last one to find the end
+    assert [load["loc"] for load in serve_loads] == [0, 2048, 4096, 5000]
+    assert serve_loads[0]["chunks"] == 4
+    assert serve_loads[0]["compress"] == "gzip"
+
+
+def test_remote_client_file_cache_store(tmp_path, minion_opts, master_opts):
+    """
+    Ensure identical files are only downloaded once with the file store
+    """
+    for saltenv in ("base", "dev"):
+        (tmp_path / saltenv).mkdir()
+        (tmp_path / saltenv / "blob").write_text("contents")
+    master_opts["file_roots"] = {
+        saltenv: [str(tmp_path / saltenv)] for saltenv in ("base", "dev")
+    }
+    minion_opts["file_cache_store"] = True
+    loads = []
+    channel = FileserverChannel(master_opts, loads)
+
+    with patch("salt.channel.client.ReqChannel.factory", return_value=channel):
+        client = fileclient.RemoteClient(minion_opts)
+        base = client.get_file("salt://blob", saltenv="base")
+        dev = client.get_file("salt://blob", saltenv="dev")
+        with patch("salt.utils.hashutils.get_hash") as get_hash:
+            assert client.get_file("salt://blob", saltenv="dev") == dev
+        get_hash.assert_not_called()
+        client.destroy()
+
+    assert os.path.samefile(base, dev)
+    serve_loads = [load for load in loads if load["cmd"] == "_serve_file"]
+    assert {load["saltenv"] for load in serve_loads} == {"base"}
+    assert os.path.isfile(
+        os.path.join(minion_opts["cachedir"], "file_store", "index.p")
+    )
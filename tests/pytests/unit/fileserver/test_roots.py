@@ -97,6 +97,29 @@ def test_serve_file(testfilepath):
         assert ret == {"data": data, "dest": "testfile"}
 
 
+@pytest.mark.skip_on_windows(reason="File handles are not reused on Windows")
+def test_serve_file_reuses_handle(testfilepath):
+    load = {"saltenv": "base", "path": str(testfilepath), "loc": 0}
+    fnd = {"path": str(testfilepath), "rel": "testfile"}
+    with patch.dict(roots.__opts__, {"file_buffer_size": 4}):
+        assert roots.serve_file(dict(load), fnd)["data"] == b"This"
+        handle = roots._OPEN_FILES[str(testfilepath)][0]
+        assert roots.serve_file(dict(load, loc=4), fnd)["data"] == b" is "
+        assert roots._OPEN_FILES[str(testfilepath)][0] is handle
+
+        # A replaced file is opened again
+        new = testfilepath.parent / "newfile"
+        new.write_text("That was a testfile")
+        os.replace(str(new), str(testfilepath))
+        assert roots.serve_file(dict(load), fnd)["data"] == b"That"
+        assert handle.closed
+
+        testfilepath.unlink()
+        with pytest.raises(FileNotFoundError):
+            roots.serve_file(dict(load), fnd)
+        assert str(testfilepath) not in roots._OPEN_FILES
+
+
 def test_envs(unicode_dirname):
     opts = {"file_roots": copy.copy(roots.__opts__["file_roots"])}
     opts["file_roots"][unicode_dirname] = opts["file_roots"]["base"]
@@ -194,6 +217,43 @@ def test_update_no_change():
     assert ret["files"]["added"] == []
 
 
+def test_update_journal(tmp_state_tree, unicode_dirname):
+    """
+    Test that the file lists and the mtime map are updated from the journal
+    of the file roots
+    """
+    new_file = tmp_state_tree / unicode_dirname / "new"
+    with patch.dict(roots.__opts__, {"fileserver_journal": True}), patch.dict(
+        roots._JOURNALS, clear=True
+    ), patch.object(roots, "_MTIME_MAP", None):
+        ret = roots.update()
+        assert ret["changed"] is True
+        assert str(tmp_state_tree / "testfile") in ret["files"]["added"]
+        # The workers don't walk the file roots anymore
+        with patch("salt.utils.path.os_walk", MagicMock(return_value=[])):
+            assert "testfile" in roots.file_list({"saltenv": "base"})
+
+        ret = roots.update()
+        assert ret["changed"] is False
+
+        new_file.write_text("new")
+        os.remove(tmp_state_tree / "testfile")
+        ret = roots.update()
+        assert ret["files"] == {
+            "changed": [],
+            "removed": [str(tmp_state_tree / "testfile")],
+            "added": [str(new_file)],
+        }
+        with patch("salt.utils.path.os_walk", MagicMock(return_value=[])):
+            file_list = roots.file_list({"saltenv": "base"})
+        assert "testfile" not in file_list
+        assert f"{unicode_dirname}/new" in file_list
+
+        # The mtime map written by the journal is the one a full update builds
+        with patch.dict(roots.__opts__, {"fileserver_journal": False}):
+            assert roots.update()["changed"] is False
+
+
 def test_update_mtime_map():
     """
     Test that files with colons in the filename are properly handled in the
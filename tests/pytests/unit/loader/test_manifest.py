@@ -0,0 +1,99 @@
+"""
+Tests for salt.loader.manifest
+"""
+
+import os
+
+import pytest
+
+import salt.loader.lazy
+import salt.loader.manifest
+from tests.support.mock import patch
+
+
+@pytest.fixture
+def loader_dir(tmp_path):
+    mod_a = """
+    __virtualname__ = "virt"
+
+    def __virtual__():
+        return __virtualname__
+
+    def ping():
+        return "a"
+    """
+    mod_b = """
+    def __virtual__():
+        return False, "not here"
+    """
+    mod_dir = tmp_path / "modules"
+    mod_dir.mkdir()
+    with pytest.helpers.temp_file(
+        "mod_a.py", directory=mod_dir, contents=mod_a
+    ), pytest.helpers.temp_file("mod_b.py", directory=mod_dir, contents=mod_b):
+        yield str(mod_dir)
+
+
+@pytest.fixture
+def opts(tmp_path):
+    return {
+        "optimization_order": [0, 1, 2],
+        "cachedir": str(tmp_path / "cache"),
+        "loader_manifest_cache": True,
+    }
+
+
+def test_manifest_reuses_file_mapping(loader_dir, opts):
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts, tag="module")
+    assert "mod_a" in loader.file_mapping
+    assert os.listdir(os.path.join(opts["cachedir"], "loader"))
+
+    with patch("os.listdir", side_effect=AssertionError("listdir called")):
+        loader = salt.loader.lazy.LazyLoader([loader_dir], opts, tag="module")
+    assert list(loader.file_mapping) == ["mod_a", "mod_b"]
+    assert loader["virt.ping"]() == "a"
+
+
+def test_manifest_invalidated_by_new_module(loader_dir, opts):
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts, tag="module")
+    assert "mod_c" not in loader.file_mapping
+    mtime = salt.loader.manifest.dir_mtime(loader_dir)
+    with pytest.helpers.temp_file(
+        "mod_c.py", directory=loader_dir, contents="def ping():\n    return 'c'\n"
+    ):
+        # Don't rely on the filesystem timestamp granularity
+        if salt.loader.manifest.dir_mtime(loader_dir) == mtime:
+            os.utime(loader_dir, ns=(mtime + 10**9, mtime + 10**9))
+        loader = salt.loader.lazy.LazyLoader([loader_dir], opts, tag="module")
+        assert "mod_c" in loader.file_mapping
+        assert loader["mod_c.ping"]() == "c"
+
+
+def test_manifest_records_virtual_names(loader_dir, opts):
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts, tag="module")
+    loader._load_all()
+    assert loader._manifest.virtual == {"mod_a": ["virt"], "mod_b": None}
+
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts, tag="module")
+    assert loader._manifest.virtual == {"mod_a": ["virt"], "mod_b": None}
+    assert list(loader._iter_files("virt")) == ["mod_a", "mod_b"]
+    assert list(loader._iter_files("mod_b")) == ["mod_a", "mod_b"]
+
+
+def test_manifest_virtual_names_depend_on_grains(loader_dir, opts):
+    loader = salt.loader.lazy.LazyLoader(
+        [loader_dir], opts, tag="module", pack={"__grains__": {"os": "Linux"}}
+    )
+    loader._load_all()
+    loader = salt.loader.lazy.LazyLoader(
+        [loader_dir], opts, tag="module", pack={"__grains__": {"os": "Windows"}}
+    )
+    assert loader._manifest.virtual == {}
+    assert "mod_a" in loader.file_mapping
+
+
+def test_manifest_disabled_by_default(loader_dir, opts):
+    opts["loader_manifest_cache"] = False
+    loader = salt.loader.lazy.LazyLoader([loader_dir], opts, tag="module")
+    assert loader._manifest is None
+    assert not os.path.exists(os.path.join(opts["cachedir"], "loader"))
@@ -0,0 +1,189 @@
+"""
+Unit tests for the SQLite indexed job cache (sqlite_local_cache).
+"""
+
+import datetime
+import os
+import threading
+import time
+
+import pytest
+
+import salt.payload
+import salt.returners.sqlite_local_cache as sqlite_local_cache
+import salt.utils.files
+import salt.utils.jid
+from tests.support.mock import patch
+
+
+@pytest.fixture
+def configure_loader_modules(tmp_path):
+    return {
+        sqlite_local_cache: {
+            "__opts__": {
+                "cachedir": str(tmp_path / "cache_dir"),
+                "hash_type": "sha256",
+                "keep_jobs_seconds": 3600,
+                "job_cache_store_endtime": True,
+            }
+        }
+    }
+
+
+@pytest.fixture(autouse=True)
+def reset_connections():
+    sqlite_local_cache._CONNECTIONS.clear()
+    yield
+    for conn in sqlite_local_cache._CONNECTIONS.values():
+        conn.close()
+    sqlite_local_cache._CONNECTIONS.clear()
+
+
+def _add_job(jid, fun="test.ping", minions=("minion",)):
+    sqlite_local_cache.prep_jid(passed_jid=jid)
+    sqlite_local_cache.save_load(
+        jid,
+        {"jid": jid, "fun": fun, "arg": [], "tgt": "*", "tgt_type": "glob"},
+        minions=list(minions),
+    )
+    for minion in minions:
+        sqlite_local_cache.returner(
+            {"jid": jid, "id": minion, "return": True, "retcode": 0}
+        )
+
+
+def test_save_and_get_job():
+    jid = "20240102030405060708"
+    _add_job(jid, minions=("minion1", "minion2"))
+    sqlite_local_cache.update_endtime(jid, "2024, Jan 02 03:04:06.000000")
+
+    load = sqlite_local_cache.get_load(jid)
+    assert load["fun"] == "test.ping"
+    assert load["Minions"] == ["minion1", "minion2"]
+    assert sqlite_local_cache.get_jid(jid) == {
+        "minion1": {"return": True, "retcode": 0},
+        "minion2": {"return": True, "retcode": 0},
+    }
+    jids = sqlite_local_cache.get_jids()
+    assert jids[jid]["Function"] == "test.ping"
+    assert jids[jid]["EndTime"] == "2024, Jan 02 03:04:06.000000"
+    assert sqlite_local_cache.get_endtime(jid) == "2024, Jan 02 03:04:06.000000"
+    assert sqlite_local_cache.get_endtime("20240102030405060709") is False
+
+
+def test_returns_from_other_threads():
+    jid = "20240102030405060708"
+    _add_job(jid, minions=("minion1",))
+    errors = []
+
+    def run():
+        try:
+            sqlite_local_cache.returner(
+                {"jid": jid, "id": "minion2", "return": True, "retcode": 0}
+            )
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+        finally:
+            key = (os.getpid(), threading.get_ident(), sqlite_local_cache._db_path())
+            conn = sqlite_local_cache._CONNECTIONS.pop(key, None)
+            if conn is not None:
+                conn.close()
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert not errors
+    assert sorted(sqlite_local_cache.get_jid(jid)) == ["minion1", "minion2"]
+
+
+def test_extra_return_is_dropped():
+    jid = "20240102030405060708"
+    _add_job(jid)
+    assert (
+        sqlite_local_cache.returner({"jid": jid, "id": "minion", "return": False})
+        is False
+    )
+
+
+def test_nocache_job_returns_are_not_stored():
+    jid = sqlite_local_cache.prep_jid(nocache=True)
+    sqlite_local_cache.returner({"jid": jid, "id": "minion", "return": True})
+    assert sqlite_local_cache.get_jid(jid) == {}
+
+
+def test_get_jids_filter():
+    for second in range(5):
+        _add_job(f"202401020304{second:02}000000")
+    _add_job("20240102030410000000", fun="saltutil.find_job")
+
+    ret = sqlite_local_cache.get_jids_filter(3)
+    assert [job["JID"] for job in ret] == [
+        "20240102030402000000",
+        "20240102030403000000",
+        "20240102030404000000",
+    ]
+    ret = sqlite_local_cache.get_jids_filter(1, filter_find_job=False)
+    assert [job["JID"] for job in ret] == ["20240102030410000000"]
+
+
+def test_get_jids_range():
+    for second in range(5):
+        _add_job(f"202401020304{second:02}000000")
+    _add_job("20240102030403000000_123")
+
+    ret = sqlite_local_cache.get_jids_range(
+        start=datetime.datetime(2024, 1, 2, 3, 4, 1),
+        end=datetime.datetime(2024, 1, 2, 3, 4, 3),
+    )
+    assert sorted(ret) == [
+        "20240102030401000000",
+        "20240102030402000000",
+        "20240102030403000000",
+        "20240102030403000000_123",
+    ]
+    ret = sqlite_local_cache.get_jids_range(
+        start=datetime.datetime(2024, 1, 2, 3, 4, 4)
+    )
+    assert sorted(ret) == ["20240102030404000000"]
+
+
+def test_clean_old_jobs():
+    old_jid = "20240102030405060708"
+    new_jid = "20240102030405060709"
+    with patch("time.time", return_value=time.time() - 7200):
+        _add_job(old_jid)
+    _add_job(new_jid)
+    old_dir = salt.utils.jid.jid_dir(old_jid, sqlite_local_cache._job_dir(), "sha256")
+    assert os.path.isdir(old_dir)
+
+    sqlite_local_cache.clean_old_jobs()
+
+    assert not os.path.isdir(old_dir)
+    assert sqlite_local_cache.get_load(old_jid) == {}
+    assert list(sqlite_local_cache.get_jids()) == [new_jid]
+
+
+def test_import_local_cache():
+    jid = "20240102030405060708"
+    jid_dir = salt.utils.jid.jid_dir(jid, sqlite_local_cache._job_dir(), "sha256")
+    os.makedirs(os.path.join(jid_dir, "minion"))
+    with salt.utils.files.fopen(os.path.join(jid_dir, "jid"), "wb") as fh_:
+        fh_.write(jid.encode())
+    with salt.utils.files.fopen(os.path.join(jid_dir, ".load.p"), "wb") as fh_:
+        salt.payload.dump({"jid": jid, "fun": "test.ping", "arg": []}, fh_)
+    with salt.utils.files.fopen(os.path.join(jid_dir, ".minions.p"), "wb") as fh_:
+        salt.payload.dump(["minion"], fh_)
+    with salt.utils.files.fopen(
+        os.path.join(jid_dir, ".minions.syndic.p"), "wb"
+    ) as fh_:
+        salt.payload.dump(["syndic_minion"], fh_)
+    with salt.utils.files.fopen(
+        os.path.join(jid_dir, "minion", "return.p"), "wb"
+    ) as fh_:
+        salt.payload.dump({"return": True}, fh_)
+
+    assert sqlite_local_cache.import_local_cache() == 1
+
+    assert sqlite_local_cache.get_load(jid)["Minions"] == ["minion", "syndic_minion"]
+    assert sqlite_local_cache.get_jids()[jid]["Function"] == "test.ping"
+    assert sqlite_local_cache.get_jid(jid) == {"minion": {"return": True}}
@@ -0,0 +1,100 @@
+"""
+Tests for the dependency graph executor of the state compiler
+"""
+
+import pytest
+
+import salt.state
+from tests.support.mock import patch
+
+pytestmark = [
+    pytest.mark.core_test,
+    pytest.mark.skip_on_spawning_platform(
+        reason="Parallel states are not reliable on spawning platforms"
+    ),
+]
+
+
+@pytest.fixture
+def high_data():
+    high = {
+        "first": {
+            "test": ["succeed_with_changes"],
+        },
+        "second": {
+            "test": ["succeed_without_changes", {"require": [{"test": "first"}]}],
+        },
+        "independent": {
+            "test": ["succeed_without_changes"],
+        },
+        "failing": {
+            "test": ["fail_without_changes"],
+        },
+        "after_failing": {
+            "test": ["succeed_with_changes", {"require": ["failing"]}],
+        },
+        "on_failure": {
+            "test": ["succeed_with_changes", {"onfail": ["failing"]}],
+        },
+        "watcher": {
+            "test": ["succeed_without_changes", {"watch": ["first"]}],
+        },
+    }
+    for data in high.values():
+        data["__sls__"] = "graph"
+        data["__env__"] = "base"
+    return high
+
+
+def _call_high(minion_opts, high_data):
+    with patch("salt.state.State._gather_pillar"):
+        state_obj = salt.state.State(minion_opts)
+        ret = state_obj.call_high(high_data)
+    for state_ret in ret.values():
+        for key in ("start_time", "duration"):
+            state_ret.pop(key, None)
+    return ret
+
+
+def test_graph_executor_returns_match_serial(minion_opts, high_data):
+    serial = _call_high(minion_opts.copy(), high_data)
+
+    minion_opts["state_graph_executor"] = True
+    with patch(
+        "salt.state.State.call_parallel",
+        autospec=True,
+        wraps=salt.state.State.call_parallel,
+    ) as call_parallel:
+        graph = _call_high(minion_opts, high_data)
+
+    assert call_parallel.called
+    assert graph.keys() == serial.keys()
+    for tag, state_ret in serial.items():
+        graph_ret = graph[tag].copy()
+        state_ret = state_ret.copy()
+        for ret in (graph_ret, state_ret):
+            ret.pop("__run_num__")
+        assert graph_ret == state_ret
+    # requisites are still honored
+    assert (
+        graph["test_|-second_|-second_|-succeed_without_changes"]["__run_num__"]
+        > graph["test_|-first_|-first_|-succeed_with_changes"]["__run_num__"]
+    )
+
+
+def test_graph_executor_serial_states(minion_opts, high_data):
+    minion_opts["state_graph_executor"] = True
+    minion_opts["state_graph_serial_states"] = ["test"]
+    with patch("salt.state.State.call_parallel") as call_parallel:
+        ret = _call_high(minion_opts, high_data)
+    call_parallel.assert_not_called()
+    assert ret["test_|-first_|-first_|-succeed_with_changes"]["result"] is True
+
+
+def test_graph_executor_failhard(minion_opts, high_data):
+    minion_opts["state_graph_executor"] = True
+    high_data["failing"]["test"].append({"failhard": True})
+    high_data["failing"]["test"].append({"order": 1})
+    ret = _call_high(minion_opts, high_data)
+    assert ret["test_|-failing_|-failing_|-fail_without_changes"]["result"] is False
+    assert "test_|-after_failing_|-after_failing_|-succeed_with_changes" not in ret
@@ -2,8 +2,10 @@ import datetime
 import os
 import time
 
+import salt.config
 import salt.fileserver
 import salt.utils.files
+from tests.support.mock import patch
 
 
 def test_diff_with_diffent_keys():
@@ -117,3 +119,83 @@ def test_file_server_serve_url_escape(tmp_path):
         }
     )
     assert ret == {"data": "", "dest": ""}
+
+
+def test_file_server_serve_chunks(tmp_path):
+    fileroot = tmp_path / "srv"
+    fileroot.mkdir()
+    content = os.urandom(5000)
+    (fileroot / "blob").write_bytes(content)
+    opts = {
+        "fileserver_backend": ["roots"],
+        "extension_modules": "",
+        "optimization_order": [0, 1],
+        "file_roots": {"base": [str(fileroot)]},
+        "file_ignore_regex": "",
+        "file_ignore_glob": "",
+        "fileserver_followsymlinks": True,
+        "file_buffer_size": 1024,
+        "file_serve_chunks": 3,
+    }
+    fs = salt.fileserver.Fileserver(opts)
+    load = {"path": "blob", "saltenv": "base", "loc": 0, "chunks": 10}
+    ret = fs.serve_file(dict(load))
+    assert ret == {"data": content[:3072], "dest": "blob"}
+
+    ret = fs.serve_file(dict(load, loc=3072, compress="gzip"))
+    assert ret["compress"] == "gzip"
+    assert salt.fileserver.uncompress_chunk(ret["data"], "gzip") == content[3072:]
+
+    # Without chunks, a single chunk is served as before
+    ret = fs.serve_file({"path": "blob", "saltenv": "base", "loc": 0})
+    assert ret == {"data": content[:1024], "dest": "blob"}
+
+
+def test_file_server_hash_index(tmp_path):
+    fileroot = tmp_path / "srv"
+    fileroot.mkdir()
+    overrides = tmp_path / "overrides"
+    overrides.mkdir()
+    (fileroot / "top.sls").write_text("base: {}")
+    (fileroot / "init.sls").write_text("{}")
+    opts = salt.config.master_config(None)
+    opts.update(
+        {
+            "cachedir": str(tmp_path / "cache"),
+            "file_roots": {"base": [str(overrides), str(fileroot)]},
+            "fileserver_backend": ["roots"],
+            "fileserver_hash_index": True,
+        }
+    )
+    fs = salt.fileserver.Fileserver(opts)
+    expected = fs.file_hash({"path": "top.sls", "saltenv": "base"})
+    fs.build_hash_index()
+
+    fs = salt.fileserver.Fileserver(opts)
+    assert fs._indexed_file("top.sls", "base", ["roots"])["hash"] == expected
+    assert fs.file_hash({"path": "top.sls", "saltenv": "base"}) == expected
+    fnd = fs.find_file("top.sls", "base")
+    assert fnd["path"] == str(fileroot / "top.sls")
+    assert fnd["back"] == "roots"
+    # Files missing from the index are looked up in the backends
+    assert fs.find_file("missing.sls", "base") == {"path": "", "rel": ""}
+
+    # Changed files are looked up in the backends until indexed again
+    (fileroot / "top.sls").write_text("base: {'*': [init]}")
+    changed = fs.file_hash({"path": "top.sls", "saltenv": "base"})
+    assert changed["hsum"] != expected["hsum"]
+    (overrides / "init.sls").write_text("{}")
+    assert fs.find_file("init.sls", "base")["path"] == str(overrides / "init.sls")
+    (fileroot / "top.sls").unlink()
+    assert fs.find_file("top.sls", "base") == {"path": "", "rel": ""}
+
+    # Only the files which changed are hashed again
+    (fileroot / "top.sls").write_text("base: {}")
+    with patch.object(fs, "_hash_entry", wraps=fs._hash_entry) as hash_entry:
+        fs.build_hash_index(back=["roots"])
+    assert sorted(call[0][2] for call in hash_entry.call_args_list) == [
+        "init.sls",
+        "top.sls",
+    ]
+    fs = salt.fileserver.Fileserver(opts)
+    assert fs.find_file("init.sls", "base")["path"] == str(overrides / "init.sls")
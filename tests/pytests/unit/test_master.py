@@ -1,5 +1,9 @@
+import asyncio
+import concurrent.futures
+import datetime
 import os
 import pathlib
+import queue
 import stat
 import threading
 import time
@@ -157,6 +161,44 @@ def test_maintenance_duration():
     assert handle_git_pillar.called
 
 
+def test_maintenance_sleep_interval(maintenance):
+    """
+    The maintenance loop wakes up for the scheduled jobs without lowering its
+    loop_interval for good
+    """
+    maintenance.loop_interval = 60
+    maintenance.schedule = MagicMock(
+        evaluating=False,
+        loop_interval=5,
+        next_due=datetime.datetime.now() + datetime.timedelta(seconds=30),
+    )
+    maintenance.handle_schedule()
+    assert maintenance.loop_interval == 60
+    assert 28 <= maintenance.sleep_interval() <= 30
+
+    # Jobs left in the evaluation need it every schedule.loop_interval
+    maintenance.schedule.evaluating = True
+    maintenance.handle_schedule()
+    assert maintenance.sleep_interval() == 5
+
+    maintenance.schedule.evaluating = False
+    maintenance.schedule.next_due = None
+    maintenance.handle_schedule()
+    assert maintenance.loop_interval == 60
+    assert maintenance.sleep_interval() == 60
+
+
+def test_fileserver_update_hash_index():
+    """
+    Validate the hash index is written after every fileserver update
+    """
+    on_update = MagicMock()
+    with patch("salt.master.FileserverUpdate._do_update") as update:
+        salt.master.FileserverUpdate.update(1, {}, 1, on_update)
+    update.assert_called_once()
+    on_update.assert_called_once_with({})
+
+
 def test_fileserver_duration():
     """
     Validate Fileserver process duration.
@@ -336,6 +378,9 @@ def test_aes_funcs_black(master_opts):
         "get_method",
         "run_func",
         "_handle_minion_event",
+        "_pillar_reply_opts",
+        "_store_pillar",
+        "pillar_from_pool",
     ]
     try:
         for name in dir(aes_funcs):
@@ -1258,3 +1303,178 @@ def test_on_demand_not_allowed(not_allowed_funcs, tmp_path, caplog):
         "The following ext_pillar modules are not allowed for on-demand pillar data: git."
         in caplog.text
     )
+
+
+def test_pillar_pool_deduplicates_requests(master_opts):
+    """
+    Identical pillar requests of a minion that arrive while its pillar is
+    being compiled are answered with the result of that compilation
+    """
+    requests = queue.Queue()
+    replies = [queue.Queue(), queue.Queue()]
+    pool = salt.master.PillarPool(master_opts, requests, replies)
+    pool.executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    compiling = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compile_pillar(load):
+        calls.append(load["id"])
+        compiling.set()
+        release.wait(5)
+        return {"minion": load["id"]}, 0.5
+
+    load = {"id": "minion", "grains": {"os": "Linux"}}
+    with patch("salt.master._compile_pillar", compile_pillar):
+        pool.handle_request(0, 1, dict(load))
+        assert compiling.wait(5)
+        pool.handle_request(1, 1, dict(load))
+        pool.handle_request(1, 2, dict(load, grains={"os": "Windows"}))
+        release.set()
+        pool.executor.shutdown(wait=True)
+
+    assert sorted(calls) == ["minion", "minion"]
+    assert replies[0].get(timeout=5) == (1, {"minion": "minion"}, None)
+    assert sorted(replies[1].get(timeout=5) for _ in range(2)) == [
+        (1, {"minion": "minion"}, None),
+        (2, {"minion": "minion"}, None),
+    ]
+    assert pool.renders == 2
+    assert pool.deduplicated == 1
+    assert pool.minion_times == {"minion": 0.5}
+    assert not pool.inflight
+
+
+async def test_pillar_pool_client(master_opts):
+    requests = queue.Queue()
+    replies = queue.Queue()
+    client = salt.master.PillarPoolClient(master_opts, requests, replies, 3)
+    load = {"id": "minion", "grains": {}, "tok": "token", "cmd": "_pillar"}
+
+    async def answer():
+        while requests.empty():
+            await asyncio.sleep(0.01)
+        worker, request_id, request = requests.get()
+        assert worker == 3
+        assert request == {"id": "minion", "grains": {}}
+        replies.put((request_id, {"foo": "bar"}, None))
+
+    pillar, _ = await asyncio.gather(client.compile_pillar(load), answer())
+    assert pillar == {"foo": "bar"}
+
+
+async def test_request_pools_run_commands_in_threads():
+    opts = {
+        "worker_pools": {
+            "returns": {"commands": ["_return", "_syndic_return"], "threads": 2},
+            "files": {"commands": ["_serve_file", "_return"]},
+        }
+    }
+    pools = salt.master.RequestPools(opts)
+    try:
+        assert pools.get("_return").name == "returns"
+        assert pools.get("_syndic_return").name == "returns"
+        assert pools.get("_serve_file").name == "files"
+        assert pools.get("_mine") is None
+
+        ret = await pools.run(
+            pools.get("_serve_file"), lambda: threading.current_thread().name
+        )
+        assert ret.startswith("RequestPool-files")
+        stats = pools.stats()
+        assert stats["files"]["runs"] == 1
+        assert stats["returns"]["runs"] == 0
+        pools.reset_stats()
+        assert pools.stats()["files"]["runs"] == 0
+    finally:
+        pools.close()
+
+
+async def test_request_pools_ready_waits_for_full_pool():
+    pools = salt.master.RequestPools(
+        {"worker_pools": {"returns": {"commands": ["_return"], "queue": 1}}}
+    )
+    pool = pools.get("_return")
+    release = threading.Event()
+    try:
+        runs = [asyncio.ensure_future(pools.run(pool, release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        assert pool.full
+        ready = asyncio.ensure_future(pools.ready())
+        await asyncio.sleep(0.1)
+        assert not ready.done()
+
+        release.set()
+        await asyncio.wait_for(ready, 5)
+        await asyncio.gather(*runs)
+        assert pool.pending == 0
+        assert pool.stats()["queue_depth_max"] == 1
+    finally:
+        release.set()
+        pools.close()
+
+
+async def test_mworker_runs_pooled_commands_in_pool(master_opts):
+    master_opts["master_stats"] = False
+    master_opts["worker_pools"] = {"returns": {"commands": ["_return"]}}
+    worker = salt.master.MWorker(master_opts, {}, {}, [])
+    worker.aes_funcs = MagicMock()
+    worker.aes_funcs.run_func.return_value = ({}, {"fun": "send"})
+    worker.request_pools = salt.master.RequestPools(master_opts)
+    try:
+        with patch("salt.master.AESFuncs") as aes_funcs:
+            aes_funcs.return_value.run_func.side_effect = lambda cmd, load: (
+                threading.current_thread().name,
+                {"fun": "send"},
+            )
+            ret = await worker._handle_payload(
+                {"enc": "aes", "load": {"cmd": "_return", "id": "minion"}}
+            )
+            assert ret[0].startswith("RequestPool-returns")
+            aes_funcs.return_value.run_func.assert_called_once_with(
+                "_return", {"cmd": "_return", "id": "minion"}
+            )
+            worker.aes_funcs.run_func.assert_not_called()
+
+            await worker._handle_payload({"enc": "aes", "load": {"cmd": "_mine"}})
+            worker.aes_funcs.run_func.assert_called_once()
+            assert worker.request_pools.stats()["returns"]["runs"] == 1
+    finally:
+        worker.request_pools.close()
+
+
+async def test_mworker_pool_threads_do_not_share_aes_funcs(master_opts):
+    master_opts["master_stats"] = False
+    master_opts["worker_pools"] = {"returns": {"commands": ["_return"], "threads": 3}}
+    worker = salt.master.MWorker(master_opts, {}, {}, [])
+    worker.aes_funcs = MagicMock()
+    worker.request_pools = salt.master.RequestPools(master_opts)
+    # Every thread of the pool runs a request at the same time
+    barrier = threading.Barrier(3, timeout=10)
+    running = set()
+
+    def run_func(self, cmd, load):
+        barrier.wait()
+        running.add((threading.current_thread().name, id(self)))
+        return {}, {"fun": "send"}
+
+    try:
+        with patch("salt.master.AESFuncs.__init__", return_value=None), patch(
+            "salt.master.AESFuncs.run_func", run_func
+        ):
+            for _ in range(2):
+                await asyncio.gather(
+                    *[
+                        worker._handle_payload(
+                            {"enc": "aes", "load": {"cmd": "_return"}}
+                        )
+                        for _ in range(3)
+                    ]
+                )
+        # Each thread kept using its own AESFuncs
+        assert len(running) == 3
+        assert len({thread for thread, _ in running}) == 3
+        assert len({funcs for _, funcs in running}) == 3
+        worker.aes_funcs.run_func.assert_not_called()
+    finally:
+        worker.request_pools.close()
@@ -17,6 +17,7 @@ import pytest
 import salt.config
 import salt.exceptions
 import salt.fileclient
+import salt.pillar
 import salt.utils.stringutils
 from salt.utils.files import fopen
 from tests.support.mock import MagicMock, patch
@@ -1311,3 +1312,112 @@ async def test_async_remote_pillar_bad_return(grains, tmp_pki):
     pillar.channel.crypted_transfer_decode_dictentry = crypted_transfer_mock
     with pytest.raises(salt.exceptions.SaltClientError):
         await pillar.compile_pillar()
+
+
+def test_compile_pillar_fingerprint_cache(master_opts, tmp_path):
+    pillar_root = tmp_path / "pillar"
+    pillar_root.mkdir()
+    (pillar_root / "top.sls").write_text(
+        "base:\n  minion1:\n    - common\n    - one\n  minion2:\n    - common\n"
+    )
+    (pillar_root / "common.sls").write_text("common: {{ grains['os'] }}\n")
+    (pillar_root / "one.sls").write_text("one: 1\n")
+    (tmp_path / "cache" / "pillar_cache").mkdir(parents=True)
+    master_opts.update(
+        {
+            "cachedir": str(tmp_path / "cache"),
+            "pillar_roots": {"base": [str(pillar_root)]},
+            "pillar_cache": True,
+            "pillar_cache_backend": "disk",
+            "pillar_cache_fingerprint": True,
+        }
+    )
+
+    def compile_pillar(minion_id, os_="Linux"):
+        return salt.pillar.PillarCache(
+            master_opts, {"os": os_}, minion_id, "base"
+        ).compile_pillar()
+
+    with patch.object(
+        salt.pillar.PillarCache,
+        "fetch_pillar",
+        autospec=True,
+        side_effect=salt.pillar.PillarCache.fetch_pillar,
+    ) as fetch:
+        assert compile_pillar("minion1") == {"common": "Linux", "one": 1}
+        assert compile_pillar("minion2") == {"common": "Linux"}
+        assert fetch.call_count == 2
+
+        # Nothing changed
+        assert compile_pillar("minion1") == {"common": "Linux", "one": 1}
+        assert compile_pillar("minion2") == {"common": "Linux"}
+        assert fetch.call_count == 2
+
+        # Only the pillar of the minion including the changed SLS is compiled
+        os.utime(pillar_root / "one.sls", ns=(0, 0))
+        (pillar_root / "one.sls").write_text("one: 2\n")
+        assert compile_pillar("minion1") == {"common": "Linux", "one": 2}
+        assert compile_pillar("minion2") == {"common": "Linux"}
+        assert fetch.call_count == 3
+
+        # Changed grains invalidate the pillar of the minion
+        assert compile_pillar("minion2", os_="Windows") == {"common": "Windows"}
+        assert fetch.call_count == 4
+
+
+def test_compile_pillar_fingerprint_cache_shadowed(master_opts, tmp_path):
+    """
+    A new SLS file taking precedence over a rendered one invalidates the
+    cached pillar
+    """
+    roots = [tmp_path / "pillar1", tmp_path / "pillar2"]
+    for root in roots:
+        root.mkdir()
+    (roots[1] / "top.sls").write_text("base:\n  '*':\n    - one\n    - two\n")
+    (roots[1] / "one.sls").write_text("one: 1\n")
+    (roots[1] / "two").mkdir()
+    (roots[1] / "two" / "init.sls").write_text("two: 1\n")
+    (tmp_path / "cache" / "pillar_cache").mkdir(parents=True)
+    master_opts.update(
+        {
+            "cachedir": str(tmp_path / "cache"),
+            "pillar_roots": {"base": [str(root) for root in roots]},
+            "pillar_cache": True,
+            "pillar_cache_backend": "disk",
+            "pillar_cache_fingerprint": True,
+        }
+    )
+
+    def compile_pillar():
+        return salt.pillar.PillarCache(
+            master_opts, {"os": "Linux"}, "minion1", "base"
+        ).compile_pillar()
+
+    assert compile_pillar() == {"one": 1, "two": 1}
+    # The same file in an earlier pillar root
+    (roots[0] / "one.sls").write_text("one: 2\n")
+    assert compile_pillar() == {"one": 2, "two": 1}
+    # An SLS file taking precedence over an init.sls
+    (roots[1] / "two.sls").write_text("two: 2\n")
+    assert compile_pillar() == {"one": 2, "two": 2}
+    (roots[0] / "two.sls").write_text("two: 3\n")
+    assert compile_pillar() == {"one": 2, "two": 3}
+
+
+def test_pillar_cache_fingerprint_opts(master_opts):
+    def fingerprint(**opts):
+        return salt.pillar.PillarCache(
+            dict(master_opts, **opts), {"os": "Linux"}, "minion1", "base"
+        ).fingerprint()
+
+    # Top files can target nodegroups
+    assert fingerprint(nodegroups={"web": "web*"}) != fingerprint(
+        nodegroups={"web": "www*"}
+    )
+    assert fingerprint(pillar_opts=False, log_level="info") == fingerprint(
+        pillar_opts=False, log_level="debug"
+    )
+    # The master options are part of the pillar
+    assert fingerprint(pillar_opts=True, log_level="info") != fingerprint(
+        pillar_opts=True, log_level="debug"
+    )
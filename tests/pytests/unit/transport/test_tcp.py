@@ -708,6 +708,47 @@ async def test_pub_server_publish_payload_closed_stream(master_opts, io_loop):
     assert server.clients == set()
 
 
+async def test_pub_server_publish_payload_targets_index(master_opts, io_loop):
+    server = salt.transport.tcp.PubServer(master_opts, io_loop=io_loop)
+    clients = {}
+    for id_ in ("minion1", "minion2", "minion3"):
+        client = MagicMock()
+        client.id_ = id_
+        clients[id_] = client
+    server.clients = clients.values()
+    await server.publish_payload({"foo": "bar"}, ["minion2", "minion3", "missing"])
+    clients["minion1"].stream.write.assert_not_called()
+    clients["minion2"].stream.write.assert_called_once()
+    clients["minion3"].stream.write.assert_called_once()
+
+    server.remove_client(clients["minion2"])
+    assert clients["minion2"] not in server.clients
+    await server.publish_payload({"foo": "bar"}, ["minion2"])
+    clients["minion2"].stream.write.assert_called_once()
+
+
+async def test_pub_server_publish_payload_drops_slow_subscriber(master_opts, io_loop):
+    master_opts["tcp_pub_write_buffer"] = 1024
+    server = salt.transport.tcp.PubServer(master_opts, io_loop=io_loop)
+    stream = MagicMock()
+    stream.socket.getpeercert.side_effect = AttributeError
+    stream.closed.return_value = False
+    with patch.object(io_loop, "spawn_callback"):
+        server.handle_stream(stream, "1.2.3.4")
+    assert stream.max_write_buffer_size == 1024
+    slow = server.clients.pop()
+    slow.id_ = "slow"
+    slow.stream.write.side_effect = tornado.iostream.StreamBufferFullError()
+    fast = MagicMock()
+    fast.id_ = "fast"
+    server.clients = [slow, fast]
+
+    await server.publish_payload({"foo": "bar"}, None)
+    fast.stream.write.assert_called_once()
+    stream.close.assert_called_once()
+    assert server.clients == {fast}
+
+
 async def test_pub_server_paths_no_perms(master_opts, io_loop):
     def publish_payload(payload):
         return payload
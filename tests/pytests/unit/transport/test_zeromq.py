@@ -1,3 +1,4 @@
+import asyncio
 import ctypes
 import hashlib
 import logging
@@ -14,6 +15,7 @@ import tornado.ioloop
 import zmq.eventloop.future
 
 import salt.config
+import salt.payload
 import salt.transport.base
 import salt.transport.zeromq
 import salt.utils.platform
@@ -2162,6 +2164,52 @@ async def test_request_server_continue_on_errors_log_debug(io_loop, caplog):
         assert "Traceback" in caplog.text
 
 
+async def test_request_server_concurrent_request_handler(io_loop):
+    server = salt.transport.zeromq.RequestServer({})
+    release = asyncio.Event()
+
+    async def gate():
+        pass
+
+    async def message_handler(payload):
+        if payload == "slow":
+            await release.wait()
+        return payload
+
+    class Socket:
+        def __init__(self):
+            self.requests = [
+                [b"slow-id", b"", salt.payload.dumps("slow")],
+                [b"fast-id", b"", salt.payload.dumps("fast")],
+            ]
+            self.sent = []
+
+        async def recv_multipart(self):
+            if self.requests:
+                return self.requests.pop(0)
+            await asyncio.sleep(1)
+
+        async def send_multipart(self, frames):
+            self.sent.append(frames)
+            if len(self.sent) == 1:
+                release.set()
+            else:
+                server._event.set()
+
+    server._socket = Socket()
+    server.request_gate = gate
+    server.message_handler = message_handler
+
+    await asyncio.wait_for(server.concurrent_request_handler(), 5)
+    await asyncio.gather(*server.tasks)
+
+    # The fast request is answered while the slow one is still being handled
+    assert server._socket.sent == [
+        [b"fast-id", b"", salt.payload.dumps("fast")],
+        [b"slow-id", b"", salt.payload.dumps("slow")],
+    ]
+
+
 @pytest.mark.xfail
 def test_backoff_timer():
     start = 0.0003
@@ -4,6 +4,7 @@ import time
 from pathlib import Path
 
 import pytest
+import tornado.ioloop
 import tornado.iostream
 import zmq
 
@@ -13,7 +14,7 @@ import salt.utils.stringutils
 from salt.exceptions import SaltDeserializationError
 from salt.utils.event import SaltEvent
 from tests.support.events import eventpublisher_process, eventsender_process
-from tests.support.mock import patch
+from tests.support.mock import MagicMock, patch
 
 NO_LONG_IPC = False
 if getattr(zmq, "IPC_PATH_MAX_LEN", 103) <= 103:
@@ -411,3 +412,62 @@ def test_event_fire_ret_load():
         )
         assert mock_log_error.mock_calls[0].args[1] == "minion_id.example.org"
         assert mock_log_error.mock_calls[0].args[2] == "".join(test_traceback)
+
+
+def test_event_pack_batch():
+    events = [SaltEvent.pack(f"evt{idx}", {"data": idx}) for idx in range(3)]
+    batch = SaltEvent.pack_batch(events)
+    assert SaltEvent.unbatch(batch) == events
+    assert SaltEvent.unbatch(events[0]) == [events[0]]
+
+
+def test_event_get_event_unbatches(sock_dir):
+    events = [SaltEvent.pack(f"evt{idx}", {"data": idx}) for idx in range(3)]
+    with salt.utils.event.MasterEvent(str(sock_dir), listen=False) as me:
+        me.subscriber = MagicMock()
+        me.subscriber.recv.side_effect = [SaltEvent.pack_batch(events), None]
+        me.cpub = True
+        for idx in range(3):
+            _assert_got_event(me.get_event(tag="evt", wait=0.1), {"data": idx})
+        assert me.get_event(tag="evt", wait=0.1) is None
+        assert me.subscriber.recv.call_count == 2
+        me.subscriber = None
+        me.cpub = False
+
+
+async def test_event_batcher(io_loop):
+    published = []
+
+    async def publish(raw):
+        published.append(raw)
+
+    events = [SaltEvent.pack(f"evt{idx}", {"data": idx}) for idx in range(3)]
+    batcher = salt.utils.event.EventBatcher(publish, 60, 2, io_loop=io_loop)
+    for raw in events:
+        await batcher.add(raw)
+    assert published == [SaltEvent.pack_batch(events[:2])]
+    await batcher.flush()
+    assert published[1] == events[2]
+    assert batcher.batches == 2
+    assert batcher.max_batch_size == 2
+    batcher.close()
+
+
+def test_event_batcher_close_publishes_pending():
+    io_loop = tornado.ioloop.IOLoop()
+    published = []
+
+    async def publish(raw):
+        published.append(raw)
+
+    events = [SaltEvent.pack(f"evt{idx}", {"data": idx}) for idx in range(3)]
+    batcher = salt.utils.event.EventBatcher(publish, 60, 10, io_loop=io_loop)
+    try:
+        for raw in events:
+            io_loop.run_sync(lambda raw=raw: batcher.add(raw))
+        assert not published
+        batcher.close()
+        assert published == [SaltEvent.pack_batch(events)]
+        assert batcher.pending == []
+    finally:
+        io_loop.close()
@@ -1165,3 +1165,50 @@ def test_eval_when_splay_in_past(schedule):
     ret = schedule.job_status(job_name)
     assert "_last_run" not in ret
     assert ret["_next_fire_time"] is None
+
+
+@pytest.mark.slow_test
+def test_eval_idle_until_due(schedule):
+    """
+    verify that jobs are left out of the evaluation until they are due
+    """
+    job_name = "test_eval_idle_until_due"
+    job = {
+        "schedule": {
+            job_name: {
+                "function": "test.ping",
+                "seconds": 3600,
+                "run_on_start": False,
+            }
+        }
+    }
+    run_time = datetime.datetime(2017, 11, 29, 12, 0, 0, 500000)
+
+    # Add the job to the scheduler
+    schedule.opts.update(job)
+
+    with patch.object(schedule, "_run_job") as run_job:
+        schedule.eval(now=run_time)
+        due = datetime.datetime(2017, 11, 29, 13, 0, 0)
+        assert schedule.next_due == due
+        assert job_name in schedule._idle
+        assert not schedule.evaluating
+
+        # Not due yet, nothing to evaluate
+        assert schedule.eval(now=run_time + datetime.timedelta(minutes=30)) == []
+        assert job_name in schedule._idle
+        run_job.assert_not_called()
+
+        # Due, the job runs and its next fire time is computed again
+        assert len(schedule.eval(now=due)) == 1
+        run_job.assert_called_once()
+        assert schedule.next_due == due + datetime.timedelta(hours=1)
+
+        # Modifying the job puts it back into the evaluation
+        schedule.disable_job(job_name, persist=False, fire_event=False)
+        assert job_name not in schedule._idle
+        schedule.eval(now=due + datetime.timedelta(minutes=1))
+        ret = schedule.job_status(job_name)
+        assert ret["_skip_reason"] == "disabled"
+        assert schedule.next_due is None
+        assert schedule.evaluating
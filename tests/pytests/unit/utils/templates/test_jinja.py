@@ -3,12 +3,14 @@ Tests for salt.utils.templates
 """
 
 import re
-
 from collections import OrderedDict
+
+import jinja2.sandbox
 import pytest
+
+import salt.utils.templates
 from salt.exceptions import SaltRenderError
 from salt.utils.templates import render_jinja_tmpl
-
 from tests.support.mock import patch
 
 
@@ -101,3 +103,24 @@ def test_render_cve_2021_25283(render_context):
     render_context["var"] = "OK"
     with pytest.raises(SaltRenderError):
         res = render_jinja_tmpl(tmpl, render_context)
+
+
+def test_render_compile_cache(render_context):
+    templ = """{{ var }} {{ [3, 1, 2]|sort|first }}"""
+    render_context["opts"]["jinja_compile_cache_size"] = 2
+    with patch.object(
+        jinja2.sandbox.SandboxedEnvironment,
+        "compile",
+        autospec=True,
+        side_effect=jinja2.sandbox.SandboxedEnvironment.compile,
+    ) as compile_:
+        for var in ("a", "b"):
+            with patch.dict(render_context, {"var": var}):
+                assert render_jinja_tmpl(templ, render_context) == f"{var} 1"
+        assert compile_.call_count == 1
+
+        for other in ("{{ var }}", "{{ var }}!"):
+            with patch.dict(render_context, {"var": "c"}):
+                render_jinja_tmpl(other, render_context)
+        assert compile_.call_count == 3
+        assert len(salt.utils.templates._COMPILED_TEMPLATES) == 2
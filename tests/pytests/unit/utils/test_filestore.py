@@ -0,0 +1,57 @@
+import os
+
+import salt.utils.files
+import salt.utils.filestore
+import salt.utils.hashutils
+from tests.support.mock import patch
+
+
+def test_add_and_fetch(tmp_path):
+    store = salt.utils.filestore.FileStore(str(tmp_path / "store"))
+    first = tmp_path / "first"
+    first.write_text("contents")
+    hsum = salt.utils.hashutils.get_hash(str(first), "sha256")
+
+    store.add(str(first), "sha256", "0" * 64)
+    assert not os.path.exists(store.object_path("sha256", "0" * 64))
+
+    store.add(str(first), "sha256", hsum)
+    obj = store.object_path("sha256", hsum)
+    assert os.path.samefile(obj, str(first))
+
+    second = tmp_path / "second"
+    assert store.fetch("sha256", hsum, str(second))
+    assert os.path.samefile(obj, str(second))
+    assert not store.fetch("sha256", "0" * 64, str(tmp_path / "third"))
+
+    # The index survives the store and validates unchanged files by stat
+    store.save()
+    store = salt.utils.filestore.FileStore(str(tmp_path / "store"))
+    with patch("salt.utils.hashutils.get_hash") as get_hash:
+        assert store.hash(str(second), "sha256") == hsum
+    get_hash.assert_not_called()
+
+
+def test_modified_files_are_rehashed_and_released(tmp_path):
+    store = salt.utils.filestore.FileStore(str(tmp_path / "store"))
+    cached = tmp_path / "cached"
+    cached.write_text("old")
+    old = salt.utils.hashutils.get_hash(str(cached), "sha256")
+    store.add(str(cached), "sha256", old)
+    old_obj = store.object_path("sha256", old)
+    assert os.path.exists(old_obj)
+
+    # A new download replaces the cached file
+    new_file = tmp_path / "download"
+    new_file.write_text("new")
+    os.replace(str(new_file), str(cached))
+    new = salt.utils.hashutils.get_hash(str(cached), "sha256")
+    assert store.hash(str(cached), "sha256") == new
+    assert not os.path.exists(old_obj)
+
+    # A stored file modified through one of its links is not served
+    store.add(str(cached), "sha256", new)
+    with salt.utils.files.fopen(str(cached), "a") as fh_:
+        fh_.write("modified")
+    assert not store.fetch("sha256", new, str(tmp_path / "other"))
+    assert not os.path.exists(store.object_path("sha256", new))
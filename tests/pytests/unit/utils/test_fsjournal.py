@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+import salt.utils.fsjournal
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "root"
+    (root / "dir").mkdir(parents=True)
+    (root / "dir" / "file").write_text("file")
+    (root / "top").write_text("top")
+    return root
+
+
+def _changes(changes, root):
+    return {
+        key: sorted(os.path.relpath(path, root) for path in paths)
+        for key, paths in changes.items()
+    }
+
+
+def test_tree_journal_poll(root):
+    journal = salt.utils.fsjournal.TreeJournal(str(root), use_inotify=False)
+    assert _changes(journal.update(), root) == {
+        "added": ["dir", os.path.join("dir", "file"), "top"],
+        "removed": [],
+        "modified": [],
+    }
+    assert _changes(journal.update(), root) == {
+        "added": [],
+        "removed": [],
+        "modified": [],
+    }
+
+    (root / "dir" / "new").mkdir()
+    (root / "dir" / "new" / "file").write_text("new")
+    os.utime(root / "top", ns=(0, 0))
+    assert _changes(journal.update(), root) == {
+        "added": [os.path.join("dir", "new"), os.path.join("dir", "new", "file")],
+        "removed": [],
+        "modified": ["dir", "top"],
+    }
+
+    (root / "dir" / "file").unlink()
+    (root / "dir" / "new" / "file").unlink()
+    (root / "dir" / "new").rmdir()
+    assert _changes(journal.update(), root) == {
+        "added": [],
+        "removed": [
+            os.path.join("dir", "file"),
+            os.path.join("dir", "new"),
+            os.path.join("dir", "new", "file"),
+        ],
+        "modified": ["dir"],
+    }
+    assert journal.files == {str(root / "top"): (0, 3)}
+
+
+def test_tree_journal_missing_root(tmp_path):
+    root = tmp_path / "root"
+    journal = salt.utils.fsjournal.TreeJournal(str(root), use_inotify=False)
+    assert journal.update() == {"added": set(), "removed": set(), "modified": set()}
+
+    root.mkdir()
+    (root / "file").write_text("file")
+    assert journal.update()["added"] == {str(root / "file")}
+
+    (root / "file").unlink()
+    root.rmdir()
+    assert journal.update()["removed"] == {str(root / "file")}
+
+
+@pytest.mark.parametrize(
+    "use_inotify",
+    [
+        False,
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(
+                not salt.utils.fsjournal.HAS_PYINOTIFY,
+                reason="pyinotify is not installed",
+            ),
+        ),
+    ],
+)
+def test_tree_journal_replaced_file(root, use_inotify):
+    journal = salt.utils.fsjournal.TreeJournal(str(root), use_inotify=use_inotify)
+    journal.update()
+    mtime_ns = (root / "top").stat().st_mtime_ns
+
+    # Rename a file over a known one, keeping the modification time
+    (root / "dir" / "tmp").write_text("replaced")
+    os.utime(root / "dir" / "tmp", ns=(mtime_ns, mtime_ns))
+    os.replace(root / "dir" / "tmp", root / "top")
+    changes = _changes(journal.update(), root)
+    assert "top" in changes["modified"]
+    assert changes["added"] == changes["removed"] == []
+
+    # Replace a file by a directory
+    (root / "dir" / "file").unlink()
+    (root / "dir" / "file").mkdir()
+    changes = _changes(journal.update(), root)
+    assert changes["added"] == [os.path.join("dir", "file")]
+    assert changes["removed"] == [os.path.join("dir", "file")]
+    assert journal.entries[str(root / "dir" / "file")] is True
+    journal.close()
@@ -1,5 +1,9 @@
+import sys
+import threading
+
 import pytest
 
+import salt.cache
 import salt.config
 import salt.utils.minions
 import salt.utils.network
@@ -128,3 +132,223 @@ def test_validate_tgt_should_return_true_when_all_minions_are_found_in_valid_min
             "fnord", "fnord", "fnord", minions=target_minions
         )
         assert result is True
+
+
+@pytest.fixture
+def indexed_opts(master_opts):
+    master_opts["minion_data_cache"] = True
+    master_opts["minion_data_cache_index"] = True
+    cache = salt.cache.factory(master_opts)
+    minion_data = {
+        "web1": {
+            "grains": {
+                "os": "Ubuntu",
+                "roles": ["web", "db"],
+                "ipv4": ["10.0.0.5", "127.0.0.1"],
+                "ipv6": ["fe80::1"],
+            },
+            "pillar": {"role": "web", "app": {"port": 80}},
+        },
+        "web2": {
+            "grains": {"os": "CentOS", "roles": ["web"], "ipv4": ["10.0.1.7"]},
+            "pillar": {"role": "web:frontend", "app": {"port": 8080}},
+        },
+        "db1": {
+            "grains": {
+                "os": "Ubuntu",
+                "roles": [{"db": "primary"}],
+                "ipv4": ["192.168.1.10"],
+            },
+            "pillar": {"role": "db"},
+        },
+    }
+    for id_, data in minion_data.items():
+        cache.store(f"minions/{id_}", "data", data)
+    cache.store("minions/nodata", "mine", {})
+    salt.utils.minions._MINION_DATA_INDEXES.clear()
+    yield master_opts
+    salt.utils.minions._MINION_DATA_INDEXES.clear()
+
+
+@pytest.mark.parametrize(
+    "tgt_type,expr",
+    [
+        ("grain", "os:Ubuntu"),
+        ("grain", "os:ubu*"),
+        ("grain", "roles:web"),
+        ("grain", "roles:db"),
+        ("grain", "roles:db:primary"),
+        ("grain", "os"),
+        ("grain", "*:Ubuntu"),
+        ("grain_pcre", "os:(centos|ubuntu)"),
+        ("pillar", "role:web"),
+        ("pillar", "role:web:frontend"),
+        ("pillar", "app:port:80*"),
+        ("pillar", "app:port"),
+        ("pillar_exact", "role:web"),
+        ("ipcidr", "10.0.0.0/8"),
+        ("ipcidr", "10.0.1.7"),
+        ("ipcidr", "192.168.0.0/16"),
+        ("ipcidr", "fe80::/10"),
+    ],
+)
+@pytest.mark.parametrize("greedy", [True, False])
+def test_minion_data_index_matches_cache_scan(indexed_opts, tgt_type, expr, greedy):
+    """
+    Targets resolved through the minion data index must match the ones
+    resolved by scanning the minion data cache
+    """
+    accepted = {"minions": ["web1", "web2", "db1", "nodata", "nocache"]}
+    with patch("salt.key.Key.list_status", return_value=accepted):
+        ckminions = salt.utils.minions.CkMinions(indexed_opts)
+        indexed = ckminions.check_minions(expr, tgt_type, greedy=greedy)
+        indexed_opts["minion_data_cache_index"] = False
+        scanned = ckminions.check_minions(expr, tgt_type, greedy=greedy)
+    assert sorted(indexed["minions"]) == sorted(scanned["minions"])
+
+
+def test_minion_data_index_refresh(indexed_opts):
+    """
+    The minion data index picks up data stored and removed behind its back
+    and data it is updated with
+    """
+    cache = salt.cache.factory(indexed_opts)
+    index = salt.utils.minions.get_minion_data_index(indexed_opts)
+    assert index.refresh() == {"web1", "web2", "db1", "nodata"}
+    assert index.match("grains", "os:Ubuntu") == {"web1", "db1"}
+
+    cache.store("minions/web2", "data", {"grains": {"os": "Ubuntu"}})
+    cache.flush("minions/db1")
+    # Changes made by others are only seen once the interval passed
+    index.refresh()
+    assert index.match("grains", "os:Ubuntu") == {"web1", "db1"}
+    index.refresh(force=True)
+    assert index.match("grains", "os:Ubuntu") == {"web1", "web2"}
+    assert "db1" not in index.minions()
+
+    index.update("web1", {"grains": {"os": "Debian"}, "pillar": {}})
+    assert index.match("grains", "os:Ubuntu") == {"web2"}
+    assert index.match("grains", "os:Debian") == {"web1"}
+
+
+def test_minion_data_index_refreshed_once_per_target(indexed_opts):
+    indexed_opts["minion_data_cache_index_interval"] = 0
+    accepted = {"minions": ["web1", "web2", "db1", "nodata", "nocache"]}
+    with patch("salt.key.Key.list_status", return_value=accepted):
+        ckminions = salt.utils.minions.CkMinions(indexed_opts)
+        index = salt.utils.minions.get_minion_data_index(indexed_opts)
+        with patch.object(index, "refresh", wraps=index.refresh) as refresh:
+            ret = ckminions.check_minions(
+                "G@os:Ubuntu and I@role:web and S@10.0.0.0/8", "compound", greedy=False
+            )
+            assert ret["minions"] == ["web1"]
+            refresh.assert_called_once()
+            ckminions.check_minions("G@os:Ubuntu", "compound", greedy=False)
+            assert refresh.call_count == 2
+
+
+def test_minion_data_index_concurrent_access(indexed_opts, request):
+    """
+    The minion data index is updated and matched against from several
+    threads at once
+    """
+    switch_interval = sys.getswitchinterval()
+    # Switch threads often to interleave the index accesses
+    sys.setswitchinterval(1e-6)
+    request.addfinalizer(lambda: sys.setswitchinterval(switch_interval))
+    index = salt.utils.minions.get_minion_data_index(indexed_opts)
+    index.refresh()
+    errors = []
+
+    def update(num):
+        try:
+            for idx in range(200):
+                index.update(
+                    f"minion{num}",
+                    {"grains": {"os": "Ubuntu", "num": [idx, num]}, "pillar": {}},
+                )
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    def match():
+        try:
+            for _ in range(200):
+                index.match("grains", "num:1*")
+                index.match("grains", "os:Ubuntu")
+                index.minions()
+        except Exception as exc:  # pylint: disable=broad-except
+            errors.append(exc)
+
+    threads = [threading.Thread(target=update, args=(num,)) for num in range(4)]
+    threads += [threading.Thread(target=match) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert index.match("grains", "num:199") == {f"minion{num}" for num in range(4)}
+    assert index.match("grains", "os:Ubuntu") == {
+        "web1",
+        "db1",
+        "minion0",
+        "minion1",
+        "minion2",
+        "minion3",
+    }
+    # The postings of every minion were kept whole
+    for num in range(4):
+        index.remove(f"minion{num}")
+    assert index.match("grains", "num:*") == set()
+
+
+def test_compile_compound():
+    nodegroups = {"dbs": "L@db1,db2"}
+    expr = "I@role:db and not ( web* or G@role:web ) and N@dbs"
+    plan = salt.utils.minions.compile_compound(expr, nodegroups)
+    # The cheapest targets come first, nodegroups are expanded
+    assert plan == (
+        "and",
+        [
+            ("target", "L", "db1,db2", None),
+            ("target", "I", "role:db", None),
+            (
+                "not",
+                (
+                    "or",
+                    [
+                        ("target", None, "web*", None),
+                        ("target", "G", "role:web", None),
+                    ],
+                ),
+                False,
+            ),
+        ],
+    )
+    # Plans are reused as long as the nodegroups are the same
+    assert salt.utils.minions.compile_compound(expr, nodegroups) is plan
+    assert salt.utils.minions.compile_compound(expr, dict(nodegroups)) is not plan
+    assert salt.utils.minions.compile_compound("web1 web2") is None
+    assert salt.utils.minions.compile_compound("and web1") is None
+
+
+@pytest.mark.parametrize("greedy", [True, False])
+def test_compound_narrows_cache_lookups(indexed_opts, greedy):
+    """
+    The targets matched against the minion data cache only look at the
+    minions matched by the cheaper targets
+    """
+    indexed_opts["minion_data_cache_index"] = False
+    accepted = {"minions": ["web1", "web2", "db1", "nodata", "nocache"]}
+    with patch("salt.key.Key.list_status", return_value=accepted):
+        ckminions = salt.utils.minions.CkMinions(indexed_opts)
+        with patch.object(
+            ckminions.cache,
+            "list_with_values",
+            wraps=ckminions.cache.list_with_values,
+        ) as list_with_values:
+            ret = ckminions.check_minions(
+                "G@os:Ubuntu and E@^web", "compound", greedy=greedy
+            )
+    assert ret["minions"] == ["web1"]
+    list_with_values.assert_called_once()
+    assert sorted(list_with_values.call_args[1]["entries"]) == ["web1", "web2"]
@@ -0,0 +1,38 @@
+import salt.utils.mmapindex
+
+
+def test_write_and_get(tmp_path):
+    path = str(tmp_path / "index")
+    items = [(("roots", "base", f"file{num}"), {"num": num}) for num in range(100)]
+    salt.utils.mmapindex.write_index(path, items)
+
+    index = salt.utils.mmapindex.MmapIndex(path)
+    for key, value in items:
+        assert index.get(key) == value
+    assert index.get(("roots", "dev", "file1")) is None
+    assert index.get(("gitfs", "base", "file1"), "missing") == "missing"
+    index.close()
+
+
+def test_replaced_index_is_mapped_again(tmp_path):
+    path = str(tmp_path / "index")
+    index = salt.utils.mmapindex.MmapIndex(path, check_interval=0)
+    assert index.get(("roots", "base", "top.sls")) is None
+
+    salt.utils.mmapindex.write_index(path, [(("roots", "base", "top.sls"), 1)])
+    assert index.get(("roots", "base", "top.sls")) == 1
+
+    salt.utils.mmapindex.write_index(path, [(("roots", "base", "top.sls"), 2)])
+    assert index.get(("roots", "base", "top.sls")) == 2
+    index.close()
+
+
+def test_items(tmp_path):
+    path = str(tmp_path / "index")
+    items = [(("roots", "base", f"file{num}"), {"num": num}) for num in range(10)]
+    salt.utils.mmapindex.write_index(path, items)
+
+    index = salt.utils.mmapindex.MmapIndex(path)
+    assert sorted(index.items()) == sorted(items)
+    index.close()
+    assert not list(salt.utils.mmapindex.MmapIndex(str(tmp_path / "none")).items())
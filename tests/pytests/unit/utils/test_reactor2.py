@@ -1,4 +1,5 @@
 import codecs
+import fnmatch
 import glob
 import logging
 import os
@@ -464,6 +465,67 @@ def test_list_reactors(test_reactor, reaction_map):
             assert test_reactor.list_reactors(tag) == reaction_map[tag]
 
 
+def test_reactor_map_matches_fnmatch():
+    """
+    Ensure the compiled reactor map returns the reactors fnmatch would, in the
+    order of the map.
+    """
+    patterns = [
+        "salt/job/*/ret/*",
+        "salt/job/*",
+        "salt/auth",
+        "salt/minion/web?/start",
+        "salt/minion/*/start",
+        "salt/[ab]*",
+        "*",
+        "salt/auth",
+        "other/*",
+    ]
+    react_map = [
+        {pattern: f"/srv/reactor/{idx}.sls"} for idx, pattern in enumerate(patterns)
+    ]
+    compiled = reactor.ReactorMap(react_map + ["invalid", {"a": 1, "b": 2}])
+    for tag in (
+        "salt/job/20240101/ret/web1",
+        "salt/job/20240101/new",
+        "salt/auth",
+        "salt/minion/web1/start",
+        "salt/minion/db1/start",
+        "salt/beacon/web1/inotify",
+        "other/event",
+        "othe",
+        "",
+    ):
+        expected = [
+            f"/srv/reactor/{idx}.sls"
+            for idx, pattern in enumerate(patterns)
+            if fnmatch.fnmatch(tag, pattern)
+        ]
+        assert compiled.match(tag) == expected
+
+
+def test_list_reactors_reloads_map_file(test_reactor, tmp_path):
+    """
+    Ensure a reactor map file is read again when it changes.
+    """
+    map_file = tmp_path / "reactor.conf"
+    map_file.write_text("- salt/auth: /srv/reactor/auth.sls\n")
+    test_reactor.opts["reactor"] = str(map_file)
+    assert test_reactor.list_reactors("salt/auth") == ["/srv/reactor/auth.sls"]
+    assert test_reactor.compiled_map() is test_reactor.compiled_map()
+
+    map_file.write_text(
+        "- salt/auth:\n  - /srv/reactor/a.sls\n  - /srv/reactor/b.sls\n"
+    )
+    assert test_reactor.list_reactors("salt/auth") == [
+        "/srv/reactor/a.sls",
+        "/srv/reactor/b.sls",
+    ]
+
+    map_file.unlink()
+    assert test_reactor.list_reactors("salt/auth") == []
+
+
 # -----------------------------------------------------------------------------
 # FIXTURE for Reactor Wrap
 # -----------------------------------------------------------------------------
@@ -0,0 +1,116 @@
+import pytest
+
+import salt.utils.statedelta
+from tests.support.mock import MagicMock, patch
+
+
+@pytest.fixture
+def opts(tmp_path):
+    return {
+        "cachedir": str(tmp_path),
+        "state_return_delta_chain": 2,
+        "state_return_delta_max_age": 3600,
+    }
+
+
+def _state(result=True, changes=None, comment="ok"):
+    return {
+        "result": result,
+        "changes": changes or {},
+        "comment": comment,
+        "duration": 1.0,
+    }
+
+
+def _load(jid, ret, fun="state.apply"):
+    return {"cmd": "_return", "id": "minion", "jid": jid, "fun": fun, "return": ret}
+
+
+def test_delta_returns_are_expanded(opts):
+    job_cache = {}
+
+    def get_return(jid, minion_id):
+        assert minion_id == "minion"
+        return job_cache.get(jid)
+
+    runs = [
+        {"a": _state(), "b": _state(), "c": _state()},
+        {"a": _state(comment="again"), "b": _state(changes={"x": 1}), "c": _state()},
+        {"a": _state(), "b": _state(result=False), "d": _state()},
+        {"a": _state(), "b": _state(result=False), "d": _state()},
+    ]
+    loads = []
+    for num, ret in enumerate(runs):
+        load = salt.utils.statedelta.delta_load(opts, _load(str(num), ret))
+        job_cache[str(num)] = load["return"]
+        salt.utils.statedelta.confirm(opts, load)
+        loads.append(load)
+
+    assert not salt.utils.statedelta.is_delta(loads[0]["return"])
+    assert set(loads[1]["return"]) == {"b", salt.utils.statedelta.DELTA_KEY}
+    delta = loads[2]["return"][salt.utils.statedelta.DELTA_KEY]
+    assert delta["base"] == "1"
+    assert delta["removed"] == ["c"]
+    assert set(loads[2]["return"]) == {"b", "d", salt.utils.statedelta.DELTA_KEY}
+    # The chain is limited to 2 delta returns
+    assert not salt.utils.statedelta.is_delta(loads[3]["return"])
+
+    expanded = salt.utils.statedelta.expand("minion", loads[2]["return"], get_return)
+    assert expanded == {"a": runs[0]["a"], "b": runs[2]["b"], "d": runs[2]["d"]}
+    assert salt.utils.statedelta.expand("minion", runs[3], get_return) is runs[3]
+
+
+def test_delta_load_skips_other_returns(opts):
+    load = _load("1", {"a": _state()}, fun="test.ping")
+    assert salt.utils.statedelta.delta_load(opts, load) is load
+    load = _load("1", ["Rendering SLS 'base:foo' failed"])
+    assert salt.utils.statedelta.delta_load(opts, load) is load
+    load = _load("req", {"a": _state()})
+    assert salt.utils.statedelta.delta_load(opts, load) is load
+
+
+def test_expand_missing_base(opts, caplog):
+    salt.utils.statedelta.confirm(
+        opts, salt.utils.statedelta.delta_load(opts, _load("1", {"a": _state()}))
+    )
+    load = salt.utils.statedelta.delta_load(
+        opts, _load("2", {"a": _state(), "b": _state()})
+    )
+    ret = salt.utils.statedelta.expand("minion", load["return"], lambda *_: None)
+    delta = ret.pop(salt.utils.statedelta.DELTA_KEY)
+    assert delta["incomplete"] is True
+    assert delta["missing"] == "1"
+    assert ret == {"b": _state()}
+    assert "is not in the job cache" in caplog.text
+
+
+def test_delta_based_on_confirmed_returns(opts):
+    load = salt.utils.statedelta.delta_load(opts, _load("1", {"a": _state()}))
+    salt.utils.statedelta.confirm(opts, load)
+    # The return of job 2 never reached the master
+    salt.utils.statedelta.delta_load(opts, _load("2", {"a": _state(False)}))
+    load = salt.utils.statedelta.delta_load(opts, _load("3", {"a": _state(False)}))
+    assert load["return"][salt.utils.statedelta.DELTA_KEY]["base"] == "1"
+    assert "a" in load["return"]
+
+
+def test_delta_max_age(opts):
+    with patch("time.time", return_value=1000):
+        load = salt.utils.statedelta.delta_load(opts, _load("1", {"a": _state()}))
+        salt.utils.statedelta.confirm(opts, load)
+    with patch("time.time", return_value=1000 + 3600):
+        load = salt.utils.statedelta.delta_load(opts, _load("2", {"a": _state()}))
+    assert not salt.utils.statedelta.is_delta(load["return"])
+
+
+def test_job_cache_getter_reads_new_returns():
+    job_cache = {"1": {"minion1": {"return": {"a": _state()}}}}
+    get_jid = MagicMock(side_effect=lambda jid: dict(job_cache[jid]))
+    get_return = salt.utils.statedelta.job_cache_getter(get_jid)
+    assert get_return("1", "minion1") == {"a": _state()}
+    assert get_return("1", "minion1") == {"a": _state()}
+    assert get_jid.call_count == 1
+    # The return of minion2 was stored after the job was read
+    job_cache["1"]["minion2"] = {"return": {"b": _state()}}
+    assert get_return("1", "minion2") == {"b": _state()}
+    assert get_jid.call_count == 2
@@ -1,6 +1,7 @@
 import importlib
 import os
 import sys
+import tarfile
 
 import pytest
 import saltfactories.utils.saltext
@@ -125,3 +126,74 @@ def test_discover_saltexts():
     assert "name" in dists[dist]
     assert dists[dist]["name"].startswith("pytest_salt_factories")
     assert dists[dist]["name"].endswith(".dist-info")
+
+
+def test_layered_tarfile(tmp_path):
+    """
+    Test the tarball built from cached layers holds all the files and only
+    the layers which changed are compressed again
+    """
+    src = tmp_path / "src"
+    for pkg in ("foo", "bar"):
+        (src / pkg).mkdir(parents=True)
+        (src / pkg / "__init__.py").write_text(f"{pkg} = True\n")
+    layerdir = tmp_path / "layers"
+    thintar = tmp_path / "thin.tgz"
+
+    def build():
+        tfp = salt.utils.thin._LayeredTarFile(str(thintar), str(layerdir))
+        for pkg in ("foo", "bar"):
+            with tfp.layer():
+                tfp.add(
+                    str(src / pkg / "__init__.py"), arcname=f"py3/{pkg}/__init__.py"
+                )
+        (src / "version").write_text("1")
+        tfp.add(str(src / "version"), arcname="version")
+        tfp.close()
+        with tarfile.open(str(thintar)) as tar:
+            return {
+                member.name: tar.extractfile(member).read()
+                for member in tar.getmembers()
+            }, tfp.layers
+
+    files, layers = build()
+    assert files == {
+        "py3/foo/__init__.py": b"foo = True\n",
+        "py3/bar/__init__.py": b"bar = True\n",
+        "version": b"1",
+    }
+    assert sorted(os.listdir(str(layerdir))) == sorted(f"{x}.gz" for x in layers)
+
+    (src / "bar" / "__init__.py").write_text("bar = False\n")
+    with patch.object(
+        salt.utils.thin._LayeredTarFile,
+        "_compress_layer",
+        autospec=True,
+        side_effect=salt.utils.thin._LayeredTarFile._compress_layer,
+    ) as compress:
+        files, new_layers = build()
+    assert compress.call_count == 1
+    assert files["py3/bar/__init__.py"] == b"bar = False\n"
+    assert new_layers[0] == layers[0]
+    assert new_layers[1] != layers[1]
+    # The layer which is not used anymore is removed
+    assert sorted(os.listdir(str(layerdir))) == sorted(f"{x}.gz" for x in new_layers)
+
+
+def test_thin_sum_cached(tmp_path):
+    """
+    Test the checksum of the tarball is only computed again when it is
+    replaced
+    """
+    thintar = tmp_path / "thin" / "thin.tgz"
+    thintar.parent.mkdir()
+    thintar.write_bytes(b"thin")
+    with patch("salt.utils.thin.gen_thin", MagicMock(return_value=str(thintar))), patch(
+        "salt.utils.hashutils.get_hash", MagicMock(side_effect=["1", "2"])
+    ) as get_hash:
+        assert salt.utils.thin.thin_sum(str(tmp_path))[1] == "1"
+        assert salt.utils.thin.thin_sum(str(tmp_path))[1] == "1"
+        assert get_hash.call_count == 1
+        thintar.unlink()
+        thintar.write_bytes(b"thin2")
+        assert salt.utils.thin.thin_sum(str(tmp_path))[1] == "2"